@@ -1,10 +1,13 @@
 """Pump Diagnostic System - Pertamina Patra Niaga (3-Layer Architecture Final - FIXED)"""
 import streamlit as st
-import numpy as np
 from datetime import datetime
-import pandas as pd
+import io
 import math
 
+# Only the stdlib-only screening path loads at startup; pandas/numpy come in
+# with route upload (engine.route_screening) and CSV export on first use
+from engine import screening
+
 # Page configuration
 st.set_page_config(
     page_title="🛢️ Pump Diagnostic System - Pertamina Patra Niaga",
@@ -197,6 +200,147 @@ if 'screening_done' not in st.session_state:
     st.session_state.fft_inputs = None
     st.session_state.coast_down_inputs = None
     st.session_state.demod_inputs = None
+    st.session_state.route_prefill = {}
+
+
+def _prefill(field, default, min_value=None, max_value=None):
+    """Widget default: route drill-down value if available, else demo value"""
+    value = st.session_state.get("route_prefill", {}).get(field)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return default
+    value = type(default)(value)
+    if min_value is not None:
+        value = max(type(default)(min_value), min(type(default)(max_value), value))
+    return value
+
+
+def _drill_down(route, route_index):
+    """Load one route asset into the single-asset flow with Layer 1 done"""
+    from engine import route_screening
+    
+    layer1_result = route_screening.route_row_layer1(route, route_index)
+    st.session_state.route_prefill = route_screening.route_row_inputs(route, route_index)
+    st.session_state.screening_done = True
+    st.session_state.anomaly_detected = layer1_result['anomaly_detected']
+    st.session_state.layer1_result = layer1_result
+    st.session_state.input_mode = "Single Asset"
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _screen_route_file(file_bytes, file_name, baseline_bytes=None):
+    """Parse + Layer 1 screen an uploaded route (and update baselines); cached on file content"""
+    from engine import route_screening
+    from engine.baselines import BaselineTracker
+    from engine.cohort_anomaly import CohortAnomalyDetector
+    from engine.input_schema import row_errors
+    
+    buffer = io.BytesIO(file_bytes)
+    buffer.name = file_name
+    route = route_screening.load_route_file(buffer)
+    validation = route_screening.validate_route(route)
+    input_errors = [
+        (route.at[i, 'asset_id'], ", ".join(row_errors(validation, i)))
+        for i in (~validation['valid']).nonzero()[0]
+    ]
+    
+    baselines = BaselineTracker.load(io.BytesIO(baseline_bytes)) if baseline_bytes else route_screening.new_route_baselines()
+    cohorts = CohortAnomalyDetector()
+    cohorts.update(route)
+    fleet = route_screening.screen_route(route, baselines, cohorts)
+    baselines.update(route['asset_id'].tolist(), route_screening.route_point_values(route))
+    updated_baseline = io.BytesIO()
+    baselines.save(updated_baseline)
+    return route, fleet, input_errors, updated_baseline.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _analyze_fault(fft_radial, fft_axial, accel_values, actual_rpm, coast_down_time, coast_down_vel, demod_inputs):
+    """Layer 2 + Layer 3 + risk for one input set; cached on the inputs"""
+    layer2_result = screening.analyze_layer2(fft_radial, fft_axial, accel_values, actual_rpm)
+    layer3_result = screening.analyze_layer3(layer2_result, coast_down_time, coast_down_vel, demod_inputs)
+    return layer2_result, layer3_result, screening.assess_screening_risk(layer2_result, layer3_result)
+
+
+input_mode = st.radio(
+    "**Mode Input**",
+    ["Single Asset", "Route Upload (Fleet)"],
+    horizontal=True,
+    key="input_mode",
+    help="Route Upload: screening Layer 1 untuk semua pompa dalam satu file route dari data collector"
+)
+
+# ============================================
+# ROUTE UPLOAD: Layer 1 Fleet Screening (ROUTE MODE ONLY)
+# ============================================
+if input_mode == "Route Upload (Fleet)":
+    st.markdown('<p class="section-header">Route Upload: Layer 1 Fleet Screening</p>', unsafe_allow_html=True)
+    st.info("💡 Upload file route (CSV/Excel, satu baris per pompa). Kolom wajib: asset_id, foundation_type, motor_kw, npshr, suction_pressure, discharge_pressure, current_r/s/t, actual_rpm, B1_H…B4_V (velocity), B1_band1…B4_band3 (acceleration).")
+    
+    route_file = st.file_uploader("Route File", type=["csv", "xlsx", "xls"], key="route_file")
+    baseline_file = st.file_uploader(
+        "Baseline File (opsional)", type=["npz"], key="baseline_file",
+        help="Baseline per pompa dari route sebelumnya - deteksi kenaikan relatif (≥2× baseline) walau masih di Zone A/B"
+    )
+    if route_file is not None:
+        try:
+            route, fleet, input_errors, updated_baseline = _screen_route_file(
+                route_file.getvalue(), route_file.name,
+                baseline_file.getvalue() if baseline_file is not None else None
+            )
+        except ValueError as e:
+            st.error(f"❌ {e}")
+            st.stop()
+        
+        if input_errors:
+            with st.expander(f"⚠️ {len(input_errors)} pompa dengan data input tidak valid (kosong / di luar range / tidak masuk akal)"):
+                for asset_id, errors in input_errors:
+                    st.write(f"• **{asset_id}**: {errors}")
+        
+        anomalous = fleet[fleet['anomaly_detected']]
+        
+        col_r1, col_r2, col_r3, col_r4 = st.columns(4)
+        col_r1.metric("Total Pompa", len(fleet))
+        col_r2.metric("Anomali (Lanjut Layer 2)", len(anomalous))
+        col_r3.metric("CRITICAL / DANGER", int(fleet['status'].isin(["CRITICAL", "DANGER"]).sum()))
+        col_r4.metric("Normal (Tanpa FFT)", int((~fleet['anomaly_detected']).sum()))
+        
+        only_anomalous = st.checkbox("Tampilkan hanya pompa anomali", value=True, key="route_only_anomalous")
+        table = anomalous if only_anomalous else fleet
+        st.dataframe(table.drop(columns="route_index"), use_container_width=True, hide_index=True)
+        st.caption("Klik header kolom untuk mengurutkan. Status: CRITICAL > DANGER > WARNING > NORMAL. baseline_status: perubahan relatif terhadap histori pompa sendiri. cohort_anomaly: menyimpang dari pompa sejenis (pump_type, kW, pondasi)")
+        
+        st.download_button(
+            "📊 Download Fleet Screening (CSV)",
+            fleet.drop(columns="route_index").to_csv(index=False),
+            file_name=f"fleet_screening_{datetime.now().strftime('%Y%m%d')}.csv",
+            mime="text/csv"
+        )
+        st.download_button(
+            "📈 Download Baseline Terbaru (.npz)",
+            updated_baseline,
+            file_name=f"route_baseline_{datetime.now().strftime('%Y%m%d')}.npz",
+            mime="application/octet-stream",
+            help="Simpan dan upload bersama route berikutnya"
+        )
+        
+        if len(anomalous):
+            drill_index = st.selectbox(
+                "Pilih pompa anomali untuk Layer 2/3",
+                anomalous['route_index'].tolist(),
+                format_func=lambda i: f"{route.at[i, 'asset_id']} - {fleet.loc[fleet['route_index'] == i, 'status'].iloc[0]}",
+                key="route_drill_asset"
+            )
+            st.button(
+                "🔬 DRILL-DOWN - Lanjut ke Layer 2/3",
+                type="primary",
+                use_container_width=True,
+                key="route_drill_btn",
+                on_click=_drill_down,
+                args=(route, drill_index)
+            )
+        else:
+            st.success("✅ Semua pompa NORMAL pada Layer 1 - tidak perlu FFT")
+    st.stop()
 
 # ============================================
 # SECTION 1: Asset Specification (ALWAYS VISIBLE)
@@ -207,18 +351,10 @@ col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown("#### 🔧 Motor Specifications")
-    motor_kw = st.number_input("Motor Power (kW)", 1, 1000, 45, help="Dari nameplate motor (IEC 60034-1)")
+    motor_kw = st.number_input("Motor Power (kW)", 1, 1000, _prefill("motor_kw", 45, 1, 1000), help="Dari nameplate motor (IEC 60034-1)")
     
     # Auto-detect machine group
-    if motor_kw <= 15:
-        machine_group = "Group 1 (≤15 kW) - Small Pumps/Fans"
-        group_num = 1
-    elif motor_kw <= 75:
-        machine_group = "Group 2 (15-75 kW) - Small Product Pumps"
-        group_num = 2
-    else:
-        machine_group = "Group 3 (>75 kW) - BBM Transfer Pumps"
-        group_num = 3
+    group_num, machine_group = screening.get_machine_group(motor_kw)
     
     st.caption(f"**Auto-detected Machine Group:** {machine_group}")
     st.caption("⚠️ Threshold: Group 2 rigid = 4.5 mm/s | Group 3 rigid = 7.1 mm/s")
@@ -237,13 +373,14 @@ with col2:
     ])
     bep_flow = st.number_input("BEP Flow (m³/hr)", 0.0, 1000.0, 50.0, help="Dari pump curve")
     bep_head = st.number_input("BEP Head (m)", 0.0, 200.0, 65.0, help="Dari pump curve")
-    npshr = st.number_input("NPSHr (m)", 0.0, 20.0, 2.8, help="Dari pump curve")
+    npshr = st.number_input("NPSHr (m)", 0.0, 20.0, _prefill("npshr", 2.8, 0.0, 20.0), help="Dari pump curve")
 
 with col3:
     st.markdown("#### 🏗️ Installation Specifications")
     foundation_type = st.radio(
         "**Foundation Type**",
         ["Rigid (Concrete)", "Flexible (Steel Structure)"],
+        index=1 if _prefill("foundation_type", "") == "Flexible (Steel Structure)" else 0,
         help="Rigid = pondasi beton, Flexible = struktur baja",
         horizontal=True
     )
@@ -253,8 +390,8 @@ with col3:
          "Large Roller (>100mm shaft)", "Unknown"],
         help="Perkiraan diameter shaft"
     )
-    asset_id = st.text_input("Asset ID", "PPJ-BBM-P-205", label_visibility="visible")
-    location = st.text_input("Location", "Plaju Terminal", label_visibility="visible")
+    asset_id = st.text_input("Asset ID", _prefill("asset_id", "PPJ-BBM-P-205"), label_visibility="visible")
+    location = st.text_input("Location", _prefill("location", "Plaju Terminal"), label_visibility="visible")
 
 # ============================================
 # SECTION 2: Layer 1 - Overall Screening (ALWAYS VISIBLE)
@@ -269,43 +406,26 @@ with col4:
     st.caption("ISO 20816-1:2016 - Machine Health Assessment")
     
     # Threshold berdasarkan machine group & foundation
-    if group_num == 2:  # Group 2: 15-75 kW
-        if foundation_type == "Rigid (Concrete)":
-            zone_a_limit = 1.8
-            zone_b_limit = 4.5
-            zone_c_limit = 7.1
-        else:
-            zone_a_limit = 2.8
-            zone_b_limit = 7.1
-            zone_c_limit = 11.2
-    else:  # Group 3: >75 kW
-        if foundation_type == "Rigid (Concrete)":
-            zone_a_limit = 2.8
-            zone_b_limit = 7.1
-            zone_c_limit = 11.2
-        else:
-            zone_a_limit = 4.5
-            zone_b_limit = 11.2
-            zone_c_limit = 18.0
+    zone_a_limit, zone_b_limit, zone_c_limit = screening.get_velocity_zone_limits(group_num, foundation_type)
     
     # Input untuk 10 titik velocity
     st.subheader("📍 Motor DE (B1)")
-    b1_h_vel = st.number_input("B1 Horizontal (mm/s)", 0.0, 20.0, 2.5, key="b1_h", format="%.2f")
-    b1_v_vel = st.number_input("B1 Vertical (mm/s)", 0.0, 20.0, 3.2, key="b1_v", format="%.2f")
-    b1_a_vel = st.number_input("B1 Axial (mm/s)", 0.0, 20.0, 1.8, key="b1_a", format="%.2f")
+    b1_h_vel = st.number_input("B1 Horizontal (mm/s)", 0.0, 20.0, _prefill("b1_h", 2.5, 0.0, 20.0), key="b1_h", format="%.2f")
+    b1_v_vel = st.number_input("B1 Vertical (mm/s)", 0.0, 20.0, _prefill("b1_v", 3.2, 0.0, 20.0), key="b1_v", format="%.2f")
+    b1_a_vel = st.number_input("B1 Axial (mm/s)", 0.0, 20.0, _prefill("b1_a", 1.8, 0.0, 20.0), key="b1_a", format="%.2f")
     
     st.subheader("📍 Motor NDE (B2)")
-    b2_h_vel = st.number_input("B2 Horizontal (mm/s)", 0.0, 20.0, 2.1, key="b2_h", format="%.2f")
-    b2_v_vel = st.number_input("B2 Vertical (mm/s)", 0.0, 20.0, 2.8, key="b2_v", format="%.2f")
+    b2_h_vel = st.number_input("B2 Horizontal (mm/s)", 0.0, 20.0, _prefill("b2_h", 2.1, 0.0, 20.0), key="b2_h", format="%.2f")
+    b2_v_vel = st.number_input("B2 Vertical (mm/s)", 0.0, 20.0, _prefill("b2_v", 2.8, 0.0, 20.0), key="b2_v", format="%.2f")
     
     st.subheader("📍 Pump DE (B3)")
-    b3_h_vel = st.number_input("B3 Horizontal (mm/s)", 0.0, 20.0, 5.46, key="b3_h", format="%.2f")
-    b3_v_vel = st.number_input("B3 Vertical (mm/s)", 0.0, 20.0, 6.70, key="b3_v", format="%.2f")
-    b3_a_vel = st.number_input("B3 Axial (mm/s)", 0.0, 20.0, 9.31, key="b3_a", format="%.2f")
+    b3_h_vel = st.number_input("B3 Horizontal (mm/s)", 0.0, 20.0, _prefill("b3_h", 5.46, 0.0, 20.0), key="b3_h", format="%.2f")
+    b3_v_vel = st.number_input("B3 Vertical (mm/s)", 0.0, 20.0, _prefill("b3_v", 6.70, 0.0, 20.0), key="b3_v", format="%.2f")
+    b3_a_vel = st.number_input("B3 Axial (mm/s)", 0.0, 20.0, _prefill("b3_a", 9.31, 0.0, 20.0), key="b3_a", format="%.2f")
     
     st.subheader("📍 Pump NDE (B4)")
-    b4_h_vel = st.number_input("B4 Horizontal (mm/s)", 0.0, 20.0, 1.62, key="b4_h", format="%.2f")
-    b4_v_vel = st.number_input("B4 Vertical (mm/s)", 0.0, 20.0, 2.05, key="b4_v", format="%.2f")
+    b4_h_vel = st.number_input("B4 Horizontal (mm/s)", 0.0, 20.0, _prefill("b4_h", 1.62, 0.0, 20.0), key="b4_h", format="%.2f")
+    b4_v_vel = st.number_input("B4 Vertical (mm/s)", 0.0, 20.0, _prefill("b4_v", 2.05, 0.0, 20.0), key="b4_v", format="%.2f")
 
 with col5:
     st.markdown("#### ⚡ Acceleration Bands RMS (0.5-16 kHz)")
@@ -313,54 +433,49 @@ with col5:
     
     # Input untuk 4 bearing x 3 bands
     st.subheader("📍 Motor DE (B1)")
-    b1_band1 = st.number_input("B1: 0.5-1.5 kHz (g)", 0.0, 10.0, 0.2, key="b1_b1", format="%.3f")
-    b1_band2 = st.number_input("B1: 1.5-5 kHz (g)", 0.0, 10.0, 0.3, key="b1_b2", format="%.3f")
-    b1_band3 = st.number_input("B1: 5-16 kHz (g)", 0.0, 10.0, 0.4, key="b1_b3", format="%.3f")
-    b1_total_acc = math.sqrt(b1_band1**2 + b1_band2**2 + b1_band3**2)
+    b1_band1 = st.number_input("B1: 0.5-1.5 kHz (g)", 0.0, 10.0, _prefill("b1_band1", 0.2, 0.0, 10.0), key="b1_b1", format="%.3f")
+    b1_band2 = st.number_input("B1: 1.5-5 kHz (g)", 0.0, 10.0, _prefill("b1_band2", 0.3, 0.0, 10.0), key="b1_b2", format="%.3f")
+    b1_band3 = st.number_input("B1: 5-16 kHz (g)", 0.0, 10.0, _prefill("b1_band3", 0.4, 0.0, 10.0), key="b1_b3", format="%.3f")
+    b1_total_acc = screening.total_acceleration(b1_band1, b1_band2, b1_band3)
     st.metric("Total Acc (0.5-16 kHz)", f"{b1_total_acc:.3f} g", delta=None, delta_color="normal")
     
     st.subheader("📍 Motor NDE (B2)")
-    b2_band1 = st.number_input("B2: 0.5-1.5 kHz (g)", 0.0, 10.0, 0.15, key="b2_b1", format="%.3f")
-    b2_band2 = st.number_input("B2: 1.5-5 kHz (g)", 0.0, 10.0, 0.25, key="b2_b2", format="%.3f")
-    b2_band3 = st.number_input("B2: 5-16 kHz (g)", 0.0, 10.0, 0.3, key="b2_b3", format="%.3f")
-    b2_total_acc = math.sqrt(b2_band1**2 + b2_band2**2 + b2_band3**2)
+    b2_band1 = st.number_input("B2: 0.5-1.5 kHz (g)", 0.0, 10.0, _prefill("b2_band1", 0.15, 0.0, 10.0), key="b2_b1", format="%.3f")
+    b2_band2 = st.number_input("B2: 1.5-5 kHz (g)", 0.0, 10.0, _prefill("b2_band2", 0.25, 0.0, 10.0), key="b2_b2", format="%.3f")
+    b2_band3 = st.number_input("B2: 5-16 kHz (g)", 0.0, 10.0, _prefill("b2_band3", 0.3, 0.0, 10.0), key="b2_b3", format="%.3f")
+    b2_total_acc = screening.total_acceleration(b2_band1, b2_band2, b2_band3)
     st.metric("Total Acc (0.5-16 kHz)", f"{b2_total_acc:.3f} g", delta=None, delta_color="normal")
     
     st.subheader("📍 Pump DE (B3)")
-    b3_band1 = st.number_input("B3: 0.5-1.5 kHz (g)", 0.0, 10.0, 0.35, key="b3_b1", format="%.3f")
-    b3_band2 = st.number_input("B3: 1.5-5 kHz (g)", 0.0, 10.0, 0.5, key="b3_b2", format="%.3f")
-    b3_band3 = st.number_input("B3: 5-16 kHz (g)", 0.0, 10.0, 1.7, key="b3_b3", format="%.3f")
-    b3_total_acc = math.sqrt(b3_band1**2 + b3_band2**2 + b3_band3**2)
+    b3_band1 = st.number_input("B3: 0.5-1.5 kHz (g)", 0.0, 10.0, _prefill("b3_band1", 0.35, 0.0, 10.0), key="b3_b1", format="%.3f")
+    b3_band2 = st.number_input("B3: 1.5-5 kHz (g)", 0.0, 10.0, _prefill("b3_band2", 0.5, 0.0, 10.0), key="b3_b2", format="%.3f")
+    b3_band3 = st.number_input("B3: 5-16 kHz (g)", 0.0, 10.0, _prefill("b3_band3", 1.7, 0.0, 10.0), key="b3_b3", format="%.3f")
+    b3_total_acc = screening.total_acceleration(b3_band1, b3_band2, b3_band3)
     st.metric("Total Acc (0.5-16 kHz)", f"{b3_total_acc:.3f} g", delta=None, delta_color="normal")
     
     st.subheader("📍 Pump NDE (B4)")
-    b4_band1 = st.number_input("B4: 0.5-1.5 kHz (g)", 0.0, 10.0, 0.2, key="b4_b1", format="%.3f")
-    b4_band2 = st.number_input("B4: 1.5-5 kHz (g)", 0.0, 10.0, 0.3, key="b4_b2", format="%.3f")
-    b4_band3 = st.number_input("B4: 5-16 kHz (g)", 0.0, 10.0, 0.45, key="b4_b3", format="%.3f")
-    b4_total_acc = math.sqrt(b4_band1**2 + b4_band2**2 + b4_band3**2)
+    b4_band1 = st.number_input("B4: 0.5-1.5 kHz (g)", 0.0, 10.0, _prefill("b4_band1", 0.2, 0.0, 10.0), key="b4_b1", format="%.3f")
+    b4_band2 = st.number_input("B4: 1.5-5 kHz (g)", 0.0, 10.0, _prefill("b4_band2", 0.3, 0.0, 10.0), key="b4_b2", format="%.3f")
+    b4_band3 = st.number_input("B4: 5-16 kHz (g)", 0.0, 10.0, _prefill("b4_band3", 0.45, 0.0, 10.0), key="b4_b3", format="%.3f")
+    b4_total_acc = screening.total_acceleration(b4_band1, b4_band2, b4_band3)
     st.metric("Total Acc (0.5-16 kHz)", f"{b4_total_acc:.3f} g", delta=None, delta_color="normal")
 
 with col6:
     st.markdown("#### 🌡️ Hydraulic & Electrical Data")
     st.caption("Critical for Cavitation & Electrical Fault Detection")
     
-    suction_pressure = st.number_input("Suction Pressure (bar)", 0.0, 20.0, 1.2, format="%.2f", help="Diukur di suction line")
-    discharge_pressure = st.number_input("Discharge Pressure (bar)", 0.0, 50.0, 8.5, format="%.2f", help="Diukur di discharge line")
+    suction_pressure = st.number_input("Suction Pressure (bar)", 0.0, 20.0, _prefill("suction_pressure", 1.2, 0.0, 20.0), format="%.2f", help="Diukur di suction line")
+    discharge_pressure = st.number_input("Discharge Pressure (bar)", 0.0, 50.0, _prefill("discharge_pressure", 8.5, 0.0, 50.0), format="%.2f", help="Diukur di discharge line")
     
     st.markdown("#### ⚡ Electrical Measurements")
-    current_r = st.number_input("Current R Phase (A)", 0.0, 200.0, 82.5, key="cur_r", format="%.1f")
-    current_s = st.number_input("Current S Phase (A)", 0.0, 200.0, 85.0, key="cur_s", format="%.1f")
-    current_t = st.number_input("Current T Phase (A)", 0.0, 200.0, 87.2, key="cur_t", format="%.1f")
-    actual_rpm = st.number_input("Actual RPM", 600, 3600, 1480, help="Diukur dengan tachometer atau dari VFD display")
+    current_r = st.number_input("Current R Phase (A)", 0.0, 200.0, _prefill("current_r", 82.5, 0.0, 200.0), key="cur_r", format="%.1f")
+    current_s = st.number_input("Current S Phase (A)", 0.0, 200.0, _prefill("current_s", 85.0, 0.0, 200.0), key="cur_s", format="%.1f")
+    current_t = st.number_input("Current T Phase (A)", 0.0, 200.0, _prefill("current_t", 87.2, 0.0, 200.0), key="cur_t", format="%.1f")
+    actual_rpm = st.number_input("Actual RPM", 600, 3600, _prefill("actual_rpm", 1480, 600, 3600), help="Diukur dengan tachometer atau dari VFD display")
     
     # Calculate current imbalance
     currents = [current_r, current_s, current_t]
-    max_current = max(currents)
-    min_current = min(currents)
-    if min_current > 0:
-        current_imbalance = ((max_current - min_current) / min_current) * 100
-    else:
-        current_imbalance = 0.0
+    current_imbalance = screening.current_imbalance(currents)
     st.metric("Current Imbalance", f"{current_imbalance:.1f}%", delta=None, delta_color="normal")
 
 # ============================================
@@ -371,64 +486,26 @@ if st.button("🔍 SCREENING - Analisis Kondisi Dasar", type="primary", use_cont
         # ============================================
         # LAYER 1: Overall Screening Analysis
         # ============================================
-        layer1_result = {
-            'velocity_values': {
+        layer1_result = screening.screen_layer1(
+            velocity_values={
                 'B1_H': b1_h_vel, 'B1_V': b1_v_vel, 'B1_A': b1_a_vel,
                 'B2_H': b2_h_vel, 'B2_V': b2_v_vel,
                 'B3_H': b3_h_vel, 'B3_V': b3_v_vel, 'B3_A': b3_a_vel,
                 'B4_H': b4_h_vel, 'B4_V': b4_v_vel
             },
-            'accel_values': {
+            accel_values={
                 'B1': b1_total_acc, 'B2': b2_total_acc,
                 'B3': b3_total_acc, 'B4': b4_total_acc
             },
-            'hydraulic': {
-                'suction': suction_pressure,
-                'discharge': discharge_pressure,
-                'npshr': npshr
-            },
-            'electrical': {
-                'imbalance': current_imbalance,
-                'rpm': actual_rpm
-            },
-            'thresholds': {
-                'zone_b': zone_b_limit,
-                'zone_c': zone_c_limit,
-                'accel_warning': 0.3,  # ISO 15243 Stage 1 threshold
-                'accel_danger': 1.0    # ISO 15243 Stage 2 threshold
-            }
-        }
-        
-        # Determine severity per point and overall anomaly detection
-        velocity_anomalies = []
-        for point, value in layer1_result['velocity_values'].items():
-            if value > zone_c_limit:
-                velocity_anomalies.append((point, value, "DANGER"))
-            elif value > zone_b_limit:
-                velocity_anomalies.append((point, value, "WARNING"))
-        
-        accel_anomalies = []
-        for bearing, value in layer1_result['accel_values'].items():
-            if value > 2.0:
-                accel_anomalies.append((bearing, value, "CRITICAL"))
-            elif value > 1.0:
-                accel_anomalies.append((bearing, value, "DANGER"))
-            elif value > 0.3:
-                accel_anomalies.append((bearing, value, "WARNING"))
-        
-        # Hydraulic check (with 0.5m safety margin)
-        hydraulic_anomaly = suction_pressure < (npshr + 0.5)
-        
-        # Electrical check
-        electrical_anomaly = current_imbalance > 10.0
-        
-        # Overall anomaly detection
-        layer1_anomaly = len(velocity_anomalies) > 0 or len(accel_anomalies) > 0 or hydraulic_anomaly or electrical_anomaly
-        layer1_result['anomaly_detected'] = layer1_anomaly
-        layer1_result['velocity_anomalies'] = velocity_anomalies
-        layer1_result['accel_anomalies'] = accel_anomalies
-        layer1_result['hydraulic_anomaly'] = hydraulic_anomaly
-        layer1_result['electrical_anomaly'] = electrical_anomaly
+            suction_pressure=suction_pressure,
+            discharge_pressure=discharge_pressure,
+            npshr=npshr,
+            currents=currents,
+            actual_rpm=actual_rpm,
+            motor_kw=motor_kw,
+            foundation_type=foundation_type
+        )
+        layer1_anomaly = layer1_result['anomaly_detected']
         
         # Update session state
         st.session_state.screening_done = True
@@ -497,14 +574,14 @@ if st.session_state.screening_done:
     
     with col17:
         # Hydraulic status
-        margin = suction_pressure - npshr
+        margin = layer1_result['hydraulic']['npsha'] - npshr
         if layer1_result['hydraulic_anomaly']:
             status_color = "🔴"
             status_text = "Cavitation Risk HIGH"
         else:
             status_color = "🟢"
             status_text = "Hydraulic OK"
-        st.markdown(f'<div class="metric-card"><h3>{status_color} {status_text}</h3><p style="font-size: 1.8rem; font-weight: bold; margin: 10px 0;">{margin:+.1f} m</p><p style="color: #6c757d; margin-top: 5px;">Suction vs NPSHr</p></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>{status_color} {status_text}</h3><p style="font-size: 1.8rem; font-weight: bold; margin: 10px 0;">{margin:+.1f} m</p><p style="color: #6c757d; margin-top: 5px;">NPSHa vs NPSHr</p></div>', unsafe_allow_html=True)
     
     with col18:
         # Electrical status
@@ -541,6 +618,7 @@ if st.session_state.screening_done:
             st.session_state.screening_done = False
             st.session_state.anomaly_detected = False
             st.session_state.layer1_result = None
+            st.session_state.route_prefill = {}
             st.session_state.fft_inputs = None
             st.session_state.coast_down_inputs = None
             st.session_state.demod_inputs = None
@@ -560,551 +638,315 @@ if st.session_state.screening_done:
                 for bearing, value, severity in layer1_result['accel_anomalies']:
                     st.write(f"• {bearing}: {value:.3f} g ({severity})")
             if layer1_result['hydraulic_anomaly']:
-                st.write(f"**⚠️ Hydraulic**: Suction pressure ({suction_pressure:.1f} m) < NPSHr+0.5 ({npshr+0.5:.1f} m) → Cavitation risk")
+                st.write(f"**⚠️ Hydraulic**: NPSHa ({layer1_result['hydraulic']['npsha']:.1f} m, suction {suction_pressure:.2f} bar) < NPSHr+0.5 ({npshr+0.5:.1f} m) → Cavitation risk")
             if layer1_result['electrical_anomaly']:
                 st.write(f"**⚠️ Electrical**: Current imbalance {current_imbalance:.1f}% > 10% threshold")
         
         st.markdown("---")
         
-        # ============================================
-        # SECTION 5: LAYER 2 & 3 INPUTS (ONLY VISIBLE IF ANOMALY DETECTED)
-        # ============================================
-        st.markdown('<p class="section-header">3. Layer 2: FFT Spectrum Analysis (Hanya untuk Titik Anomali)</p>', unsafe_allow_html=True)
+        # Layer 2/3 inputs and results run as a fragment: editing an FFT peak
+        # or coast-down value reruns only this part, not the Layer 1 screening
+        @st.fragment
+        def fault_analysis_section():
+            # ============================================
+            # SECTION 5: LAYER 2 & 3 INPUTS (ONLY VISIBLE IF ANOMALY DETECTED)
+            # ============================================
+            st.markdown('<p class="section-header">3. Layer 2: FFT Spectrum Analysis (Hanya untuk Titik Anomali)</p>', unsafe_allow_html=True)
         
-        col7, col8 = st.columns(2)
+            col7, col8 = st.columns(2)
         
-        # Store FFT data
-        fft_radial = {}
-        fft_axial = {}
+            # Store FFT data
+            fft_radial = {}
+            fft_axial = {}
         
-        with col7:
-            st.markdown("#### 📡 Radial Spectra (Horizontal Direction)")
-            for bearing in ["Motor DE (B1)", "Motor NDE (B2)", "Pump DE (B3)", "Pump NDE (B4)"]:
-                st.subheader(f"📍 {bearing}")
-                peaks = []
-                for i in range(3):
-                    freq = st.number_input(
-                        f"Peak {i+1} Freq ({bearing})",
-                        0.0, 500.0,
-                        value=24.8 if (bearing=="Pump DE (B3)" and i==0) else 49.6 if (bearing=="Pump DE (B3)" and i==1) else 10.0,
-                        key=f"rad_{bearing}_{i}_freq",
-                        format="%.1f"
-                    )
-                    amp = st.number_input(
-                        f"Peak {i+1} Amp ({bearing})",
-                        0.0, 20.0,
-                        value=3.8 if (bearing=="Pump DE (B3)" and i==0) else 1.1 if (bearing=="Pump DE (B3)" and i==1) else 0.5,
-                        key=f"rad_{bearing}_{i}_amp",
-                        format="%.2f"
-                    )
-                    peaks.append({"freq": freq, "amp": amp})
-                fft_radial[bearing] = peaks
+            with col7:
+                st.markdown("#### 📡 Radial Spectra (Horizontal Direction)")
+                for bearing in ["Motor DE (B1)", "Motor NDE (B2)", "Pump DE (B3)", "Pump NDE (B4)"]:
+                    st.subheader(f"📍 {bearing}")
+                    peaks = []
+                    for i in range(3):
+                        freq = st.number_input(
+                            f"Peak {i+1} Freq ({bearing})",
+                            0.0, 500.0,
+                            value=24.8 if (bearing=="Pump DE (B3)" and i==0) else 49.6 if (bearing=="Pump DE (B3)" and i==1) else 10.0,
+                            key=f"rad_{bearing}_{i}_freq",
+                            format="%.1f"
+                        )
+                        amp = st.number_input(
+                            f"Peak {i+1} Amp ({bearing})",
+                            0.0, 20.0,
+                            value=3.8 if (bearing=="Pump DE (B3)" and i==0) else 1.1 if (bearing=="Pump DE (B3)" and i==1) else 0.5,
+                            key=f"rad_{bearing}_{i}_amp",
+                            format="%.2f"
+                        )
+                        peaks.append({"freq": freq, "amp": amp})
+                    fft_radial[bearing] = peaks
         
-        with col8:
-            st.markdown("#### 📡 Axial Spectra (Only at DE Bearings)")
-            for bearing in ["Motor DE (B1)", "Pump DE (B3)"]:
-                st.subheader(f"📍 {bearing}")
-                peaks = []
-                for i in range(3):
-                    freq = st.number_input(
-                        f"Peak {i+1} Freq ({bearing})",
-                        0.0, 500.0,
-                        value=49.6 if (bearing=="Pump DE (B3)" and i==0) else 99.2 if (bearing=="Pump DE (B3)" and i==1) else 24.8,
-                        key=f"ax_{bearing}_{i}_freq",
-                        format="%.1f"
-                    )
-                    amp = st.number_input(
-                        f"Peak {i+1} Amp ({bearing})",
-                        0.0, 20.0,
-                        value=2.1 if (bearing=="Pump DE (B3)" and i==0) else 0.9 if (bearing=="Pump DE (B3)" and i==1) else 0.6,
-                        key=f"ax_{bearing}_{i}_amp",
-                        format="%.2f"
-                    )
-                    peaks.append({"freq": freq, "amp": amp})
-                fft_axial[bearing] = peaks
+            with col8:
+                st.markdown("#### 📡 Axial Spectra (Only at DE Bearings)")
+                for bearing in ["Motor DE (B1)", "Pump DE (B3)"]:
+                    st.subheader(f"📍 {bearing}")
+                    peaks = []
+                    for i in range(3):
+                        freq = st.number_input(
+                            f"Peak {i+1} Freq ({bearing})",
+                            0.0, 500.0,
+                            value=49.6 if (bearing=="Pump DE (B3)" and i==0) else 99.2 if (bearing=="Pump DE (B3)" and i==1) else 24.8,
+                            key=f"ax_{bearing}_{i}_freq",
+                            format="%.1f"
+                        )
+                        amp = st.number_input(
+                            f"Peak {i+1} Amp ({bearing})",
+                            0.0, 20.0,
+                            value=2.1 if (bearing=="Pump DE (B3)" and i==0) else 0.9 if (bearing=="Pump DE (B3)" and i==1) else 0.6,
+                            key=f"ax_{bearing}_{i}_amp",
+                            format="%.2f"
+                        )
+                        peaks.append({"freq": freq, "amp": amp})
+                    fft_axial[bearing] = peaks
         
-        st.markdown('<p class="section-header">4. Layer 3: Advanced Tests (Conditional)</p>', unsafe_allow_html=True)
+            st.markdown('<p class="section-header">4. Layer 3: Advanced Tests (Conditional)</p>', unsafe_allow_html=True)
         
-        col9, col10 = st.columns(2)
+            col9, col10 = st.columns(2)
         
-        with col9:
-            st.markdown("#### 📉 Coast-Down Test Data")
-            st.caption("Rekam velocity setiap 2 detik selama 10 detik setelah motor dimatikan")
-            coast_down_time = st.multiselect(
-                "Time Points (detik)",
-                options=[0, 2, 4, 6, 8, 10],
-                default=[0, 2, 4, 6, 8, 10],
-                key="coast_time"
-            )
-            coast_down_vel = []
-            for t in coast_down_time:
-                v = st.number_input(
-                    f"Velocity @ {t}s (mm/s)",
-                    0.0, 20.0,
-                    value=5.2 if t==0 else 3.8 if t==2 else 2.5 if t==4 else 1.5 if t==6 else 0.8 if t==8 else 0.3,
-                    key=f"coast_vel_{t}",
-                    format="%.2f"
+            with col9:
+                st.markdown("#### 📉 Coast-Down Test Data")
+                st.caption("Rekam velocity setiap 2 detik selama 10 detik setelah motor dimatikan")
+                coast_down_time = st.multiselect(
+                    "Time Points (detik)",
+                    options=[0, 2, 4, 6, 8, 10],
+                    default=[0, 2, 4, 6, 8, 10],
+                    key="coast_time"
                 )
-                coast_down_vel.append(v)
+                coast_down_vel = []
+                for t in coast_down_time:
+                    v = st.number_input(
+                        f"Velocity @ {t}s (mm/s)",
+                        0.0, 20.0,
+                        value=5.2 if t==0 else 3.8 if t==2 else 2.5 if t==4 else 1.5 if t==6 else 0.8 if t==8 else 0.3,
+                        key=f"coast_vel_{t}",
+                        format="%.2f"
+                    )
+                    coast_down_vel.append(v)
         
-        with col10:
-            st.markdown("#### 🔊 Demodulation/Envelope Values")
-            st.caption("Untuk deteksi 'masking' bearing defect di balik unbalance")
-            demod_motor_de = st.number_input("Motor DE Demod (gE)", 0.0, 10.0, 0.4, key="demod_mde", format="%.2f")
-            demod_motor_nde = st.number_input("Motor NDE Demod (gE)", 0.0, 10.0, 0.3, key="demod_mnde", format="%.2f")
-            demod_pump_de = st.number_input("Pump DE Demod (gE)", 0.0, 10.0, 3.2, key="demod_pde", format="%.2f")
-            demod_pump_nde = st.number_input("Pump NDE Demod (gE)", 0.0, 10.0, 0.5, key="demod_pnde", format="%.2f")
-            st.caption("Baseline healthy bearing: 0.3–0.6 gE | Warning: >2.0 gE | Critical: >4.0 gE")
+            with col10:
+                st.markdown("#### 🔊 Demodulation/Envelope Values")
+                st.caption("Untuk deteksi 'masking' bearing defect di balik unbalance")
+                demod_motor_de = st.number_input("Motor DE Demod (gE)", 0.0, 10.0, 0.4, key="demod_mde", format="%.2f")
+                demod_motor_nde = st.number_input("Motor NDE Demod (gE)", 0.0, 10.0, 0.3, key="demod_mnde", format="%.2f")
+                demod_pump_de = st.number_input("Pump DE Demod (gE)", 0.0, 10.0, 3.2, key="demod_pde", format="%.2f")
+                demod_pump_nde = st.number_input("Pump NDE Demod (gE)", 0.0, 10.0, 0.5, key="demod_pnde", format="%.2f")
+                st.caption("Baseline healthy bearing: 0.3–0.6 gE | Warning: >2.0 gE | Critical: >4.0 gE")
         
-        # Save inputs to session state
-        st.session_state.fft_inputs = {
-            'radial': fft_radial,
-            'axial': fft_axial
-        }
-        st.session_state.coast_down_inputs = {
-            'time': coast_down_time,
-            'vel': coast_down_vel
-        }
-        st.session_state.demod_inputs = {
-            'motor_de': demod_motor_de,
-            'motor_nde': demod_motor_nde,
-            'pump_de': demod_pump_de,
-            'pump_nde': demod_pump_nde
-        }
+            # Save inputs to session state
+            st.session_state.fft_inputs = {
+                'radial': fft_radial,
+                'axial': fft_axial
+            }
+            st.session_state.coast_down_inputs = {
+                'time': coast_down_time,
+                'vel': coast_down_vel
+            }
+            st.session_state.demod_inputs = {
+                'motor_de': demod_motor_de,
+                'motor_nde': demod_motor_nde,
+                'pump_de': demod_pump_de,
+                'pump_nde': demod_pump_nde
+            }
         
-        # ============================================
-        # SECTION 6: ANALYZE FAULT BUTTON (ONLY VISIBLE IF ANOMALY DETECTED)
-        # ============================================
-        if st.button("⚡ ANALYZE FAULT - Diagnosis Lengkap", type="secondary", use_container_width=True, key="analyze_btn"):
-            with st.spinner("Menganalisis Layer 2 & 3: FFT Spectrum & Advanced Tests..."):
-                # ============================================
-                # LAYER 2: FFT Analysis
-                # ============================================
-                fundamental_hz = actual_rpm / 60.0
-                
-                # Initialize features dictionary safely
-                features = {
-                    'motor_de': {'radial': {}, 'axial': {}},
-                    'motor_nde': {'radial': {}},
-                    'pump_de': {'radial': {}, 'axial': {}},
-                    'pump_nde': {'radial': {}}
-                }
-                
-                # Process radial spectra (horizontal direction)
-                radial_locations = {
-                    "Motor DE (B1)": "motor_de",
-                    "Motor NDE (B2)": "motor_nde",
-                    "Pump DE (B3)": "pump_de",
-                    "Pump NDE (B4)": "pump_nde"
-                }
-                
-                for loc_name, loc_key in radial_locations.items():
-                    if loc_name in fft_radial:
-                        peaks = fft_radial[loc_name]
-                        
-                        # Extract 1X and 2X amplitudes
-                        a1x = 0
-                        a2x = 0
-                        for p in peaks:
-                            if abs(p['freq'] - fundamental_hz) / fundamental_hz <= 0.05:
-                                a1x = p['amp']
-                            if abs(p['freq'] - 2*fundamental_hz) / (2*fundamental_hz) <= 0.05:
-                                a2x = p['amp']
-                        
-                        features[loc_key]['radial'] = {
-                            'a1x': a1x,
-                            'a2x': a2x,
-                            'r2x_1x': a2x / a1x if a1x > 0.1 else 0
-                        }
-                
-                # Process axial spectra (only for DE bearings)
-                axial_locations = {
-                    "Motor DE (B1)": "motor_de",
-                    "Pump DE (B3)": "pump_de"
-                }
-                
-                for loc_name, loc_key in axial_locations.items():
-                    if loc_name in fft_axial:
-                        peaks = fft_axial[loc_name]
-                        
-                        # Extract 1X and 2X amplitudes
-                        a1x = 0
-                        a2x = 0
-                        for p in peaks:
-                            if abs(p['freq'] - fundamental_hz) / fundamental_hz <= 0.05:
-                                a1x = p['amp']
-                            if abs(p['freq'] - 2*fundamental_hz) / (2*fundamental_hz) <= 0.05:
-                                a2x = p['amp']
-                        
-                        features[loc_key]['axial'] = {
-                            'a1x': a1x,
-                            'a2x': a2x,
-                            'r2x_1x': a2x / a1x if a1x > 0.1 else 0
-                        }
-                
-                # Calculate fault scores with safe access
-                mis_score = 0
-                mis_location = None
-                
-                # Check misalignment (axial 2X/1X ratio > 1.5)
-                if 'axial' in features['motor_de'] and features['motor_de']['axial'].get('r2x_1x', 0) > 1.5:
-                    mis_score += 2.0
-                    mis_location = "motor"
-                if 'axial' in features['pump_de'] and features['pump_de']['axial'].get('r2x_1x', 0) > 1.5:
-                    mis_score += 2.0
-                    mis_location = "pump" if mis_score == 2.0 else "coupling"
-                
-                # Calculate radial averages for unbalance detection
-                motor_radial_avg = 0
-                pump_radial_avg = 0
-                radial_count = 0
-                
-                for loc in ['motor_de', 'motor_nde']:
-                    if 'radial' in features[loc] and features[loc]['radial'].get('a1x', 0) > 0:
-                        motor_radial_avg += features[loc]['radial']['a1x']
-                        radial_count += 1
-                
-                if radial_count > 0:
-                    motor_radial_avg /= radial_count
-                
-                radial_count = 0
-                for loc in ['pump_de', 'pump_nde']:
-                    if 'radial' in features[loc] and features[loc]['radial'].get('a1x', 0) > 0:
-                        pump_radial_avg += features[loc]['radial']['a1x']
-                        radial_count += 1
-                
-                if radial_count > 0:
-                    pump_radial_avg /= radial_count
-                
-                # Unbalance score
-                unb_score = 0
-                unb_location = None
-                if pump_radial_avg > 3.0 and pump_radial_avg > motor_radial_avg * 1.5:
-                    unb_score += 3.0
-                    unb_location = "pump"
-                elif motor_radial_avg > 3.0 and motor_radial_avg > pump_radial_avg * 1.5:
-                    unb_score += 3.0
-                    unb_location = "motor"
-                
-                # Looseness score (harmonics detection)
-                loo_score = 0
-                harmonic_count = 0
-                
-                # Check radial spectra for harmonics
-                for loc in ['motor_de', 'motor_nde', 'pump_de', 'pump_nde']:
-                    if 'radial' in features[loc]:
-                        if features[loc]['radial'].get('a1x', 0) > 0.5:
-                            harmonic_count += 1
-                
-                # Check axial spectra for harmonics
-                for loc in ['motor_de', 'pump_de']:
-                    if 'axial' in features[loc]:
-                        if features[loc]['axial'].get('a1x', 0) > 0.5:
-                            harmonic_count += 1
-                
-                if harmonic_count > 4:  # >40% of spectra show harmonics
-                    loo_score = 3.0
-                
-                # Bearing defect score
-                bearing_score = 0
-                bearing_location = None
-                max_accel = max(layer1_result['accel_values'].values())
-                if max_accel > 2.0:
-                    bearing_score = min(5.0, max_accel * 0.8)
-                    bearing_location = max(layer1_result['accel_values'], key=layer1_result['accel_values'].get)
-                
-                # Determine primary fault
-                fault_scores = {
-                    'misalignment': mis_score,
-                    'unbalance': unb_score,
-                    'looseness': loo_score,
-                    'bearing_defect': bearing_score
-                }
-                primary_fault = max(fault_scores, key=fault_scores.get)
-                primary_score = fault_scores[primary_fault]
-                
-                # If no significant fault but acceleration high, prioritize bearing defect
-                if primary_score < 2.5 and bearing_score > 0:
-                    primary_fault = 'bearing_defect'
-                    primary_score = bearing_score
-                
-                # Determine fault location
-                if primary_fault == 'misalignment':
-                    fault_location = mis_location if mis_location else "coupling"
-                elif primary_fault == 'unbalance':
-                    fault_location = unb_location if unb_location else "unknown"
-                elif primary_fault == 'bearing_defect':
-                    fault_location = bearing_location if bearing_location else "unknown"
-                elif primary_fault == 'looseness':
-                    fault_location = "structure"
-                else:
-                    fault_location = None
+            # ============================================
+            # SECTION 6: ANALYZE FAULT BUTTON (ONLY VISIBLE IF ANOMALY DETECTED)
+            # ============================================
+            if st.button("⚡ ANALYZE FAULT - Diagnosis Lengkap", type="secondary", use_container_width=True, key="analyze_btn"):
+                with st.spinner("Menganalisis Layer 2 & 3: FFT Spectrum & Advanced Tests..."):
+                    # ============================================
+                    # LAYER 2: FFT Analysis +
+                    # LAYER 3: Advanced Differentiation (Only if unbalance detected)
+                    # ============================================
+                    layer2_result, layer3_result, risk = _analyze_fault(
+                        fft_radial,
+                        fft_axial,
+                        layer1_result['accel_values'],
+                        actual_rpm,
+                        coast_down_time,
+                        coast_down_vel,
+                        st.session_state.demod_inputs
+                    )
+                    features = layer2_result['features']
+                    harmonic_count = layer2_result['harmonic_count']
+                    bearing_location = layer2_result['bearing_location']
+                    need_layer3 = (layer2_result['primary_fault'] == 'unbalance')
                 
-                layer2_result = {
-                    'primary_fault': primary_fault,
-                    'fault_location': fault_location,
-                    'confidence': min(95, 70 + primary_score * 5),
-                    'severity': 'Unacceptable' if primary_score >= 4.0 else 'Unsatisfactory' if primary_score >= 3.0 else 'Satisfactory',
-                    'features': features,
-                    'fundamental_hz': fundamental_hz,
-                    'motor_radial_avg': motor_radial_avg,
-                    'pump_radial_avg': pump_radial_avg
-                }
+                    # ============================================
+                    # DISPLAY FULL DIAGNOSIS RESULTS
+                    # ============================================
+                    st.markdown("### 🔍 Layer 2: FFT Spectrum Analysis Results")
                 
-                # ============================================
-                # LAYER 3: Advanced Differentiation (Only if unbalance detected)
-                # ============================================
-                layer3_result = None
-                need_layer3 = (layer2_result['primary_fault'] == 'unbalance')
+                    fault_display = screening.FAULT_DISPLAY
                 
-                if need_layer3 and coast_down_time and len(coast_down_vel) >= 3:
-                    # Coast-down analysis
-                    if coast_down_time[1] - coast_down_time[0] > 0:
-                        initial_drop = (coast_down_vel[0] - coast_down_vel[1]) / (coast_down_time[1] - coast_down_time[0])
-                    else:
-                        initial_drop = 0
+                    if layer2_result['primary_fault'] != 'no_significant_fault':
+                        fault_emoji = "🔴" if layer2_result['severity'] == 'Unacceptable' else "🟠" if layer2_result['severity'] == 'Unsatisfactory' else "🟡"
+                        st.warning(f"{fault_emoji} **{fault_display[layer2_result['primary_fault']]}** pada **{layer2_result['fault_location'].upper() if layer2_result['fault_location'] else 'N/A'}**")
+                        # ✅ FIXED: Convert percentage to fraction (0.0-1.0)
+                        st.progress(min(layer2_result['confidence'], 95) / 100.0)  # <-- PERUBAHAN DI SINI
+                        st.caption(f"Confidence: {layer2_result['confidence']}% | Severity: {layer2_result['severity']}")
                     
-                    # Mechanical unbalance: gradual decrease
-                    if initial_drop < 1.5 and coast_down_vel[-1] < coast_down_vel[0] * 0.2:
-                        unbalance_type = 'mechanical'
-                        confidence = 85
-                        evidence = [
-                            f"Velocity decrease gradual: {coast_down_vel[0]:.1f} → {coast_down_vel[-1]:.1f} mm/s over {coast_down_time[-1]} seconds",
-                            "Pattern consistent with mechanical unbalance (inertia-driven decay)"
-                        ]
-                        recommendation = "Lakukan dynamic balancing pada rotor"
+                        # Evidence based on fault type
+                        evidence_list = []
+                        if layer2_result['primary_fault'] == 'misalignment':
+                            motor_axial_ratio = features['motor_de']['axial'].get('r2x_1x', 0) if 'axial' in features['motor_de'] else 0
+                            pump_axial_ratio = features['pump_de']['axial'].get('r2x_1x', 0) if 'axial' in features['pump_de'] else 0
+                            evidence_list = [
+                                f"2X RPM dominan di arah aksial: Motor DE ratio = {motor_axial_ratio:.2f}, Pump DE ratio = {pump_axial_ratio:.2f}",
+                                f"Threshold misalignment: rasio 2X/1X > 1.5",
+                                "Pola khas: 2X tinggi hanya di DE (kedua sisi coupling), NDE normal"
+                            ]
+                        elif layer2_result['primary_fault'] == 'unbalance':
+                            evidence_list = [
+                                f"1X RPM dominan di radial: Pump rata-rata = {layer2_result['pump_radial_avg']:.1f} mm/s vs Motor = {layer2_result['motor_radial_avg']:.1f} mm/s",
+                                f"1X Pump DE Horizontal = {features['pump_de']['radial'].get('a1x', 0):.1f} mm/s",
+                                "Dominant direction: radial (horizontal/vertical) bukan aksial"
+                            ]
+                        elif layer2_result['primary_fault'] == 'looseness':
+                            evidence_list = [
+                                f"Harmonik tinggi terdeteksi di {harmonic_count} dari 10 spektrum pengukuran",
+                                "Pola khas looseness: multiple harmonik kuat (2X, 3X, 4X speed)",
+                                "Perlu verifikasi dengan pengukuran mounting bolt"
+                            ]
+                        elif layer2_result['primary_fault'] == 'bearing_defect':
+                            evidence_list = [
+                                f"Max HF Acceleration = {max_acc:.3f}g > 0.3g threshold (Bearing {bearing_location})",
+                                f"Band 3 (5-16 kHz) dominan di {bearing_location}: {layer1_result['accel_values'][bearing_location]:.3f}g",
+                                "Perlu konfirmasi dengan demodulation/envelope analysis"
+                            ]
                     
-                    # Electrical unbalance: rapid drop
-                    elif initial_drop > 2.5 and len(coast_down_vel) > 2 and coast_down_vel[2] < coast_down_vel[0] * 0.4:
-                        unbalance_type = 'electrical'
-                        confidence = 85
-                        evidence = [
-                            f"Velocity drop rapid: {coast_down_vel[0]:.1f} → {coast_down_vel[2]:.1f} mm/s dalam {coast_down_time[2]} detik",
-                            "Indikasi gangguan pada rotor bar atau stator winding"
-                        ]
-                        recommendation = "Periksa rotor bar (broken bar) dan stator winding dengan MCSA"
+                        st.markdown("**Evidence FFT Analysis:**")
+                        for ev in evidence_list:
+                            st.write(f"• {ev}")
                     else:
-                        unbalance_type = 'ambiguous'
-                        confidence = 70
-                        evidence = [f"Pola penurunan tidak jelas: initial drop rate = {initial_drop:.2f} mm/s²"]
-                        recommendation = "Lakukan MCSA untuk konfirmasi atau lakukan balancing sebagai langkah aman pertama"
-                    
-                    # Check for bearing defect masking
-                    demod_check = None
-                    if fault_location == "pump" and demod_pump_de > 2.0:
-                        demod_check = {
-                            'warning': 'High demodulation value detected at Pump DE',
-                            'interpretation': 'Unbalance mungkin masking early-stage bearing defect',
-                            'action': 'After balancing, re-measure vibration. If velocity remains high, suspect bearing defect.'
-                        }
-                    elif fault_location == "motor" and demod_motor_de > 2.0:
-                        demod_check = {
-                            'warning': 'High demodulation value detected at Motor DE',
-                            'interpretation': 'Electrical unbalance mungkin terkait bearing defect',
-                            'action': 'Periksa bearing Motor DE setelah investigasi electrical fault'
-                        }
-                    
-                    layer3_result = {
-                        'unbalance_type': unbalance_type,
-                        'confidence': confidence,
-                        'evidence': evidence,
-                        'recommendation': recommendation,
-                        'demod_check': demod_check
-                    }
+                        st.success("✅ **NO SIGNIFICANT FAULT DETECTED** dalam spektrum FFT")
+                        st.caption("All vibration signatures within acceptable limits")
                 
-                # ============================================
-                # DISPLAY FULL DIAGNOSIS RESULTS
-                # ============================================
-                st.markdown("### 🔍 Layer 2: FFT Spectrum Analysis Results")
+                    # Decision: Apakah perlu Layer 3?
+                    if need_layer3:
+                        st.info("💡 **REKOMENDASI**: Lanjut ke Layer 3 untuk diferensiasi Mechanical vs Electrical Unbalance")
+                    else:
+                        st.success("✅ **Layer 3 tidak diperlukan** - Fault type sudah teridentifikasi jelas")
                 
-                fault_display = {
-                    'misalignment': 'MISALIGNMENT',
-                    'unbalance': 'UNBALANCE',
-                    'looseness': 'MECHANICAL LOOSENESS',
-                    'bearing_defect': 'BEARING DEFECT',
-                    'no_significant_fault': 'NO SIGNIFICANT FAULT'
-                }
+                    st.markdown("---")
                 
-                if layer2_result['primary_fault'] != 'no_significant_fault':
-                fault_emoji = "🔴" if layer2_result['severity'] == 'Unacceptable' else "🟠" if layer2_result['severity'] == 'Unsatisfactory' else "🟡"
-                st.warning(f"{fault_emoji} **{fault_display[layer2_result['primary_fault']]}** pada **{layer2_result['fault_location'].upper() if layer2_result['fault_location'] else 'N/A'}**")
-                # ✅ FIXED: Convert percentage to fraction (0.0-1.0)
-                st.progress(min(layer2_result['confidence'], 95) / 100.0)  # <-- PERUBAHAN DI SINI
-                st.caption(f"Confidence: {layer2_result['confidence']}% | Severity: {layer2_result['severity']}")
+                    # ============================================
+                    # DISPLAY LAYER 3 RESULTS (IF APPLICABLE)
+                    # ============================================
+                    if layer3_result and need_layer3:
+                        st.markdown("### ⚡ Layer 3: Advanced Differentiation Results")
                     
-                    # Evidence based on fault type
-                    evidence_list = []
-                    if layer2_result['primary_fault'] == 'misalignment':
-                        motor_axial_ratio = features['motor_de']['axial'].get('r2x_1x', 0) if 'axial' in features['motor_de'] else 0
-                        pump_axial_ratio = features['pump_de']['axial'].get('r2x_1x', 0) if 'axial' in features['pump_de'] else 0
-                        evidence_list = [
-                            f"2X RPM dominan di arah aksial: Motor DE ratio = {motor_axial_ratio:.2f}, Pump DE ratio = {pump_axial_ratio:.2f}",
-                            f"Threshold misalignment: rasio 2X/1X > 1.5",
-                            "Pola khas: 2X tinggi hanya di DE (kedua sisi coupling), NDE normal"
-                        ]
-                    elif layer2_result['primary_fault'] == 'unbalance':
-                        evidence_list = [
-                            f"1X RPM dominan di radial: Pump rata-rata = {layer2_result['pump_radial_avg']:.1f} mm/s vs Motor = {layer2_result['motor_radial_avg']:.1f} mm/s",
-                            f"1X Pump DE Horizontal = {features['pump_de']['radial'].get('a1x', 0):.1f} mm/s",
-                            "Dominant direction: radial (horizontal/vertical) bukan aksial"
-                        ]
-                    elif layer2_result['primary_fault'] == 'looseness':
-                        evidence_list = [
-                            f"Harmonik tinggi terdeteksi di {harmonic_count} dari 10 spektrum pengukuran",
-                            "Pola khas looseness: multiple harmonik kuat (2X, 3X, 4X speed)",
-                            "Perlu verifikasi dengan pengukuran mounting bolt"
-                        ]
-                    elif layer2_result['primary_fault'] == 'bearing_defect':
-                        evidence_list = [
-                            f"Max HF Acceleration = {max_acc:.3f}g > 0.3g threshold (Bearing {bearing_location})",
-                            f"Band 3 (5-16 kHz) dominan di {bearing_location}: {layer1_result['accel_values'][bearing_location]:.3f}g",
-                            "Perlu konfirmasi dengan demodulation/envelope analysis"
-                        ]
+                        if layer3_result['unbalance_type'] == 'mechanical':
+                            st.success(f"✅ **MECHANICAL UNBALANCE** terkonfirmasi")
+                        elif layer3_result['unbalance_type'] == 'electrical':
+                            st.error(f"⚠️ **ELECTRICAL UNBALANCE** terkonfirmasi")
+                        elif layer3_result['unbalance_type'] == 'ambiguous':
+                            st.warning(f"❓ **UNBALANCE TYPE AMBIGUOUS**")
+                        else:
+                            st.info(f"ℹ️ **COAST-DOWN TEST TIDAK DILAKUKAN**")
+                        st.progress(layer3_result['confidence'] / 100.0)
                     
-                    st.markdown("**Evidence FFT Analysis:**")
-                    for ev in evidence_list:
-                        st.write(f"• {ev}")
-                else:
-                    st.success("✅ **NO SIGNIFICANT FAULT DETECTED** dalam spektrum FFT")
-                    st.caption("All vibration signatures within acceptable limits")
-                
-                # Decision: Apakah perlu Layer 3?
-                if need_layer3:
-                    st.info("💡 **REKOMENDASI**: Lanjut ke Layer 3 untuk diferensiasi Mechanical vs Electrical Unbalance")
-                else:
-                    st.success("✅ **Layer 3 tidak diperlukan** - Fault type sudah teridentifikasi jelas")
-                
-                st.markdown("---")
-                
-                # ============================================
-                # DISPLAY LAYER 3 RESULTS (IF APPLICABLE)
-                # ============================================
-                if layer3_result and need_layer3:
-                st.markdown("### ⚡ Layer 3: Advanced Differentiation Results")
-                
-                if layer3_result['unbalance_type'] == 'mechanical':
-                    st.success(f"✅ **MECHANICAL UNBALANCE** terkonfirmasi")
-                    st.progress(layer3_result['confidence'] / 100.0)  # <-- PERUBAHAN DI SINI
-                elif layer3_result['unbalance_type'] == 'electrical':
-                    st.error(f"⚠️ **ELECTRICAL UNBALANCE** terkonfirmasi")
-                    st.progress(layer3_result['confidence'] / 100.0)  # <-- PERUBAHAN DI SINI
-                elif layer3_result['unbalance_type'] == 'ambiguous':
-                    st.warning(f"❓ **UNBALANCE TYPE AMBIGUOUS**")
-                    st.progress(layer3_result['confidence'] / 100.0)  # <-- PERUBAHAN DI SINI
-                else:
-                    st.info(f"ℹ️ **COAST-DOWN TEST TIDAK DILAKUKAN**")
-                    st.progress(layer3_result['confidence'] / 100.0)  # <-- PERUBAHAN DI SINI
-                    
-                    st.markdown("**Evidence Coast-Down Analysis:**")
-                    for ev in layer3_result['evidence']:
-                        st.write(f"• {ev}")
+                        st.markdown("**Evidence Coast-Down Analysis:**")
+                        for ev in layer3_result['evidence']:
+                            st.write(f"• {ev}")
                     
-                    # Demodulation check for masking
-                    if layer3_result['demod_check']:
-                        st.markdown("#### ⚠️ Bearing Defect Masking Check")
-                        st.warning(layer3_result['demod_check']['warning'])
-                        st.write(f"• {layer3_result['demod_check']['interpretation']}")
-                        st.write(f"• **Action**: {layer3_result['demod_check']['action']}")
+                        # Demodulation check for masking
+                        if layer3_result['demod_check']:
+                            st.markdown("#### ⚠️ Bearing Defect Masking Check")
+                            st.warning(layer3_result['demod_check']['warning'])
+                            st.write(f"• {layer3_result['demod_check']['interpretation']}")
+                            st.write(f"• **Action**: {layer3_result['demod_check']['action']}")
                     
-                    st.markdown("---")
+                        st.markdown("---")
                 
-                # ============================================
-                # FINAL DIAGNOSIS & ACTION PLAN
-                # ============================================
-                st.markdown("### 🎯 Final Diagnosis & Action Plan")
+                    # ============================================
+                    # FINAL DIAGNOSIS & ACTION PLAN
+                    # ============================================
+                    st.markdown("### 🎯 Final Diagnosis & Action Plan")
                 
-                # Determine risk level
-                if layer2_result['severity'] == 'Unacceptable' or (layer3_result and layer3_result.get('unbalance_type') == 'electrical'):
-                    risk_level = "CRITICAL"
-                    mtbf_days = "< 7"
-                    timeline = "< 4 hours"
-                elif layer2_result['severity'] == 'Unsatisfactory':
-                    risk_level = "HIGH"
-                    mtbf_days = "7-30"
-                    timeline = "< 72 hours"
-                else:
-                    risk_level = "MEDIUM"
-                    mtbf_days = "30-90"
-                    timeline = "< 30 days"
+                    # Determine risk level
+                    risk_level = risk['risk_level']
+                    mtbf_days = risk['mtbf_days']
+                    timeline = risk['timeline']
                 
-                col28, col29, col30 = st.columns(3)
-                with col28:
-                    risk_emoji = "🔴" if risk_level == "CRITICAL" else "🟠" if risk_level == "HIGH" else "🟡" if risk_level == "MEDIUM" else "🟢"
-                    st.markdown(f'<div class="metric-card"><h3>{risk_emoji} {risk_level}</h3><p style="font-size: 1.4rem; margin-top: 8px;">Risk Level</p></div>', unsafe_allow_html=True)
-                with col29:
-                    st.markdown(f'<div class="metric-card"><h3>⏱️ {mtbf_days}</h3><p style="font-size: 1.4rem; margin-top: 8px;">MTBF Estimation</p></div>', unsafe_allow_html=True)
-                with col30:
-                    st.markdown(f'<div class="metric-card"><h3>📅 {timeline}</h3><p style="font-size: 1.4rem; margin-top: 8px;">Action Timeline</p></div>', unsafe_allow_html=True)
+                    col28, col29, col30 = st.columns(3)
+                    with col28:
+                        risk_emoji = "🔴" if risk_level == "CRITICAL" else "🟠" if risk_level == "HIGH" else "🟡" if risk_level == "MEDIUM" else "🟢"
+                        st.markdown(f'<div class="metric-card"><h3>{risk_emoji} {risk_level}</h3><p style="font-size: 1.4rem; margin-top: 8px;">Risk Level</p></div>', unsafe_allow_html=True)
+                    with col29:
+                        st.markdown(f'<div class="metric-card"><h3>⏱️ {mtbf_days}</h3><p style="font-size: 1.4rem; margin-top: 8px;">MTBF Estimation</p></div>', unsafe_allow_html=True)
+                    with col30:
+                        st.markdown(f'<div class="metric-card"><h3>📅 {timeline}</h3><p style="font-size: 1.4rem; margin-top: 8px;">Action Timeline</p></div>', unsafe_allow_html=True)
                 
-                # Action items based on diagnosis
-                st.markdown("**Recommended Actions:**")
-                if risk_level == "CRITICAL":
-                    st.error("🔴 **CRITICAL - <4 hours**")
-                    st.write("• LAKUKAN SHUTDOWN SEGERA")
-                    st.write("• Ikuti prosedur LOTO sesuai OSHA 1910.147")
-                    st.write("• Siapkan tim maintenance darurat")
-                elif risk_level == "HIGH":
-                    st.warning("🟠 **HIGH PRIORITY - <72 hours**")
-                    if layer2_result['primary_fault'] == 'misalignment':
-                        st.write(f"• Jadwalkan laser alignment coupling dalam 72 jam")
-                        st.write(f"• Periksa kondisi coupling element untuk kerusakan")
-                    elif layer2_result['primary_fault'] == 'bearing_defect':
-                        st.write(f"• Segera pesan bearing pengganti untuk {layer2_result['fault_location'].upper()}")
-                        st.write(f"• Jadwalkan penggantian bearing dalam 7 hari")
-                    elif layer2_result['primary_fault'] == 'unbalance':
-                        if layer3_result and layer3_result.get('unbalance_type') == 'mechanical':
-                            st.write(f"• Lakukan dynamic balancing pada {'impeller pompa' if layer2_result['fault_location'] == 'pump' else 'rotor motor'}")
-                            st.write("• Setelah balancing, ulangi pengukuran untuk verifikasi")
-                        elif layer3_result and layer3_result.get('unbalance_type') == 'electrical':
-                            st.write("• Lakukan Motor Current Signature Analysis (MCSA) untuk konfirmasi broken rotor bar")
-                            st.write("• Jika dikonfirmasi, jadwalkan rewinding motor")
-                        if layer3_result and layer3_result.get('demod_check'):
-                            st.write("• **PENTING**: Setelah perbaikan unbalance, ulangi pengukuran untuk deteksi bearing defect yang mungkin 'termasking'")
-                elif risk_level == "MEDIUM":
-                    st.info("🟡 **MEDIUM PRIORITY - <30 days**")
-                    st.write(f"• Jadwalkan perbaikan sesuai maintenance window berikutnya")
-                    st.write(f"• Monitor vibrasi setiap 7 hari sampai perbaikan")
+                    # Action items based on diagnosis
+                    st.markdown("**Recommended Actions:**")
+                    if risk_level == "CRITICAL":
+                        st.error("🔴 **CRITICAL - <4 hours**")
+                        st.write("• LAKUKAN SHUTDOWN SEGERA")
+                        st.write("• Ikuti prosedur LOTO sesuai OSHA 1910.147")
+                        st.write("• Siapkan tim maintenance darurat")
+                    elif risk_level == "HIGH":
+                        st.warning("🟠 **HIGH PRIORITY - <72 hours**")
+                        if layer2_result['primary_fault'] == 'misalignment':
+                            st.write(f"• Jadwalkan laser alignment coupling dalam 72 jam")
+                            st.write(f"• Periksa kondisi coupling element untuk kerusakan")
+                        elif layer2_result['primary_fault'] == 'bearing_defect':
+                            st.write(f"• Segera pesan bearing pengganti untuk {layer2_result['fault_location'].upper()}")
+                            st.write(f"• Jadwalkan penggantian bearing dalam 7 hari")
+                        elif layer2_result['primary_fault'] == 'unbalance':
+                            if layer3_result and layer3_result.get('unbalance_type') == 'mechanical':
+                                st.write(f"• Lakukan dynamic balancing pada {'impeller pompa' if layer2_result['fault_location'] == 'pump' else 'rotor motor'}")
+                                st.write("• Setelah balancing, ulangi pengukuran untuk verifikasi")
+                            elif layer3_result and layer3_result.get('unbalance_type') == 'electrical':
+                                st.write("• Lakukan Motor Current Signature Analysis (MCSA) untuk konfirmasi broken rotor bar")
+                                st.write("• Jika dikonfirmasi, jadwalkan rewinding motor")
+                            if layer3_result and layer3_result.get('demod_check'):
+                                st.write("• **PENTING**: Setelah perbaikan unbalance, ulangi pengukuran untuk deteksi bearing defect yang mungkin 'termasking'")
+                    elif risk_level == "MEDIUM":
+                        st.info("🟡 **MEDIUM PRIORITY - <30 days**")
+                        st.write(f"• Jadwalkan perbaikan sesuai maintenance window berikutnya")
+                        st.write(f"• Monitor vibrasi setiap 7 hari sampai perbaikan")
                 
-                st.markdown("---")
+                    st.markdown("---")
                 
-                # ============================================
-                # COMPLIANCE SUMMARY
-                # ============================================
-                st.markdown("### 📜 Compliance Summary")
+                    # ============================================
+                    # COMPLIANCE SUMMARY
+                    # ============================================
+                    st.markdown("### 📜 Compliance Summary")
                 
-                col31, col32, col33 = st.columns(3)
+                    compliance = screening.assess_screening_compliance(layer1_result)
+                    iso_status = compliance['iso_20816_1']
+                    api_status = compliance['api_610']
+                    iso15243_status = compliance['iso_15243']
                 
-                with col31:
-                    iso_status = "COMPLIANT" if max_vel <= zone_b_limit else "NON-COMPLIANT"
-                    iso_emoji = "✅" if iso_status == "COMPLIANT" else "❌"
-                    st.markdown(f'<span class="compliance-badge compliance-{iso_status.lower()}">{iso_emoji} ISO 20816-1: {iso_status}</span>', unsafe_allow_html=True)
+                    col31, col32, col33 = st.columns(3)
                 
-                with col32:
-                    api_status = "COMPLIANT" if not layer1_result['hydraulic_anomaly'] else "WARNING"
-                    api_emoji = "✅" if api_status == "COMPLIANT" else "⚠️"
-                    st.markdown(f'<span class="compliance-badge compliance-{api_status.lower()}">{api_emoji} API 610: {api_status}</span>', unsafe_allow_html=True)
+                    with col31:
+                        iso_emoji = "✅" if iso_status == "COMPLIANT" else "❌"
+                        st.markdown(f'<span class="compliance-badge compliance-{iso_status.lower()}">{iso_emoji} ISO 20816-1: {iso_status}</span>', unsafe_allow_html=True)
                 
-                with col33:
-                    if max_acc < 0.3:
-                        iso15243_status = "COMPLIANT (Stage 0)"
-                    elif max_acc < 1.0:
-                        iso15243_status = "STAGE 1"
-                    elif max_acc < 2.0:
-                        iso15243_status = "STAGE 2"
-                    else:
-                        iso15243_status = "STAGE 3"
-                    iso15243_emoji = "✅" if iso15243_status == "COMPLIANT (Stage 0)" else "⚠️" if "Stage 1" in iso15243_status or "Stage 2" in iso15243_status else "❌"
-                    st.markdown(f'<span class="compliance-badge compliance-{("compliant" if iso15243_status == "COMPLIANT (Stage 0)" else "warning" if "Stage" in iso15243_status else "noncompliant")}">{iso15243_emoji} ISO 15243: {iso15243_status}</span>', unsafe_allow_html=True)
+                    with col32:
+                        api_emoji = "✅" if api_status == "COMPLIANT" else "⚠️"
+                        st.markdown(f'<span class="compliance-badge compliance-{api_status.lower()}">{api_emoji} API 610: {api_status}</span>', unsafe_allow_html=True)
                 
-                st.markdown("---")
+                    with col33:
+                        iso15243_emoji = "✅" if iso15243_status == "COMPLIANT (Stage 0)" else "⚠️" if "Stage 1" in iso15243_status or "Stage 2" in iso15243_status else "❌"
+                        st.markdown(f'<span class="compliance-badge compliance-{("compliant" if iso15243_status == "COMPLIANT (Stage 0)" else "warning" if "Stage" in iso15243_status else "noncompliant")}">{iso15243_emoji} ISO 15243: {iso15243_status}</span>', unsafe_allow_html=True)
                 
-                # ============================================
-                # EXPORT SECTION
-                # ============================================
-                st.markdown("### 📥 Export Report")
+                    st.markdown("---")
+                
+                    # ============================================
+                    # EXPORT SECTION
+                    # ============================================
+                    st.markdown("### 📥 Export Report")
                 
-                # Generate comprehensive report text
-                report_text = f"""PUMP DIAGNOSTIC REPORT - PERTAMINA PATRA NIAGA (3-Layer Architecture)
+                    # Generate comprehensive report text
+                    report_text = f"""PUMP DIAGNOSTIC REPORT - PERTAMINA PATRA NIAGA (3-Layer Architecture)
 =====================================================================
 Asset ID        : {asset_id}
 Location        : {location}
@@ -1121,7 +963,7 @@ DIAGNOSTIC ARCHITECTURE
 LAYER 1 RESULTS
 - Max Velocity     : {max_vel:.2f} mm/s → Zone {('B' if max_vel<=zone_b_limit else 'C' if max_vel<=zone_c_limit else 'D')}
 - Max Acceleration : {max_acc:.3f} g → {"Normal (Stage 0)" if max_acc<0.3 else "Warning (Stage 1)" if max_acc<1.0 else "Danger (Stage 2)" if max_acc<2.0 else "Critical (Stage 3)"}
-- Hydraulic Status : {"OK" if not layer1_result['hydraulic_anomaly'] else f"RISK (Suction {suction_pressure:.1f}m < NPSHr+0.5 {npshr+0.5:.1f}m)"}
+- Hydraulic Status : {"OK" if not layer1_result['hydraulic_anomaly'] else f"RISK (NPSHa {layer1_result['hydraulic']['npsha']:.1f}m < NPSHr+0.5 {npshr+0.5:.1f}m)"}
 - Electrical Status: {"OK" if not layer1_result['electrical_anomaly'] else f"IMBALANCE {current_imbalance:.1f}%"}
 - Anomaly Detected : {"YES - Proceed to Layer 2" if st.session_state.anomaly_detected else "NO"}
 
@@ -1157,50 +999,55 @@ Standards           : ISO 20816-1:2016, API 610 Ed.11, ISO 15243:2017
 Diagnostic System   : 3-Layer Architecture (Overall Screening → FFT Analysis → Advanced Differentiation)
 """
                 
-                col34, col35 = st.columns(2)
-                with col34:
-                    st.download_button(
-                        "📄 Download Full Report",
-                        report_text,
-                        file_name=f"pump_diagnostic_{asset_id}_{datetime.now().strftime('%Y%m%d')}.txt",
-                        mime="text/plain",
-                        use_container_width=True
-                    )
-                with col35:
-                    st.download_button(
-                        "📊 Download Data Summary (CSV)",
-                        pd.DataFrame({
-                            'Parameter': ['Max Velocity', 'Max Acceleration', 'Suction Pressure', 'Current Imbalance', 'Primary Fault', 'Confidence', 'Risk Level'],
-                            'Value': [f"{max_vel:.2f} mm/s", f"{max_acc:.3f} g", f"{suction_pressure:.1f} bar", f"{current_imbalance:.1f}%", layer2_result['primary_fault'] if layer2_result else "N/A", f"{layer2_result['confidence'] if layer2_result else 0}%", risk_level]
-                        }).to_csv(index=False),
-                        file_name=f"pump_data_{asset_id}_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv",
-                        use_container_width=True
-                    )
+                    import pandas as pd
+                    
+                    col34, col35 = st.columns(2)
+                    with col34:
+                        st.download_button(
+                            "📄 Download Full Report",
+                            report_text,
+                            file_name=f"pump_diagnostic_{asset_id}_{datetime.now().strftime('%Y%m%d')}.txt",
+                            mime="text/plain",
+                            use_container_width=True
+                        )
+                    with col35:
+                        st.download_button(
+                            "📊 Download Data Summary (CSV)",
+                            pd.DataFrame({
+                                'Parameter': ['Max Velocity', 'Max Acceleration', 'Suction Pressure', 'Current Imbalance', 'Primary Fault', 'Confidence', 'Risk Level'],
+                                'Value': [f"{max_vel:.2f} mm/s", f"{max_acc:.3f} g", f"{suction_pressure:.1f} bar", f"{current_imbalance:.1f}%", layer2_result['primary_fault'] if layer2_result else "N/A", f"{layer2_result['confidence'] if layer2_result else 0}%", risk_level]
+                            }).to_csv(index=False),
+                            file_name=f"pump_data_{asset_id}_{datetime.now().strftime('%Y%m%d')}.csv",
+                            mime="text/csv",
+                            use_container_width=True
+                        )
                 
-                st.caption("Report includes complete 3-layer diagnostic traceability with evidence-based confidence levels")
+                    st.caption("Report includes complete 3-layer diagnostic traceability with evidence-based confidence levels")
                 
-                st.markdown('</div>', unsafe_allow_html=True)
+                    st.markdown('</div>', unsafe_allow_html=True)
                 
-                # Footer
-                st.markdown("""
-                <div class="footer">
-                <p><strong>Pump Diagnostic System v3.2 (FIXED)</strong> | Pertamina Patra Niaga - Asset Integrity Management</p>
-                <p>Architecture: 3-Layer Diagnostic (Overall Screening → FFT Analysis → Advanced Differentiation)</p>
-                <p>Standards: ISO 20816-1:2016, API 610 Ed.11, ISO 15243:2017</p>
-                <p>© 2026 Pertamina Patra Niaga. All rights reserved.</p>
-                </div>
-                """, unsafe_allow_html=True)
+                    # Footer
+                    st.markdown("""
+                    <div class="footer">
+                    <p><strong>Pump Diagnostic System v3.2 (FIXED)</strong> | Pertamina Patra Niaga - Asset Integrity Management</p>
+                    <p>Architecture: 3-Layer Diagnostic (Overall Screening → FFT Analysis → Advanced Differentiation)</p>
+                    <p>Standards: ISO 20816-1:2016, API 610 Ed.11, ISO 15243:2017</p>
+                    <p>© 2026 Pertamina Patra Niaga. All rights reserved.</p>
+                    </div>
+                    """, unsafe_allow_html=True)
                 
-                # Reset button after full diagnosis
-                if st.button("🔄 ANALISIS MESIN LAIN", use_container_width=True, key="reset_after_diagnosis"):
-                    st.session_state.screening_done = False
-                    st.session_state.anomaly_detected = False
-                    st.session_state.layer1_result = None
-                    st.session_state.fft_inputs = None
-                    st.session_state.coast_down_inputs = None
-                    st.session_state.demod_inputs = None
-                    st.rerun()
+                    # Reset button after full diagnosis
+                    if st.button("🔄 ANALISIS MESIN LAIN", use_container_width=True, key="reset_after_diagnosis"):
+                        st.session_state.screening_done = False
+                        st.session_state.anomaly_detected = False
+                        st.session_state.layer1_result = None
+                        st.session_state.route_prefill = {}
+                        st.session_state.fft_inputs = None
+                        st.session_state.coast_down_inputs = None
+                        st.session_state.demod_inputs = None
+                        st.rerun()
+
+        fault_analysis_section()
 
 # Display important notes at the bottom
 st.markdown("""
@@ -0,0 +1,144 @@
+"""
+Import-time and cold-start benchmark with heavy-dependency audit
+
+Each entry point is imported in a fresh interpreter under `-X importtime`.
+The audit fails (exit code 1) when a lightweight entry point pulls in a
+library it must only load on demand.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ("numpy", "pandas", "plotly", "matplotlib", "PIL", "reportlab", "openpyxl")
+
+# (label, statement, modules that must NOT be loaded by the statement)
+ENTRY_POINTS = (
+    ("engine", "import engine", HEAVY_MODULES),
+    ("engine.screening", "from engine import screening", HEAVY_MODULES),
+    ("engine.diagnostic_engine", "from engine import PumpDiagnosticEngine", HEAVY_MODULES),
+    ("engine.measurement", "from engine import Measurement", HEAVY_MODULES),
+    ("report.report_generator", "from report.report_generator import generate_text_report", HEAVY_MODULES),
+    ("report.streaming_writer", "from report.streaming_writer import write_fleet_reports", HEAVY_MODULES),
+    ("report.excel_export", "from report.excel_export import export_fleet_excel", ("openpyxl",)),
+    ("report.pdf_renderer", "from report.pdf_renderer import render_pdf_report", ("reportlab",)),
+    ("engine.route_screening", "from engine import route_screening", ()),
+    ("engine.prognostics", "from engine import prognostics", ())
+)
+
+APP_FIRST_RENDER = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+harness = set(sys.modules)
+start = time.perf_counter()
+AppTest.from_file({app!r}, default_timeout=120).run()
+print(time.perf_counter() - start)
+print(",".join(m for m in {heavy!r} if m in sys.modules and m not in harness))
+"""
+
+
+def _loaded_heavy(stderr):
+    """Top-level heavy packages that appear in -X importtime output"""
+    loaded = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        name = line.rsplit("|", 1)[1].strip()
+        root = name.split(".")[0]
+        if root in HEAVY_MODULES:
+            loaded.add(root)
+    return loaded
+
+
+def _cumulative_us(stderr):
+    """Sum of cumulative import time of modules imported at top level"""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  ") and name.strip():
+            total += int(cumulative)
+    return total
+
+
+def measure_entry_point(statement, repeat):
+    """
+    Wall and import time of `statement` in fresh interpreters
+
+    Returns:
+    --------
+    dict : wall_ms (median), import_ms (median), heavy (modules loaded)
+    """
+    baseline = [sys.executable, "-X", "importtime", "-c", "pass"]
+    command = [sys.executable, "-X", "importtime", "-c", statement]
+    wall, imports, heavy = [], [], set()
+    for _ in range(repeat):
+        base = subprocess.run(baseline, cwd=REPO_ROOT, capture_output=True, text=True)
+        start = time.perf_counter()
+        proc = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+        wall.append((time.perf_counter() - start) * 1000)
+        if proc.returncode != 0:
+            raise RuntimeError(f"{statement!r} failed:\n{proc.stderr}")
+        imports.append(max(0, _cumulative_us(proc.stderr) - _cumulative_us(base.stderr)) / 1000)
+        heavy |= _loaded_heavy(proc.stderr)
+    return {
+        "wall_ms": statistics.median(wall),
+        "import_ms": statistics.median(imports),
+        "heavy": heavy
+    }
+
+
+def measure_app_first_render():
+    """
+    Time to first render of app.py via streamlit's AppTest, or None
+
+    Heavy modules already imported by the AppTest harness itself are not
+    attributed to the app.
+    """
+    code = APP_FIRST_RENDER.format(app=os.path.join(REPO_ROOT, "app.py"), heavy=HEAVY_MODULES)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    seconds, heavy = proc.stdout.splitlines()[-2:]
+    return {"render_ms": float(seconds) * 1000, "heavy": set(filter(None, heavy.split(",")))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    violations = []
+    print(f"{'entry point':<28}{'wall ms':>10}{'import ms':>12}  heavy modules loaded")
+    for label, statement, forbidden in ENTRY_POINTS:
+        result = measure_entry_point(statement, args.repeat)
+        print(f"{label:<28}{result['wall_ms']:>10.1f}{result['import_ms']:>12.1f}  {', '.join(sorted(result['heavy'])) or '-'}")
+        bad = result["heavy"] & set(forbidden)
+        if bad:
+            violations.append(f"{label} loads {', '.join(sorted(bad))}")
+
+    app = measure_app_first_render()
+    if app is None:
+        print(f"{'app.py first render':<28}{'skipped (streamlit unavailable)':>22}")
+    else:
+        print(f"{'app.py first render':<28}{app['render_ms']:>10.1f}{'':>12}  {', '.join(sorted(app['heavy'])) or '-'}")
+        if app["heavy"]:
+            violations.append(f"app.py first render loads {', '.join(sorted(app['heavy']))}")
+
+    for violation in violations:
+        print(f"AUDIT FAIL: {violation}")
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
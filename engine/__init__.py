@@ -0,0 +1,51 @@
+"""Pump Diagnostic Engine - Pertamina Patra Niaga"""
+
+import importlib
+
+
+# Public entry points -> submodule. Resolved on first attribute access so
+# `import engine` stays stdlib-only; numpy/pandas load only with the
+# prognostics, reliability, streaming and route-screening modules.
+_LAZY_EXPORTS = {
+    "PumpDiagnosticEngine": "diagnostic_engine",
+    "Measurement": "measurement",
+    "InputValidator": "input_schema",
+    "validate_measurements": "input_schema",
+    "run_screening": "screening",
+    "screen_layer1": "screening",
+    "analyze_layer2": "screening",
+    "analyze_layer3": "screening",
+    "load_route_file": "route_screening",
+    "screen_route": "route_screening",
+    "register_detector": "detector_registry",
+    "run_detectors": "detector_registry",
+    "MaintenanceScheduler": "maintenance_scheduler",
+    "estimate_fleet_rul": "prognostics",
+    "ReliabilityModel": "reliability",
+    "StreamingSafetyEvaluator": "streaming_safety",
+    "AlarmManager": "alarm_manager",
+    "HistoryStore": "history_store",
+    "AssetRegistry": "asset_registry",
+    "BaselineTracker": "baselines",
+    "CohortAnomalyDetector": "cohort_anomaly",
+    "CaseIndex": "case_library",
+    "diagnose_batch": "batch_engine",
+    "sweep": "sensitivity",
+    "calibrate": "calibration",
+    "TrendRollups": "trend_rollups"
+}
+
+__all__ = sorted(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'engine' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
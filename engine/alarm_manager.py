@@ -0,0 +1,236 @@
+"""
+Alarm Management for Safety Triggers
+ISA-18.2 / IEC 62682 alarm states - deduplication, latching and rate limiting
+"""
+
+from collections import deque
+
+
+# ISA-18.2 alarm states
+NORMAL = "NORMAL"
+ACTIVE_UNACKED = "ACTIVE_UNACKED"
+ACTIVE_ACKED = "ACTIVE_ACKED"
+CLEARED_UNACKED = "CLEARED_UNACKED"
+
+
+def alarm_key(asset_id, trigger):
+    """Deduplication key for a shutdown trigger"""
+    return (asset_id, trigger["parameter"], trigger["component"])
+
+
+def bypasses_rate_limit(event):
+    """
+    New CRITICAL alarms and latch changes (CLEARED into CLEARED_UNACKED or
+    back to NORMAL) are never held back; RETURNED chatter of a latched alarm
+    and lower-severity raises are coalesced into the digest
+    """
+    if event["transition"] == "CLEARED":
+        return True
+    return event["transition"] == "RAISED" and event["severity"] == "CRITICAL"
+
+
+class AlarmManager:
+    """Latched alarm table that emits only state changes"""
+
+    def __init__(self, history_size=50, max_events_per_interval=5, digest_interval=3600.0):
+        """
+        Parameters:
+        -----------
+        history_size : int
+            Events kept per asset (older events are dropped)
+        max_events_per_interval : int
+            Rate-limited events emitted per asset per digest interval before
+            further ones are coalesced into the digest (CRITICAL raises and
+            clears always pass, see bypasses_rate_limit)
+        digest_interval : float
+            Digest period in seconds
+        """
+        self.history_size = history_size
+        self.max_events_per_interval = max_events_per_interval
+        self.digest_interval = digest_interval
+
+        self.alarms = {}          # asset_id -> {key: alarm record}
+        self.history = {}         # asset_id -> deque of events
+        self._emitted = {}        # asset_id -> (interval_start, emitted_count)
+        self._suppressed = {}     # asset_id -> {"start": t, "counts": {(parameter, state): n}}
+
+    def process(self, asset_id, triggers, timestamp):
+        """
+        Reconcile the alarm table with the triggers active for one asset
+
+        Parameters:
+        -----------
+        asset_id : str
+            Asset identifier
+        triggers : list
+            Currently active triggers (e.g. safety_gates_check()["triggers"])
+        timestamp : float
+            Evaluation time in seconds
+
+        Returns:
+        --------
+        list : State-change events that passed the rate limiter
+        """
+        active_keys = set()
+        events = []
+        asset_alarms = self.alarms.setdefault(asset_id, {})
+
+        for trigger in triggers:
+            key = alarm_key(asset_id, trigger)
+            active_keys.add(key)
+            alarm = asset_alarms.get(key)
+
+            if alarm is None or alarm["state"] == NORMAL:
+                asset_alarms[key] = {
+                    "asset_id": asset_id,
+                    "parameter": trigger["parameter"],
+                    "component": trigger["component"],
+                    "state": ACTIVE_UNACKED,
+                    "severity": trigger.get("severity", "CRITICAL"),
+                    "raised_at": timestamp,
+                    "last_value": trigger.get("value"),
+                    "peak_value": trigger.get("value"),
+                    "threshold": trigger.get("threshold"),
+                    "standard": trigger.get("standard"),
+                    "action": trigger.get("action"),
+                    "acked_by": None
+                }
+                events.append(self._event(asset_alarms[key], "RAISED", timestamp))
+            else:
+                alarm["last_value"] = trigger.get("value")
+                if alarm["peak_value"] is None or (trigger.get("value") or 0) > alarm["peak_value"]:
+                    alarm["peak_value"] = trigger.get("value")
+                if alarm["state"] == CLEARED_UNACKED:
+                    # Returned before anyone acknowledged - alarm again
+                    alarm["state"] = ACTIVE_UNACKED
+                    events.append(self._event(alarm, "RETURNED", timestamp))
+
+        for key, alarm in asset_alarms.items():
+            if key in active_keys:
+                continue
+            if alarm["state"] == ACTIVE_UNACKED:
+                alarm["state"] = CLEARED_UNACKED  # latched until acknowledged
+                events.append(self._event(alarm, "CLEARED", timestamp))
+            elif alarm["state"] == ACTIVE_ACKED:
+                alarm["state"] = NORMAL
+                events.append(self._event(alarm, "CLEARED", timestamp))
+
+        self._drop_normal(asset_id)
+        return self._rate_limit(asset_id, events, timestamp)
+
+    def process_safety_result(self, asset_id, safety_result, timestamp):
+        """
+        Convenience wrapper for a safety_gates_check result
+        """
+        return self.process(asset_id, safety_result["triggers"], timestamp)
+
+    def acknowledge(self, asset_id, parameter, component, timestamp, user=None):
+        """
+        Operator acknowledgement of one alarm
+
+        Returns:
+        --------
+        list : ACKNOWLEDGED event (empty if the alarm was not awaiting ack)
+        """
+        alarm = self.alarms.get(asset_id, {}).get((asset_id, parameter, component))
+        if alarm is None or alarm["state"] not in (ACTIVE_UNACKED, CLEARED_UNACKED):
+            return []
+
+        alarm["acked_by"] = user
+        alarm["state"] = ACTIVE_ACKED if alarm["state"] == ACTIVE_UNACKED else NORMAL
+        events = [self._event(alarm, "ACKNOWLEDGED", timestamp)]
+        self._drop_normal(asset_id)
+        # Acknowledgements are operator actions - never rate limited
+        self._record(asset_id, events)
+        return events
+
+    def active_alarms(self, asset_id=None):
+        """
+        Alarms not yet returned to NORMAL (optionally for one asset)
+        """
+        assets = [asset_id] if asset_id is not None else list(self.alarms)
+        return [
+            dict(alarm)
+            for asset in assets
+            for alarm in self.alarms.get(asset, {}).values()
+        ]
+
+    def collect_digests(self, now):
+        """
+        Return and reset digests whose interval has ended
+
+        Returns:
+        --------
+        list : One digest per asset with suppressed event counts
+        """
+        digests = []
+        for asset_id in list(self._suppressed):
+            pending = self._suppressed[asset_id]
+            if now - pending["start"] < self.digest_interval:
+                continue
+            digests.append({
+                "asset_id": asset_id,
+                "period_start": pending["start"],
+                "period_end": now,
+                "suppressed_count": sum(pending["counts"].values()),
+                "by_parameter": {f"{parameter} {transition}": count for (parameter, transition), count in pending["counts"].items()},
+                "active_alarms": len(self.active_alarms(asset_id))
+            })
+            del self._suppressed[asset_id]
+        return digests
+
+    def _event(self, alarm, transition, timestamp):
+        return {
+            "asset_id": alarm["asset_id"],
+            "parameter": alarm["parameter"],
+            "component": alarm["component"],
+            "transition": transition,
+            "state": alarm["state"],
+            "severity": alarm["severity"],
+            "value": alarm["last_value"],
+            "threshold": alarm["threshold"],
+            "standard": alarm["standard"],
+            "timestamp": timestamp
+        }
+
+    def _drop_normal(self, asset_id):
+        """Forget alarms back in NORMAL so the table stays bounded"""
+        asset_alarms = self.alarms.get(asset_id, {})
+        for key in [k for k, a in asset_alarms.items() if a["state"] == NORMAL]:
+            del asset_alarms[key]
+        if not asset_alarms:
+            self.alarms.pop(asset_id, None)
+
+    def _record(self, asset_id, events):
+        history = self.history.get(asset_id)
+        if history is None:
+            history = self.history[asset_id] = deque(maxlen=self.history_size)
+        history.extend(events)
+
+    def _rate_limit(self, asset_id, events, timestamp):
+        """
+        Pass CRITICAL raises and clears; pass at most max_events_per_interval
+        other events per asset and coalesce the rest
+        """
+        if not events:
+            return []
+        self._record(asset_id, events)
+
+        interval_start, emitted = self._emitted.get(asset_id, (timestamp, 0))
+        if timestamp - interval_start >= self.digest_interval:
+            interval_start, emitted = timestamp, 0
+
+        passed = []
+        for event in events:
+            if bypasses_rate_limit(event):
+                passed.append(event)
+            elif emitted < self.max_events_per_interval:
+                passed.append(event)
+                emitted += 1
+            else:
+                pending = self._suppressed.setdefault(asset_id, {"start": interval_start, "counts": {}})
+                count_key = (event["parameter"], event["transition"])
+                pending["counts"][count_key] = pending["counts"].get(count_key, 0) + 1
+        self._emitted[asset_id] = (interval_start, emitted)
+
+        return passed
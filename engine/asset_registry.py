@@ -0,0 +1,297 @@
+"""
+Asset Registry - nameplate data and cached per-asset derived constants
+ISO 14224:2016 equipment data; ISO 10816-3 / ISO 20816-1 limits, API 610 curve
+Static facts (machine group, zone limits, running-speed orders, BEP, NPSHr,
+FLC, bearing defect frequencies) are derived once per asset and reused by
+reference until the asset is updated; PumpDiagnosticEngine passes them to
+Level 2 (ISO 10816-3 limits) and Level 3 (1X/2X/3X orders).
+"""
+
+import bisect
+import csv
+import json
+import math
+
+from .iso_10816_3_classifier import RIGID_FOUNDATION, iso_10816_3_limits
+from .screening import get_machine_group, get_velocity_zone_limits
+
+
+LINE_FREQUENCY = 50.0      # Hz - PLN grid
+POWER_FACTOR = 0.85        # FLC estimate when the nameplate current is missing
+MOTOR_EFFICIENCY = 0.95
+
+# Nameplate fields copied into the engine input when not measured
+ENGINE_NAMEPLATE_FIELDS = ("motor_kw", "motor_rpm", "flc", "npshr", "bep_flow", "foundation_type", "pump_type", "location")
+
+# Flat CSV columns (everything else - pump curve, bearing geometry,
+# baselines - needs the JSON format)
+CSV_NUMERIC_COLUMNS = ("motor_kw", "motor_rpm", "rated_voltage", "flc", "bep_flow", "npshr", "line_frequency")
+
+
+def bearing_defect_frequencies(rpm, n_elements, ball_diameter, pitch_diameter, contact_angle_deg=0.0):
+    """
+    Rolling-element bearing defect frequencies (ISO 15243 annex / classic kinematics)
+
+    Returns:
+    --------
+    dict : BPFO, BPFI, BSF, FTF in Hz
+    """
+    fr = rpm / 60.0
+    ratio = ball_diameter / pitch_diameter * math.cos(math.radians(contact_angle_deg))
+    return {
+        "BPFO": n_elements / 2.0 * fr * (1 - ratio),
+        "BPFI": n_elements / 2.0 * fr * (1 + ratio),
+        "BSF": pitch_diameter / (2.0 * ball_diameter) * fr * (1 - ratio**2),
+        "FTF": fr / 2.0 * (1 - ratio)
+    }
+
+
+def estimate_flc(motor_kw, rated_voltage, power_factor=POWER_FACTOR, efficiency=MOTOR_EFFICIENCY):
+    """Full-load current (A) of a three-phase motor from its rating"""
+    return motor_kw * 1000 / (math.sqrt(3) * rated_voltage * power_factor * efficiency)
+
+
+def pump_curve_points(curve):
+    """
+    Sorted (flow, head, efficiency, npshr) tuples from a pump curve
+
+    Parameters:
+    -----------
+    curve : list
+        Points as dicts (flow, head, efficiency, npshr) or 4-tuples in that
+        order; flow m³/h, head m, efficiency %, NPSHr m (None = not given)
+    """
+    points = []
+    for point in curve or ():
+        if isinstance(point, dict):
+            point = (point.get("flow"), point.get("head"), point.get("efficiency"), point.get("npshr"))
+        points.append(tuple(None if value is None else float(value) for value in point))
+    return sorted(points, key=lambda point: point[0])
+
+
+def derive_constants(asset):
+    """
+    Static per-asset constants from nameplate data
+
+    Parameters:
+    -----------
+    asset : dict
+        Registry entry (motor_kw, motor_rpm, foundation_type, flc or
+        rated_voltage, bep_flow/npshr or pump_curve, bearings, baselines)
+
+    Returns:
+    --------
+    dict : machine_group, group_label, zone_limits (A, B, C mm/s),
+           iso_10816_3 (engine group and zone B/C/D limits), engine_basis
+           (motor_rpm, motor_kw, foundation_type they hold for),
+           running_speed_hz, orders (1X/2X/3X Hz), line_frequency_2x,
+           bep_flow, npshr, npshr_curve, flc, bearing_frequencies, bearings,
+           baselines
+    """
+    motor_kw = asset.get("motor_kw")
+    rpm = asset.get("motor_rpm")
+    foundation_type = asset.get("foundation_type", RIGID_FOUNDATION)
+    constants = {
+        "asset_id": asset["asset_id"],
+        "machine_group": None,
+        "group_label": None,
+        "zone_limits": None,
+        "iso_10816_3": None,
+        "engine_basis": None,
+        "running_speed_hz": None,
+        "orders": {},
+        "line_frequency_2x": 2.0 * asset.get("line_frequency", LINE_FREQUENCY),
+        "bep_flow": asset.get("bep_flow"),
+        "npshr": asset.get("npshr"),
+        "npshr_curve": None,
+        "flc": asset.get("flc"),
+        "bearing_frequencies": {},
+        "bearings": {position: bearing.get("designation") for position, bearing in asset.get("bearings", {}).items()},
+        "baselines": asset.get("baselines", {})
+    }
+
+    if motor_kw is not None:
+        group, label = get_machine_group(motor_kw)
+        constants["machine_group"] = group
+        constants["group_label"] = label
+        constants["zone_limits"] = get_velocity_zone_limits(group, foundation_type)
+        if constants["flc"] is None and asset.get("rated_voltage"):
+            constants["flc"] = estimate_flc(motor_kw, asset["rated_voltage"])
+
+    if rpm:
+        fundamental = rpm / 60.0
+        constants["running_speed_hz"] = fundamental
+        constants["orders"] = {f"{order}X": order * fundamental for order in (1, 2, 3)}
+
+    # Level 2/3 constants of the diagnostic engine - valid for readings taken
+    # at the nameplate speed, power and foundation
+    if rpm and motor_kw is not None:
+        constants["iso_10816_3"] = iso_10816_3_limits(rpm, motor_kw, foundation_type)
+        constants["engine_basis"] = (rpm, motor_kw, foundation_type)
+
+    # BEP = best-efficiency point of the pump curve; NPSHr interpolated there
+    points = pump_curve_points(asset.get("pump_curve"))
+    rated = [point for point in points if point[2] is not None]
+    if constants["bep_flow"] is None and rated:
+        constants["bep_flow"] = max(rated, key=lambda point: point[2])[0]
+    npshr_points = [(point[0], point[3]) for point in points if point[3] is not None]
+    if npshr_points:
+        constants["npshr_curve"] = (tuple(p[0] for p in npshr_points), tuple(p[1] for p in npshr_points))
+        if constants["npshr"] is None and constants["bep_flow"] is not None:
+            constants["npshr"] = interpolate(constants["npshr_curve"], constants["bep_flow"])
+
+    for position, bearing in asset.get("bearings", {}).items():
+        if rpm and all(bearing.get(key) for key in ("n_elements", "ball_diameter", "pitch_diameter")):
+            constants["bearing_frequencies"][position] = bearing_defect_frequencies(
+                rpm, bearing["n_elements"], bearing["ball_diameter"], bearing["pitch_diameter"],
+                bearing.get("contact_angle", 0.0)
+            )
+    return constants
+
+
+def interpolate(curve, x):
+    """Linear interpolation on a (xs, ys) curve, clamped at the ends"""
+    xs, ys = curve
+    index = bisect.bisect_left(xs, x)
+    if index == 0:
+        return ys[0]
+    if index == len(xs):
+        return ys[-1]
+    x0, x1, y0, y1 = xs[index - 1], xs[index], ys[index - 1], ys[index]
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0) if x1 != x0 else y1
+
+
+class AssetRegistry:
+    """Per-asset nameplate data with a derived-constants cache"""
+
+    def __init__(self, assets=(), store=None):
+        """
+        Parameters:
+        -----------
+        assets : iterable
+            Asset dicts, each with an "asset_id"
+        store : HistoryStore
+            Optional persistence - existing assets are loaded from it and
+            every update is written through
+        """
+        self.store = store
+        self._assets = {}
+        self._constants = {}
+        if store is not None:
+            for asset in store.load_assets():
+                self._assets[asset["asset_id"]] = asset
+        for asset in assets:
+            self.put(asset)
+
+    @classmethod
+    def from_file(cls, path, store=None):
+        """
+        Registry from a JSON list of asset dicts or a flat CSV
+
+        CSV columns: asset_id, location, pump_type, foundation_type,
+        CSV_NUMERIC_COLUMNS and bearing_<position> designations.
+        """
+        if str(path).lower().endswith(".json"):
+            with open(path, encoding="utf-8") as handle:
+                assets = json.load(handle)
+        else:
+            with open(path, newline="", encoding="utf-8") as handle:
+                assets = [_asset_from_csv_row(row) for row in csv.DictReader(handle)]
+        return cls(assets, store)
+
+    def __contains__(self, asset_id):
+        return asset_id in self._assets
+
+    def __len__(self):
+        return len(self._assets)
+
+    def asset_ids(self, location=None):
+        """Registered asset IDs (optionally at one location)"""
+        return sorted(asset_id for asset_id, asset in self._assets.items()
+                      if location is None or asset.get("location") == location)
+
+    def get(self, asset_id):
+        """Nameplate entry of an asset (KeyError if unknown)"""
+        return self._assets[asset_id]
+
+    def constants(self, asset_id):
+        """
+        Derived constants of an asset, computed on first use
+
+        The same dict is returned until the asset is updated; treat it as
+        read-only.
+        """
+        constants = self._constants.get(asset_id)
+        if constants is None:
+            constants = derive_constants(self._assets[asset_id])
+            self._constants[asset_id] = constants
+        return constants
+
+    def put(self, asset):
+        """Add or replace an asset entry"""
+        asset = dict(asset)
+        asset.setdefault("bearings", {})
+        asset.setdefault("baselines", {})
+        self._assets[asset["asset_id"]] = asset
+        self._constants.pop(asset["asset_id"], None)
+        if self.store is not None:
+            self.store.put_assets([asset])
+
+    def update(self, asset_id, **fields):
+        """Change nameplate fields of an asset and invalidate its constants"""
+        asset = dict(self._assets[asset_id])
+        asset.update(fields)
+        self.put(asset)
+
+    def set_bearing(self, asset_id, position, designation, **geometry):
+        """
+        Bearing at one position (e.g. "pump_de"): designation plus optional
+        n_elements, ball_diameter, pitch_diameter (mm), contact_angle (deg)
+        """
+        bearings = dict(self._assets[asset_id]["bearings"])
+        bearings[position] = {"designation": designation, **geometry}
+        self.update(asset_id, bearings=bearings)
+
+    def set_baselines(self, asset_id, baselines):
+        """Replace the baseline values (parameter -> value) of an asset"""
+        self.update(asset_id, baselines=dict(baselines))
+
+    def remove(self, asset_id):
+        """Drop an asset and its cached constants"""
+        del self._assets[asset_id]
+        self._constants.pop(asset_id, None)
+        if self.store is not None:
+            self.store.delete_asset(asset_id)
+
+    def engine_inputs(self, asset_id):
+        """
+        Nameplate engine inputs of an asset (motor_kw, motor_rpm, flc, npshr,
+        bep_flow, foundation_type, pump_type, location) - only the known ones
+
+        Returns:
+        --------
+        dict : Field -> value
+        """
+        asset = self._assets[asset_id]
+        constants = self.constants(asset_id)
+        inputs = {}
+        for field in ENGINE_NAMEPLATE_FIELDS:
+            value = constants.get(field, asset.get(field))
+            if value is not None:
+                inputs[field] = value
+        return inputs
+
+
+def _asset_from_csv_row(row):
+    asset = {"bearings": {}}
+    for column, value in row.items():
+        value = (value or "").strip()
+        if not value:
+            continue
+        if column in CSV_NUMERIC_COLUMNS:
+            asset[column] = float(value)
+        elif column.startswith("bearing_"):
+            asset["bearings"][column[len("bearing_"):]] = {"designation": value}
+        else:
+            asset[column] = value
+    return asset
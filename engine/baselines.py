@@ -0,0 +1,252 @@
+"""
+Per-Asset Statistical Baselines - change detection relative to own history
+ISO 13373-1:2002 Clause 7.3 (baseline comparison), ISO 17359:2018 Annex C
+Running mean/variance (Welford), EWMA and a rolling median/MAD per asset and
+measurement point, updated in O(1) per reading and scored for a whole route
+at once.
+"""
+
+import warnings
+
+import numpy as np
+
+
+# Flag levels (index into BASELINE_FLAG_NAMES)
+BASELINE_FLAG_NAMES = ("NORMAL", "WARNING", "DANGER")
+
+DEFAULT_THRESHOLDS = {
+    "ratio_warning": 2.0,     # reading / baseline median (+6 dB)
+    "ratio_danger": 4.0,      # +12 dB
+    "robust_z_warning": 3.5,  # modified z-score (Iglewicz & Hoaglin)
+    "robust_z_danger": 6.0
+}
+
+MAD_TO_SIGMA = 1.4826
+RELATIVE_SIGMA_FLOOR = 0.10   # sigma never below 10% of the median - a robust_z
+                              # warning then needs a rise of at least 35%
+
+
+class BaselineTracker:
+    """Incremental per-asset, per-point baselines stored as compact arrays"""
+
+    def __init__(self, points, alpha=0.1, window=16, min_count=5, floors=None, thresholds=None):
+        """
+        Parameters:
+        -----------
+        points : tuple
+            Measurement point names (columns of the value matrices)
+        alpha : float
+            EWMA smoothing factor
+        window : int
+            Readings kept per point for the rolling median/MAD
+        min_count : int
+            Readings needed before a point is scored
+        floors : array
+            Per-point level below which no flag is raised (e.g. 0.5 mm/s),
+            so ratios of near-zero baselines stay quiet
+        thresholds : dict
+            Overrides for DEFAULT_THRESHOLDS
+        """
+        self.points = tuple(points)
+        self.alpha = alpha
+        self.window = window
+        self.min_count = min_count
+        self.floors = np.zeros(len(self.points)) if floors is None else np.asarray(floors, dtype=float)
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+        self.asset_ids = []
+        self._index = {}
+        n_points = len(self.points)
+        self.count = np.zeros((0, n_points), dtype=np.int32)
+        self.mean = np.zeros((0, n_points))
+        self.m2 = np.zeros((0, n_points))
+        self.ewma = np.full((0, n_points), np.nan)
+        self.ewm_var = np.zeros((0, n_points))
+        self.recent = np.full((0, n_points, window), np.nan, dtype=np.float32)
+        self.cursor = np.zeros(0, dtype=np.int32)
+
+    def __len__(self):
+        return len(self.asset_ids)
+
+    def _rows(self, asset_ids, create):
+        rows = np.array([self._index.get(asset_id, -1) for asset_id in asset_ids], dtype=np.intp)
+        if create and (rows < 0).any():
+            new_ids = list(dict.fromkeys(asset_id for asset_id, row in zip(asset_ids, rows) if row < 0))
+            for asset_id in new_ids:
+                self._index[asset_id] = len(self.asset_ids)
+                self.asset_ids.append(asset_id)
+            n_new, n_points = len(new_ids), len(self.points)
+            self.count = np.concatenate([self.count, np.zeros((n_new, n_points), dtype=np.int32)])
+            self.mean = np.concatenate([self.mean, np.zeros((n_new, n_points))])
+            self.m2 = np.concatenate([self.m2, np.zeros((n_new, n_points))])
+            self.ewma = np.concatenate([self.ewma, np.full((n_new, n_points), np.nan)])
+            self.ewm_var = np.concatenate([self.ewm_var, np.zeros((n_new, n_points))])
+            self.recent = np.concatenate([self.recent, np.full((n_new, n_points, self.window), np.nan, dtype=np.float32)])
+            self.cursor = np.concatenate([self.cursor, np.zeros(n_new, dtype=np.int32)])
+            rows = np.array([self._index[asset_id] for asset_id in asset_ids], dtype=np.intp)
+        return rows
+
+    def update(self, asset_ids, values):
+        """
+        Fold one reading per row into the baselines (NaN = not measured)
+
+        Parameters:
+        -----------
+        asset_ids : list
+            Asset of each row; an asset may appear more than once (rows are
+            applied in order)
+        values : array
+            (n_rows, n_points) readings
+        """
+        values = np.asarray(values, dtype=float).reshape(len(asset_ids), len(self.points))
+        rows = self._rows(asset_ids, create=True)
+
+        # Each pass handles at most one reading per asset so the vectorized
+        # updates never collide
+        occurrence = np.zeros(len(rows), dtype=np.intp)
+        seen = {}
+        for position, row in enumerate(rows):
+            occurrence[position] = seen.get(row, 0)
+            seen[row] = occurrence[position] + 1
+        for rank in range(int(occurrence.max()) + 1 if len(rows) else 0):
+            selected = occurrence == rank
+            self._update_unique(rows[selected], values[selected])
+
+    def _update_unique(self, rows, x):
+        measured = ~np.isnan(x)
+        count = self.count[rows] + measured
+
+        # Welford running mean / M2
+        mean = self.mean[rows]
+        delta = np.where(measured, x - mean, 0.0)
+        mean = mean + np.where(measured, delta / np.maximum(count, 1), 0.0)
+        self.m2[rows] += np.where(measured, delta * (x - mean), 0.0)
+        self.mean[rows] = mean
+        self.count[rows] = count
+
+        # EWMA level and variance (first reading initializes the level)
+        ewma = self.ewma[rows]
+        first = measured & np.isnan(ewma)
+        e_delta = np.where(measured & ~first, x - ewma, 0.0)
+        ewma = np.where(first, x, ewma + self.alpha * e_delta)
+        self.ewm_var[rows] = np.where(measured & ~first,
+                                      (1 - self.alpha) * (self.ewm_var[rows] + self.alpha * e_delta**2),
+                                      self.ewm_var[rows])
+        self.ewma[rows] = ewma
+
+        # Rolling window for median/MAD - one slot per reading, shared cursor
+        slot = self.cursor[rows]
+        self.recent[rows, :, slot] = x.astype(np.float32)
+        self.cursor[rows] = (slot + 1) % self.window
+
+    def robust_baseline(self, rows):
+        """Rolling median and MAD (rows x points), NaN while the window is empty"""
+        recent = self.recent[rows]
+        with np.errstate(all="ignore"), warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)  # all-NaN windows
+            median = np.nanmedian(recent, axis=2)
+            mad = np.nanmedian(np.abs(recent - median[..., None]), axis=2)
+        return median.astype(float), mad.astype(float)
+
+    def score(self, asset_ids, values):
+        """
+        Compare readings with each asset's baseline (before updating it)
+
+        Returns:
+        --------
+        dict : z (Welford), ewma_z, robust_z, ratio (reading / rolling median),
+               flags (0 NORMAL / 1 WARNING / 2 DANGER per point),
+               asset_flag (worst per row), worst_point (point index per row);
+               all (n_rows x n_points) except the last two. Unknown assets
+               and points with fewer than min_count readings score NaN / 0.
+        """
+        values = np.asarray(values, dtype=float).reshape(len(asset_ids), len(self.points))
+        rows = self._rows(asset_ids, create=False)
+        known = rows >= 0
+        shape = values.shape
+
+        z = np.full(shape, np.nan)
+        ewma_z = np.full(shape, np.nan)
+        robust_z = np.full(shape, np.nan)
+        ratio = np.full(shape, np.nan)
+        if known.any():
+            k_rows, x = rows[known], values[known]
+            ready = self.count[k_rows] >= self.min_count
+            with np.errstate(divide="ignore", invalid="ignore"):
+                std = np.sqrt(self.m2[k_rows] / np.maximum(self.count[k_rows] - 1, 1))
+                median, mad = self.robust_baseline(k_rows)
+                sigma = np.maximum(MAD_TO_SIGMA * mad, RELATIVE_SIGMA_FLOOR * np.abs(median))
+                z[known] = np.where(ready, (x - self.mean[k_rows]) / std, np.nan)
+                ewma_z[known] = np.where(ready, (x - self.ewma[k_rows]) / np.sqrt(self.ewm_var[k_rows]), np.nan)
+                robust_z[known] = np.where(ready, (x - median) / sigma, np.nan)
+                ratio[known] = np.where(ready & (median > 0), x / median, np.nan)
+
+        thresholds = self.thresholds
+        above_floor = values >= self.floors
+        with np.errstate(invalid="ignore"):
+            danger = above_floor & ((ratio >= thresholds["ratio_danger"]) | (robust_z >= thresholds["robust_z_danger"]))
+            warning = above_floor & ((ratio >= thresholds["ratio_warning"]) | (robust_z >= thresholds["robust_z_warning"]))
+        flags = np.where(danger, 2, np.where(warning, 1, 0)).astype(np.int8)
+
+        return {
+            "z": z,
+            "ewma_z": ewma_z,
+            "robust_z": robust_z,
+            "ratio": ratio,
+            "flags": flags,
+            "asset_flag": flags.max(axis=1) if flags.size else np.zeros(len(values), dtype=np.int8),
+            "worst_point": np.argmax(np.nan_to_num(ratio, nan=-np.inf), axis=1) if flags.size else np.zeros(0, dtype=np.intp)
+        }
+
+    def score_and_update(self, asset_ids, values):
+        """score() the readings, then fold them into the baselines"""
+        result = self.score(asset_ids, values)
+        self.update(asset_ids, values)
+        return result
+
+    def stats(self, asset_id):
+        """
+        Baseline summary of one asset (e.g. for AssetRegistry.set_baselines)
+
+        Returns:
+        --------
+        dict : point -> count, mean, std, ewma, median, mad
+        """
+        row = self._index[asset_id]
+        median, mad = self.robust_baseline(np.array([row]))
+        count = self.count[row]
+        std = np.sqrt(self.m2[row] / np.maximum(count - 1, 1))
+        return {
+            point: {
+                "count": int(count[i]),
+                "mean": float(self.mean[row, i]) if count[i] else None,
+                "std": float(std[i]) if count[i] > 1 else None,
+                "ewma": None if np.isnan(self.ewma[row, i]) else float(self.ewma[row, i]),
+                "median": None if np.isnan(median[0, i]) else float(median[0, i]),
+                "mad": None if np.isnan(mad[0, i]) else float(mad[0, i])
+            }
+            for i, point in enumerate(self.points)
+        }
+
+    def save(self, path):
+        """Write the baseline state to a compressed .npz file"""
+        np.savez_compressed(
+            path, points=np.array(self.points), asset_ids=np.array(self.asset_ids, dtype=str),
+            count=self.count, mean=self.mean, m2=self.m2, ewma=self.ewma, ewm_var=self.ewm_var,
+            recent=self.recent, cursor=self.cursor, floors=self.floors,
+            settings=np.array([self.alpha, self.window, self.min_count])
+        )
+
+    @classmethod
+    def load(cls, path, thresholds=None):
+        """BaselineTracker from a file written by save()"""
+        with np.load(path) as state:
+            alpha, window, min_count = state["settings"]
+            tracker = cls(tuple(state["points"].tolist()), alpha=float(alpha), window=int(window),
+                          min_count=int(min_count), floors=state["floors"], thresholds=thresholds)
+            tracker.asset_ids = state["asset_ids"].tolist()
+            tracker._index = {asset_id: row for row, asset_id in enumerate(tracker.asset_ids)}
+            for name in ("count", "mean", "m2", "ewma", "ewm_var", "recent", "cursor"):
+                setattr(tracker, name, state[name].copy())
+        return tracker
+
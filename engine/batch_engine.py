@@ -0,0 +1,336 @@
+"""
+Batch Diagnostic Engine - Levels 1-6 for many measurements at once
+Same decisions as PumpDiagnosticEngine.run_diagnosis, computed column-wise
+over a MEASUREMENT_DTYPE batch (what-if sweeps, calibration replays). Only
+the decision fields are produced - no evidence text or recommendations.
+Limits, confidences, CPT factors, MTBF and risk tables are imported from
+the scalar Level 1-6 modules; tests/test_batch_engine.py checks parity.
+"""
+
+import numpy as np
+
+from .bayesian_fusion import CPT
+from .cross_validator import (MISALIGNMENT_TEMP_GRADIENT_C, PHASE_STABLE_DEG, PHASE_UNSTABLE_DEG,
+                              VALIDATION_SCORE)
+from .detector_registry import DETECTOR_REGISTRY
+from .fft_analyzer import AMBIENT_TEMP_C, DETECTOR_CONFIDENCE, LINE_FREQ_2X_HZ, RULE_THRESHOLDS
+from .iso_10816_3_classifier import GROUP_3_RPM_RANGE, GROUP_POWER_LIMITS_KW, RIGID_FOUNDATION, ZONE_LIMITS
+from .measurement import FIELD_NAMES, numeric_matrix, to_batch
+from .risk_assessor import BASE_MTBF_DAYS, DEFAULT_MTBF_DAYS, RISK_MATRIX, SEVERITY_ZONE_LIMITS
+from .safety_gates import SHUTDOWN_LIMITS
+from .screening import npsh_available
+
+_FIELD = {name: index for index, name in enumerate(FIELD_NAMES)}
+
+BUILTIN_DETECTORS = frozenset(DETECTOR_CONFIDENCE)
+
+# Level 3 fault slots in descending detector confidence - the scalar
+# engine's tie-break order after its confidence sort
+FAULT_SLOTS = tuple(sorted(DETECTOR_CONFIDENCE, key=DETECTOR_CONFIDENCE.get, reverse=True))
+_CONFIDENCE = np.array([DETECTOR_CONFIDENCE[fault] for fault in FAULT_SLOTS])
+_E, _M, _B, _MIS, _C = (FAULT_SLOTS.index(fault) for fault in (
+    "ELECTRICAL_UNBALANCE", "MECHANICAL_UNBALANCE", "BEARING_DEFECT", "MISALIGNMENT", "CAVITATION"))
+
+LEVELS = ("LOW", "MEDIUM", "HIGH")
+
+# Decision thresholds of the scalar Levels 3-5 (fft_analyzer.RULE_THRESHOLDS
+# and the Level 4 cutoff); defaults reproduce run_diagnosis, other values
+# come from engine.calibration
+DEFAULT_THRESHOLDS = {**RULE_THRESHOLDS, "validation_score": VALIDATION_SCORE}
+
+
+class _Columns:
+    """Column access with the scalar engine's data.get(key, default) semantics"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def measured(self, name):
+        return ~np.isnan(self.values[:, _FIELD[name]])
+
+    def get(self, name, default=0.0):
+        column = self.values[:, _FIELD[name]]
+        return np.where(np.isnan(column), default, column)
+
+
+def _voltage_imbalance(columns):
+    v_r, v_s, v_t = (columns.get(f"voltage_{phase}", 400.0) for phase in "rst")
+    v_avg = (v_r + v_s + v_t) / 3
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum(np.maximum(abs(v_r - v_avg), abs(v_s - v_avg)), abs(v_t - v_avg)) / v_avg * 100
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator > 0, numerator / denominator, 0.0)
+
+
+def resolve_thresholds(thresholds=None):
+    """
+    DEFAULT_THRESHOLDS with overrides applied
+
+    Raises:
+    -------
+    ValueError : On an unknown threshold name
+    """
+    unknown = sorted(set(thresholds or {}) - set(DEFAULT_THRESHOLDS))
+    if unknown:
+        raise ValueError(f"Unknown thresholds: {', '.join(unknown)}")
+    return {**DEFAULT_THRESHOLDS, **{name: float(value) for name, value in (thresholds or {}).items()}}
+
+
+def diagnose_batch(records, reliability=None, thresholds=None):
+    """
+    Decision fields of run_diagnosis for every row of a batch
+
+    Parameters:
+    -----------
+    records : ndarray or list
+        MEASUREMENT_DTYPE batch, or records / engine input dicts
+    reliability : ReliabilityModel
+        Optional fitted Weibull model, as for PumpDiagnosticEngine
+    thresholds : dict
+        Overrides for DEFAULT_THRESHOLDS (e.g. a calibrated config)
+
+    Returns:
+    --------
+    dict : Arrays (n_rows) - report_type, shutdown, zone, max_velocity,
+           primary_fault ("" on EMERGENCY_SHUTDOWN, "NO_FAULT_DETECTED" on
+           ROUTINE_MONITORING), posterior, risk_level ("NONE" on routine
+           rows, "CRITICAL" on shutdown), mtbf_days (-1 when not assessed),
+           and detected (n_rows x FAULT_SLOTS) - the Level 3 detections
+           before cross-validation (CAVITATION has no Level 4 rule, so it
+           shows here but never as primary_fault), validated (the
+           detections that passed Level 4).
+           The zone is classified for every row, also where the scalar
+           engine stops at Level 1.
+
+    Raises:
+    -------
+    ValueError : On unknown thresholds, or non-default thresholds while
+                 detectors beyond the built-in ones are registered
+    """
+    batch = records if isinstance(records, np.ndarray) else to_batch(records)
+    limits = resolve_thresholds(thresholds)
+    if not set(DETECTOR_REGISTRY) <= BUILTIN_DETECTORS:
+        # Registered detectors run arbitrary Python hooks - evaluate each row
+        if limits != DEFAULT_THRESHOLDS:
+            raise ValueError("Custom thresholds need the built-in detectors only")
+        return _diagnose_rows(batch, reliability)
+
+    columns = _Columns(numeric_matrix(batch))
+    get = columns.get
+    n_rows = len(batch)
+
+    # === LEVEL 1: SAFETY GATES ===
+    temp_motor_max = np.maximum(get("temp_motor_de"), get("temp_motor_nde"))
+    temp_pump_max = np.maximum(get("temp_pump_de"), get("temp_pump_nde"))
+    flc = get("flc", 500.0)
+    current_avg = (get("current_r") + get("current_s") + get("current_t")) / 3
+    load_factor = np.where(flc > 0, _ratio(current_avg, flc) * 100, 0.0)
+    shutdown = ((temp_motor_max > SHUTDOWN_LIMITS["bearing_temp_c"]) | (temp_pump_max > SHUTDOWN_LIMITS["bearing_temp_c"])
+                | (get("vibration_max_avr") > SHUTDOWN_LIMITS["vibration_mm_s"])
+                | (get("p_dis_fluctuation") > SHUTDOWN_LIMITS["p_dis_fluctuation_pct"])
+                | (load_factor > SHUTDOWN_LIMITS["load_factor_pct"]))
+
+    # === LEVEL 2: SEVERITY CLASSIFICATION ===
+    pump_v_avr = (get("pump_v_de") + get("pump_v_nde")) / 2
+    pump_a_avr = (get("pump_a_de") + get("pump_a_nde")) / 2
+    max_velocity = np.max([(get(f"{component}_{direction}_de") + get(f"{component}_{direction}_nde")) / 2
+                           for component in ("motor", "pump") for direction in "hva"], axis=0)
+
+    rpm = get("motor_rpm", 1500.0)
+    rigid = np.isin(batch["foundation_type"], ("", RIGID_FOUNDATION))
+    group_3 = ((get("motor_kw", 315.0) > GROUP_POWER_LIMITS_KW[1])
+               & (rpm > GROUP_3_RPM_RANGE[0]) & (rpm <= GROUP_3_RPM_RANGE[1]))
+    limit_b, limit_c, limit_d = (
+        np.select([group_3 & rigid, group_3], [rigid_limit, flexible_limit], default_limit)
+        for rigid_limit, flexible_limit, default_limit in zip(
+            ZONE_LIMITS["group_3_rigid"], ZONE_LIMITS["group_3_flexible"], ZONE_LIMITS["default"])
+    )
+    zone = np.select([max_velocity <= limit_b, max_velocity <= limit_c, max_velocity <= limit_d],
+                     ["A", "B", "C"], "D")
+
+    # === LEVEL 3: PRIMARY FAULT DETECTION ===
+    peak1_freq, peak1_amp = get("peak1_freq"), get("peak1_amp")
+    peak2_freq, peak2_amp = get("peak2_freq"), get("peak2_amp")
+    peak3_freq, peak3_amp = get("peak3_freq"), get("peak3_amp")
+    fundamental = rpm / 60
+    v_imbalance = _voltage_imbalance(columns)
+    hf_pump_de = get("hf_pump_de")
+    temp_pump_de, temp_pump_nde = get("temp_pump_de"), get("temp_pump_nde")
+    temp_gradient = abs(temp_pump_de - temp_pump_nde)
+    temp_rise = temp_pump_de - AMBIENT_TEMP_C
+    v_unbalanced = v_imbalance > limits["voltage_imbalance_pct"]
+    v_balanced = v_imbalance < limits["voltage_imbalance_pct"]
+    hf_high = hf_pump_de > limits["hf_g"]
+    temp_rise_high = temp_rise > limits["temp_rise_c"]
+    is_2lf_dominant = (abs(peak3_freq - LINE_FREQ_2X_HZ) < 5.0) & (peak3_amp > limits["ratio_2lf"] * peak1_amp)
+    peak1_ratio = _ratio(peak1_amp, peak1_amp + peak2_amp + peak3_amp)
+    is_1x_dominant = (abs(peak1_freq - fundamental) < 0.1 * fundamental) & (peak1_ratio > limits["ratio_1x"])
+    peak2_ratio = _ratio(peak2_amp, peak1_amp)
+    second_harmonic = 2 * fundamental
+    angular = pump_a_avr > 0.7 * pump_v_avr
+    away_from_harmonics = ((peak3_freq > 50) & (abs(peak3_freq - fundamental) > 0.2 * fundamental)
+                           & (abs(peak3_freq - second_harmonic) > 0.2 * second_harmonic))
+
+    def measured(*names):
+        mask = np.ones(n_rows, dtype=bool)
+        for name in names:
+            mask &= columns.measured(name)
+        return mask
+
+    detected = np.zeros((n_rows, len(FAULT_SLOTS)), dtype=bool)
+    detected[:, _E] = (measured("peak1_amp", "peak3_freq", "peak3_amp", "voltage_r", "voltage_s", "voltage_t")
+                       & is_2lf_dominant & v_unbalanced)
+    detected[:, _M] = (measured("peak1_freq", "peak1_amp", "peak2_amp", "peak3_amp")
+                       & is_1x_dominant & ~is_2lf_dominant & ~v_unbalanced)
+    detected[:, _B] = (measured("hf_pump_de") & hf_high
+                       & ((away_from_harmonics & (abs(peak3_freq - 3 * fundamental) > 0.2 * 3 * fundamental))
+                          | (temp_gradient > limits["temp_gradient_c"])))
+    detected[:, _MIS] = (measured("peak1_amp", "peak2_freq", "peak2_amp")
+                         & (abs(peak2_freq - second_harmonic) < 0.1 * second_harmonic) & (peak2_ratio > limits["ratio_2x"]))
+    npsha_margin = npsh_available(get("p_suc")) - get("npshr", 3.0)
+    bep_flow = get("bep_flow", 100.0)
+    bep_deviation = np.where(bep_flow > 0, _ratio(abs(get("actual_flow") - bep_flow), bep_flow) * 100, 0.0)
+    detected[:, _C] = (measured("p_suc", "actual_flow") & (npsha_margin < limits["npsh_margin_m"])
+                       & (bep_deviation > limits["bep_deviation_pct"]))
+
+    # === LEVEL 4: CROSS-VALIDATION (same score increments and order) ===
+    phase_measured = columns.measured("phase_instability")
+    phase = get("phase_instability")
+    score = np.zeros((n_rows, len(FAULT_SLOTS)))
+    score[:, _E] = (np.where(v_unbalanced, 0.4, 0.0) + np.where(temp_gradient < limits["temp_gradient_c"], 0.3, 0.0))
+    score[:, _E] += np.where(phase_measured & (phase > PHASE_UNSTABLE_DEG), 0.3, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected_displacement = pump_v_avr / (2 * 3.1416 * fundamental) * 1000
+    score[:, _M] = (np.where(v_balanced, 0.4, 0.0) + np.where(phase_measured & (phase < PHASE_STABLE_DEG), 0.3, 0.0))
+    score[:, _M] += np.where(abs(get("displacement_peak") - expected_displacement) < expected_displacement * 0.5,
+                             0.3, 0.0)
+    score[:, _B] = np.where(hf_high, 0.4, 0.0) + np.where(temp_rise_high, 0.3, 0.0)
+    score[:, _B] += np.where(v_balanced, 0.3, 0.0)
+    pattern = np.where(angular, pump_a_avr > pump_v_avr, pump_a_avr < pump_v_avr)
+    score[:, _MIS] = np.where(peak2_ratio > limits["ratio_2x"], 0.4, 0.0) + np.where(pattern, 0.3, 0.0)
+    score[:, _MIS] += np.where(temp_gradient > MISALIGNMENT_TEMP_GRADIENT_C, 0.3, 0.0)
+    # CAVITATION has no Level 4 rule - score 0, never validated
+    final_confidence = np.minimum(_CONFIDENCE * (0.7 + score * 0.3), 0.95)
+    validated = detected & (score >= limits["validation_score"])
+
+    # === LEVEL 5: BAYESIAN FUSION (likelihoods multiplied in the same order) ===
+    likelihood = np.ones((n_rows, len(FAULT_SLOTS)))
+    electrical, mechanical, bearing = CPT["ELECTRICAL_UNBALANCE"], CPT["MECHANICAL_UNBALANCE"], CPT["BEARING_DEFECT"]
+    for slot, factors in (
+        (_E, ((is_2lf_dominant, electrical["2lf_dominant"]), (v_unbalanced, electrical["v_imbalance>2%"]),
+              (phase_measured & (phase > PHASE_UNSTABLE_DEG), electrical["phase_unstable"]),
+              (hf_pump_de < limits["hf_g"], electrical["hf_normal"]),
+              (temp_rise < limits["temp_rise_c"], electrical["temp_normal"]))),
+        (_M, ((is_1x_dominant, mechanical["1x_dominant"]),
+              (phase_measured & (phase < PHASE_STABLE_DEG), mechanical["phase_stable"]),
+              (v_balanced, mechanical["v_imbalance<2%"]), (hf_pump_de < limits["hf_g"], mechanical["hf_normal"]))),
+        (_B, ((hf_high, bearing["hf>0.7g"]), (away_from_harmonics, bearing["bpfo_peak"]),
+              (temp_rise_high, bearing["temp_rise>40C"]), (v_balanced, bearing["v_imbalance<2%"])))
+    ):
+        for condition, factor in factors:
+            likelihood[:, slot] = np.where(condition, likelihood[:, slot] * factor, likelihood[:, slot])
+    posterior = np.minimum(likelihood * 100, 95)
+
+    # Primary = highest posterior, then highest final confidence, then slot order
+    ranked = np.where(validated, posterior, -np.inf)
+    tied = ranked == ranked.max(axis=1, keepdims=True)
+    ranked = np.where(tied & validated, final_confidence, -np.inf)
+    primary = np.argmax(ranked == ranked.max(axis=1, keepdims=True), axis=1)
+    diagnosed = validated.any(axis=1) & ~shutdown
+
+    misalignment = np.where(angular, "ANGULAR_MISALIGNMENT", "PARALLEL_MISALIGNMENT")
+    slot_names = np.array(FAULT_SLOTS, dtype=object)[primary]
+    fault_names = np.where(primary == _MIS, misalignment, slot_names).astype(str)
+    primary_fault = np.where(shutdown, "", np.where(diagnosed, fault_names, "NO_FAULT_DETECTED"))
+    primary_posterior = np.where(diagnosed, posterior[np.arange(n_rows), primary], 0.0)
+
+    # === LEVEL 6: RISK ASSESSMENT ===
+    mtbf = _estimate_mtbf(batch, columns, primary_fault, diagnosed, max_velocity, reliability)
+    severity_zone = np.select([max_velocity > limit for _, limit in SEVERITY_ZONE_LIMITS],
+                              [zone for zone, _ in SEVERITY_ZONE_LIMITS], "A")
+    severity = np.where((primary_posterior > 90) & (severity_zone == "C"), 2,
+                        np.where((primary_posterior > 80) & np.isin(severity_zone, ("B", "C")), 1, 0))
+    probability = np.where(mtbf < 7, 2, np.where(mtbf < 30, 1, 0))
+    risk_table = np.array([[RISK_MATRIX[(LEVELS[s], LEVELS[p])][0] for p in range(3)] for s in range(3)])
+    risk_level = np.where(shutdown, "CRITICAL", np.where(diagnosed, risk_table[severity, probability], "NONE"))
+
+    report_type = np.where(shutdown, "EMERGENCY_SHUTDOWN",
+                           np.where(diagnosed, "COMPREHENSIVE_DIAGNOSIS", "ROUTINE_MONITORING"))
+    return {
+        "report_type": report_type,
+        "shutdown": shutdown,
+        "zone": zone,
+        "max_velocity": max_velocity,
+        "primary_fault": primary_fault,
+        "posterior": primary_posterior,
+        "risk_level": risk_level,
+        "mtbf_days": np.where(diagnosed, mtbf, -1),
+        "detected": detected & ~shutdown[:, None],
+        "validated": validated & ~shutdown[:, None]
+    }
+
+
+def _estimate_mtbf(batch, columns, primary_fault, diagnosed, vibration_max, reliability):
+    """risk_assessor.estimate_mtbf for every row (integer arithmetic as in the scalar code)"""
+    get = columns.get
+    mtbf = np.full(len(batch), DEFAULT_MTBF_DAYS, dtype=np.int64)
+    for fault in np.unique(primary_fault[diagnosed]):
+        rows = primary_fault == fault
+        mtbf[rows] = BASE_MTBF_DAYS.get(fault, DEFAULT_MTBF_DAYS)
+        if reliability is not None:
+            for pump_type, location in set(zip(batch["pump_type"][rows].tolist(), batch["location"][rows].tolist())):
+                weibull_mtbf = reliability.mtbf_days(fault, pump_type or None, location or None)
+                if weibull_mtbf is not None and weibull_mtbf == weibull_mtbf:
+                    mtbf[rows & (batch["pump_type"] == pump_type) & (batch["location"] == location)] = \
+                        max(int(weibull_mtbf), 1)
+
+    mtbf = np.where(vibration_max > 7.1, np.maximum(mtbf // 3, 3),
+                    np.where(vibration_max > 4.5, np.maximum(mtbf // 2, 7), mtbf))
+    bearing = np.char.find(primary_fault.astype(str), "BEARING_DEFECT") >= 0
+    hf_value = get("hf_pump_de")
+    mtbf = np.where(bearing & (hf_value > 1.5), 3, np.where(bearing & (hf_value > 1.0), 7, mtbf))
+    temp_rise = get("temp_pump_de") - AMBIENT_TEMP_C
+    mtbf = np.where(temp_rise > 60, np.maximum(mtbf // 2, 2),
+                    np.where(temp_rise > 50, np.maximum(mtbf * 2 // 3, 3), mtbf))
+
+    # Trend-based RUL (engine.prognostics) takes precedence
+    rul_days = columns.values[:, _FIELD["rul_days"]]
+    has_rul = np.isfinite(rul_days)
+    return np.where(has_rul, np.maximum(np.trunc(np.where(has_rul, rul_days, 0)), 1).astype(np.int64), mtbf)
+
+
+def _diagnose_rows(batch, reliability):
+    from .diagnostic_engine import PumpDiagnosticEngine
+    from .iso_10816_3_classifier import calculate_direction_averages, classify_iso_10816_3_zone
+    from .measurement import from_batch
+
+    fields = {name: [] for name in ("report_type", "shutdown", "zone", "max_velocity", "primary_fault",
+                                    "posterior", "risk_level", "mtbf_days", "detected", "validated")}
+    for record in from_batch(batch):
+        engine = PumpDiagnosticEngine(reliability=reliability)
+        result = engine.run_diagnosis(record)
+        averages = calculate_direction_averages(record)
+        zone = result.get("level_2_severity") or classify_iso_10816_3_zone(
+            averages["max_velocity"], record.get("motor_rpm", 1500), record.get("motor_kw", 315),
+            record.get("foundation_type", RIGID_FOUNDATION))
+        shutdown = result["report_type"] == "EMERGENCY_SHUTDOWN"
+        bayesian = result.get("level_5_bayesian", {})
+        risk = result.get("level_6_risk", {})
+        fields["report_type"].append(result["report_type"])
+        fields["shutdown"].append(shutdown)
+        fields["zone"].append(zone["zone"])
+        fields["max_velocity"].append(averages["max_velocity"])
+        fields["primary_fault"].append("" if shutdown else bayesian.get("primary_fault", "NO_FAULT_DETECTED"))
+        fields["posterior"].append(bayesian.get("primary_confidence", 0.0))
+        fields["risk_level"].append("CRITICAL" if shutdown else risk.get("risk_level", "NONE"))
+        fields["mtbf_days"].append(risk.get("mtbf_days", -1))
+        # Routine reports omit Levels 3-4; the engine keeps them in results
+        found = [fault["type"] for fault in engine.results.get("level_3_fft", {}).get("faults", [])]
+        fields["detected"].append([any(slot in name for name in found) for slot in FAULT_SLOTS])
+        passed = [fault["type"] for fault in engine.results.get("level_4_validation", {}).get("faults", [])
+                  if fault["is_validated"]]
+        fields["validated"].append([any(slot in name for name in passed) for slot in FAULT_SLOTS])
+    return {name: np.asarray(values) for name, values in fields.items()}
@@ -3,6 +3,47 @@ Level 5: Bayesian Fusion
 ISO 13381-1 Clause 7 - Probabilistic fault diagnosis
 """
 
+from .detector_registry import get_fault_hook, is_measured
+from .fft_analyzer import AMBIENT_TEMP_C, LINE_FREQ_2X_HZ, RULE_THRESHOLDS
+from .cross_validator import PHASE_STABLE_DEG, PHASE_UNSTABLE_DEG
+
+# Conditional Probability Table (CPT) based on industry data
+# P(Evidence | Fault) - Likelihood of evidence given fault
+CPT = {
+    "ELECTRICAL_UNBALANCE": {
+        "2lf_dominant": 0.95,
+        "v_imbalance>2%": 0.92,
+        "phase_unstable": 0.88,
+        "hf_normal": 0.85,
+        "temp_normal": 0.80,
+        "1x_not_dominant": 0.75
+    },
+    "MECHANICAL_UNBALANCE": {
+        "1x_dominant": 0.94,
+        "phase_stable": 0.90,
+        "v_imbalance<2%": 0.85,
+        "hf_normal": 0.80,
+        "temp_normal": 0.75,
+        "displacement_correlated": 0.70
+    },
+    "BEARING_DEFECT": {
+        "hf>0.7g": 0.96,
+        "bpfo_peak": 0.93,
+        "temp_rise>40C": 0.90,
+        "v_imbalance<2%": 0.85,
+        "1x_not_dominant": 0.80,
+        "temp_gradient>15C": 0.75
+    },
+    "MISALIGNMENT": {
+        "2x_dominant": 0.92,
+        "axial_dominant": 0.88,
+        "v_imbalance<2%": 0.85,
+        "temp_gradient>10C": 0.80,
+        "phase_unstable": 0.75
+    }
+}
+
+
 def bayesian_fusion(validated_faults, data):
     """
     Calculate posterior probability using Bayesian inference
@@ -18,42 +59,6 @@ def bayesian_fusion(validated_faults, data):
     --------
     dict : Bayesian fusion result with posterior probabilities
     """
-    # Conditional Probability Table (CPT) based on industry data
-    # P(Evidence | Fault) - Likelihood of evidence given fault
-    cpt = {
-        "ELECTRICAL_UNBALANCE": {
-            "2lf_dominant": 0.95,
-            "v_imbalance>2%": 0.92,
-            "phase_unstable": 0.88,
-            "hf_normal": 0.85,
-            "temp_normal": 0.80,
-            "1x_not_dominant": 0.75
-        },
-        "MECHANICAL_UNBALANCE": {
-            "1x_dominant": 0.94,
-            "phase_stable": 0.90,
-            "v_imbalance<2%": 0.85,
-            "hf_normal": 0.80,
-            "temp_normal": 0.75,
-            "displacement_correlated": 0.70
-        },
-        "BEARING_DEFECT": {
-            "hf>0.7g": 0.96,
-            "bpfo_peak": 0.93,
-            "temp_rise>40C": 0.90,
-            "v_imbalance<2%": 0.85,
-            "1x_not_dominant": 0.80,
-            "temp_gradient>15C": 0.75
-        },
-        "MISALIGNMENT": {
-            "2x_dominant": 0.92,
-            "axial_dominant": 0.88,
-            "v_imbalance<2%": 0.85,
-            "temp_gradient>10C": 0.80,
-            "phase_unstable": 0.75
-        }
-    }
-    
     fault_probabilities = []
     
     for fault in validated_faults:
@@ -67,11 +72,11 @@ def bayesian_fusion(validated_faults, data):
             peak3_freq = data.get("peak3_freq", 0)
             peak3_amp = data.get("peak3_amp", 0)
             peak1_amp = data.get("peak1_amp", 0)
-            is_2lf = abs(peak3_freq - 100.0) < 5.0
-            is_2lf_dominant = is_2lf and peak3_amp > 0.5 * peak1_amp
+            is_2lf = abs(peak3_freq - LINE_FREQ_2X_HZ) < 5.0
+            is_2lf_dominant = is_2lf and peak3_amp > RULE_THRESHOLDS["ratio_2lf"] * peak1_amp
             
             if is_2lf_dominant:
-                likelihood *= cpt["ELECTRICAL_UNBALANCE"]["2lf_dominant"]
+                likelihood *= CPT["ELECTRICAL_UNBALANCE"]["2lf_dominant"]
                 evidence_list.append("2LF dominant")
             
             # Evidence 2: Voltage imbalance >2%
@@ -81,28 +86,27 @@ def bayesian_fusion(validated_faults, data):
             v_avg = (v_r + v_s + v_t) / 3
             v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
             
-            if v_imbalance > 2.0:
-                likelihood *= cpt["ELECTRICAL_UNBALANCE"]["v_imbalance>2%"]
+            if v_imbalance > RULE_THRESHOLDS["voltage_imbalance_pct"]:
+                likelihood *= CPT["ELECTRICAL_UNBALANCE"]["v_imbalance>2%"]
                 evidence_list.append(f"V imbalance {v_imbalance:.1f}%")
             
-            # Evidence 3: Phase instability
-            phase_instability = data.get("phase_instability", 30)
-            if phase_instability > 20:
-                likelihood *= cpt["ELECTRICAL_UNBALANCE"]["phase_unstable"]
+            # Evidence 3: Phase instability (no evidence when not measured)
+            phase_instability = data["phase_instability"] if is_measured(data, "phase_instability") else None
+            if phase_instability is not None and phase_instability > PHASE_UNSTABLE_DEG:
+                likelihood *= CPT["ELECTRICAL_UNBALANCE"]["phase_unstable"]
                 evidence_list.append(f"Phase unstable ±{phase_instability}°")
             
             # Evidence 4: HF bands normal
             hf_pump_de = data.get("hf_pump_de", 0)
-            if hf_pump_de < 0.7:
-                likelihood *= cpt["ELECTRICAL_UNBALANCE"]["hf_normal"]
+            if hf_pump_de < RULE_THRESHOLDS["hf_g"]:
+                likelihood *= CPT["ELECTRICAL_UNBALANCE"]["hf_normal"]
                 evidence_list.append(f"HF {hf_pump_de:.2f}g normal")
             
             # Evidence 5: Temperature normal
             temp_pump_de = data.get("temp_pump_de", 0)
-            ambient = 35
-            temp_rise = temp_pump_de - ambient
-            if temp_rise < 40:
-                likelihood *= cpt["ELECTRICAL_UNBALANCE"]["temp_normal"]
+            temp_rise = temp_pump_de - AMBIENT_TEMP_C
+            if temp_rise < RULE_THRESHOLDS["temp_rise_c"]:
+                likelihood *= CPT["ELECTRICAL_UNBALANCE"]["temp_normal"]
                 evidence_list.append(f"Temp rise {temp_rise:.0f}°C normal")
         
         # === MECHANICAL UNBALANCE BAYESIAN CALCULATION ===
@@ -118,16 +122,16 @@ def bayesian_fusion(validated_faults, data):
             peak1_ratio = peak1_amp / total_rms if total_rms > 0 else 0
             
             is_1x_dominant = (abs(peak1_freq - fundamental) < 0.1 * fundamental and
-                            peak1_ratio > 0.80)
+                            peak1_ratio > RULE_THRESHOLDS["ratio_1x"])
             
             if is_1x_dominant:
-                likelihood *= cpt["MECHANICAL_UNBALANCE"]["1x_dominant"]
+                likelihood *= CPT["MECHANICAL_UNBALANCE"]["1x_dominant"]
                 evidence_list.append("1X dominant")
             
-            # Evidence 2: Phase stable
-            phase_instability = data.get("phase_instability", 5)
-            if phase_instability < 10:
-                likelihood *= cpt["MECHANICAL_UNBALANCE"]["phase_stable"]
+            # Evidence 2: Phase stable (no evidence when not measured)
+            phase_instability = data["phase_instability"] if is_measured(data, "phase_instability") else None
+            if phase_instability is not None and phase_instability < PHASE_STABLE_DEG:
+                likelihood *= CPT["MECHANICAL_UNBALANCE"]["phase_stable"]
                 evidence_list.append(f"Phase stable ±{phase_instability}°")
             
             # Evidence 3: Voltage imbalance normal
@@ -137,22 +141,22 @@ def bayesian_fusion(validated_faults, data):
             v_avg = (v_r + v_s + v_t) / 3
             v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
             
-            if v_imbalance < 2.0:
-                likelihood *= cpt["MECHANICAL_UNBALANCE"]["v_imbalance<2%"]
+            if v_imbalance < RULE_THRESHOLDS["voltage_imbalance_pct"]:
+                likelihood *= CPT["MECHANICAL_UNBALANCE"]["v_imbalance<2%"]
                 evidence_list.append(f"V imbalance {v_imbalance:.1f}% normal")
             
             # Evidence 4: HF bands normal
             hf_pump_de = data.get("hf_pump_de", 0)
-            if hf_pump_de < 0.7:
-                likelihood *= cpt["MECHANICAL_UNBALANCE"]["hf_normal"]
+            if hf_pump_de < RULE_THRESHOLDS["hf_g"]:
+                likelihood *= CPT["MECHANICAL_UNBALANCE"]["hf_normal"]
                 evidence_list.append(f"HF {hf_pump_de:.2f}g normal")
         
         # === BEARING DEFECT BAYESIAN CALCULATION ===
         elif "BEARING_DEFECT" in fault_type:
             # Evidence 1: HF >0.7g
             hf_pump_de = data.get("hf_pump_de", 0)
-            if hf_pump_de > 0.7:
-                likelihood *= cpt["BEARING_DEFECT"]["hf>0.7g"]
+            if hf_pump_de > RULE_THRESHOLDS["hf_g"]:
+                likelihood *= CPT["BEARING_DEFECT"]["hf>0.7g"]
                 evidence_list.append(f"HF {hf_pump_de:.2f}g high")
             
             # Evidence 2: BPFO peak (non-harmonic frequency)
@@ -167,16 +171,15 @@ def bayesian_fusion(validated_faults, data):
                       abs(peak3_freq - second_harmonic) > 0.2 * second_harmonic)
             
             if is_bpfo:
-                likelihood *= cpt["BEARING_DEFECT"]["bpfo_peak"]
+                likelihood *= CPT["BEARING_DEFECT"]["bpfo_peak"]
                 evidence_list.append(f"BPFO peak {peak3_freq:.1f}Hz")
             
             # Evidence 3: Temperature rise >40°C
             temp_pump_de = data.get("temp_pump_de", 0)
-            ambient = 35
-            temp_rise = temp_pump_de - ambient
+            temp_rise = temp_pump_de - AMBIENT_TEMP_C
             
-            if temp_rise > 40:
-                likelihood *= cpt["BEARING_DEFECT"]["temp_rise>40C"]
+            if temp_rise > RULE_THRESHOLDS["temp_rise_c"]:
+                likelihood *= CPT["BEARING_DEFECT"]["temp_rise>40C"]
                 evidence_list.append(f"Temp rise {temp_rise:.0f}°C")
             
             # Evidence 4: Voltage imbalance normal
@@ -186,10 +189,14 @@ def bayesian_fusion(validated_faults, data):
             v_avg = (v_r + v_s + v_t) / 3
             v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
             
-            if v_imbalance < 2.0:
-                likelihood *= cpt["BEARING_DEFECT"]["v_imbalance<2%"]
+            if v_imbalance < RULE_THRESHOLDS["voltage_imbalance_pct"]:
+                likelihood *= CPT["BEARING_DEFECT"]["v_imbalance<2%"]
                 evidence_list.append(f"V imbalance {v_imbalance:.1f}% normal")
         
+        # === REGISTERED DETECTORS (engine.detector_registry) ===
+        elif get_fault_hook(fault_type, "likelihood"):
+            likelihood, evidence_list = get_fault_hook(fault_type, "likelihood")(fault, data)
+        
         # Normalize to 0-95% range
         posterior = min(likelihood * 100, 95)
         
@@ -0,0 +1,308 @@
+"""
+Threshold Calibration - ROC/PR replay of labeled history
+ISO 13379-1:2012 Clause 6 (diagnostic rule validation)
+Labeled measurements are replayed through engine.batch_engine for every
+combination of candidate thresholds, in a process pool. Per-fault
+confusion matrices give ROC and precision-recall points, and the best set
+is written as a versioned threshold config.
+A config only applies to diagnose_batch(..., thresholds=...); the scalar
+PumpDiagnosticEngine always runs the module-level rule tables
+(fft_analyzer.RULE_THRESHOLDS, cross_validator.VALIDATION_SCORE).
+"""
+
+import hashlib
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .batch_engine import DEFAULT_THRESHOLDS, FAULT_SLOTS, diagnose_batch, resolve_thresholds
+from .measurement import to_batch
+
+
+CONFIG_SCHEMA = 1
+HEALTHY_LABELS = ("", "NONE", "NORMAL", "HEALTHY", "NO_FAULT", "NO_FAULT_DETECTED")
+DECISIONS = ("primary", "validated", "detected")
+OBJECTIVES = ("f1", "youden")
+
+# Confusion matrix columns
+TP, FP, FN, TN = range(4)
+
+_WORKER = {}
+
+
+def fault_families(labels):
+    """
+    Fault slot per label (ANGULAR_MISALIGNMENT -> MISALIGNMENT)
+
+    Returns:
+    --------
+    ndarray : Slot name, "" for healthy labels; labels matching no slot
+              are kept as given (a fault the engine cannot name)
+    """
+    families = []
+    for label in labels:
+        label = (label or "").strip().upper().replace(" ", "_")
+        if label in HEALTHY_LABELS:
+            families.append("")
+            continue
+        families.append(next((slot for slot in FAULT_SLOTS if slot in label), label))
+    return np.array(families, dtype=str)
+
+
+def predicted_faults(result, decision="primary"):
+    """
+    (n_rows, FAULT_SLOTS) predictions of a diagnose_batch() result
+
+    decision "primary" counts only the primary fault; "validated" every
+    fault passing Level 4; "detected" every Level 3 detection.
+    """
+    if decision == "primary":
+        return fault_families(result["primary_fault"])[:, None] == np.array(FAULT_SLOTS)[None, :]
+    if decision in ("validated", "detected"):
+        return result[decision]
+    raise ValueError(f"Unknown decision {decision!r} (expected one of {', '.join(DECISIONS)})")
+
+
+def confusion_matrices(actual, predicted):
+    """
+    One-vs-rest confusion counts per fault
+
+    Returns:
+    --------
+    ndarray : (FAULT_SLOTS, 4) int - TP, FP, FN, TN columns
+    """
+    return np.stack([
+        (actual & predicted).sum(axis=0),
+        (~actual & predicted).sum(axis=0),
+        (actual & ~predicted).sum(axis=0),
+        (~actual & ~predicted).sum(axis=0)
+    ], axis=-1)
+
+
+def confusion_metrics(counts):
+    """
+    precision, recall (TPR), fpr, f1 and support from confusion counts
+    (any leading shape, last axis TP/FP/FN/TN); undefined ratios are 0
+    """
+    counts = np.asarray(counts, dtype=float)
+    tp, fp, fn, tn = (counts[..., column] for column in (TP, FP, FN, TN))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        fpr = np.where(fp + tn > 0, fp / (fp + tn), 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return {"precision": precision, "recall": recall, "fpr": fpr, "f1": f1, "support": tp + fn}
+
+
+def _init_worker(batch, actual, decision, reliability):
+    _WORKER.update(batch=batch, actual=actual, decision=decision, reliability=reliability)
+
+
+def _evaluate_chunk(threshold_sets):
+    counts = []
+    for thresholds in threshold_sets:
+        result = diagnose_batch(_WORKER["batch"], _WORKER["reliability"], thresholds)
+        counts.append(confusion_matrices(_WORKER["actual"], predicted_faults(result, _WORKER["decision"])))
+    return counts
+
+
+def _roc_envelope(fpr, tpr):
+    """Upper envelope of ROC points through (0, 0) and (1, 1), and its area"""
+    order = np.lexsort((-tpr, fpr))
+    x = np.concatenate([[0.0], fpr[order], [1.0]])
+    y = np.maximum.accumulate(np.concatenate([[0.0], tpr[order], [1.0]]))
+    return x, y, float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+
+def calibrate(records, labels, grid, decision="primary", objective="f1", processes=None, chunk_size=4,
+              reliability=None):
+    """
+    Grid-search engine thresholds against labeled history
+
+    Parameters:
+    -----------
+    records : ndarray or list
+        MEASUREMENT_DTYPE batch, or records / engine input dicts
+    labels : list
+        Confirmed root cause per record (fault name, "" / NORMAL = healthy)
+    grid : dict
+        Threshold name (DEFAULT_THRESHOLDS) -> candidate values; every
+        combination is replayed, names not given keep their default
+    decision : str
+        What counts as a positive call (see predicted_faults)
+    objective : str
+        "f1" (macro F1) or "youden" (macro TPR - FPR) over the faults
+        present in the labels
+    processes : int
+        Worker processes (defaults to CPU count; 1 replays in-process)
+    chunk_size : int
+        Threshold sets sent to a worker per task
+    reliability : ReliabilityModel
+        Optional fitted Weibull model, as for PumpDiagnosticEngine
+
+    Returns:
+    --------
+    dict : names, candidates (n_sets x names), confusion (n_sets x
+           FAULT_SLOTS x 4), metrics (arrays n_sets x FAULT_SLOTS), score
+           (n_sets), best (index), thresholds (best set, resolved), roc
+           and pr (fault -> curve points, candidate indexes, auc - None
+           when the labels hold no positives or no negatives of the fault),
+           decision, objective, grid, dataset (records, label counts)
+
+    Raises:
+    -------
+    ValueError : On unknown thresholds, decision or objective, or when
+                 labels and records differ in length
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r} (expected one of {', '.join(OBJECTIVES)})")
+    if decision not in DECISIONS:
+        raise ValueError(f"Unknown decision {decision!r} (expected one of {', '.join(DECISIONS)})")
+    batch = records if isinstance(records, np.ndarray) else to_batch(records)
+    families = fault_families(labels)
+    if len(families) != len(batch):
+        raise ValueError(f"{len(families)} labels for {len(batch)} records")
+    resolve_thresholds(dict.fromkeys(grid, 0.0))
+
+    names = tuple(grid)
+    candidates = np.array(list(itertools.product(*(grid[name] for name in names))), dtype=float)
+    threshold_sets = [dict(zip(names, values)) for values in candidates]
+    actual = families[:, None] == np.array(FAULT_SLOTS)[None, :]
+
+    chunks = [threshold_sets[start:start + chunk_size] for start in range(0, len(threshold_sets), chunk_size)]
+    if processes == 1:
+        _init_worker(batch, actual, decision, reliability)
+        counts = [matrix for chunk in chunks for matrix in _evaluate_chunk(chunk)]
+    else:
+        counts = []
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                 initargs=(batch, actual, decision, reliability)) as executor:
+            for chunk_counts in executor.map(_evaluate_chunk, chunks):
+                counts.extend(chunk_counts)
+    confusion = np.array(counts, dtype=np.int64).reshape(len(threshold_sets), len(FAULT_SLOTS), 4)
+    metrics = confusion_metrics(confusion)
+
+    # Macro average over the faults that occur in the labels
+    present = actual.any(axis=0)
+    per_fault = metrics["f1"] if objective == "f1" else metrics["recall"] - metrics["fpr"]
+    score = per_fault[:, present].mean(axis=1) if present.any() else np.zeros(len(threshold_sets))
+    # Ties go to the set closest to the engine defaults
+    defaults = np.array([DEFAULT_THRESHOLDS[name] for name in names])
+    distance = np.abs(candidates - defaults).sum(axis=1)
+    best = int(np.lexsort((distance, -score))[0])
+
+    roc, pr = {}, {}
+    # ROC area is undefined without both classes (it would read as 0.5)
+    has_both_classes = present & ~actual.all(axis=0)
+    for slot, fault in enumerate(FAULT_SLOTS):
+        fpr, tpr, precision = metrics["fpr"][:, slot], metrics["recall"][:, slot], metrics["precision"][:, slot]
+        x, y, auc = _roc_envelope(fpr, tpr)
+        if not has_both_classes[slot]:
+            auc = None
+        order = np.lexsort((-tpr, fpr))
+        roc[fault] = {"fpr": fpr[order], "tpr": tpr[order], "candidate": order,
+                      "envelope": (x, y), "auc": auc}
+        order = np.lexsort((-precision, tpr))
+        pr[fault] = {"recall": tpr[order], "precision": precision[order], "candidate": order}
+
+    labels_seen, label_counts = np.unique(families, return_counts=True)
+    return {
+        "names": names,
+        "candidates": candidates,
+        "confusion": confusion,
+        "metrics": metrics,
+        "score": score,
+        "best": best,
+        "thresholds": resolve_thresholds(threshold_sets[best]),
+        "roc": roc,
+        "pr": pr,
+        "decision": decision,
+        "objective": objective,
+        "grid": {name: [float(value) for value in grid[name]] for name in names},
+        "dataset": {
+            "records": int(len(batch)),
+            "labels": {(label or "HEALTHY"): int(count) for label, count in zip(labels_seen, label_counts)}
+        }
+    }
+
+
+def threshold_digest(thresholds):
+    """Content hash of a resolved threshold set (identifies a config)"""
+    canonical = json.dumps(resolve_thresholds(thresholds), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def threshold_config(result, version=None, notes=""):
+    """
+    Versioned threshold config from a calibrate() result
+
+    Parameters:
+    -----------
+    result : dict
+        calibrate() result
+    version : str
+        Config version; defaults to "<UTC date>-<digest prefix>"
+    notes : str
+        Free text (dataset period, reviewer, ...)
+
+    Returns:
+    --------
+    dict : schema, version, created, digest, thresholds, defaults,
+           decision, objective, score, metrics (fault -> precision, recall,
+           fpr, f1, support at the chosen set), grid, dataset, notes
+    """
+    best = result["best"]
+    thresholds = result["thresholds"]
+    digest = threshold_digest(thresholds)
+    created = datetime.now(timezone.utc).replace(microsecond=0)
+    return {
+        "schema": CONFIG_SCHEMA,
+        "version": version or f"{created:%Y.%m.%d}-{digest[:8]}",
+        "created": created.isoformat(),
+        "digest": digest,
+        "thresholds": thresholds,
+        "defaults": dict(DEFAULT_THRESHOLDS),
+        "decision": result["decision"],
+        "objective": result["objective"],
+        "score": float(result["score"][best]),
+        "metrics": {
+            fault: {name: float(values[best, slot]) for name, values in result["metrics"].items()}
+            for slot, fault in enumerate(FAULT_SLOTS)
+        },
+        "grid": result["grid"],
+        "dataset": result["dataset"],
+        "notes": notes
+    }
+
+
+def save_threshold_config(config, path):
+    """Write a threshold config as JSON"""
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(config, handle, indent=2, sort_keys=True)
+
+
+def load_threshold_config(path):
+    """
+    Read and check a threshold config written by save_threshold_config
+
+    Returns:
+    --------
+    dict : The config; config["thresholds"] is ready for
+           diagnose_batch(..., thresholds=...)
+
+    Raises:
+    -------
+    ValueError : On an unsupported schema, unknown thresholds or a digest
+                 that no longer matches the thresholds (hand-edited file)
+    """
+    with open(path, encoding="utf-8") as handle:
+        config = json.load(handle)
+    if config.get("schema") != CONFIG_SCHEMA:
+        raise ValueError(f"Unsupported threshold config schema {config.get('schema')!r}")
+    config["thresholds"] = resolve_thresholds(config["thresholds"])
+    if threshold_digest(config["thresholds"]) != config.get("digest"):
+        raise ValueError(f"Threshold config {config.get('version')} does not match its digest")
+    return config
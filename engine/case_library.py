@@ -0,0 +1,298 @@
+"""
+Spectral Case Library - nearest-neighbour retrieval of past diagnoses
+ISO 13379-1:2012 Clause 6.4 (data-driven diagnostics, case comparison)
+Spectra or the three reported peaks are resampled onto a running-speed
+order grid (1X, 2X, ...) so pumps at different speeds compare, then
+indexed with random-projection LSH (cosine) and re-ranked exactly.
+"""
+
+import json
+
+import numpy as np
+
+
+ORDER_RESOLUTION = 0.1     # X per bin
+MAX_ORDER = 12.0           # 1X..12X covers harmonics, vane pass and most bearing tones
+ORDER_SMOOTHING = 1.0      # Gaussian sigma in bins - tolerates slip and rpm error
+N_ORDER_BINS = int(round(MAX_ORDER / ORDER_RESOLUTION))
+
+DEFAULT_TABLES = 12
+DEFAULT_BITS = 14
+MIN_CANDIDATES = 64        # probe neighbouring buckets until this many eligible candidates
+
+
+def _smooth_and_normalize(vectors):
+    offsets = np.arange(-3, 4)
+    kernel = np.exp(-0.5 * (offsets / ORDER_SMOOTHING) ** 2)
+    padded = np.pad(vectors, ((0, 0), (3, 3)))
+    smoothed = sum(weight * padded[:, 3 + offset:3 + offset + N_ORDER_BINS]
+                   for offset, weight in zip(offsets, kernel))
+    norm = np.linalg.norm(smoothed, axis=1, keepdims=True)
+    return np.divide(smoothed, norm, out=np.zeros_like(smoothed), where=norm > 0).astype(np.float32)
+
+
+def order_spectrum(freqs, amps, rpm):
+    """
+    Order-normalized signature of a full spectrum
+
+    Parameters:
+    -----------
+    freqs, amps : array
+        Spectrum (Hz, mm/s)
+    rpm : float
+        Running speed at the time of measurement
+
+    Returns:
+    --------
+    ndarray : (N_ORDER_BINS,) float32, unit length (zeros if empty)
+    """
+    orders = np.asarray(freqs, dtype=float) / (rpm / 60.0)
+    amps = np.asarray(amps, dtype=float)
+    bins = np.floor(orders / ORDER_RESOLUTION).astype(np.intp)
+    inside = (bins >= 0) & (bins < N_ORDER_BINS) & ~np.isnan(amps)
+    vector = np.zeros((1, N_ORDER_BINS))
+    np.maximum.at(vector[0], bins[inside], amps[inside])   # peak per bin survives
+    return _smooth_and_normalize(vector)[0]
+
+
+def peak_orders(records):
+    """
+    Order-normalized signatures of the three reported peaks (peak1..3
+    freq/amp over motor_rpm) of engine input dicts or records
+
+    Returns:
+    --------
+    ndarray : (n_records, N_ORDER_BINS) float32, unit length rows; rows
+              without rpm or peaks are zero
+    """
+    vectors = np.zeros((len(records), N_ORDER_BINS))
+    for row, data in enumerate(records):
+        rpm = data.get("motor_rpm")
+        if not rpm:
+            continue
+        for n in (1, 2, 3):
+            freq, amp = data.get(f"peak{n}_freq"), data.get(f"peak{n}_amp")
+            if freq is None or amp is None:
+                continue
+            bin_index = int(freq / (rpm / 60.0) / ORDER_RESOLUTION)
+            if 0 <= bin_index < N_ORDER_BINS:
+                vectors[row, bin_index] = max(vectors[row, bin_index], amp)
+    return _smooth_and_normalize(vectors)
+
+
+class CaseIndex:
+    """Order-signature index of historical cases with confirmed root causes"""
+
+    def __init__(self, n_tables=DEFAULT_TABLES, n_bits=DEFAULT_BITS, seed=0):
+        """
+        Parameters:
+        -----------
+        n_tables : int
+            Independent hash tables (more = higher recall, more memory)
+        n_bits : int
+            Hyperplanes per table (more = smaller buckets)
+        seed : int
+            Seed of the random hyperplanes (fixed so saved indexes reload)
+        """
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((n_tables, n_bits, N_ORDER_BINS)).astype(np.float32)
+        self._weights = (1 << np.arange(n_bits)).astype(np.int64)
+
+        self.vectors = np.zeros((0, N_ORDER_BINS), dtype=np.float32)
+        self.codes = np.zeros((n_tables, 0), dtype=np.int64)
+        self.asset_ids = []
+        self.timestamps = np.zeros(0)
+        self.faults = []
+        self.root_causes = []
+        self.notes = []
+        self.confirmed = np.zeros(0, dtype=bool)
+        self.center = None      # mean signature, fixed by the first add()
+        self._order = None      # per-table argsort of codes, rebuilt lazily
+        self._sorted = None
+        self._asset_array = None    # asset_ids as an array for vectorized filters
+
+    def __len__(self):
+        return len(self.asset_ids)
+
+    def _hash(self, vectors):
+        # Signatures are non-negative, so hyperplanes through the origin
+        # would put almost everything on one side - hash around the mean
+        signs = np.einsum("tbd,nd->tnb", self._planes, vectors - self.center) > 0
+        return signs.astype(np.int64) @ self._weights
+
+    def add(self, vectors, cases):
+        """
+        Index signatures with their case metadata
+
+        Parameters:
+        -----------
+        vectors : array
+            (n_cases, N_ORDER_BINS) signatures (order_spectrum / peak_orders)
+        cases : list
+            Dicts with asset_id, timestamp, primary_fault and optionally
+            root_cause (confirmed finding, "" = unconfirmed) and notes
+
+        Returns:
+        --------
+        ndarray : Case IDs of the added rows
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(cases), N_ORDER_BINS)
+        if self.center is None:
+            self.center = vectors.mean(axis=0) if len(vectors) else np.zeros(N_ORDER_BINS, dtype=np.float32)
+        first = len(self)
+        self.vectors = np.concatenate([self.vectors, vectors])
+        self.codes = np.concatenate([self.codes, self._hash(vectors)], axis=1)
+        self.timestamps = np.concatenate([self.timestamps, [float(case.get("timestamp", 0.0)) for case in cases]])
+        for case in cases:
+            self.asset_ids.append(case.get("asset_id", ""))
+            self.faults.append(case.get("primary_fault") or "")
+            self.root_causes.append(case.get("root_cause") or "")
+            self.notes.append(case.get("notes") or "")
+        self.confirmed = np.concatenate([self.confirmed, [bool(case.get("root_cause")) for case in cases]])
+        self._order = None
+        self._asset_array = None
+        return np.arange(first, len(self))
+
+    def confirm(self, case_id, root_cause, notes=""):
+        """Record the root cause found on inspection for an indexed case"""
+        self.root_causes[case_id] = root_cause
+        self.notes[case_id] = notes
+        self.confirmed[case_id] = bool(root_cause)
+
+    def _eligible(self, confirmed_only, exclude_asset):
+        """Boolean mask of the cases a query may return (None = every case)"""
+        mask = self.confirmed if confirmed_only else None
+        if exclude_asset is not None:
+            if self._asset_array is None:
+                self._asset_array = np.asarray(self.asset_ids, dtype=str)
+            other_assets = self._asset_array != exclude_asset
+            mask = other_assets if mask is None else mask & other_assets
+        return mask
+
+    def _candidates(self, query_codes, eligible, k):
+        if self._order is None:
+            self._order = np.argsort(self.codes, axis=1, kind="stable")
+            self._sorted = np.take_along_axis(self.codes, self._order, axis=1)
+
+        found = [np.zeros(0, dtype=np.intp)]
+        candidates = found[0]
+        # Multi-probe: exact buckets first, then buckets one bit away; only
+        # eligible cases count towards the candidate budget
+        for flips in (np.zeros(1, dtype=np.int64), self._weights):
+            probes = query_codes[:, None] ^ flips[None, :]
+            for table in range(self.n_tables):
+                low = np.searchsorted(self._sorted[table], probes[table], side="left")
+                high = np.searchsorted(self._sorted[table], probes[table], side="right")
+                found.extend(self._order[table, start:stop] for start, stop in zip(low, high) if stop > start)
+            candidates = np.unique(np.concatenate(found))
+            if eligible is not None:
+                candidates = candidates[eligible[candidates]]
+            if len(candidates) >= max(k, MIN_CANDIDATES):
+                break
+        # Sparse eligible set (e.g. few confirmed cases): scan it exactly
+        # rather than return fewer than k
+        if len(candidates) < k:
+            candidates = np.arange(len(self)) if eligible is None else np.flatnonzero(eligible)
+        return candidates
+
+    def query(self, vector, k=5, confirmed_only=False, exact=False, exclude_asset=None):
+        """
+        Most similar past cases (cosine similarity of order signatures)
+
+        Parameters:
+        -----------
+        vector : array
+            (N_ORDER_BINS,) signature of the new measurement
+        k : int
+            Cases to return
+        confirmed_only : bool
+            Only cases with a recorded root cause
+        exact : bool
+            Scan every case instead of the LSH candidates
+        exclude_asset : str
+            Skip cases of this asset (e.g. its own earlier readings)
+
+        Returns:
+        --------
+        list : Dicts with case_id, similarity, asset_id, timestamp,
+               primary_fault, root_cause, notes; best first
+        """
+        if not len(self):
+            return []
+        vector = np.asarray(vector, dtype=np.float32).reshape(N_ORDER_BINS)
+        eligible = self._eligible(confirmed_only, exclude_asset)
+        if exact:
+            candidates = np.arange(len(self)) if eligible is None else np.flatnonzero(eligible)
+        else:
+            candidates = self._candidates(self._hash(vector[None, :])[:, 0], eligible, k)
+        if not len(candidates):
+            return []
+
+        similarity = self.vectors[candidates] @ vector
+        top = np.argsort(-similarity, kind="stable")[:k]
+        return [
+            {
+                "case_id": int(case_id),
+                "similarity": float(similarity[position]),
+                "asset_id": self.asset_ids[case_id],
+                "timestamp": float(self.timestamps[case_id]),
+                "primary_fault": self.faults[case_id],
+                "root_cause": self.root_causes[case_id],
+                "notes": self.notes[case_id]
+            }
+            for position, case_id in zip(top, candidates[top])
+        ]
+
+    def similar_cases(self, data, k=5, confirmed_only=True, exclude_asset=None):
+        """query() for one engine input (peak features over motor_rpm)"""
+        return self.query(peak_orders([data])[0], k, confirmed_only, exclude_asset=exclude_asset)
+
+    @classmethod
+    def from_store(cls, store, **settings):
+        """
+        Index every stored measurement that has a diagnosis at the same
+        asset and timestamp (peak signatures, diagnosed primary fault)
+        """
+        rows = store.conn.execute(
+            "SELECT m.asset_id, m.timestamp, m.data, d.primary_fault FROM measurements m "
+            "JOIN diagnoses d ON d.asset_id = m.asset_id AND d.timestamp = m.timestamp "
+            "ORDER BY m.timestamp"
+        ).fetchall()
+        index = cls(**settings)
+        records = [json.loads(data) for _, _, data, _ in rows]
+        index.add(peak_orders(records), [
+            {"asset_id": asset_id, "timestamp": timestamp, "primary_fault": fault}
+            for asset_id, timestamp, _, fault in rows
+        ])
+        return index
+
+    def save(self, path):
+        """Write the index (signatures, metadata, hashing settings) to a .npz file"""
+        np.savez_compressed(
+            path, vectors=self.vectors, timestamps=self.timestamps,
+            asset_ids=np.array(self.asset_ids, dtype=str), faults=np.array(self.faults, dtype=str),
+            root_causes=np.array(self.root_causes, dtype=str), notes=np.array(self.notes, dtype=str),
+            center=self.center if self.center is not None else np.zeros(0, dtype=np.float32),
+            settings=np.array([self.n_tables, self.n_bits, self.seed])
+        )
+
+    @classmethod
+    def load(cls, path):
+        """CaseIndex from a file written by save() (hash codes are recomputed)"""
+        with np.load(path) as state:
+            n_tables, n_bits, seed = (int(value) for value in state["settings"])
+            index = cls(n_tables, n_bits, seed)
+            if len(state["center"]):
+                index.center = state["center"]
+            cases = [
+                {"asset_id": asset_id, "timestamp": timestamp, "primary_fault": fault,
+                 "root_cause": root_cause, "notes": notes}
+                for asset_id, timestamp, fault, root_cause, notes in zip(
+                    state["asset_ids"].tolist(), state["timestamps"].tolist(), state["faults"].tolist(),
+                    state["root_causes"].tolist(), state["notes"].tolist())
+            ]
+            index.add(state["vectors"], cases)
+        return index
@@ -0,0 +1,226 @@
+"""
+Fleet Cohort Anomaly Detection - sister pumps compared with each other
+ISO 13379-1:2012 Clause 6.4 (data-driven comparison), ISO 17359:2018 Annex D
+Assets with the same configuration (pump type, motor rating, foundation)
+form a cohort; a robust covariance is fitted per cohort over the Layer 1
+feature vector and every pump is scored by Mahalanobis distance at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .quantiles import normal_quantile
+from .route_screening import VELOCITY_COLUMNS, BAND_COLUMNS
+
+
+COHORT_FEATURES = VELOCITY_COLUMNS + BAND_COLUMNS + (
+    "current_r", "current_s", "current_t", "suction_pressure", "discharge_pressure"
+)
+COHORT_KEYS = ("pump_type", "motor_kw", "foundation_type")
+
+MAD_TO_SIGMA = 1.4826
+
+
+def chi2_quantile(probability, dof):
+    """Chi-square quantile via the Wilson-Hilferty approximation (no SciPy dependency)"""
+    z = normal_quantile(probability)
+    h = 2.0 / (9.0 * dof)
+    return dof * (1 - h + z * np.sqrt(h)) ** 3
+
+
+def _shrunk_covariance(z):
+    """Ledoit-Wolf covariance of (already centred) rows, shrunk toward a scaled identity"""
+    n, d = z.shape
+    sample = z.T @ z / n
+    mu = np.trace(sample) / d
+    delta = np.sum((sample - mu * np.eye(d)) ** 2) / d
+    # sum_i ||z_i z_i^T - S||^2 without forming the outer products
+    beta = (np.sum(np.sum(z**2, axis=1) ** 2) - 2 * np.einsum("nd,de,ne->", z, sample, z)
+            + n * np.sum(sample**2)) / (n * n * d)
+    shrinkage = min(1.0, beta / delta) if delta > 0 else 1.0
+    return (1 - shrinkage) * sample + shrinkage * mu * np.eye(d)
+
+
+def fit_robust_covariance(x, support_fraction=0.75, n_csteps=5):
+    """
+    Robust location/scatter of one cohort (FAST-MCD style concentration steps)
+
+    Features are standardized by median/MAD, missing values imputed with the
+    median, then the covariance is refitted on the h rows closest to the
+    current fit (Ledoit-Wolf shrinkage keeps it invertible when a cohort
+    has fewer rows than features) and rescaled for consistency.
+
+    Parameters:
+    -----------
+    x : array
+        (n_rows, n_features) readings of one cohort, NaN = not measured
+
+    Returns:
+    --------
+    dict : center, scale (robust standardization), location, precision
+           (in standardized units), support (rows used)
+    """
+    center = np.nanmedian(x, axis=0)
+    center = np.where(np.isnan(center), 0.0, center)
+    mad = np.nanmedian(np.abs(x - center), axis=0) * MAD_TO_SIGMA
+    scale = np.where(np.isnan(mad) | (mad <= 0), np.maximum(np.abs(center) * 0.05, 1e-6), mad)
+    z = np.where(np.isnan(x), 0.0, (x - center) / scale)
+
+    n, d = z.shape
+    support = np.arange(n)
+    location = np.zeros(d)
+    precision = np.eye(d)
+    # Too few rows for a stable full scatter: keep the robust diagonal
+    if n >= 2 * d:
+        h = max(2, min(n, int(np.ceil(support_fraction * n))))
+        for _ in range(n_csteps):
+            location = z[support].mean(axis=0)
+            precision = np.linalg.inv(_shrunk_covariance(z[support] - location))
+            diff = z - location
+            distance = np.einsum("nd,de,ne->n", diff, precision, diff)
+            new_support = np.sort(np.argsort(distance)[:h])
+            if np.array_equal(new_support, support):
+                break
+            support = new_support
+
+    # Consistency correction: the h-subset scatter (or small-sample MAD)
+    # misestimates the full cohort's, so rescale to a chi-square median distance
+    diff = z - location
+    distance = np.einsum("nd,de,ne->n", diff, precision, diff)
+    correction = np.median(distance) / chi2_quantile(0.5, d)
+    if correction > 0:
+        precision = precision / correction
+    return {"center": center, "scale": scale, "location": location, "precision": precision, "support": support}
+
+
+class CohortAnomalyDetector:
+    """Per-cohort robust Mahalanobis scoring with incremental refits"""
+
+    def __init__(self, features=COHORT_FEATURES, keys=COHORT_KEYS, history=3, min_cohort=4,
+                 probability=0.999, support_fraction=0.75):
+        """
+        Parameters:
+        -----------
+        features : tuple
+            Route columns forming the feature vector
+        keys : tuple
+            Route columns defining a cohort (missing columns count as "")
+        history : int
+            Latest readings kept per asset for the cohort fit
+        min_cohort : int
+            Fewest distinct assets for a cohort to be scored
+        probability : float
+            Chi-square quantile of the anomaly threshold (inflated per
+            cohort by 1 + n_features / n_rows)
+        """
+        self.features = tuple(features)
+        self.keys = tuple(keys)
+        self.history = history
+        self.min_cohort = min_cohort
+        self.probability = probability
+        self.support_fraction = support_fraction
+        self.threshold = chi2_quantile(probability, len(self.features))
+
+        self._readings = {}     # asset_id -> (cohort, list of feature vectors, newest last)
+        self._models = {}       # cohort -> fitted model or None (too small)
+        self._dirty = set()
+
+    def cohort_labels(self, route):
+        """Cohort key of every route row as a string ("pump_type | kW | foundation")"""
+        parts = []
+        for key in self.keys:
+            if key not in route.columns:
+                parts.append(pd.Series("", index=route.index))
+            elif key == "motor_kw":
+                parts.append(route[key].round(1).astype(str))
+            else:
+                parts.append(route[key].fillna("").astype(str))
+        labels = parts[0]
+        for part in parts[1:]:
+            labels = labels + " | " + part
+        return labels.to_numpy()
+
+    def update(self, route):
+        """
+        Add a route's readings; only the cohorts it touches are refitted
+        (lazily, on the next score)
+        """
+        values = route[list(self.features)].to_numpy(dtype=float)
+        for asset_id, cohort, row in zip(route["asset_id"], self.cohort_labels(route), values):
+            previous = self._readings.get(asset_id)
+            if previous is not None and previous[0] != cohort:
+                self._dirty.add(previous[0])
+                previous = None
+            readings = (previous[1] if previous else []) + [row]
+            self._readings[asset_id] = (cohort, readings[-self.history:])
+            self._dirty.add(cohort)
+
+    def _refit(self):
+        if not self._dirty:
+            return
+        members = {}
+        for cohort, readings in self._readings.values():
+            if cohort in self._dirty:
+                members.setdefault(cohort, []).append(readings)
+        for cohort in self._dirty:
+            assets = members.get(cohort, [])
+            if len(assets) < self.min_cohort:
+                self._models[cohort] = None
+                continue
+            model = fit_robust_covariance(np.vstack([np.vstack(readings) for readings in assets]),
+                                          self.support_fraction)
+            model["size"] = len(assets)
+            # Finite-sample inflation: scatter from few rows per feature
+            # gives heavier-than-chi-square distances
+            n_rows = sum(len(readings) for readings in assets)
+            model["threshold"] = self.threshold * (1 + len(self.features) / n_rows)
+            self._models[cohort] = model
+        self._dirty.clear()
+
+    def score(self, route):
+        """
+        Mahalanobis distance of every route row to its cohort, in one pass
+
+        Returns:
+        --------
+        DataFrame : route_index, asset_id, cohort, cohort_size, cohort_distance
+                    (sqrt of squared distance), cohort_threshold,
+                    cohort_anomaly, cohort_feature (largest contributor)
+        """
+        self._refit()
+        labels = self.cohort_labels(route)
+        values = route[list(self.features)].to_numpy(dtype=float)
+        n_rows, n_features = values.shape
+
+        cohorts = [cohort for cohort, model in self._models.items() if model is not None]
+        slot = {cohort: index for index, cohort in enumerate(cohorts)}
+        index = np.array([slot.get(label, -1) for label in labels], dtype=np.intp)
+        scored = index >= 0
+
+        distance = np.full(n_rows, np.nan)
+        contribution = np.zeros((n_rows, n_features))
+        if cohorts and scored.any():
+            center = np.stack([self._models[c]["center"] for c in cohorts])
+            scale = np.stack([self._models[c]["scale"] for c in cohorts])
+            location = np.stack([self._models[c]["location"] for c in cohorts])
+            precision = np.stack([self._models[c]["precision"] for c in cohorts])
+
+            rows = index[scored]
+            z = (values[scored] - center[rows]) / scale[rows]
+            diff = np.where(np.isnan(z), 0.0, z - location[rows])
+            weighted = np.einsum("nde,ne->nd", precision[rows], diff)
+            contribution[scored] = diff * weighted
+            distance[scored] = np.sqrt(np.maximum(contribution[scored].sum(axis=1), 0.0))
+
+        sizes = np.array([self._models[cohorts[i]]["size"] if i >= 0 else 0 for i in index], dtype=int)
+        thresholds = np.array([self._models[cohorts[i]]["threshold"] if i >= 0 else np.nan for i in index])
+        return pd.DataFrame({
+            "route_index": np.arange(n_rows),
+            "asset_id": route["asset_id"].to_numpy(),
+            "cohort": labels,
+            "cohort_size": sizes,
+            "cohort_distance": distance,
+            "cohort_threshold": np.sqrt(thresholds),
+            "cohort_anomaly": scored & (distance**2 > thresholds),
+            "cohort_feature": np.where(scored, np.asarray(self.features)[np.argmax(contribution, axis=1)], "")
+        })
@@ -3,6 +3,16 @@ Level 4: Cross-Validation
 Multi-parameter consistency check to avoid false positives
 """
 
+from .detector_registry import get_fault_hook, is_measured
+from .fft_analyzer import AMBIENT_TEMP_C, RULE_THRESHOLDS
+
+# Consistency score a fault needs to pass Level 4
+VALIDATION_SCORE = 0.6
+PHASE_UNSTABLE_DEG = 20     # electrical origin
+PHASE_STABLE_DEG = 10       # mechanical origin
+MISALIGNMENT_TEMP_GRADIENT_C = 10
+
+
 def cross_validate_faults(primary_faults, data):
     """
     Validate fault consistency across multiple parameters
@@ -36,7 +46,7 @@ def cross_validate_faults(primary_faults, data):
             v_avg = (v_r + v_s + v_t) / 3
             v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
             
-            if v_imbalance > 2.0:
+            if v_imbalance > RULE_THRESHOLDS["voltage_imbalance_pct"]:
                 consistency_score += 0.4
                 consistency_evidence.append(f"✓ Voltage imbalance {v_imbalance:.1f}% confirmed (>2% limit)")
             else:
@@ -47,19 +57,20 @@ def cross_validate_faults(primary_faults, data):
             temp_pump_nde = data.get("temp_pump_nde", 0)
             temp_gradient = abs(temp_pump_de - temp_pump_nde)
             
-            if temp_gradient < 15:
+            if temp_gradient < RULE_THRESHOLDS["temp_gradient_c"]:
                 consistency_score += 0.3
                 consistency_evidence.append(f"✓ Temperature gradient {temp_gradient:.0f}°C normal (<15°C)")
             else:
                 inconsistencies.append(f"✗ Temperature gradient {temp_gradient:.0f}°C high - possible bearing defect")
             
-            # Validation 3: Phase instability should be present
-            phase_instability = data.get("phase_instability", 30)
-            if phase_instability > 20:
-                consistency_score += 0.3
-                consistency_evidence.append(f"✓ Phase instability ±{phase_instability:.0f}° confirmed")
-            else:
-                inconsistencies.append(f"✗ Phase stability ±{phase_instability:.0f}° - unexpected for electrical fault")
+            # Validation 3: Phase instability should be present (skipped when not measured)
+            if is_measured(data, "phase_instability"):
+                phase_instability = data["phase_instability"]
+                if phase_instability > PHASE_UNSTABLE_DEG:
+                    consistency_score += 0.3
+                    consistency_evidence.append(f"✓ Phase instability ±{phase_instability:.0f}° confirmed")
+                else:
+                    inconsistencies.append(f"✗ Phase stability ±{phase_instability:.0f}° - unexpected for electrical fault")
         
         # === VALIDATION FOR MECHANICAL UNBALANCE ===
         elif "MECHANICAL_UNBALANCE" in fault_type:
@@ -70,19 +81,20 @@ def cross_validate_faults(primary_faults, data):
             v_avg = (v_r + v_s + v_t) / 3
             v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
             
-            if v_imbalance < 2.0:
+            if v_imbalance < RULE_THRESHOLDS["voltage_imbalance_pct"]:
                 consistency_score += 0.4
                 consistency_evidence.append(f"✓ Voltage imbalance {v_imbalance:.1f}% normal (<2% limit)")
             else:
                 inconsistencies.append(f"✗ Voltage imbalance {v_imbalance:.1f}% high - possible electrical fault")
             
-            # Validation 2: Phase should be stable
-            phase_instability = data.get("phase_instability", 5)
-            if phase_instability < 10:
-                consistency_score += 0.3
-                consistency_evidence.append(f"✓ Phase stability ±{phase_instability:.0f}° confirmed")
-            else:
-                inconsistencies.append(f"✗ Phase instability ±{phase_instability:.0f}° - unexpected for mechanical fault")
+            # Validation 2: Phase should be stable (skipped when not measured)
+            if is_measured(data, "phase_instability"):
+                phase_instability = data["phase_instability"]
+                if phase_instability < PHASE_STABLE_DEG:
+                    consistency_score += 0.3
+                    consistency_evidence.append(f"✓ Phase stability ±{phase_instability:.0f}° confirmed")
+                else:
+                    inconsistencies.append(f"✗ Phase instability ±{phase_instability:.0f}° - unexpected for mechanical fault")
             
             # Validation 3: Displacement should correlate with velocity
             pump_v_avr = (data.get("pump_v_de", 0) + data.get("pump_v_nde", 0)) / 2
@@ -103,18 +115,17 @@ def cross_validate_faults(primary_faults, data):
         elif "BEARING_DEFECT" in fault_type:
             # Validation 1: HF bands must be high
             hf_pump_de = data.get("hf_pump_de", 0)
-            if hf_pump_de > 0.7:
+            if hf_pump_de > RULE_THRESHOLDS["hf_g"]:
                 consistency_score += 0.4
                 consistency_evidence.append(f"✓ HF 5-16 kHz = {hf_pump_de:.2f}g > 0.7g threshold")
             else:
                 inconsistencies.append(f"✗ HF 5-16 kHz = {hf_pump_de:.2f}g normal (<0.7g)")
             
             # Validation 2: Temperature rise should be present
-            ambient = 35  # Assume ambient temperature for BBM terminal
             temp_pump_de = data.get("temp_pump_de", 0)
-            temp_rise = temp_pump_de - ambient
+            temp_rise = temp_pump_de - AMBIENT_TEMP_C
             
-            if temp_rise > 40:
+            if temp_rise > RULE_THRESHOLDS["temp_rise_c"]:
                 consistency_score += 0.3
                 consistency_evidence.append(f"✓ Bearing temp rise {temp_rise:.0f}°C >40°C limit")
             else:
@@ -127,7 +138,7 @@ def cross_validate_faults(primary_faults, data):
             v_avg = (v_r + v_s + v_t) / 3
             v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
             
-            if v_imbalance < 2.0:
+            if v_imbalance < RULE_THRESHOLDS["voltage_imbalance_pct"]:
                 consistency_score += 0.3
                 consistency_evidence.append(f"✓ Voltage imbalance {v_imbalance:.1f}% normal")
             else:
@@ -140,7 +151,7 @@ def cross_validate_faults(primary_faults, data):
             peak1_amp = data.get("peak1_amp", 0)
             peak2_ratio = peak2_amp / peak1_amp if peak1_amp > 0 else 0
             
-            if peak2_ratio > 0.5:
+            if peak2_ratio > RULE_THRESHOLDS["ratio_2x"]:
                 consistency_score += 0.4
                 consistency_evidence.append(f"✓ 2X/1X ratio = {peak2_ratio:.2f} > 0.5 threshold")
             else:
@@ -164,12 +175,18 @@ def cross_validate_faults(primary_faults, data):
             temp_pump_nde = data.get("temp_pump_nde", 0)
             temp_gradient = abs(temp_pump_de - temp_pump_nde)
             
-            if temp_gradient > 10:
+            if temp_gradient > MISALIGNMENT_TEMP_GRADIENT_C:
                 consistency_score += 0.3
                 consistency_evidence.append(f"✓ Temperature gradient {temp_gradient:.0f}°C present")
             else:
                 consistency_evidence.append(f"○ Temperature gradient {temp_gradient:.0f}°C normal")
         
+        # === VALIDATION FOR REGISTERED DETECTORS (engine.detector_registry) ===
+        else:
+            validate = get_fault_hook(fault_type, "validate")
+            if validate:
+                consistency_score, consistency_evidence, inconsistencies = validate(fault, data)
+        
         # Calculate final confidence with consistency adjustment
         original_confidence = fault["confidence"]
         adjusted_confidence = original_confidence * (0.7 + consistency_score * 0.3)
@@ -181,7 +198,7 @@ def cross_validate_faults(primary_faults, data):
             "final_confidence": min(adjusted_confidence, 0.95),  # Cap at 95%
             "consistency_evidence": consistency_evidence,
             "inconsistencies": inconsistencies,
-            "is_validated": consistency_score >= 0.6,
+            "is_validated": consistency_score >= VALIDATION_SCORE,
             "standard": fault["standard"],
             "severity": fault["severity"]
         })
@@ -0,0 +1,141 @@
+"""
+Fault Detector Registry
+ISO 13379-1:2012 Clause 6 - Data-driven diagnostic rule management
+"""
+
+import math
+
+
+# name -> detector specification (see register_detector)
+DETECTOR_REGISTRY = {}
+
+
+def register_detector(name, required_inputs, cost=1.0, optional_inputs=(),
+                      validate=None, likelihood=None, recommend=None, uses_constants=False):
+    """
+    Register a fault detector together with its downstream hooks
+
+    A detector is a function detect(data) -> fault dict (or None), or
+    detect(data, constants) with uses_constants set; a fault
+    with severity "CRITICAL" is safety level and ends run_detectors early
+    when early_exit is set. The optional hooks let a new fault type plug into Levels 4-6 without
+    editing cross_validator, bayesian_fusion or risk_assessor:
+
+    - validate(fault, data) -> (consistency_score, evidence, inconsistencies)
+    - likelihood(fault, data) -> (likelihood, evidence_list)
+    - recommend(data, mtbf_days, risk_level) -> (primary_rec, follow_up_recs)
+
+    Parameters:
+    -----------
+    name : str
+        Fault type name (e.g. "BEARING_DEFECT")
+    required_inputs : tuple
+        Input keys that must be measured for the detector to run
+    cost : float
+        Relative evaluation cost - cheaper detectors are scheduled first
+    optional_inputs : tuple
+        Inputs used when present (documentation and auditing only)
+    validate, likelihood, recommend : callable
+        Optional Level 4/5/6 hooks
+    uses_constants : bool
+        Pass the asset constants (engine.asset_registry) given to
+        run_detectors as a second argument - None when there are none
+
+    Returns:
+    --------
+    callable : Decorator registering the detect function
+    """
+    def decorator(detect):
+        DETECTOR_REGISTRY[name] = {
+            "name": name,
+            "detect": detect,
+            "required_inputs": tuple(required_inputs),
+            "optional_inputs": tuple(optional_inputs),
+            "cost": cost,
+            "validate": validate,
+            "likelihood": likelihood,
+            "recommend": recommend,
+            "uses_constants": uses_constants
+        }
+        return detect
+    return decorator
+
+
+def get_detector_for_fault(fault_type):
+    """
+    Find the detector specification that produced a fault type
+
+    Detectors may emit qualified names (e.g. "ANGULAR_MISALIGNMENT" from
+    "MISALIGNMENT"), so an exact match is tried before a substring match.
+    """
+    spec = DETECTOR_REGISTRY.get(fault_type)
+    if spec:
+        return spec
+    for name, spec in DETECTOR_REGISTRY.items():
+        if name in fault_type:
+            return spec
+    return None
+
+
+def get_fault_hook(fault_type, hook):
+    """Return a registered Level 4/5/6 hook for a fault type, or None"""
+    spec = get_detector_for_fault(fault_type)
+    return spec[hook] if spec else None
+
+
+def is_measured(data, key):
+    """True if an input was actually measured (present, not None, not NaN)"""
+    value = data.get(key)
+    if value is None:
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return True
+
+
+def run_detectors(data, early_exit=False, exit_severity="CRITICAL", constants=None):
+    """
+    Run every registered detector whose inputs are present, cheapest first
+
+    Parameters:
+    -----------
+    data : dict
+        Measurement data
+    early_exit : bool
+        Stop scheduling further detectors once a fault with exit_severity
+        has been confirmed
+    exit_severity : str
+        Fault severity that triggers the early exit
+    constants : dict
+        Derived asset constants valid for this reading (running-speed
+        orders), handed to detectors registered with uses_constants
+
+    Returns:
+    --------
+    dict : Detected faults plus the detectors that ran or were skipped
+    """
+    faults = []
+    executed = []
+    skipped = []
+
+    schedule = sorted(DETECTOR_REGISTRY.values(), key=lambda spec: spec["cost"])
+    for index, spec in enumerate(schedule):
+        missing = [key for key in spec["required_inputs"] if not is_measured(data, key)]
+        if missing:
+            skipped.append({"detector": spec["name"], "reason": "missing inputs", "missing": missing})
+            continue
+
+        executed.append(spec["name"])
+        fault = spec["detect"](data, constants) if spec["uses_constants"] else spec["detect"](data)
+        if fault:
+            faults.append(fault)
+            if early_exit and fault.get("severity") == exit_severity:
+                for remaining in schedule[index + 1:]:
+                    skipped.append({"detector": remaining["name"], "reason": "early exit", "missing": []})
+                break
+
+    return {
+        "faults": faults,
+        "executed": executed,
+        "skipped": skipped
+    }
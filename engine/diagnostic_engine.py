@@ -3,32 +3,68 @@ Main Diagnostic Engine - Orchestrates all 6 levels
 """
 
 from .safety_gates import safety_gates_check
-from .iso_10816_3_classifier import classify_iso_10816_3_zone, calculate_direction_averages
-from .fft_analyzer import detect_fft_signatures, analyze_bearing_condition
+from .iso_10816_3_classifier import RIGID_FOUNDATION, classify_iso_10816_3_zone, calculate_direction_averages
+from .fft_analyzer import AMBIENT_TEMP_C, analyze_bearing_condition
+from .detector_registry import run_detectors
 from .cross_validator import cross_validate_faults
 from .bayesian_fusion import bayesian_fusion
 from .risk_assessor import assess_risk_and_generate_plan
+from .measurement import Measurement
+from .screening import npsh_available
 
 
 class PumpDiagnosticEngine:
     """Main engine for pump diagnostic analysis"""
     
-    def __init__(self):
+    def __init__(self, reliability=None, early_exit=False, registry=None):
         self.results = {}
+        # Stop Level 3 detection once a safety-level fault is confirmed
+        self.early_exit = early_exit
+        # Optional fitted Weibull model (engine.reliability) for MTBF
+        self.reliability = reliability
+        # Optional engine.asset_registry.AssetRegistry for nameplate inputs
+        # and cached per-asset constants
+        self.registry = registry
     
-    def run_diagnosis(self, input_data):
+    def run_diagnosis(self, input_data, asset_id=None):
         """
         Run complete 6-level diagnostic analysis
         
         Parameters:
         -----------
-        input_data : dict
-            Dictionary containing all input measurements
+        input_data : dict or Measurement
+            Input measurements (dict or typed engine.measurement record)
+        asset_id : str
+            Registered asset; its nameplate values (motor_kw, motor_rpm, flc,
+            npshr, bep_flow, foundation_type, ...) fill inputs that were not
+            given, and its cached constants (ISO 10816-3 limits, 1X/2X/3X
+            orders) feed Levels 2-3 when the reading matches the nameplate
         
         Returns:
         --------
-        dict : Complete diagnosis report
+        dict : Complete diagnosis report (with "asset_constants" when an
+               asset_id was resolved through the registry)
         """
+        self.results = {}
+        constants = None
+        
+        # Fill nameplate inputs from the asset registry
+        if self.registry is not None and asset_id is not None:
+            nameplate = self.registry.engine_inputs(asset_id)
+            constants = self.registry.constants(asset_id)
+            self.results["asset_constants"] = constants
+            if isinstance(input_data, Measurement):
+                input_data = input_data.replace(**{field: value for field, value in nameplate.items() if field not in input_data})
+            else:
+                input_data = {**nameplate, **input_data}
+        
+        report = self._run_levels(input_data, _constants_for_reading(constants, input_data))
+        if constants is not None:
+            report["asset_constants"] = constants
+        return report
+    
+    def _run_levels(self, input_data, constants):
+        """Levels 1-6 on filled-in input; constants = asset constants valid for it, or None"""
         # Store input data
         self.input_data = input_data
         
@@ -50,18 +86,26 @@ class PumpDiagnosticEngine:
             velocity_rms=averages["max_velocity"],
             rpm=input_data.get("motor_rpm", 1500),
             power_kw=input_data.get("motor_kw", 315),
-            foundation_type=input_data.get("foundation_type", "Rigid (Concrete)")
+            foundation_type=input_data.get("foundation_type", RIGID_FOUNDATION),
+            limits=constants["iso_10816_3"] if constants is not None else None
         )
         self.results["level_2_severity"] = zone_result
         
         # Add averages to input data for next levels
-        input_data["vibration_max_avr"] = averages["max_velocity"]
+        if isinstance(input_data, Measurement):
+            input_data = input_data.replace(vibration_max_avr=averages["max_velocity"])
+            self.input_data = input_data
+        else:
+            input_data["vibration_max_avr"] = averages["max_velocity"]
         
         # === LEVEL 3: PRIMARY FAULT DETECTION ===
-        fft_faults = detect_fft_signatures(input_data)
+        detection = run_detectors(input_data, early_exit=self.early_exit, constants=constants)
+        fft_faults = sorted(detection["faults"], key=lambda x: x["confidence"], reverse=True)
         self.results["level_3_fft"] = {
             "faults": fft_faults,
-            "fault_count": len(fft_faults)
+            "fault_count": len(fft_faults),
+            "detectors_run": detection["executed"],
+            "detectors_skipped": detection["skipped"]
         }
         
         # If no faults detected, return basic report
@@ -85,14 +129,13 @@ class PumpDiagnosticEngine:
         self.results["level_5_bayesian"] = bayesian_result
         
         # === LEVEL 6: RISK ASSESSMENT & ACTION PLAN ===
-        risk_result = assess_risk_and_generate_plan(bayesian_result, input_data)
+        risk_result = assess_risk_and_generate_plan(bayesian_result, input_data, self.reliability)
         self.results["level_6_risk"] = risk_result
         
         # === BEARING CONDITION ANALYSIS (Additional) ===
         hf_pump_de = input_data.get("hf_pump_de", 0)
         temp_pump_de = input_data.get("temp_pump_de", 0)
-        ambient = 35
-        temp_rise = temp_pump_de - ambient
+        temp_rise = temp_pump_de - AMBIENT_TEMP_C
         demod_value = input_data.get("demod_pump_de", 0)
         
         bearing_condition = analyze_bearing_condition(hf_pump_de, temp_rise, demod_value)
@@ -198,7 +241,7 @@ class PumpDiagnosticEngine:
         # API 610 compliance (NPSHa margin)
         p_suc = input_data.get("p_suc", 0)
         npshr = input_data.get("npshr", 3.0)
-        npsha = p_suc + 10.33 - 0.5
+        npsha = npsh_available(p_suc)
         npsha_margin = npsha - npshr
         api_610_status = "COMPLIANT" if npsha_margin >= 0.6 else "WARNING"
         
@@ -218,3 +261,22 @@ class PumpDiagnosticEngine:
                 iso_15243_status == "COMPLIANT"
             ]) else "NON-COMPLIANT"
         }
+
+
+def _constants_for_reading(constants, input_data):
+    """
+    Asset constants if they hold for this reading, else None
+
+    The cached ISO 10816-3 limits and running-speed orders are derived from
+    the nameplate speed, power and foundation; a reading taken at another
+    speed (e.g. on a VFD) or with overridden nameplate values is classified
+    from its own inputs instead.
+    """
+    if constants is None or constants["engine_basis"] is None:
+        return None
+    basis = (
+        input_data.get("motor_rpm", 1500),
+        input_data.get("motor_kw", 315),
+        input_data.get("foundation_type", RIGID_FOUNDATION)
+    )
+    return constants if basis == constants["engine_basis"] else None
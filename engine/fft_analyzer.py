@@ -3,60 +3,77 @@ Level 3: FFT Signature Detection
 ISO 13373-2 Clause 5.4 - Frequency domain analysis
 """
 
-def detect_fft_signatures(data):
-    """
-    Detect fault signatures from FFT peaks (frequency + amplitude)
-    
-    Parameters:
-    -----------
-    data : dict
-        Dictionary containing FFT peak data and machine parameters
-    
-    Returns:
-    --------
-    list : List of detected faults with confidence scores
-    """
-    faults = []
-    
-    # Extract FFT data
-    peak1_freq = data.get("peak1_freq", 0)
-    peak1_amp = data.get("peak1_amp", 0)
-    peak2_freq = data.get("peak2_freq", 0)
-    peak2_amp = data.get("peak2_amp", 0)
-    peak3_freq = data.get("peak3_freq", 0)
-    peak3_amp = data.get("peak3_amp", 0)
-    rpm = data.get("motor_rpm", 1500)
-    
-    # Calculate expected frequencies
-    fundamental = rpm / 60          # 1X frequency (Hz)
-    second_harmonic = 2 * fundamental  # 2X frequency (Hz)
-    third_harmonic = 3 * fundamental   # 3X frequency (Hz)
-    line_freq_2x = 100.0             # 2×Line Frequency (50 Hz system)
-    
-    # Calculate ratios
-    total_rms = peak1_amp + peak2_amp + peak3_amp
-    peak1_ratio = peak1_amp / total_rms if total_rms > 0 else 0
-    peak2_ratio = peak2_amp / peak1_amp if peak1_amp > 0 else 0
-    peak3_ratio = peak3_amp / peak1_amp if peak1_amp > 0 else 0
-    
-    # === DETECTION 1: ELECTRICAL UNBALANCE ===
-    # Check if peak3 is near 2×Line Frequency (100 Hz)
-    is_2lf_dominant = (abs(peak3_freq - line_freq_2x) < 5.0 and 
-                      peak3_amp > 0.5 * peak1_amp)
-    
-    # Check voltage imbalance
+from .detector_registry import register_detector, run_detectors
+from .screening import npsh_available
+
+
+# Rule tables shared with Levels 4-6 and engine.batch_engine
+AMBIENT_TEMP_C = 35         # Assumed ambient temperature for BBM terminals
+LINE_FREQ_2X_HZ = 100.0     # 2×Line Frequency, 50 Hz system
+BEARING_STAGE_3_G = 1.5     # HF g RMS - ISO 15243 Stage 3, failure imminent (safety level)
+
+DETECTOR_CONFIDENCE = {
+    "ELECTRICAL_UNBALANCE": 0.92,
+    "MECHANICAL_UNBALANCE": 0.88,
+    "BEARING_DEFECT": 0.87,
+    "MISALIGNMENT": 0.85,
+    "CAVITATION": 0.80
+}
+
+RULE_THRESHOLDS = {
+    "hf_g": 0.7,                    # HF 5-16 kHz g RMS - bearing defect (ISO 15243)
+    "voltage_imbalance_pct": 2.0,   # IEC 60034-1 §6.3
+    "ratio_1x": 0.80,               # 1X / sum of the three peaks - mechanical unbalance
+    "ratio_2x": 0.50,               # 2X / 1X - misalignment
+    "ratio_2lf": 0.50,              # 2xLF / 1X - electrical unbalance
+    "temp_gradient_c": 15.0,        # pump DE-NDE bearing temperature difference
+    "temp_rise_c": 40.0,            # pump DE bearing above ambient
+    "npsh_margin_m": 0.6,           # NPSHa - NPSHr (API 610)
+    "bep_deviation_pct": 20.0
+}
+
+
+def _order(data, constants, order):
+    """Running-speed order (Hz): cached asset constant, else order x RPM/60"""
+    if constants is not None:
+        return constants["orders"][f"{order}X"]
+    return order * data.get("motor_rpm", 1500) / 60
+
+
+def _voltage_imbalance(data):
+    """Voltage imbalance in % (IEC 60034-1 §6.3 definition)"""
     v_r = data.get("voltage_r", 400)
     v_s = data.get("voltage_s", 400)
     v_t = data.get("voltage_t", 400)
     v_avg = (v_r + v_s + v_t) / 3
-    v_imbalance = max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
+    return max(abs(v_r-v_avg), abs(v_s-v_avg), abs(v_t-v_avg)) / v_avg * 100
+
+
+def _is_2lf_dominant(data):
+    """Peak3 near 2×Line Frequency (100 Hz, 50 Hz system) and strong vs 1X"""
+    return (abs(data.get("peak3_freq", 0) - LINE_FREQ_2X_HZ) < 5.0 and
+            data.get("peak3_amp", 0) > RULE_THRESHOLDS["ratio_2lf"] * data.get("peak1_amp", 0))
+
+
+# === DETECTION 1: ELECTRICAL UNBALANCE ===
+@register_detector(
+    "ELECTRICAL_UNBALANCE",
+    required_inputs=("peak1_amp", "peak3_freq", "peak3_amp", "voltage_r", "voltage_s", "voltage_t"),
+    cost=1.0
+)
+def detect_electrical_unbalance(data):
+    peak1_amp = data.get("peak1_amp", 0)
+    peak3_freq = data.get("peak3_freq", 0)
+    peak3_amp = data.get("peak3_amp", 0)
+    peak3_ratio = peak3_amp / peak1_amp if peak1_amp > 0 else 0
     
-    is_v_imbalance = v_imbalance > 2.0
+    # Check if peak3 is near 2×Line Frequency (100 Hz) and voltage imbalance
+    v_imbalance = _voltage_imbalance(data)
     
-    if is_2lf_dominant and is_v_imbalance:
-        faults.append({
+    if _is_2lf_dominant(data) and v_imbalance > RULE_THRESHOLDS["voltage_imbalance_pct"]:
+        return {
             "type": "ELECTRICAL_UNBALANCE",
-            "confidence": 0.92,
+            "confidence": DETECTOR_CONFIDENCE["ELECTRICAL_UNBALANCE"],
             "primary_evidence": f"2×Line Freq dominant at {peak3_freq:.1f} Hz ({peak3_amp:.1f} mm/s)",
             "secondary_evidence": [
                 f"2LF/1X ratio = {peak3_ratio:.2f} > 0.5 threshold",
@@ -65,19 +82,36 @@ def detect_fft_signatures(data):
             ],
             "standard": "ISO 13373-2 Clause 5.4.3 + NEMA MG-1 §14.32",
             "severity": "WARNING"
-        })
+        }
+    return None
+
+
+# === DETECTION 2: MECHANICAL UNBALANCE ===
+@register_detector(
+    "MECHANICAL_UNBALANCE",
+    required_inputs=("peak1_freq", "peak1_amp", "peak2_amp", "peak3_amp"),
+    optional_inputs=("motor_rpm", "peak3_freq", "voltage_r", "voltage_s", "voltage_t"),
+    cost=1.0,
+    uses_constants=True
+)
+def detect_mechanical_unbalance(data, constants=None):
+    peak1_freq = data.get("peak1_freq", 0)
+    peak1_amp = data.get("peak1_amp", 0)
+    fundamental = _order(data, constants, 1)  # 1X frequency (Hz)
+    total_rms = peak1_amp + data.get("peak2_amp", 0) + data.get("peak3_amp", 0)
+    peak1_ratio = peak1_amp / total_rms if total_rms > 0 else 0
     
-    # === DETECTION 2: MECHANICAL UNBALANCE ===
     is_1x_dominant = (abs(peak1_freq - fundamental) < 0.1 * fundamental and
-                     peak1_ratio > 0.80)
+                     peak1_ratio > RULE_THRESHOLDS["ratio_1x"])
     
     # Assume phase stability if not electrical unbalance
-    is_phase_stable = not is_2lf_dominant
+    is_phase_stable = not _is_2lf_dominant(data)
+    is_v_imbalance = _voltage_imbalance(data) > RULE_THRESHOLDS["voltage_imbalance_pct"]
     
     if is_1x_dominant and is_phase_stable and not is_v_imbalance:
-        faults.append({
+        return {
             "type": "MECHANICAL_UNBALANCE",
-            "confidence": 0.88,
+            "confidence": DETECTOR_CONFIDENCE["MECHANICAL_UNBALANCE"],
             "primary_evidence": f"1X dominant at {peak1_freq:.1f} Hz ({peak1_amp:.1f} mm/s, {peak1_ratio*100:.0f}% RMS)",
             "secondary_evidence": [
                 f"1X/Total RMS ratio = {peak1_ratio:.2f} > 0.80 threshold",
@@ -86,11 +120,27 @@ def detect_fft_signatures(data):
             ],
             "standard": "ISO 1940-1:2003 G2.5",
             "severity": "WARNING"
-        })
+        }
+    return None
+
+
+# === DETECTION 3: MISALIGNMENT ===
+@register_detector(
+    "MISALIGNMENT",
+    required_inputs=("peak1_amp", "peak2_freq", "peak2_amp"),
+    optional_inputs=("motor_rpm", "pump_a_de", "pump_a_nde", "pump_v_de", "pump_v_nde"),
+    cost=1.5,
+    uses_constants=True
+)
+def detect_misalignment(data, constants=None):
+    peak1_amp = data.get("peak1_amp", 0)
+    peak2_freq = data.get("peak2_freq", 0)
+    peak2_amp = data.get("peak2_amp", 0)
+    second_harmonic = _order(data, constants, 2)  # 2X frequency (Hz)
+    peak2_ratio = peak2_amp / peak1_amp if peak1_amp > 0 else 0
     
-    # === DETECTION 3: MISALIGNMENT ===
     is_2x_dominant = (abs(peak2_freq - second_harmonic) < 0.1 * second_harmonic and
-                     peak2_ratio > 0.50)
+                     peak2_ratio > RULE_THRESHOLDS["ratio_2x"])
     
     # Check axial vs radial vibration
     pump_a_avr = (data.get("pump_a_de", 0) + data.get("pump_a_nde", 0)) / 2
@@ -99,9 +149,9 @@ def detect_fft_signatures(data):
     
     if is_2x_dominant:
         alignment_type = "ANGULAR" if is_axial_dominant else "PARALLEL"
-        faults.append({
+        return {
             "type": f"{alignment_type}_MISALIGNMENT",
-            "confidence": 0.85,
+            "confidence": DETECTOR_CONFIDENCE["MISALIGNMENT"],
             "primary_evidence": f"2X dominant at {peak2_freq:.1f} Hz ({peak2_amp:.1f} mm/s)",
             "secondary_evidence": [
                 f"2X/1X ratio = {peak2_ratio:.2f} > 0.5 threshold",
@@ -110,58 +160,82 @@ def detect_fft_signatures(data):
             ],
             "standard": "API 671 Clause 5.3",
             "severity": "WARNING"
-        })
-    
-    # === DETECTION 4: BEARING DEFECT ===
+        }
+    return None
+
+
+# === DETECTION 4: BEARING DEFECT ===
+@register_detector(
+    "BEARING_DEFECT",
+    required_inputs=("hf_pump_de",),
+    optional_inputs=("peak3_freq", "motor_rpm", "temp_pump_de", "temp_pump_nde"),
+    cost=0.5,
+    uses_constants=True
+)
+def detect_bearing_defect(data, constants=None):
     hf_pump_de = data.get("hf_pump_de", 0)
-    is_hf_high = hf_pump_de > 0.7  # g RMS
+    is_hf_high = hf_pump_de > RULE_THRESHOLDS["hf_g"]  # g RMS
+    if not is_hf_high:
+        return None
     
     # Temperature gradient analysis
     temp_pump_de = data.get("temp_pump_de", 0)
     temp_pump_nde = data.get("temp_pump_nde", 0)
     temp_gradient = abs(temp_pump_de - temp_pump_nde)
-    is_temp_gradient_high = temp_gradient > 15  # °C
+    is_temp_gradient_high = temp_gradient > RULE_THRESHOLDS["temp_gradient_c"]  # °C
     
     # Check if peak3 is bearing defect frequency (not harmonic)
+    peak3_freq = data.get("peak3_freq", 0)
+    fundamental = _order(data, constants, 1)
+    second_harmonic = 2 * fundamental
+    third_harmonic = 3 * fundamental
     is_bpfo_candidate = (peak3_freq > 50 and 
                         abs(peak3_freq - fundamental) > 0.2 * fundamental and
                         abs(peak3_freq - second_harmonic) > 0.2 * second_harmonic and
                         abs(peak3_freq - third_harmonic) > 0.2 * third_harmonic)
     
-    if is_hf_high and (is_bpfo_candidate or is_temp_gradient_high):
-        faults.append({
+    if is_bpfo_candidate or is_temp_gradient_high:
+        # Stage 3 is a safety-level fault: CRITICAL lets run_detectors exit early
+        is_stage_3 = hf_pump_de >= BEARING_STAGE_3_G
+        return {
             "type": "BEARING_DEFECT",
-            "confidence": 0.87,
+            "confidence": DETECTOR_CONFIDENCE["BEARING_DEFECT"],
             "primary_evidence": f"HF 5-16 kHz = {hf_pump_de:.2f}g > 0.7g threshold",
             "secondary_evidence": [
                 f"Peak3 at {peak3_freq:.1f} Hz (BPFO candidate - non-harmonic)",
                 f"Temperature gradient DE-NDE = {temp_gradient:.0f}°C >15°C",
                 "High frequency bands indicate bearing defect (ISO 15243)"
             ],
-            "standard": "ISO 15243:2017 Table 2 (Stage 2 defect)",
-            "severity": "WARNING"
-        })
-    
-    # === DETECTION 5: CAVITATION ===
+            "standard": f"ISO 15243:2017 Table 2 (Stage {3 if is_stage_3 else 2} defect)",
+            "severity": "CRITICAL" if is_stage_3 else "WARNING"
+        }
+    return None
+
+
+# === DETECTION 5: CAVITATION ===
+@register_detector(
+    "CAVITATION",
+    required_inputs=("p_suc", "actual_flow"),
+    optional_inputs=("bep_flow", "npshr"),
+    cost=0.5
+)
+def detect_cavitation(data):
     p_suc = data.get("p_suc", 0)
-    p_dis = data.get("p_dis", 0)
     actual_flow = data.get("actual_flow", 0)
     bep_flow = data.get("bep_flow", 100)
     npshr = data.get("npshr", 3.0)
     
-    # Calculate NPSHa (simplified for BBM)
-    npsha = p_suc + 10.33 - 0.5  # Approximation for BBM
+    # Calculate NPSHa (simplified for BBM, p_suc gauge, bar)
+    npsha = npsh_available(p_suc)
     npsha_margin = npsha - npshr
     
     # Calculate BEP deviation
     bep_deviation = abs(actual_flow - bep_flow) / bep_flow * 100 if bep_flow > 0 else 0
     
-    is_cavitation_risk = npsha_margin < 0.6 and bep_deviation > 20
-    
-    if is_cavitation_risk:
-        faults.append({
+    if npsha_margin < RULE_THRESHOLDS["npsh_margin_m"] and bep_deviation > RULE_THRESHOLDS["bep_deviation_pct"]:
+        return {
             "type": "CAVITATION",
-            "confidence": 0.80,
+            "confidence": DETECTOR_CONFIDENCE["CAVITATION"],
             "primary_evidence": f"NPSHa margin = {npsha_margin:.2f}m < 0.6m safety margin",
             "secondary_evidence": [
                 f"BEP deviation = {bep_deviation:.0f}% > 20% limit",
@@ -170,7 +244,29 @@ def detect_fft_signatures(data):
             ],
             "standard": "API 610 Clause 7.3.2",
             "severity": "WARNING"
-        })
+        }
+    return None
+
+
+def detect_fft_signatures(data, early_exit=False):
+    """
+    Detect fault signatures from FFT peaks (frequency + amplitude)
+    
+    Only detectors whose required inputs were measured are run (see
+    engine.detector_registry), cheapest first.
+    
+    Parameters:
+    -----------
+    data : dict
+        Dictionary containing FFT peak data and machine parameters
+    early_exit : bool
+        Stop once a safety-level (CRITICAL) fault is confirmed
+    
+    Returns:
+    --------
+    list : List of detected faults with confidence scores
+    """
+    faults = run_detectors(data, early_exit=early_exit)["faults"]
     
     # Sort by confidence (highest first)
     faults.sort(key=lambda x: x["confidence"], reverse=True)
@@ -204,7 +300,7 @@ def analyze_bearing_condition(hf_value, temp_rise, demod_value=0):
         stage = 1
         condition = "EARLY STAGE"
         recommendation = "Monitor closely - defect incipient"
-    elif hf_value < 1.5:
+    elif hf_value < BEARING_STAGE_3_G:
         stage = 2
         condition = "MODERATE DEFECT"
         recommendation = "Plan replacement within 30 days"
@@ -0,0 +1,479 @@
+"""
+Measurement & Diagnosis History Store - embedded SQLite
+ISO 13374-2:2007 data acquisition/manipulation layers; ISO 45001 Clause 7.5.3
+One file per terminal, no server. Trend queries return NumPy arrays.
+"""
+
+import json
+import sqlite3
+
+import numpy as np
+
+from .iso_10816_3_classifier import calculate_direction_averages
+from .trend_rollups import TrendRollups
+
+
+# Trended per-measurement features (REAL columns, NULL when not measured)
+TREND_PARAMETERS = (
+    "velocity_rms",        # mm/s - max DE/NDE direction average (vibration_max_avr)
+    "hf_g",                # g RMS - max HF acceleration
+    "demod_ge",            # gE - max demodulation
+    "bearing_temp",        # °C - max bearing temperature
+    "current_imbalance",   # % - max deviation from average phase current
+    "p_suc",               # bar
+    "p_dis",               # bar
+    "motor_rpm"
+)
+
+VELOCITY_KEYS = (
+    "motor_h_de", "motor_v_de", "motor_a_de", "motor_h_nde", "motor_v_nde", "motor_a_nde",
+    "pump_h_de", "pump_v_de", "pump_a_de", "pump_h_nde", "pump_v_nde", "pump_a_nde"
+)
+HF_KEYS = ("hf_pump_de", "hf_pump_nde", "hf_motor_de", "hf_motor_nde")
+DEMOD_KEYS = ("demod_pump_de", "demod_pump_nde", "demod_motor_de", "demod_motor_nde")
+TEMP_KEYS = ("temp_pump_de", "temp_pump_nde", "temp_motor_de", "temp_motor_nde")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS measurements (
+    id INTEGER PRIMARY KEY,
+    asset_id TEXT NOT NULL,
+    location TEXT NOT NULL DEFAULT '',
+    timestamp REAL NOT NULL,
+    {", ".join(f"{name} REAL" for name in TREND_PARAMETERS)},
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_measurements_asset_time ON measurements (asset_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_measurements_location_time ON measurements (location, timestamp);
+
+CREATE TABLE IF NOT EXISTS diagnoses (
+    id INTEGER PRIMARY KEY,
+    asset_id TEXT NOT NULL,
+    location TEXT NOT NULL DEFAULT '',
+    timestamp REAL NOT NULL,
+    report_type TEXT,
+    zone TEXT,
+    velocity_rms REAL,
+    primary_fault TEXT,
+    posterior REAL,
+    risk_level TEXT,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_diagnoses_asset_time ON diagnoses (asset_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_diagnoses_location_time ON diagnoses (location, timestamp);
+
+CREATE TABLE IF NOT EXISTS assets (
+    asset_id TEXT PRIMARY KEY,
+    location TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+"""
+
+SECONDS_PER_DAY = 86400.0
+
+
+def _max_direction_average(data):
+    """Engine vibration_max_avr (calculate_direction_averages) from the measured points"""
+    points = {key: data[key] for key in VELOCITY_KEYS if data.get(key) is not None}
+    return calculate_direction_averages(points)["max_velocity"] if points else None
+
+
+def _max_present(data, keys):
+    values = [data[key] for key in keys if data.get(key) is not None]
+    return max(values) if values else None
+
+
+def extract_trend_features(data):
+    """
+    Trended features from one engine input dict
+
+    Explicit keys (e.g. data["velocity_rms"]) take precedence over values
+    derived from the per-point inputs.
+
+    Returns:
+    --------
+    dict : TREND_PARAMETERS -> float or None (not measured)
+    """
+    currents = [data.get(key) for key in ("current_r", "current_s", "current_t")]
+    if all(current is not None for current in currents) and sum(currents) > 0:
+        current_avg = sum(currents) / 3
+        current_imbalance = max(abs(current - current_avg) for current in currents) / current_avg * 100
+    else:
+        current_imbalance = None
+
+    derived = {
+        "velocity_rms": (data["vibration_max_avr"] if data.get("vibration_max_avr") is not None
+                         else _max_direction_average(data)),
+        "hf_g": _max_present(data, HF_KEYS),
+        "demod_ge": _max_present(data, DEMOD_KEYS),
+        "bearing_temp": _max_present(data, TEMP_KEYS),
+        "current_imbalance": current_imbalance,
+        "p_suc": data.get("p_suc"),
+        "p_dis": data.get("p_dis"),
+        "motor_rpm": data.get("motor_rpm")
+    }
+    return {
+        name: (float(data[name]) if data.get(name) is not None
+               else None if derived[name] is None else float(derived[name]))
+        for name in TREND_PARAMETERS
+    }
+
+
+def diagnosis_record_fields(diagnosis_result):
+    """
+    Indexed summary fields of one diagnosis result
+
+    Returns:
+    --------
+    dict : report_type, zone, velocity_rms, primary_fault, posterior, risk_level
+    """
+    zone = diagnosis_result.get("level_2_severity", {})
+    bayesian = diagnosis_result.get("level_5_bayesian", {})
+    risk = diagnosis_result.get("level_6_risk", {})
+    if diagnosis_result.get("report_type") == "EMERGENCY_SHUTDOWN":
+        risk_level = "CRITICAL"
+    else:
+        risk_level = risk.get("risk_level")
+    return {
+        "report_type": diagnosis_result.get("report_type"),
+        "zone": zone.get("zone"),
+        "velocity_rms": zone.get("velocity_rms"),
+        "primary_fault": bayesian.get("primary_fault"),
+        "posterior": bayesian.get("primary_confidence"),
+        "risk_level": risk_level
+    }
+
+
+class HistoryStore:
+    """SQLite-backed measurement, feature and diagnosis history"""
+
+    def __init__(self, path=":memory:", rollups=True, utc_offset_hours=0.0):
+        """
+        Parameters:
+        -----------
+        path : str
+            SQLite database file (created if missing); ":memory:" for a
+            throwaway store
+        rollups : bool
+            Maintain daily/weekly/monthly TrendRollups on every write
+        utc_offset_hours : float
+            Terminal local time for rollup bucket boundaries (WIB = 7.0)
+        """
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+        self.rollups = TrendRollups(self.conn, TREND_PARAMETERS, utc_offset_hours) if rollups else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Commit and close the database"""
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def add_measurements(self, records):
+        """
+        Bulk-insert measurements in one transaction
+
+        Parameters:
+        -----------
+        records : iterable
+            (asset_id, location, timestamp, data) tuples; timestamp in POSIX
+            seconds, data the engine input dict (stored as JSON alongside
+            the extracted trend features)
+
+        Returns:
+        --------
+        int : Number of rows inserted
+        """
+        rows = []
+        for asset_id, location, timestamp, data in records:
+            features = extract_trend_features(data)
+            rows.append(
+                (asset_id, location or "", float(timestamp))
+                + tuple(features[name] for name in TREND_PARAMETERS)
+                + (json.dumps(dict(data), separators=(",", ":"), default=str),)
+            )
+        columns = ("asset_id", "location", "timestamp") + TREND_PARAMETERS + ("data",)
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO measurements ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                rows
+            )
+            if self.rollups is not None:
+                self.rollups.update_measurements([row[0] for row in rows], [row[1] for row in rows],
+                                                 [row[2] for row in rows])
+        return len(rows)
+
+    def add_measurement(self, asset_id, location, timestamp, data):
+        """Insert a single measurement (see add_measurements)"""
+        return self.add_measurements([(asset_id, location, timestamp, data)])
+
+    def add_diagnoses(self, records):
+        """
+        Bulk-insert diagnoses in one transaction
+
+        Parameters:
+        -----------
+        records : iterable
+            (diagnosis_result, asset_info, timestamp) tuples
+
+        Returns:
+        --------
+        int : Number of rows inserted
+        """
+        rows = []
+        for diagnosis_result, asset_info, timestamp in records:
+            fields = diagnosis_record_fields(diagnosis_result)
+            rows.append((
+                asset_info.get("asset_id", "UNKNOWN"),
+                asset_info.get("location", "") or "",
+                float(timestamp),
+                fields["report_type"],
+                fields["zone"],
+                fields["velocity_rms"],
+                fields["primary_fault"],
+                fields["posterior"],
+                fields["risk_level"],
+                json.dumps(diagnosis_result, separators=(",", ":"), default=str)
+            ))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO diagnoses (asset_id, location, timestamp, report_type, zone, velocity_rms, "
+                "primary_fault, posterior, risk_level, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if self.rollups is not None:
+                self.rollups.update_diagnoses([row[0] for row in rows], [row[1] for row in rows],
+                                              [row[2] for row in rows])
+        return len(rows)
+
+    def add_diagnosis(self, diagnosis_result, asset_info, timestamp):
+        """Insert a single diagnosis (see add_diagnoses)"""
+        return self.add_diagnoses([(diagnosis_result, asset_info, timestamp)])
+
+    # ------------------------------------------------------------------
+    # Asset registry persistence
+    # ------------------------------------------------------------------
+    def put_assets(self, assets):
+        """
+        Insert or replace asset registry entries (engine.asset_registry)
+
+        Parameters:
+        -----------
+        assets : iterable
+            Asset dicts, each with an "asset_id"
+        """
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO assets (asset_id, location, data) VALUES (?, ?, ?)",
+                [(asset["asset_id"], asset.get("location") or "", json.dumps(asset, separators=(",", ":")))
+                 for asset in assets]
+            )
+
+    def delete_asset(self, asset_id):
+        """Remove one asset registry entry (its history is kept)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM assets WHERE asset_id = ?", (asset_id,))
+
+    def load_assets(self):
+        """All asset registry entries, ordered by asset_id"""
+        return [json.loads(row[0]) for row in self.conn.execute("SELECT data FROM assets ORDER BY asset_id")]
+
+    # ------------------------------------------------------------------
+    # Trend queries
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _time_filter(start, end):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(float(start))
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(float(end))
+        return "".join(f" AND {clause}" for clause in clauses), params
+
+    def trend(self, asset_id, parameters=TREND_PARAMETERS, start=None, end=None):
+        """
+        Time series of one asset, oldest first
+
+        Parameters:
+        -----------
+        asset_id : str
+            Asset ID
+        parameters : tuple
+            Subset of TREND_PARAMETERS
+        start, end : float
+            Inclusive POSIX timestamp range
+
+        Returns:
+        --------
+        dict : "timestamp" and each parameter -> float64 ndarray (NaN where
+               not measured)
+        """
+        parameters = self._check_parameters(parameters)
+        time_sql, params = self._time_filter(start, end)
+        rows = self.conn.execute(
+            f"SELECT timestamp, {', '.join(parameters)} FROM measurements "
+            f"WHERE asset_id = ?{time_sql} ORDER BY timestamp",
+            [asset_id] + params
+        ).fetchall()
+        table = np.array(rows, dtype=float).reshape(len(rows), len(parameters) + 1)
+        result = {"timestamp": table[:, 0]}
+        for position, name in enumerate(parameters, 1):
+            result[name] = table[:, position]
+        return result
+
+    def location_trend(self, location, parameter, start=None, end=None):
+        """
+        One parameter for every asset at a location, ordered by time
+
+        Returns:
+        --------
+        tuple : (asset_ids object ndarray, timestamps, values)
+        """
+        self._check_parameters((parameter,))
+        time_sql, params = self._time_filter(start, end)
+        rows = self.conn.execute(
+            f"SELECT asset_id, timestamp, {parameter} FROM measurements "
+            f"WHERE location = ?{time_sql} ORDER BY timestamp",
+            [location] + params
+        ).fetchall()
+        if not rows:
+            return np.zeros(0, dtype=object), np.zeros(0), np.zeros(0)
+        asset_ids, timestamps, values = zip(*rows)
+        return (np.array(asset_ids, dtype=object),
+                np.array(timestamps, dtype=float),
+                np.array(values, dtype=float))
+
+    def prognostics_history(self, parameters=("velocity_rms", "hf_g", "demod_ge", "bearing_temp"),
+                            location=None, start=None, end=None, reference_time=None):
+        """
+        Fleet history in the engine.prognostics.estimate_fleet_rul format
+
+        Parameters:
+        -----------
+        parameters : tuple
+            Trended parameters to return
+        location : str
+            Restrict to one location (terminal)
+        start, end : float
+            Inclusive POSIX timestamp range
+        reference_time : float
+            t_days origin; defaults to the latest timestamp so t_days <= 0
+
+        Returns:
+        --------
+        tuple : (asset_ids list, {parameter: (asset_index, t_days, values)})
+                with unmeasured readings dropped per parameter
+        """
+        parameters = self._check_parameters(parameters)
+        time_sql, params = self._time_filter(start, end)
+        where = "WHERE 1 = 1"
+        if location is not None:
+            where = "WHERE location = ?"
+            params = [location] + params
+        rows = self.conn.execute(
+            f"SELECT asset_id, timestamp, {', '.join(parameters)} FROM measurements "
+            f"{where}{time_sql} ORDER BY asset_id, timestamp",
+            params
+        ).fetchall()
+
+        if not rows:
+            return [], {name: (np.zeros(0, dtype=int), np.zeros(0), np.zeros(0)) for name in parameters}
+
+        asset_column = [row[0] for row in rows]
+        asset_ids, asset_index = np.unique(np.array(asset_column, dtype=object), return_inverse=True)
+        table = np.array([row[1:] for row in rows], dtype=float)
+        if reference_time is None:
+            reference_time = table[:, 0].max()
+        t_days = (table[:, 0] - reference_time) / SECONDS_PER_DAY
+
+        history = {}
+        for position, name in enumerate(parameters, 1):
+            values = table[:, position]
+            measured = ~np.isnan(values)
+            history[name] = (asset_index[measured], t_days[measured], values[measured])
+        return list(asset_ids), history
+
+    def diagnoses(self, asset_id=None, location=None, start=None, end=None, full=False):
+        """
+        Diagnosis history, oldest first
+
+        Parameters:
+        -----------
+        asset_id, location : str
+            Optional filters
+        start, end : float
+            Inclusive POSIX timestamp range
+        full : bool
+            Include the parsed diagnosis result under "diagnosis"
+
+        Returns:
+        --------
+        list : Dicts with asset_id, location, timestamp and the indexed fields
+        """
+        time_sql, time_params = self._time_filter(start, end)
+        where, params = "WHERE 1 = 1", []
+        if asset_id is not None:
+            where += " AND asset_id = ?"
+            params.append(asset_id)
+        if location is not None:
+            where += " AND location = ?"
+            params.append(location)
+        params += time_params
+        columns = ("asset_id", "location", "timestamp", "report_type", "zone", "velocity_rms",
+                   "primary_fault", "posterior", "risk_level")
+        select = columns + (("data",) if full else ())
+        rows = self.conn.execute(
+            f"SELECT {', '.join(select)} FROM diagnoses {where}{time_sql} ORDER BY timestamp",
+            params
+        ).fetchall()
+
+        results = []
+        for row in rows:
+            record = dict(zip(columns, row))
+            if full:
+                record["diagnosis"] = json.loads(row[-1])
+            results.append(record)
+        return results
+
+    def latest_diagnosis(self, asset_id):
+        """Most recent diagnosis result of an asset, or None"""
+        row = self.conn.execute(
+            "SELECT data FROM diagnoses WHERE asset_id = ? ORDER BY timestamp DESC LIMIT 1",
+            (asset_id,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def asset_ids(self, location=None):
+        """Distinct asset IDs with measurements (optionally at one location)"""
+        if location is None:
+            rows = self.conn.execute("SELECT DISTINCT asset_id FROM measurements ORDER BY asset_id")
+        else:
+            rows = self.conn.execute(
+                "SELECT DISTINCT asset_id FROM measurements WHERE location = ? ORDER BY asset_id",
+                (location,)
+            )
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _check_parameters(parameters):
+        parameters = tuple(parameters)
+        unknown = [name for name in parameters if name not in TREND_PARAMETERS]
+        if unknown:
+            raise ValueError(f"Unknown trend parameters: {', '.join(unknown)}")
+        return parameters
@@ -1 +0,0 @@
-"""Pump Diagnostic Engine - Pertamina Patra Niaga"""
@@ -0,0 +1,249 @@
+"""
+Input Schema Validation & Unit Normalization
+ISO 13374-2:2007 data manipulation layer (range and plausibility checks)
+A schema is compiled once into range/scale vectors and rule closures, then
+applied column-wise to whole batches. Bad rows are reported in per-row error
+masks instead of raising on the first bad record.
+"""
+
+import operator
+from functools import lru_cache
+
+import numpy as np
+
+from .measurement import FIELD_NAMES, FIELD_UNITS, to_batch
+
+
+# Source unit -> canonical unit: value * scale + offset
+UNIT_CONVERSIONS = {
+    ("in/s", "mm/s"): (25.4, 0.0),
+    ("ips", "mm/s"): (25.4, 0.0),
+    ("mils", "μm"): (25.4, 0.0),
+    ("°F", "°C"): (5.0 / 9.0, -160.0 / 9.0),
+    ("K", "°C"): (1.0, -273.15),
+    ("psi", "bar"): (0.0689476, 0.0),
+    ("kPa", "bar"): (0.01, 0.0),
+    ("MPa", "bar"): (10.0, 0.0),
+    ("kg/cm²", "bar"): (0.980665, 0.0),
+    ("m", "bar"): (1 / 10.197, 0.0),      # metres of water head
+    ("ft", "m"): (0.3048, 0.0),
+    ("gpm", "m³/h"): (0.2271247, 0.0),
+    ("l/s", "m³/h"): (3.6, 0.0),
+    ("kV", "V"): (1000.0, 0.0),
+    ("hp", "kW"): (0.7457, 0.0),
+    ("Hz", "rpm"): (60.0, 0.0),
+    ("cpm", "Hz"): (1 / 60.0, 0.0)
+}
+
+# Engine input field -> (min, max) in its canonical unit (measurement.FIELD_UNITS)
+MEASUREMENT_RANGES = {
+    **{point: (0.0, 100.0) for point in FIELD_NAMES if point.startswith(("motor_h", "motor_v", "motor_a",
+                                                                            "pump_h", "pump_v", "pump_a"))},
+    "vibration_max_avr": (0.0, 100.0),
+    "displacement_peak": (0.0, 1000.0),
+    **{name: (0.0, 50.0) for name in FIELD_NAMES if name.startswith(("hf_", "demod_"))},
+    **{name: (-20.0, 200.0) for name in FIELD_NAMES if name.startswith("temp_")},
+    **{f"peak{n}_freq": (0.0, 20000.0) for n in (1, 2, 3)},
+    **{f"peak{n}_amp": (0.0, 100.0) for n in (1, 2, 3)},
+    "phase_instability": (0.0, 180.0),
+    **{f"voltage_{phase}": (0.0, 15000.0) for phase in "rst"},
+    **{f"current_{phase}": (0.0, 5000.0) for phase in "rst"},
+    "flc": (0.0, 5000.0),
+    "motor_rpm": (0.0, 6000.0),
+    "motor_kw": (0.0, 20000.0),
+    "p_suc": (-1.0, 50.0),
+    "p_dis": (-1.0, 250.0),
+    "p_dis_fluctuation": (0.0, 100.0),
+    "npshr": (0.0, 50.0),
+    "actual_flow": (0.0, 20000.0),
+    "bep_flow": (0.0, 20000.0),
+    "rul_days": (0.0, 36500.0)
+}
+
+# Fields each diagnostic level needs to run at all
+MEASUREMENT_LAYERS = {
+    "safety": ("temp_motor_de", "temp_motor_nde", "temp_pump_de", "temp_pump_nde",
+               "current_r", "current_s", "current_t", "flc"),
+    "severity": ("motor_h_de", "motor_v_de", "motor_h_nde", "motor_v_nde",
+                 "pump_h_de", "pump_v_de", "pump_h_nde", "pump_v_nde", "motor_rpm", "motor_kw"),
+    "fault_detection": ("peak1_freq", "peak1_amp", "peak2_freq", "peak2_amp",
+                        "peak3_freq", "peak3_amp", "hf_pump_de"),
+    "hydraulic": ("p_suc", "npshr", "actual_flow", "bep_flow")
+}
+
+# Physical plausibility: (label, column, operator, column or constant, factor)
+# - the rule must hold (column op factor * other); rows where either side is
+# not measured are not checked
+MEASUREMENT_RULES = (
+    ("discharge below suction", "p_dis", ">=", "p_suc", 1.0),
+    ("phase R current above 2x FLC", "current_r", "<=", "flc", 2.0),
+    ("phase S current above 2x FLC", "current_s", "<=", "flc", 2.0),
+    ("phase T current above 2x FLC", "current_t", "<=", "flc", 2.0),
+    ("flow above 2x BEP", "actual_flow", "<=", "bep_flow", 2.0),
+    ("motor rated power zero", "motor_kw", ">", 0.0, 1.0)
+)
+
+_OPERATORS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+class InputValidator:
+    """Schema compiled into vectorized range, required-field and plausibility checks"""
+
+    def __init__(self, units, ranges, layers=None, rules=(), source_units=None):
+        """
+        Parameters:
+        -----------
+        units : dict
+            Column -> canonical unit
+        ranges : dict
+            Column -> (min, max) in the canonical unit
+        layers : dict
+            Layer name -> columns required by that layer
+        rules : tuple
+            Plausibility rules (label, column, operator, column or constant, factor)
+        source_units : dict
+            Units the data arrives in. Keys are columns or canonical units
+            (e.g. {"mm/s": "in/s", "°C": "°F", "p_suc": "m"}); a column key
+            overrides a unit key.
+
+        Raises:
+        -------
+        ValueError : On an unknown unit conversion, rule column or operator
+        """
+        self.columns = tuple(units)
+        self.layers = {name: tuple(columns) for name, columns in (layers or {}).items()}
+        index = {column: position for position, column in enumerate(self.columns)}
+        source_units = source_units or {}
+
+        scale = np.ones(len(self.columns))
+        offset = np.zeros(len(self.columns))
+        for position, column in enumerate(self.columns):
+            target = units[column]
+            source = source_units.get(column, source_units.get(target, target))
+            if source != target:
+                if (source, target) not in UNIT_CONVERSIONS:
+                    raise ValueError(f"No conversion from {source} to {target} for {column}")
+                scale[position], offset[position] = UNIT_CONVERSIONS[(source, target)]
+        self._scale = scale
+        self._offset = offset
+        self._converted = (scale != 1.0) | (offset != 0.0)
+
+        self._low = np.array([ranges.get(column, (-np.inf, np.inf))[0] for column in self.columns])
+        self._high = np.array([ranges.get(column, (-np.inf, np.inf))[1] for column in self.columns])
+
+        self._layer_masks = {}
+        for name, columns in self.layers.items():
+            unknown = [column for column in columns if column not in index]
+            if unknown:
+                raise ValueError(f"Layer {name} requires unknown columns: {', '.join(unknown)}")
+            mask = np.zeros(len(self.columns), dtype=bool)
+            mask[[index[column] for column in columns]] = True
+            self._layer_masks[name] = mask
+
+        self.rules = tuple(rule[0] for rule in rules)
+        self._rules = []
+        for label, column, op, other, factor in rules:
+            if op not in _OPERATORS:
+                raise ValueError(f"Unknown operator {op!r} in rule {label!r}")
+            if column not in index or (isinstance(other, str) and other not in index):
+                raise ValueError(f"Rule {label!r} refers to an unknown column")
+            rhs = index[other] if isinstance(other, str) else None
+            self._rules.append((index[column], _OPERATORS[op], rhs, other if rhs is None else None, factor))
+
+    def required_mask(self, layer=None):
+        """Boolean column mask of the fields required by one or more layers"""
+        if layer is None:
+            return np.zeros(len(self.columns), dtype=bool)
+        names = (layer,) if isinstance(layer, str) else tuple(layer)
+        mask = np.zeros(len(self.columns), dtype=bool)
+        for name in names:
+            mask |= self._layer_masks[name]
+        return mask
+
+    def validate(self, table, layer=None):
+        """
+        Normalize units and check every row of a batch
+
+        Parameters:
+        -----------
+        table : ndarray or DataFrame
+            Structured array / DataFrame holding the schema columns
+        layer : str or tuple
+            Layer(s) whose required fields must be measured; None checks
+            ranges and rules only
+
+        Returns:
+        --------
+        dict : data (normalized copy), columns, missing / out_of_range
+               (n_rows x n_columns), implausible (n_rows x n_rules), rules,
+               valid (n_rows)
+        """
+        data = table.copy()
+        values = np.column_stack([np.asarray(table[column], dtype=float) for column in self.columns]) \
+            if len(table) else np.empty((0, len(self.columns)))
+        values = np.where(self._converted, values * self._scale + self._offset, values)
+        for position in np.flatnonzero(self._converted):
+            data[self.columns[position]] = values[:, position]
+
+        measured = ~np.isnan(values)
+        missing = ~measured & self.required_mask(layer)
+        out_of_range = measured & ((values < self._low) | (values > self._high))
+
+        implausible = np.zeros((len(values), len(self._rules)), dtype=bool)
+        for position, (lhs, compare, rhs, constant, factor) in enumerate(self._rules):
+            if rhs is None:
+                other = np.full(len(values), constant * factor)
+                checked = measured[:, lhs]
+            else:
+                other = values[:, rhs] * factor
+                checked = measured[:, lhs] & measured[:, rhs]
+            with np.errstate(invalid="ignore"):
+                implausible[:, position] = checked & ~compare(values[:, lhs], other)
+
+        return {
+            "data": data,
+            "columns": self.columns,
+            "missing": missing,
+            "out_of_range": out_of_range,
+            "implausible": implausible,
+            "rules": self.rules,
+            "valid": ~(missing.any(axis=1) | out_of_range.any(axis=1) | implausible.any(axis=1))
+        }
+
+
+def row_errors(result, row):
+    """
+    Readable error list for one row of a validate() result
+
+    Returns:
+    --------
+    list : Messages, empty for a valid row
+    """
+    errors = [f"{column}: missing" for column, flag in zip(result["columns"], result["missing"][row]) if flag]
+    errors += [f"{column}: out of range" for column, flag in zip(result["columns"], result["out_of_range"][row]) if flag]
+    errors += [rule for rule, flag in zip(result["rules"], result["implausible"][row]) if flag]
+    return errors
+
+
+@lru_cache(maxsize=32)
+def _measurement_validator(source_units):
+    return InputValidator(FIELD_UNITS, MEASUREMENT_RANGES, MEASUREMENT_LAYERS, MEASUREMENT_RULES,
+                          dict(source_units))
+
+
+def measurement_validator(source_units=None):
+    """InputValidator for engine measurement batches, compiled once per unit set"""
+    return _measurement_validator(tuple(sorted((source_units or {}).items())))
+
+
+def validate_measurements(records, source_units=None, layer=None):
+    """
+    Validate engine inputs (records, dicts or a MEASUREMENT_DTYPE batch)
+
+    Returns:
+    --------
+    dict : InputValidator.validate() result; "data" is a MEASUREMENT_DTYPE
+           batch in canonical units
+    """
+    batch = records if isinstance(records, np.ndarray) else to_batch(records)
+    return measurement_validator(source_units).validate(batch, layer)
@@ -3,14 +3,27 @@ Level 2: ISO 10816-3 Zone Classification
 ISO 10816-3:2001 Table 2 with foundation type consideration
 """
 
-def classify_iso_10816_3_zone(velocity_rms, rpm, power_kw, foundation_type):
+RIGID_FOUNDATION = "Rigid (Concrete)"
+
+# Machine group by motor power: Group 1 <= 15 kW, Group 2 <= 75 kW, else Group 3
+GROUP_POWER_LIMITS_KW = (15, 75)
+# Group 3 speed range with foundation-dependent limits (exclusive, inclusive]
+GROUP_3_RPM_RANGE = (1200, 3600)
+
+# Zone B/C/D lower limits (mm/s RMS)
+ZONE_LIMITS = {
+    "group_3_rigid": (2.8, 7.1, 11.2),
+    "group_3_flexible": (4.5, 11.2, 18.0),
+    "default": (4.5, 7.1, 11.2)
+}
+
+
+def iso_10816_3_limits(rpm, power_kw, foundation_type):
     """
-    Classify vibration severity according to ISO 10816-3:2001 Table 2
+    Machine group and zone B/C/D limits per ISO 10816-3:2001 Table 2
     
     Parameters:
     -----------
-    velocity_rms : float
-        Vibration velocity in mm/s RMS
     rpm : int
         Machine rotational speed
     power_kw : float
@@ -20,40 +33,69 @@ def classify_iso_10816_3_zone(velocity_rms, rpm, power_kw, foundation_type):
     
     Returns:
     --------
-    dict : Zone classification result
+    dict : group, limits (zone B, C, D lower limits mm/s), foundation_note
     """
     # Determine machine group based on power
-    if power_kw <= 15:
+    if power_kw <= GROUP_POWER_LIMITS_KW[0]:
         group = 1
-    elif power_kw <= 75:
+    elif power_kw <= GROUP_POWER_LIMITS_KW[1]:
         group = 2
     else:
         group = 3  # Pompa BBM >75 kW
     
     # Determine zone limits based on foundation type (CRITICAL!)
-    is_rigid = (foundation_type == "Rigid (Concrete)")
+    is_rigid = (foundation_type == RIGID_FOUNDATION)
     
     # Group 3 machines (pompa BBM) - 1200-3600 RPM range
-    if group == 3 and 1200 < rpm <= 3600:
+    if group == 3 and GROUP_3_RPM_RANGE[0] < rpm <= GROUP_3_RPM_RANGE[1]:
         if is_rigid:
             # RIGID FOUNDATION (concrete) - stricter limits
-            zone_b_limit = 2.8   # mm/s
-            zone_c_limit = 7.1
-            zone_d_limit = 11.2
+            zone_b_limit, zone_c_limit, zone_d_limit = ZONE_LIMITS["group_3_rigid"]
             foundation_note = "Rigid foundation (concrete) - stricter limits apply"
         else:
-            # FLEXIBLE FOUNDATION (steel) - more lenient limits
-            zone_b_limit = 4.5   # mm/s (60% higher than rigid!)
-            zone_c_limit = 11.2
-            zone_d_limit = 18.0
+            # FLEXIBLE FOUNDATION (steel) - more lenient limits (Zone B 60% higher than rigid)
+            zone_b_limit, zone_c_limit, zone_d_limit = ZONE_LIMITS["group_3_flexible"]
             foundation_note = "Flexible foundation (steel structure) - more lenient limits apply"
     else:
         # Other RPM ranges or groups (fallback)
-        zone_b_limit = 4.5
-        zone_c_limit = 7.1
-        zone_d_limit = 11.2
+        zone_b_limit, zone_c_limit, zone_d_limit = ZONE_LIMITS["default"]
         foundation_note = "Default limits applied"
     
+    return {
+        "group": group,
+        "limits": (zone_b_limit, zone_c_limit, zone_d_limit),
+        "foundation_note": foundation_note
+    }
+
+
+def classify_iso_10816_3_zone(velocity_rms, rpm, power_kw, foundation_type, limits=None):
+    """
+    Classify vibration severity according to ISO 10816-3:2001 Table 2
+    
+    Parameters:
+    -----------
+    velocity_rms : float
+        Vibration velocity in mm/s RMS
+    rpm : int
+        Machine rotational speed
+    power_kw : float
+        Motor power in kW
+    foundation_type : str
+        "Rigid (Concrete)" or "Flexible (Steel Structure)"
+    limits : dict
+        Precomputed iso_10816_3_limits(rpm, power_kw, foundation_type),
+        e.g. the cached asset constant; derived here when not given
+    
+    Returns:
+    --------
+    dict : Zone classification result
+    """
+    if limits is None:
+        limits = iso_10816_3_limits(rpm, power_kw, foundation_type)
+    group = limits["group"]
+    zone_b_limit, zone_c_limit, zone_d_limit = limits["limits"]
+    foundation_note = limits["foundation_note"]
+    
     # Classify zone based on velocity
     if velocity_rms <= zone_b_limit:
         zone = "A"
@@ -0,0 +1,313 @@
+"""
+Fleet Maintenance Scheduler
+ISO 55001 Clause 8.1 + API 581 RBI - Risk-based work planning across a terminal
+"""
+
+import heapq
+import re
+
+
+# Lower rank = more urgent (ISO 45001 Annex A risk matrix order)
+RISK_RANK = {
+    "CRITICAL": 0,
+    "HIGH": 1,
+    "MEDIUM": 2,
+    "LOW": 3
+}
+
+# Recurring monitoring timelines used by generate_recommendations
+RECURRING_TIMELINE_HOURS = {
+    "IMMEDIATE": 0,
+    "DAILY": 24,
+    "WEEKLY": 168,
+    "MONTHLY": 720
+}
+
+# Typical crew-hours per action (Pertamina AIM work-pack estimates)
+ACTION_DURATION_HOURS = {
+    "SHUTDOWN MACHINE NOW": 2,
+    "Correct voltage imbalance to <2%": 4,
+    "Verify motor terminal connections": 2,
+    "Schedule dynamic balancing": 8,
+    "Inspect impeller for fouling or damage": 6,
+    "Re-align coupling": 6,
+    "Inspect coupling and foundation bolts": 3,
+    "Schedule bearing replacement": 12,
+    "Check lubrication system": 2,
+    "Adjust flow control valve": 2,
+    "Check NPSHa margin": 2
+}
+
+DEFAULT_DURATION_HOURS = 4
+
+_TIMELINE_PATTERN = re.compile(r"<\s*(\d+(?:\.\d+)?)\s*(hour|hours|day|days)", re.IGNORECASE)
+
+
+def parse_timeline_hours(timeline):
+    """
+    Convert a text timeline from the risk assessor into hours
+
+    Parameters:
+    -----------
+    timeline : str
+        Timeline text such as "<24 hours", "<7 days", "IMMEDIATE" or "Weekly"
+
+    Returns:
+    --------
+    float : Deadline in hours from the time of diagnosis (None if unknown)
+    """
+    if not timeline:
+        return None
+
+    text = timeline.strip()
+    recurring = RECURRING_TIMELINE_HOURS.get(text.upper())
+    if recurring is not None:
+        return float(recurring)
+
+    match = _TIMELINE_PATTERN.search(text)
+    if not match:
+        return None
+
+    value = float(match.group(1))
+    if match.group(2).lower().startswith("day"):
+        value *= 24
+    return value
+
+
+def build_work_items(asset_id, risk_result, issued_at=0.0, include_monitoring=False):
+    """
+    Turn one asset's risk assessment into schedulable work items
+
+    Parameters:
+    -----------
+    asset_id : str
+        Asset identifier (e.g. "PPJ-BBM-P-205")
+    risk_result : dict
+        Output of assess_risk_and_generate_plan (or an emergency report,
+        which carries "recommendations" but no "risk_level")
+    issued_at : float
+        Time of the diagnosis in planning hours
+    include_monitoring : bool
+        Also schedule the recurring "MONITOR" recommendation
+
+    Returns:
+    --------
+    list : Work items with deadline, risk rank, MTBF and duration
+    """
+    risk_level = risk_result.get("risk_level", "CRITICAL" if risk_result.get("report_type") == "EMERGENCY_SHUTDOWN" else "MEDIUM")
+    mtbf_days = risk_result.get("mtbf_days", 0 if risk_level == "CRITICAL" else 365)
+
+    work_items = []
+    for index, rec in enumerate(risk_result.get("recommendations", [])):
+        if rec.get("priority") == "MONITOR" and not include_monitoring:
+            continue
+
+        deadline_hours = parse_timeline_hours(rec.get("timeline"))
+        if deadline_hours is None:
+            deadline_hours = parse_timeline_hours(risk_result.get("action_timeline"))
+        if deadline_hours is None:
+            deadline_hours = 720.0
+
+        # Recommendation priority can be more urgent than the overall risk level
+        rank = min(RISK_RANK.get(risk_level, 2), RISK_RANK.get(rec.get("priority"), 3))
+
+        work_items.append({
+            "work_id": f"{asset_id}#{index}",
+            "asset_id": asset_id,
+            "action": rec.get("action", ""),
+            "priority": rec.get("priority", "MEDIUM"),
+            "risk_level": risk_level,
+            "risk_rank": rank,
+            "mtbf_days": mtbf_days,
+            "issued_at": issued_at,
+            "deadline": issued_at + deadline_hours,
+            "duration_hours": rec.get("duration_hours", ACTION_DURATION_HOURS.get(rec.get("action"), DEFAULT_DURATION_HOURS)),
+            "standard": rec.get("standard", "")
+        })
+
+    return work_items
+
+
+def _prepare_windows(windows):
+    """Sort maintenance windows and give each crew slot a free-time heap"""
+    prepared = []
+    for window in sorted(windows, key=lambda w: w["start"]):
+        crews = max(int(window.get("crews", 1)), 0)
+        prepared.append({
+            "window_id": window.get("window_id", f"W{len(prepared) + 1}"),
+            "start": float(window["start"]),
+            "end": float(window["end"]),
+            "locations": window.get("locations"),
+            "crew_free": [(float(window["start"]), crew) for crew in range(crews)]
+        })
+    return prepared
+
+
+def _assign(item, windows, first_open, asset_location):
+    """
+    Place one work item in the earliest window/crew that can finish it
+
+    Returns (window_index, crew, start, end) or None if no capacity remains.
+    """
+    duration = item["duration_hours"]
+    earliest = item["issued_at"]
+
+    for w_index in range(first_open, len(windows)):
+        window = windows[w_index]
+        if window["end"] <= earliest:
+            continue
+        if window["locations"] and asset_location not in window["locations"]:
+            continue
+
+        crew_free = window["crew_free"]
+        if not crew_free:
+            continue
+
+        free_at, crew = crew_free[0]
+        start = max(free_at, earliest)
+        if start + duration <= window["end"]:
+            heapq.heapreplace(crew_free, (start + duration, crew))
+            return w_index, crew, start, start + duration
+
+    return None
+
+
+def schedule_work_items(work_items, windows, asset_locations=None):
+    """
+    Build a feasible schedule with earliest-deadline-first dispatch
+
+    Work items are drawn from a heap keyed by (deadline, risk rank, MTBF) and
+    packed into maintenance windows, each of which has a fixed number of crews.
+
+    Parameters:
+    -----------
+    work_items : list
+        Work items from build_work_items
+    windows : list
+        Maintenance windows as dicts with "start", "end" (planning hours),
+        "crews" and optional "window_id" / "locations"
+    asset_locations : dict
+        Optional asset_id -> location map for location-restricted windows
+
+    Returns:
+    --------
+    dict : Scheduled assignments, late items and unscheduled items
+    """
+    asset_locations = asset_locations or {}
+    prepared = _prepare_windows(windows)
+
+    heap = [
+        (item["deadline"], item["risk_rank"], item["mtbf_days"], seq, item)
+        for seq, item in enumerate(work_items)
+    ]
+    heapq.heapify(heap)
+
+    scheduled = []
+    unscheduled = []
+    late_count = 0
+    first_open = 0
+
+    while heap:
+        _, _, _, _, item = heapq.heappop(heap)
+
+        # Skip windows that are fully booked for every crew
+        while first_open < len(prepared) and all(
+            free >= prepared[first_open]["end"] for free, _ in prepared[first_open]["crew_free"]
+        ):
+            first_open += 1
+
+        placement = _assign(item, prepared, first_open, asset_locations.get(item["asset_id"]))
+        if placement is None:
+            unscheduled.append(item)
+            continue
+
+        w_index, crew, start, end = placement
+        is_late = end > item["deadline"]
+        late_count += is_late
+        scheduled.append({
+            "work_id": item["work_id"],
+            "asset_id": item["asset_id"],
+            "action": item["action"],
+            "risk_level": item["risk_level"],
+            "window_id": prepared[w_index]["window_id"],
+            "crew": crew,
+            "start": start,
+            "end": end,
+            "deadline": item["deadline"],
+            "is_late": is_late
+        })
+
+    return {
+        "scheduled": scheduled,
+        "unscheduled": unscheduled,
+        "scheduled_count": len(scheduled),
+        "late_count": late_count,
+        "unscheduled_count": len(unscheduled),
+        "is_feasible": late_count == 0 and not unscheduled,
+        "standard": "ISO 55001:2014 Clause 8.1 + API 581 RBI"
+    }
+
+
+class MaintenanceScheduler:
+    """
+    Fleet work queue keyed by asset with a cached schedule
+
+    Earliest-deadline-first dispatch is order dependent - one changed asset
+    can move every later placement - so any change drops the cached
+    schedule and the next plan() re-dispatches the whole queue.
+    """
+
+    def __init__(self, windows, asset_locations=None):
+        self.windows = list(windows)
+        self.asset_locations = dict(asset_locations or {})
+        self._items_by_asset = {}
+        self._schedule = None
+
+    def update_asset(self, asset_id, risk_result, issued_at=0.0, location=None):
+        """
+        Replace the work items of one asset after its diagnosis changes
+        (the schedule is rebuilt on the next plan())
+
+        Parameters:
+        -----------
+        asset_id : str
+            Asset identifier
+        risk_result : dict
+            New risk assessment (None removes the asset from the queue)
+        issued_at : float
+            Time of the new diagnosis in planning hours
+        location : str
+            Optional location used for location-restricted windows
+        """
+        if location is not None:
+            self.asset_locations[asset_id] = location
+
+        if risk_result is None:
+            self._items_by_asset.pop(asset_id, None)
+        else:
+            self._items_by_asset[asset_id] = build_work_items(asset_id, risk_result, issued_at)
+
+        self._schedule = None
+
+    def load_fleet(self, fleet_results, issued_at=0.0):
+        """
+        Ingest (asset_id, risk_result) pairs for a whole fleet
+        """
+        for asset_id, risk_result in fleet_results:
+            self._items_by_asset[asset_id] = build_work_items(asset_id, risk_result, issued_at)
+        self._schedule = None
+
+    def set_windows(self, windows):
+        """Replace maintenance windows (crew rosters changed)"""
+        self.windows = list(windows)
+        self._schedule = None
+
+    def plan(self):
+        """
+        Return the cached schedule, or re-dispatch the full queue with
+        schedule_work_items if anything changed since the last call
+        """
+        if self._schedule is None:
+            work_items = [item for items in self._items_by_asset.values() for item in items]
+            self._schedule = schedule_work_items(work_items, self.windows, self.asset_locations)
+        return self._schedule
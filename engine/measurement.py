@@ -0,0 +1,331 @@
+"""
+Measurement Record - typed engine input with explicit units
+ISO 13374-2:2007 data manipulation layer
+One slotted, immutable record per measurement; fleet batches use the
+matching NumPy structured dtype (MEASUREMENT_DTYPE) and share its buffer
+"""
+
+from array import array
+from collections.abc import Mapping
+
+
+# (field, unit) - stored as float64, NaN = not measured
+NUMERIC_FIELDS = (
+    # Overall velocity, ISO 10816-3 measurement points
+    ("motor_h_de", "mm/s"),
+    ("motor_v_de", "mm/s"),
+    ("motor_a_de", "mm/s"),
+    ("motor_h_nde", "mm/s"),
+    ("motor_v_nde", "mm/s"),
+    ("motor_a_nde", "mm/s"),
+    ("pump_h_de", "mm/s"),
+    ("pump_v_de", "mm/s"),
+    ("pump_a_de", "mm/s"),
+    ("pump_h_nde", "mm/s"),
+    ("pump_v_nde", "mm/s"),
+    ("pump_a_nde", "mm/s"),
+    ("vibration_max_avr", "mm/s"),
+    ("displacement_peak", "μm"),
+    # Bearing condition
+    ("hf_pump_de", "g"),
+    ("hf_pump_nde", "g"),
+    ("hf_motor_de", "g"),
+    ("hf_motor_nde", "g"),
+    ("demod_pump_de", "gE"),
+    ("demod_pump_nde", "gE"),
+    ("demod_motor_de", "gE"),
+    ("demod_motor_nde", "gE"),
+    ("temp_pump_de", "°C"),
+    ("temp_pump_nde", "°C"),
+    ("temp_motor_de", "°C"),
+    ("temp_motor_nde", "°C"),
+    # Spectrum peaks
+    ("peak1_freq", "Hz"),
+    ("peak1_amp", "mm/s"),
+    ("peak2_freq", "Hz"),
+    ("peak2_amp", "mm/s"),
+    ("peak3_freq", "Hz"),
+    ("peak3_amp", "mm/s"),
+    ("phase_instability", "deg"),
+    # Electrical
+    ("voltage_r", "V"),
+    ("voltage_s", "V"),
+    ("voltage_t", "V"),
+    ("current_r", "A"),
+    ("current_s", "A"),
+    ("current_t", "A"),
+    ("flc", "A"),
+    ("motor_rpm", "rpm"),
+    ("motor_kw", "kW"),
+    # Hydraulic
+    ("p_suc", "bar"),
+    ("p_dis", "bar"),
+    ("p_dis_fluctuation", "%"),
+    ("npshr", "m"),
+    ("actual_flow", "m³/h"),
+    ("bep_flow", "m³/h"),
+    # Prognostics
+    ("rul_days", "days")
+)
+
+# (field, max characters in MEASUREMENT_DTYPE) - str, None = not given;
+# to_batch rejects longer values rather than truncating them
+TEXT_FIELDS = (
+    ("foundation_type", 32),
+    ("pump_type", 32),
+    ("location", 64)
+)
+
+FIELD_NAMES = tuple(name for name, _ in NUMERIC_FIELDS)
+FIELD_UNITS = dict(NUMERIC_FIELDS)
+TEXT_NAMES = tuple(name for name, _ in TEXT_FIELDS)
+
+_FIELD_INDEX = {name: index for index, name in enumerate(FIELD_NAMES)}
+_NUMERIC_BYTES = 8 * len(FIELD_NAMES)
+_NAN = float("nan")
+
+
+def __getattr__(name):
+    # The structured dtype needs numpy; build it on first use so importing
+    # the record (and the engine) stays stdlib-only
+    if name == "MEASUREMENT_DTYPE":
+        import numpy as np
+
+        dtype = np.dtype(
+            [(field, "<f8") for field in FIELD_NAMES]
+            + [(field, f"<U{width}") for field, width in TEXT_FIELDS]
+        )
+        globals()[name] = dtype
+        return dtype
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class Measurement(Mapping):
+    """
+    Immutable engine input record
+
+    Numeric fields are float64 in one contiguous buffer (NaN = not
+    measured); attribute access returns NaN for missing fields. The
+    Mapping interface exposes only measured fields, so engine code written
+    against dicts (data.get(key, default), is_measured) behaves exactly as
+    for a dict that simply lacks the key.
+    """
+
+    __slots__ = ("_values", "_batch", "foundation_type", "pump_type", "location")
+
+    def __init__(self, foundation_type=None, pump_type=None, location=None, **values):
+        """
+        Parameters:
+        -----------
+        foundation_type, pump_type, location : str
+            Text fields (None = not given)
+        **values : float
+            Numeric fields by name (see NUMERIC_FIELDS); None or NaN = not
+            measured
+
+        Raises:
+        -------
+        ValueError : If a field name is unknown
+        """
+        unknown = [name for name in values if name not in _FIELD_INDEX]
+        if unknown:
+            raise ValueError(f"Unknown measurement fields: {', '.join(sorted(unknown))}")
+        buffer = array("d", [_NAN]) * len(FIELD_NAMES)
+        for name, value in values.items():
+            if value is not None:
+                buffer[_FIELD_INDEX[name]] = float(value)
+        self._init(buffer, None, foundation_type, pump_type, location)
+
+    def _init(self, buffer, batch, foundation_type, pump_type, location):
+        set_slot = object.__setattr__
+        set_slot(self, "_values", buffer)
+        set_slot(self, "_batch", batch)
+        set_slot(self, "foundation_type", foundation_type or None)
+        set_slot(self, "pump_type", pump_type or None)
+        set_slot(self, "location", location or None)
+
+    @classmethod
+    def _wrap(cls, buffer, batch, foundation_type, pump_type, location):
+        record = cls.__new__(cls)
+        record._init(buffer, batch, foundation_type, pump_type, location)
+        return record
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Record from an engine input dict
+
+        Raises:
+        -------
+        ValueError : If the dict holds keys that are not measurement fields
+        """
+        return cls(**data)
+
+    def to_dict(self):
+        """
+        Engine input dict with only the measured / given fields
+
+        Returns:
+        --------
+        dict : Field -> float (numeric) or str (text)
+        """
+        return dict(self.items())
+
+    def replace(self, **changes):
+        """New record with some fields changed (None clears a field)"""
+        values = {name: value for name, value in zip(FIELD_NAMES, self._values)}
+        texts = {name: getattr(self, name) for name in TEXT_NAMES}
+        for name, value in changes.items():
+            (texts if name in texts else values)[name] = value
+        return Measurement(**texts, **values)
+
+    @staticmethod
+    def unit(name):
+        """Engineering unit of a numeric field"""
+        return FIELD_UNITS[name]
+
+    def __getattr__(self, name):
+        # Only reached for numeric fields (text fields are real slots)
+        index = _FIELD_INDEX.get(name)
+        if index is None:
+            raise AttributeError(f"'Measurement' has no field '{name}'")
+        return self._values[index]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Measurement is immutable - use replace()")
+
+    def __getitem__(self, key):
+        index = _FIELD_INDEX.get(key)
+        if index is not None:
+            value = self._values[index]
+            if value == value:
+                return value
+        elif key in TEXT_NAMES:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self):
+        for name, value in zip(FIELD_NAMES, self._values):
+            if value == value:
+                yield name
+        for name in TEXT_NAMES:
+            if getattr(self, name) is not None:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.items())
+        return f"Measurement({fields})"
+
+    def __reduce__(self):
+        return (Measurement.from_dict, (self.to_dict(),))
+
+
+def as_measurement(data):
+    """Measurement record from a record (returned as is) or an input dict"""
+    return data if isinstance(data, Measurement) else Measurement.from_dict(data)
+
+
+def empty_batch(n_records):
+    """
+    Fleet batch of n_records unmeasured rows
+
+    Returns:
+    --------
+    ndarray : MEASUREMENT_DTYPE array, numeric fields NaN, text fields ""
+    """
+    import numpy as np
+
+    batch = np.zeros(n_records, dtype=__getattr__("MEASUREMENT_DTYPE"))
+    numeric_matrix(batch)[:] = np.nan
+    return batch
+
+
+def numeric_matrix(batch):
+    """
+    (n_records, len(FIELD_NAMES)) float64 view of a batch's numeric fields
+
+    Shares memory with the batch - no copy, writes go through.
+    """
+    import numpy as np
+
+    return np.ndarray(
+        (len(batch), len(FIELD_NAMES)), dtype="<f8", buffer=batch,
+        offset=0, strides=(batch.dtype.itemsize, 8)
+    )
+
+
+def to_batch(records):
+    """
+    Fleet batch from records or input dicts
+
+    Records that are the rows of one batch, in order, give back that batch
+    without copying; anything else is gathered into a new batch.
+
+    Returns:
+    --------
+    ndarray : MEASUREMENT_DTYPE array
+
+    Raises:
+    -------
+    ValueError : A text field longer than its TEXT_FIELDS width (it would
+                 be truncated and could compare equal to another value)
+    """
+    records = [as_measurement(record) for record in records]
+    if records and records[0]._batch is not None:
+        batch = records[0]._batch[0]
+        if len(batch) == len(records) and all(
+            record._batch is not None and record._batch[0] is batch and record._batch[1] == index
+            for index, record in enumerate(records)
+        ):
+            return batch
+
+    import numpy as np
+
+    batch = empty_batch(len(records))
+    if records:
+        numeric_matrix(batch)[:] = np.frombuffer(
+            b"".join(bytes(record._values) for record in records), dtype="<f8"
+        ).reshape(len(records), len(FIELD_NAMES))
+        for name, width in TEXT_FIELDS:
+            values = [getattr(record, name) or "" for record in records]
+            for row, value in enumerate(values):
+                if len(value) > width:
+                    raise ValueError(f"{name} of record {row} is {len(value)} characters; "
+                                     f"the batch holds at most {width}: {value!r}")
+            batch[name] = values
+    return batch
+
+
+def from_batch(batch):
+    """
+    Records viewing the rows of a fleet batch
+
+    Numeric fields are read-only views into the batch buffer (no copy), so
+    later writes to the batch are visible through the records; text fields
+    are copied.
+
+    Returns:
+    --------
+    list : One Measurement per row
+    """
+    import numpy as np
+
+    if batch.dtype != __getattr__("MEASUREMENT_DTYPE"):
+        raise ValueError("Batch dtype is not MEASUREMENT_DTYPE")
+    batch = np.ascontiguousarray(batch)
+    buffer = memoryview(batch.view(np.uint8)).toreadonly()
+    itemsize = batch.dtype.itemsize
+    texts = [batch[name].tolist() for name in TEXT_NAMES]
+    return [
+        Measurement._wrap(
+            buffer[index * itemsize:index * itemsize + _NUMERIC_BYTES].cast("d"),
+            (batch, index),
+            *(column[index] for column in texts)
+        )
+        for index in range(len(batch))
+    ]
@@ -0,0 +1,259 @@
+"""
+Trend-Based Prognostics - Remaining Useful Life
+ISO 13381-1:2015 Clause 6 - Degradation trend extrapolation
+"""
+
+import numpy as np
+
+from .quantiles import normal_quantile
+
+
+# Alarm limits the trends are extrapolated to
+# (Group 3 rigid defaults - pass per-asset arrays for other machines)
+PARAMETER_LIMITS = {
+    "velocity_rms": {
+        "zone_c": 7.1,    # mm/s - ISO 10816-3 Table 2
+        "zone_d": 11.2
+    },
+    "hf_g": {
+        "stage_3": 1.5    # g RMS - ISO 15243 Stage 3 (see analyze_bearing_condition)
+    },
+    "demod_ge": {
+        "stage_3": 4.0    # gE - critical envelope level
+    },
+    "bearing_temp": {
+        "stage_3": 120.0  # °C - API 610 Table 8.4.3-1 shutdown limit
+    }
+}
+
+def _t_quantile(confidence, dof):
+    """
+    Two-sided Student-t quantile via Cornish-Fisher expansion (no SciPy dependency)
+
+    Raises:
+    -------
+    ValueError : confidence outside (0, 1) (e.g. given in percent)
+    """
+    if not 0.0 < confidence < 1.0:
+        raise ValueError(f"confidence must be a fraction in (0, 1), got {confidence!r}")
+    z = normal_quantile((1.0 + confidence) / 2.0)
+    dof = np.maximum(dof, 1)
+    return z + (z**3 + z) / (4 * dof) + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * dof**2)
+
+
+def _group_median(groups, values, n_groups):
+    """Median of values per group in one sort (groups must be 0..n_groups-1)"""
+    order = np.lexsort((values, groups))
+    sorted_values = values[order]
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    medians = np.full(n_groups, np.nan)
+    has_data = counts > 0
+    lo = starts + (counts - 1) // 2
+    hi = starts + counts // 2
+    medians[has_data] = 0.5 * (sorted_values[lo[has_data]] + sorted_values[hi[has_data]])
+    return medians
+
+
+def _weighted_line_fit(groups, t, y, w, n_groups):
+    """Weighted least-squares line per group using grouped sums"""
+    sw = np.bincount(groups, weights=w, minlength=n_groups)
+    swx = np.bincount(groups, weights=w * t, minlength=n_groups)
+    swy = np.bincount(groups, weights=w * y, minlength=n_groups)
+    swxx = np.bincount(groups, weights=w * t * t, minlength=n_groups)
+    swxy = np.bincount(groups, weights=w * t * y, minlength=n_groups)
+
+    denom = sw * swxx - swx**2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denom > 0, (sw * swxy - swx * swy) / denom, 0.0)
+        intercept = np.where(sw > 0, (swy - slope * swx) / sw, np.nan)
+    return intercept, slope, sw, denom
+
+
+def fit_degradation_trends(asset_index, t_days, values, n_assets=None, robust=False, n_iter=5):
+    """
+    Fit a linear degradation trend for every asset in one batched pass
+
+    Parameters:
+    -----------
+    asset_index : array of int
+        Asset number (0..n_assets-1) for each inspection record
+    t_days : array of float
+        Inspection time in days (any common epoch)
+    values : array of float
+        Measured parameter (velocity RMS, HF g, demod gE or bearing °C)
+    n_assets : int
+        Number of assets (defaults to max(asset_index) + 1)
+    robust : bool
+        Use Huber-weighted IRLS instead of ordinary least squares
+    n_iter : int
+        IRLS iterations when robust=True
+
+    Returns:
+    --------
+    dict : Per-asset arrays of slope (units/day), level at last inspection,
+           slope standard error and point counts
+    """
+    groups = np.asarray(asset_index, dtype=np.intp)
+    t = np.asarray(t_days, dtype=float)
+    y = np.asarray(values, dtype=float)
+
+    valid = np.isfinite(t) & np.isfinite(y)
+    groups, t, y = groups[valid], t[valid], y[valid]
+    if n_assets is None:
+        n_assets = int(groups.max()) + 1 if groups.size else 0
+
+    counts = np.bincount(groups, minlength=n_assets)
+    t_last = np.full(n_assets, np.nan)
+    np.fmax.at(t_last, groups, t)
+
+    # Centre time per asset for numerical stability
+    with np.errstate(invalid="ignore"):
+        t_mean = np.bincount(groups, weights=t, minlength=n_assets) / np.maximum(counts, 1)
+    tc = t - t_mean[groups]
+
+    w = np.ones_like(y)
+    intercept, slope, sw, denom = _weighted_line_fit(groups, tc, y, w, n_assets)
+
+    if robust:
+        for _ in range(n_iter):
+            residual = y - (intercept[groups] + slope[groups] * tc)
+            abs_res = np.abs(residual)
+            scale = 1.4826 * _group_median(groups, abs_res, n_assets)
+            scale = np.where(scale > 1e-12, scale, 1e-12)
+            # Huber weights with the usual k = 1.345
+            cutoff = 1.345 * scale[groups]
+            w = np.where(abs_res <= cutoff, 1.0, cutoff / np.maximum(abs_res, 1e-12))
+            intercept, slope, sw, denom = _weighted_line_fit(groups, tc, y, w, n_assets)
+
+    residual = y - (intercept[groups] + slope[groups] * tc)
+    dof = counts - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        residual_var = np.bincount(groups, weights=w * residual**2, minlength=n_assets) / np.maximum(dof, 1)
+        slope_se = np.where((denom > 0) & (dof > 0), np.sqrt(residual_var * sw / denom), np.nan)
+
+    level_now = intercept + slope * (t_last - t_mean)
+
+    return {
+        "slope_per_day": slope,
+        "slope_se": slope_se,
+        "level_now": level_now,
+        "t_last": t_last,
+        "n_points": counts,
+        "dof": dof,
+        "residual_std": np.sqrt(residual_var),
+        "method": "Huber IRLS" if robust else "OLS",
+        "standard": "ISO 13381-1:2015 Clause 6"
+    }
+
+
+def estimate_time_to_threshold(trend, threshold, confidence=0.95):
+    """
+    Extrapolate fitted trends to an alarm limit with confidence bounds
+
+    Parameters:
+    -----------
+    trend : dict
+        Output of fit_degradation_trends
+    threshold : float or array
+        Alarm limit (scalar or one value per asset)
+    confidence : float
+        Two-sided confidence level for the slope, in (0, 1)
+
+    Returns:
+    --------
+    dict : Per-asset arrays of days to threshold (estimate, lower, upper);
+           inf when the trend is flat or improving, 0 when already exceeded
+    """
+    slope = trend["slope_per_day"]
+    level = trend["level_now"]
+    headroom = np.asarray(threshold, dtype=float) - level
+
+    t_q = _t_quantile(confidence, trend["dof"])
+    slope_se = np.nan_to_num(trend["slope_se"], nan=0.0)
+    slope_fast = slope + t_q * slope_se
+    slope_slow = slope - t_q * slope_se
+
+    def _days(rate):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            days = np.where(rate > 0, headroom / rate, np.inf)
+        return np.where(headroom <= 0, 0.0, days)
+
+    return {
+        "days": _days(slope),
+        "days_lower": _days(slope_fast),
+        "days_upper": _days(slope_slow),
+        "confidence": confidence,
+        "already_exceeded": headroom <= 0
+    }
+
+
+def estimate_fleet_rul(history, limits=None, robust=True, confidence=0.95, min_points=3):
+    """
+    Remaining useful life for every asset across all trended parameters
+
+    Parameters:
+    -----------
+    history : dict
+        Parameter name -> (asset_index, t_days, values) arrays, e.g.
+        {"velocity_rms": (idx, t, v), "hf_g": (idx, t, g)}
+    limits : dict
+        Parameter name -> {limit_name: scalar or per-asset array};
+        defaults to PARAMETER_LIMITS
+    robust : bool
+        Use Huber IRLS fits
+    confidence : float
+        Two-sided confidence level for the interval, in (0, 1)
+    min_points : int
+        Assets with fewer inspections get no estimate (NaN)
+
+    Returns:
+    --------
+    dict : Per-limit results plus "rul_days"/"rul_lower"/"rul_upper"
+           (earliest limit crossing per asset) and "limiting_parameter"
+    """
+    limits = limits or PARAMETER_LIMITS
+    n_assets = 0
+    for asset_index, _, _ in history.values():
+        if len(asset_index):
+            n_assets = max(n_assets, int(np.max(asset_index)) + 1)
+
+    rul = np.full(n_assets, np.inf)
+    rul_lower = np.full(n_assets, np.inf)
+    rul_upper = np.full(n_assets, np.inf)
+    limiting = np.full(n_assets, "", dtype=object)
+    enough_data = np.zeros(n_assets, dtype=bool)
+    per_limit = {}
+
+    for parameter, (asset_index, t_days, values) in history.items():
+        if parameter not in limits:
+            continue
+        trend = fit_degradation_trends(asset_index, t_days, values, n_assets=n_assets, robust=robust)
+        usable = trend["n_points"] >= min_points
+        enough_data |= usable
+
+        for limit_name, threshold in limits[parameter].items():
+            result = estimate_time_to_threshold(trend, threshold, confidence)
+            days = np.where(usable, result["days"], np.inf)
+            per_limit[f"{parameter}:{limit_name}"] = result
+
+            earlier = days < rul
+            rul = np.where(earlier, days, rul)
+            rul_lower = np.where(earlier, np.where(usable, result["days_lower"], np.inf), rul_lower)
+            rul_upper = np.where(earlier, np.where(usable, result["days_upper"], np.inf), rul_upper)
+            limiting[earlier] = f"{parameter}:{limit_name}"
+
+    rul[~enough_data] = np.nan
+    rul_lower[~enough_data] = np.nan
+    rul_upper[~enough_data] = np.nan
+
+    return {
+        "rul_days": rul,
+        "rul_lower": rul_lower,
+        "rul_upper": rul_upper,
+        "limiting_parameter": limiting,
+        "per_limit": per_limit,
+        "confidence": confidence,
+        "standard": "ISO 13381-1:2015 Clause 6"
+    }
@@ -0,0 +1,45 @@
+"""
+Normal quantiles without a SciPy dependency
+Shared by the Mahalanobis thresholds (cohort_anomaly) and the RUL
+confidence bounds (prognostics).
+"""
+
+import math
+
+
+# Acklam's rational approximation of the inverse normal CDF (|rel. error| < 1.2e-9)
+_NORMAL_A = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+             1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+_NORMAL_B = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+             6.680131188771972e+01, -1.328068155288572e+01)
+_NORMAL_C = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+             -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+_NORMAL_D = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+             3.754408661907416e+00)
+_NORMAL_TAIL = 0.02425
+
+
+def _polyval(coefficients, x):
+    result = 0.0
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+def normal_quantile(probability):
+    """
+    Standard normal quantile (inverse CDF) without SciPy
+
+    Raises:
+    -------
+    ValueError : probability outside (0, 1)
+    """
+    if not 0.0 < probability < 1.0:
+        raise ValueError(f"probability must be in (0, 1), got {probability!r}")
+    if probability < _NORMAL_TAIL or probability > 1.0 - _NORMAL_TAIL:
+        q = math.sqrt(-2.0 * math.log(min(probability, 1.0 - probability)))
+        z = _polyval(_NORMAL_C, q) / (_polyval(_NORMAL_D, q) * q + 1.0)
+        return z if probability < _NORMAL_TAIL else -z
+    q = probability - 0.5
+    r = q * q
+    return _polyval(_NORMAL_A, r) * q / (_polyval(_NORMAL_B, r) * r + 1.0)
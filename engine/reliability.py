@@ -0,0 +1,207 @@
+"""
+Weibull Reliability Analysis
+IEC 61649:2008 - Weibull analysis with right-censored failure data
+"""
+
+import math
+
+import numpy as np
+
+
+# Key of the pooled levels; a missing pump_type / location is "" so it
+# never lands in a pooled cell
+POOLED = "*"
+
+# Hierarchy used when a (fault, pump_type, location) cell has too few failures
+_FALLBACK_LEVELS = (
+    lambda f, p, l: (f, p, l),
+    lambda f, p, l: (f, p, POOLED),
+    lambda f, p, l: (f, POOLED, POOLED)
+)
+
+
+def _attribute(value):
+    """Cell attribute of a record (None = not recorded -> "")"""
+    return "" if value is None else value
+
+
+def fit_weibull_groups(group_ids, durations, failed, n_groups=None, max_iter=50, tol=1e-8):
+    """
+    Maximum-likelihood Weibull fit for many groups at once
+
+    Uses the profile likelihood in the shape parameter k, solved by a
+    vectorized Newton iteration; every iteration is a handful of grouped sums.
+
+    Parameters:
+    -----------
+    group_ids : array of int
+        Group number (0..n_groups-1) for each record
+    durations : array of float
+        Time to failure or time in service when censored (days)
+    failed : array of bool
+        True for failures, False for right-censored records (still running
+        or removed for other reasons)
+    n_groups : int
+        Number of groups (defaults to max(group_ids) + 1)
+    max_iter : int
+        Newton iteration limit
+    tol : float
+        Convergence tolerance on the shape parameter
+
+    Returns:
+    --------
+    dict : Per-group arrays of shape (beta), scale (eta, days), MTBF (days),
+           record and failure counts
+    """
+    groups = np.asarray(group_ids, dtype=np.intp)
+    t = np.asarray(durations, dtype=float)
+    delta = np.asarray(failed, dtype=bool)
+
+    valid = np.isfinite(t) & (t > 0)
+    groups, t, delta = groups[valid], t[valid], delta[valid]
+    if n_groups is None:
+        n_groups = int(groups.max()) + 1 if groups.size else 0
+
+    n_records = np.bincount(groups, minlength=n_groups)
+    n_failures = np.bincount(groups, weights=delta, minlength=n_groups)
+
+    # Normalise by the group mean so t**k cannot overflow
+    t_ref = np.bincount(groups, weights=t, minlength=n_groups) / np.maximum(n_records, 1)
+    t_ref = np.where(t_ref > 0, t_ref, 1.0)
+    x = t / t_ref[groups]
+    log_x = np.log(x)
+
+    mean_log_failed = np.bincount(groups, weights=log_x * delta, minlength=n_groups) / np.maximum(n_failures, 1)
+
+    shape = np.full(n_groups, 1.5)
+    fittable = n_failures > 0
+    for _ in range(max_iter):
+        k = shape[groups]
+        xk = x**k
+        sum_xk = np.bincount(groups, weights=xk, minlength=n_groups)
+        sum_xk_log = np.bincount(groups, weights=xk * log_x, minlength=n_groups)
+        sum_xk_log2 = np.bincount(groups, weights=xk * log_x**2, minlength=n_groups)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = sum_xk_log / sum_xk
+            g = ratio - 1.0 / shape - mean_log_failed
+            g_prime = sum_xk_log2 / sum_xk - ratio**2 + 1.0 / shape**2
+            step = np.where(fittable & (g_prime > 0), g / g_prime, 0.0)
+
+        new_shape = np.clip(shape - step, 0.05, 20.0)
+        converged = np.all(np.abs(new_shape - shape) < tol)
+        shape = new_shape
+        if converged:
+            break
+
+    sum_xk = np.bincount(groups, weights=x**shape[groups], minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = t_ref * (sum_xk / n_failures) ** (1.0 / shape)
+    scale = np.where(fittable, scale, np.nan)
+    shape = np.where(fittable, shape, np.nan)
+
+    gamma_term = np.array([math.gamma(1.0 + 1.0 / k) if k == k else np.nan for k in shape])
+    mtbf = scale * gamma_term
+
+    return {
+        "shape": shape,
+        "scale": scale,
+        "mtbf_days": mtbf,
+        "n_records": n_records,
+        "n_failures": n_failures.astype(int)
+    }
+
+
+class ReliabilityModel:
+    """Cache of Weibull parameters keyed by (fault, pump_type, location)"""
+
+    def __init__(self, min_failures=3):
+        self.min_failures = min_failures
+        self.parameters = {}
+
+    def fit(self, fault_types, pump_types, locations, durations, failed):
+        """
+        Fit Weibull parameters for every (fault, pump_type, location) cell
+
+        Coarser pooled cells (fault, pump_type, POOLED) and (fault, POOLED,
+        POOLED) are fitted in the same batch so sparse cells can fall back
+        to them. Missing pump types / locations form their own "" cell.
+
+        Parameters:
+        -----------
+        fault_types, pump_types, locations : sequences of str
+            Record attributes (one entry per failure/repair record)
+        durations : array of float
+            Time to failure or censoring time (days)
+        failed : array of bool
+            Failure (True) or right-censored (False)
+
+        Returns:
+        --------
+        dict : Fitted parameters keyed by cell
+        """
+        fault_types = np.asarray(fault_types, dtype=object)
+        pump_types = np.array([_attribute(value) for value in pump_types], dtype=object)
+        locations = np.array([_attribute(value) for value in locations], dtype=object)
+        durations = np.asarray(durations, dtype=float)
+        failed = np.asarray(failed, dtype=bool)
+        n_records = len(durations)
+        pooled_column = np.full(n_records, POOLED, dtype=object)
+
+        # Stack all three aggregation levels into one batched fit
+        level_keys = [
+            (fault_types, pump_types, locations),
+            (fault_types, pump_types, pooled_column),
+            (fault_types, pooled_column, pooled_column)
+        ]
+        all_keys = []
+        for f, p, l in level_keys:
+            all_keys.extend(zip(f, p, l))
+
+        cells = {}
+        group_ids = np.fromiter(
+            (cells.setdefault(key, len(cells)) for key in all_keys),
+            dtype=np.intp,
+            count=len(all_keys)
+        )
+        fit = fit_weibull_groups(
+            group_ids,
+            np.tile(durations, len(level_keys)),
+            np.tile(failed, len(level_keys)),
+            n_groups=len(cells)
+        )
+
+        self.parameters = {
+            key: {
+                "shape": float(fit["shape"][gid]),
+                "scale": float(fit["scale"][gid]),
+                "mtbf_days": float(fit["mtbf_days"][gid]),
+                "n_records": int(fit["n_records"][gid]),
+                "n_failures": int(fit["n_failures"][gid]),
+                "standard": "IEC 61649:2008"
+            }
+            for key, gid in cells.items()
+        }
+        return self.parameters
+
+    def lookup(self, fault_type, pump_type=None, location=None):
+        """
+        Fitted parameters for a cell, falling back to pooled cells
+
+        Returns:
+        --------
+        dict : Weibull parameters, or None if no cell has enough failures
+        """
+        pump_type, location = _attribute(pump_type), _attribute(location)
+        for level in _FALLBACK_LEVELS:
+            params = self.parameters.get(level(fault_type, pump_type, location))
+            if params and params["n_failures"] >= self.min_failures:
+                return params
+        return None
+
+    def mtbf_days(self, fault_type, pump_type=None, location=None):
+        """
+        Weibull MTBF (days) for a cell, or None if not available
+        """
+        params = self.lookup(fault_type, pump_type, location)
+        return params["mtbf_days"] if params else None
@@ -3,7 +3,38 @@ Level 6: Risk Assessment & Action Plan
 ISO 45001 Annex A + API 581 RBI Methodology
 """
 
-def assess_risk_and_generate_plan(diagnosis, data):
+from .detector_registry import get_fault_hook
+from .fft_analyzer import AMBIENT_TEMP_C
+
+# Severity zone by overall vibration (mm/s), checked in order; below all = "A"
+SEVERITY_ZONE_LIMITS = (("D", 11.2), ("C", 7.1), ("B", 2.8))
+
+# Risk matrix (ISO 45001 Annex A): (severity, probability) -> (risk, timeline, priority)
+RISK_MATRIX = {
+    ("HIGH", "HIGH"): ("CRITICAL", "<4 hours", "IMMEDIATE SHUTDOWN"),
+    ("HIGH", "MEDIUM"): ("HIGH", "<24 hours", "CORRECTIVE MAINTENANCE"),
+    ("HIGH", "LOW"): ("MEDIUM", "<72 hours", "SCHEDULED MAINTENANCE"),
+    ("MEDIUM", "HIGH"): ("HIGH", "<24 hours", "CORRECTIVE MAINTENANCE"),
+    ("MEDIUM", "MEDIUM"): ("MEDIUM", "<7 days", "PLANNED MAINTENANCE"),
+    ("MEDIUM", "LOW"): ("LOW", "<30 days", "ROUTINE MONITORING"),
+    ("LOW", "HIGH"): ("MEDIUM", "<7 days", "PLANNED MAINTENANCE"),
+    ("LOW", "MEDIUM"): ("LOW", "<30 days", "ROUTINE MONITORING"),
+    ("LOW", "LOW"): ("LOW", "<90 days", "ROUTINE MONITORING")
+}
+
+# Base MTBF per fault type (days) before severity adjustments
+BASE_MTBF_DAYS = {
+    "ELECTRICAL_UNBALANCE": 45,
+    "MECHANICAL_UNBALANCE": 60,
+    "MISALIGNMENT": 30,
+    "BEARING_DEFECT": 21,
+    "CAVITATION": 14,
+    "NO_FAULT_DETECTED": 365
+}
+DEFAULT_MTBF_DAYS = 90
+
+
+def assess_risk_and_generate_plan(diagnosis, data, reliability=None):
     """
     Assess risk level and generate action plan with timeline
     
@@ -13,6 +44,8 @@ def assess_risk_and_generate_plan(diagnosis, data):
         Bayesian fusion diagnosis result
     data : dict
         Dictionary containing all measurement data
+    reliability : ReliabilityModel
+        Optional fitted Weibull model (engine.reliability) for base MTBF
     
     Returns:
     --------
@@ -24,14 +57,7 @@ def assess_risk_and_generate_plan(diagnosis, data):
     
     # Get severity zone
     vibration_max = data.get("vibration_max_avr", 0)
-    if vibration_max > 11.2:
-        severity_zone = "D"
-    elif vibration_max > 7.1:
-        severity_zone = "C"
-    elif vibration_max > 2.8:
-        severity_zone = "B"
-    else:
-        severity_zone = "A"
+    severity_zone = next((zone for zone, limit in SEVERITY_ZONE_LIMITS if vibration_max > limit), "A")
     
     # Calculate severity based on ISO 45001 Annex A
     if confidence > 90 and severity_zone == "C":
@@ -45,7 +71,7 @@ def assess_risk_and_generate_plan(diagnosis, data):
         severity_description = "Minor issue - routine monitoring acceptable"
     
     # Calculate probability based on MTBF estimation
-    mtbf_days = estimate_mtbf(primary_fault, data)
+    mtbf_days = estimate_mtbf(primary_fault, data, reliability)
     
     if mtbf_days < 7:
         probability_level = "HIGH"
@@ -58,19 +84,7 @@ def assess_risk_and_generate_plan(diagnosis, data):
         probability_description = "Failure unlikely within 90 days"
     
     # Risk matrix (ISO 45001 Annex A)
-    risk_matrix = {
-        ("HIGH", "HIGH"): ("CRITICAL", "<4 hours", "IMMEDIATE SHUTDOWN"),
-        ("HIGH", "MEDIUM"): ("HIGH", "<24 hours", "CORRECTIVE MAINTENANCE"),
-        ("HIGH", "LOW"): ("MEDIUM", "<72 hours", "SCHEDULED MAINTENANCE"),
-        ("MEDIUM", "HIGH"): ("HIGH", "<24 hours", "CORRECTIVE MAINTENANCE"),
-        ("MEDIUM", "MEDIUM"): ("MEDIUM", "<7 days", "PLANNED MAINTENANCE"),
-        ("MEDIUM", "LOW"): ("LOW", "<30 days", "ROUTINE MONITORING"),
-        ("LOW", "HIGH"): ("MEDIUM", "<7 days", "PLANNED MAINTENANCE"),
-        ("LOW", "MEDIUM"): ("LOW", "<30 days", "ROUTINE MONITORING"),
-        ("LOW", "LOW"): ("LOW", "<90 days", "ROUTINE MONITORING")
-    }
-    
-    risk_level, timeline, action_priority = risk_matrix.get(
+    risk_level, timeline, action_priority = RISK_MATRIX.get(
         (severity_level, probability_level),
         ("MEDIUM", "<7 days", "PLANNED MAINTENANCE")
     )
@@ -92,7 +106,7 @@ def assess_risk_and_generate_plan(diagnosis, data):
     }
 
 
-def estimate_mtbf(fault_type, data):
+def estimate_mtbf(fault_type, data, reliability=None):
     """
     Estimate Mean Time Between Failures based on fault type and severity
     
@@ -102,22 +116,27 @@ def estimate_mtbf(fault_type, data):
         Type of detected fault
     data : dict
         Measurement data
+    reliability : ReliabilityModel
+        Optional fitted Weibull model; replaces the static base MTBF table
+        for (fault, pump_type, location) cells with enough failure history
     
     Returns:
     --------
     int : Estimated MTBF in days
     """
+    # Trend-based RUL (engine.prognostics) takes precedence over static table
+    rul_days = data.get("rul_days")
+    if rul_days is not None and rul_days == rul_days and rul_days != float("inf"):
+        return max(int(rul_days), 1)
+
     # Base MTBF values
-    base_mtbf = {
-        "ELECTRICAL_UNBALANCE": 45,
-        "MECHANICAL_UNBALANCE": 60,
-        "MISALIGNMENT": 30,
-        "BEARING_DEFECT": 21,
-        "CAVITATION": 14,
-        "NO_FAULT_DETECTED": 365
-    }
+    mtbf = BASE_MTBF_DAYS.get(fault_type, DEFAULT_MTBF_DAYS)
     
-    mtbf = base_mtbf.get(fault_type, 90)
+    # Fleet-derived Weibull MTBF (engine.reliability) when available
+    if reliability is not None:
+        weibull_mtbf = reliability.mtbf_days(fault_type, data.get("pump_type"), data.get("location"))
+        if weibull_mtbf is not None and weibull_mtbf == weibull_mtbf:
+            mtbf = max(int(weibull_mtbf), 1)
     
     # Adjust based on severity
     vibration_max = data.get("vibration_max_avr", 0)
@@ -136,8 +155,7 @@ def estimate_mtbf(fault_type, data):
     
     # Adjust for temperature
     temp_pump_de = data.get("temp_pump_de", 0)
-    ambient = 35
-    temp_rise = temp_pump_de - ambient
+    temp_rise = temp_pump_de - AMBIENT_TEMP_C
     
     if temp_rise > 60:
         mtbf = max(mtbf // 2, 2)  # Halve MTBF for overheating
@@ -263,4 +281,10 @@ def generate_recommendations(fault_type, data, mtbf_days, risk_level):
             "standard": "API 610 Clause 7.3.2"
         })
     
+    # Registered detectors (engine.detector_registry) supply their own actions
+    elif get_fault_hook(fault_type, "recommend"):
+        primary_rec, follow_up_recs = get_fault_hook(fault_type, "recommend")(data, mtbf_days, risk_level)
+        recommendations.insert(0, primary_rec)
+        recommendations.extend(follow_up_recs)
+    
     return recommendations
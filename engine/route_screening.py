@@ -0,0 +1,329 @@
+"""
+Route Fleet Screening - Layer 1 for a whole inspection route in one pass
+Parses a data-collector route export (CSV/Excel, one row per asset) and
+applies the engine.screening Layer 1 rules column-wise
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .screening import VELOCITY_POINTS, BEARINGS, npsh_available, screen_layer1
+from .input_schema import InputValidator
+from .baselines import BaselineTracker, BASELINE_FLAG_NAMES
+
+
+FOUNDATION_RIGID = "Rigid (Concrete)"
+FOUNDATION_FLEXIBLE = "Flexible (Steel Structure)"
+
+VELOCITY_COLUMNS = tuple(point.lower() for point in VELOCITY_POINTS)
+BAND_COLUMNS = tuple(f"{bearing.lower()}_band{band}" for bearing in BEARINGS for band in (1, 2, 3))
+NUMERIC_COLUMNS = (
+    "motor_kw", "npshr", "suction_pressure", "discharge_pressure",
+    "current_r", "current_s", "current_t", "actual_rpm"
+) + VELOCITY_COLUMNS + BAND_COLUMNS
+
+# Route-export header spellings seen on data collectors -> canonical column
+COLUMN_ALIASES = {
+    "asset": "asset_id",
+    "tag": "asset_id",
+    "equipment_id": "asset_id",
+    "area": "location",
+    "motor_power": "motor_kw",
+    "motor_power_kw": "motor_kw",
+    "kw": "motor_kw",
+    "foundation": "foundation_type",
+    "npshr_m": "npshr",
+    "suction": "suction_pressure",
+    "discharge": "discharge_pressure",
+    "rpm": "actual_rpm",
+    "current_r_phase": "current_r",
+    "current_s_phase": "current_s",
+    "current_t_phase": "current_t"
+}
+
+REQUIRED_COLUMNS = ("asset_id", "foundation_type") + NUMERIC_COLUMNS
+
+ANOMALY_SEVERITY_RANK = {"NORMAL": 0, "WARNING": 1, "DANGER": 2, "CRITICAL": 3}
+
+# Canonical unit and plausible range of each numeric route column
+ROUTE_UNITS = {
+    "motor_kw": "kW",
+    "npshr": "m",
+    "suction_pressure": "bar",
+    "discharge_pressure": "bar",
+    "current_r": "A",
+    "current_s": "A",
+    "current_t": "A",
+    "actual_rpm": "rpm",
+    **{column: "mm/s" for column in VELOCITY_COLUMNS},
+    **{column: "g" for column in BAND_COLUMNS}
+}
+
+ROUTE_RANGES = {
+    "motor_kw": (0.0, 20000.0),
+    "npshr": (0.0, 50.0),
+    "suction_pressure": (-1.0, 50.0),
+    "discharge_pressure": (-1.0, 250.0),
+    "current_r": (0.0, 5000.0),
+    "current_s": (0.0, 5000.0),
+    "current_t": (0.0, 5000.0),
+    "actual_rpm": (0.0, 6000.0),
+    **{column: (0.0, 100.0) for column in VELOCITY_COLUMNS},
+    **{column: (0.0, 50.0) for column in BAND_COLUMNS}
+}
+
+# Per-point baselines (engine.baselines): 10 velocities + 4 total accelerations
+BASELINE_POINTS = VELOCITY_COLUMNS + tuple(f"{bearing.lower()}_accel" for bearing in BEARINGS)
+BASELINE_FLOORS = (0.5,) * len(VELOCITY_COLUMNS) + (0.05,) * len(BEARINGS)   # mm/s, g
+
+ROUTE_RULES = (
+    ("discharge below suction", "discharge_pressure", ">=", "suction_pressure", 1.0),
+    ("motor rated power zero", "motor_kw", ">", 0.0, 1.0)
+)
+
+
+def _canonical_column(name):
+    """'B1 Band 1', 'b1-band1', 'Suction Pressure (bar)' -> b1_band1, suction_pressure"""
+    key = re.sub(r"\(.*?\)", "", str(name)).strip().lower()
+    key = re.sub(r"[^a-z0-9]+", "_", key).strip("_")
+    key = re.sub(r"band_(\d)", r"band\1", key)
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _canonical_foundation(values):
+    text = values.astype(str).str.strip().str.lower()
+    return np.where(text.str.startswith("flex"), FOUNDATION_FLEXIBLE, FOUNDATION_RIGID)
+
+
+def load_route_file(source, sheet_name=0, source_units=None):
+    """
+    Read a route export into a canonical route DataFrame
+
+    Parameters:
+    -----------
+    source : str or file object
+        Path or uploaded file; .xlsx/.xls are read with openpyxl, anything
+        else as CSV
+    sheet_name : str or int
+        Excel sheet holding the route
+    source_units : dict
+        Units of the export when they differ from ROUTE_UNITS, e.g.
+        {"mm/s": "in/s", "suction_pressure": "psi"}
+
+    Returns:
+    --------
+    DataFrame : One row per asset with canonical lower-case columns
+    """
+    name = str(getattr(source, "name", source)).lower()
+    if name.endswith((".xlsx", ".xls")):
+        route = pd.read_excel(source, sheet_name=sheet_name)
+    else:
+        route = pd.read_csv(source)
+    return normalize_route_frame(route, source_units)
+
+
+def normalize_route_frame(route, source_units=None):
+    """
+    Canonicalize headers, dtypes and units of a route DataFrame
+
+    Raises:
+    -------
+    ValueError : If required columns are missing
+    """
+    route = route.rename(columns=_canonical_column)
+    missing = [column for column in REQUIRED_COLUMNS if column not in route.columns]
+    if missing:
+        raise ValueError(f"Route file missing columns: {', '.join(missing)}")
+
+    route = route.dropna(subset=["asset_id"]).reset_index(drop=True)
+    route["asset_id"] = route["asset_id"].astype(str).str.strip()
+    if "location" not in route.columns:
+        route["location"] = ""
+    route["location"] = route["location"].fillna("").astype(str)
+    route["foundation_type"] = _canonical_foundation(route["foundation_type"])
+
+    numeric = list(NUMERIC_COLUMNS)
+    route[numeric] = route[numeric].apply(pd.to_numeric, errors="coerce").astype(float)
+    if source_units:
+        route = route_validator(source_units).validate(route)["data"]
+    return route
+
+
+@lru_cache(maxsize=32)
+def _route_validator(source_units):
+    return InputValidator(ROUTE_UNITS, ROUTE_RANGES, {"layer1": NUMERIC_COLUMNS}, ROUTE_RULES, dict(source_units))
+
+
+def route_validator(source_units=None):
+    """InputValidator for route DataFrames, compiled once per unit set"""
+    return _route_validator(tuple(sorted((source_units or {}).items())))
+
+
+def validate_route(route):
+    """
+    Per-row input checks of a canonical route (all Layer 1 inputs required)
+
+    Returns:
+    --------
+    dict : InputValidator.validate() result, rows in route order
+    """
+    return route_validator().validate(route[list(NUMERIC_COLUMNS)], "layer1")
+
+
+def route_point_values(route):
+    """
+    (n_assets, len(BASELINE_POINTS)) matrix: velocities (mm/s) then total
+    acceleration per bearing (g RMS over the three bands)
+    """
+    velocity = route[list(VELOCITY_COLUMNS)].to_numpy(dtype=float)
+    bands = route[list(BAND_COLUMNS)].to_numpy(dtype=float).reshape(len(route), len(BEARINGS), 3)
+    return np.hstack([velocity, np.sqrt(np.sum(bands**2, axis=2))])
+
+
+def new_route_baselines(**settings):
+    """BaselineTracker over the route Layer 1 points (BASELINE_POINTS)"""
+    return BaselineTracker(BASELINE_POINTS, floors=BASELINE_FLOORS, **settings)
+
+
+def screen_route(route, baselines=None, cohorts=None):
+    """
+    Layer 1 screening for every asset of a route in one vectorized pass
+
+    Produces the same anomaly decisions as screening.screen_layer1 per row.
+
+    Parameters:
+    -----------
+    route : DataFrame
+        Output of load_route_file / normalize_route_frame
+    baselines : BaselineTracker
+        Optional per-asset baselines (new_route_baselines()); readings are
+        also scored against each asset's own history and a baseline
+        WARNING/DANGER marks the asset anomalous. The tracker is not updated.
+    cohorts : CohortAnomalyDetector
+        Optional sister-pump comparison (engine.cohort_anomaly); call
+        cohorts.update(route) first so the route's own siblings are in the
+        cohort fit. A cohort outlier marks the asset anomalous.
+
+    Returns:
+    --------
+    DataFrame : Fleet table (one row per asset) with max velocity/acceleration,
+                worst point/bearing, per-parameter flags, anomaly counts and
+                overall status, sorted worst first
+    """
+    n_assets = len(route)
+    points = route_point_values(route)
+    velocity = points[:, :len(VELOCITY_COLUMNS)]
+    accel = points[:, len(VELOCITY_COLUMNS):]
+
+    # Zone limits (ISO 20816-1) by machine group and foundation
+    motor_kw = route["motor_kw"].to_numpy(dtype=float)
+    rigid = route["foundation_type"].to_numpy() == FOUNDATION_RIGID
+    group_2 = (motor_kw > 15) & (motor_kw <= 75)
+    zone_b = np.select([group_2 & rigid, group_2, rigid], [4.5, 7.1, 7.1], 11.2)
+    zone_c = np.select([group_2 & rigid, group_2, rigid], [7.1, 11.2, 11.2], 18.0)
+
+    velocity_danger = velocity > zone_c[:, None]
+    velocity_warning = (velocity > zone_b[:, None]) & ~velocity_danger
+    accel_critical = accel > 2.0
+    accel_danger = (accel > 1.0) & ~accel_critical
+    accel_warning = (accel > 0.3) & (accel <= 1.0)
+
+    currents = route[["current_r", "current_s", "current_t"]].to_numpy(dtype=float)
+    min_current = currents.min(axis=1)
+    max_current = currents.max(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        imbalance = np.where(min_current > 0, (max_current - min_current) / min_current * 100, 0.0)
+
+    npsha = npsh_available(route["suction_pressure"].to_numpy(dtype=float))
+    hydraulic_anomaly = npsha < route["npshr"].to_numpy(dtype=float) + 0.5
+    electrical_anomaly = imbalance > 10.0
+
+    velocity_anomalies = velocity_danger.sum(axis=1) + velocity_warning.sum(axis=1)
+    accel_anomalies = accel_critical.sum(axis=1) + accel_danger.sum(axis=1) + accel_warning.sum(axis=1)
+    anomaly_detected = (velocity_anomalies > 0) | (accel_anomalies > 0) | hydraulic_anomaly | electrical_anomaly
+    if baselines is not None:
+        baseline = baselines.score(route["asset_id"].tolist(), points)
+        anomaly_detected = anomaly_detected | (baseline["asset_flag"] > 0)
+    if cohorts is not None:
+        cohort = cohorts.score(route)
+        anomaly_detected = anomaly_detected | cohort["cohort_anomaly"].to_numpy()
+
+    status = np.select(
+        [accel_critical.any(axis=1),
+         velocity_danger.any(axis=1) | accel_danger.any(axis=1),
+         anomaly_detected],
+        ["CRITICAL", "DANGER", "WARNING"],
+        "NORMAL"
+    )
+
+    # NaN readings never trip a limit; argmax over them picks the first point
+    max_velocity = np.nanmax(np.where(np.isnan(velocity), -np.inf, velocity), axis=1)
+    max_accel = np.nanmax(np.where(np.isnan(accel), -np.inf, accel), axis=1)
+    worst_point = np.asarray(VELOCITY_POINTS)[np.argmax(np.nan_to_num(velocity, nan=-np.inf), axis=1)]
+    worst_bearing = np.asarray(BEARINGS)[np.argmax(np.nan_to_num(accel, nan=-np.inf), axis=1)]
+
+    fleet = pd.DataFrame({
+        "asset_id": route["asset_id"].to_numpy(),
+        "location": route["location"].to_numpy(),
+        "status": status,
+        "anomaly_detected": anomaly_detected,
+        "max_velocity": max_velocity,
+        "worst_point": worst_point,
+        "zone_b": zone_b,
+        "zone_c": zone_c,
+        "max_accel": max_accel,
+        "worst_bearing": worst_bearing,
+        "velocity_anomalies": velocity_anomalies,
+        "accel_anomalies": accel_anomalies,
+        "hydraulic_anomaly": hydraulic_anomaly,
+        "current_imbalance": imbalance,
+        "electrical_anomaly": electrical_anomaly,
+        "route_index": np.arange(n_assets)
+    })
+    if baselines is not None:
+        worst = baseline["worst_point"]
+        fleet.insert(len(fleet.columns) - 1, "baseline_status", np.asarray(BASELINE_FLAG_NAMES)[baseline["asset_flag"]])
+        fleet.insert(len(fleet.columns) - 1, "baseline_point", np.asarray(BASELINE_POINTS)[worst])
+        fleet.insert(len(fleet.columns) - 1, "baseline_ratio", baseline["ratio"][np.arange(n_assets), worst])
+    if cohorts is not None:
+        for column in ("cohort_anomaly", "cohort_distance", "cohort_threshold", "cohort_feature", "cohort_size"):
+            fleet.insert(len(fleet.columns) - 1, column, cohort[column].to_numpy())
+    fleet["_rank"] = fleet["status"].map(ANOMALY_SEVERITY_RANK)
+    fleet = fleet.sort_values(["_rank", "max_velocity", "max_accel"], ascending=False, kind="stable")
+    return fleet.drop(columns="_rank").reset_index(drop=True)
+
+
+def route_row_inputs(route, route_index):
+    """
+    Single-asset inputs (app.py widget values) for one route row
+
+    Returns:
+    --------
+    dict : Canonical column -> value, used to pre-fill the drill-down form
+    """
+    row = route.iloc[int(route_index)]
+    return {column: row[column] for column in route.columns}
+
+
+def route_row_layer1(route, route_index):
+    """
+    Full Layer 1 result dict for one route row (drill-down detail)
+    """
+    row = route.iloc[int(route_index)]
+    return screen_layer1(
+        velocity_values={point: float(row[point.lower()]) for point in VELOCITY_POINTS},
+        accel_values={
+            bearing: float(np.sqrt(sum(row[f"{bearing.lower()}_band{band}"]**2 for band in (1, 2, 3))))
+            for bearing in BEARINGS
+        },
+        suction_pressure=float(row["suction_pressure"]),
+        discharge_pressure=float(row["discharge_pressure"]),
+        npshr=float(row["npshr"]),
+        currents=(float(row["current_r"]), float(row["current_s"]), float(row["current_t"])),
+        actual_rpm=float(row["actual_rpm"]),
+        motor_kw=float(row["motor_kw"]),
+        foundation_type=row["foundation_type"]
+    )
@@ -4,6 +4,15 @@ API 670 Annex G Table G.1 + OSHA 1910.147
 Hard shutdown criteria - no probabilistic assessment
 """
 
+# Shutdown limits (shared with engine.batch_engine)
+SHUTDOWN_LIMITS = {
+    "bearing_temp_c": 120,          # API 610 Table 8.4.3-1
+    "vibration_mm_s": 11.2,         # ISO 10816-3 Zone D (Group 3)
+    "p_dis_fluctuation_pct": 15,    # API 610 Clause 7.3.4
+    "load_factor_pct": 110          # IEC 60034-1 Table 3
+}
+
+
 def safety_gates_check(data):
     """
     Check for critical safety hazards requiring immediate shutdown
@@ -23,7 +32,7 @@ def safety_gates_check(data):
     temp_motor_max = max(data.get("temp_motor_de", 0), data.get("temp_motor_nde", 0))
     temp_pump_max = max(data.get("temp_pump_de", 0), data.get("temp_pump_nde", 0))
     
-    if temp_motor_max > 120:
+    if temp_motor_max > SHUTDOWN_LIMITS["bearing_temp_c"]:
         shutdown_triggers.append({
             "parameter": "Motor Bearing Temperature",
             "component": "Motor",
@@ -35,7 +44,7 @@ def safety_gates_check(data):
             "severity": "CRITICAL"
         })
     
-    if temp_pump_max > 120:
+    if temp_pump_max > SHUTDOWN_LIMITS["bearing_temp_c"]:
         shutdown_triggers.append({
             "parameter": "Pump Bearing Temperature",
             "component": "Pump",
@@ -49,7 +58,7 @@ def safety_gates_check(data):
     
     # Trigger 2: Vibration Zone D (>11.2 mm/s for Group 3)
     vibration_max = data.get("vibration_max_avr", 0)
-    if vibration_max > 11.2:
+    if vibration_max > SHUTDOWN_LIMITS["vibration_mm_s"]:
         shutdown_triggers.append({
             "parameter": "Vibration Velocity",
             "component": "Overall",
@@ -63,7 +72,7 @@ def safety_gates_check(data):
     
     # Trigger 3: Hydraulic surge (>15% pressure fluctuation)
     p_dis_fluct = data.get("p_dis_fluctuation", 0)
-    if p_dis_fluct > 15:
+    if p_dis_fluct > SHUTDOWN_LIMITS["p_dis_fluctuation_pct"]:
         shutdown_triggers.append({
             "parameter": "Discharge Pressure Fluctuation",
             "component": "Hydraulic",
@@ -80,7 +89,7 @@ def safety_gates_check(data):
     current_avg = (data.get("current_r", 0) + data.get("current_s", 0) + data.get("current_t", 0)) / 3
     load_factor = (current_avg / flc) * 100 if flc > 0 else 0
     
-    if load_factor > 110:
+    if load_factor > SHUTDOWN_LIMITS["load_factor_pct"]:
         shutdown_triggers.append({
             "parameter": "Motor Load Factor",
             "component": "Electrical",
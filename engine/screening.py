@@ -0,0 +1,574 @@
+"""
+3-Layer Screening Engine (production path used by app.py)
+Layer 1: Overall Screening - ISO 20816-1:2016, ISO 15243:2017
+Layer 2: FFT Fault Identification - 1X/2X features per bearing
+Layer 3: Advanced Differentiation - coast-down mechanical vs electrical unbalance
+"""
+
+import math
+
+
+VELOCITY_POINTS = ("B1_H", "B1_V", "B1_A", "B2_H", "B2_V", "B3_H", "B3_V", "B3_A", "B4_H", "B4_V")
+BEARINGS = ("B1", "B2", "B3", "B4")
+
+RADIAL_LOCATIONS = {
+    "Motor DE (B1)": "motor_de",
+    "Motor NDE (B2)": "motor_nde",
+    "Pump DE (B3)": "pump_de",
+    "Pump NDE (B4)": "pump_nde"
+}
+
+AXIAL_LOCATIONS = {
+    "Motor DE (B1)": "motor_de",
+    "Pump DE (B3)": "pump_de"
+}
+
+# Static head of 1 bar of water (m) - converts gauge suction pressure to
+# head so it can be compared with NPSHr from the pump curve
+BAR_TO_METRES_HEAD = 10.197
+
+# NPSHa for BBM service (API 610 Clause 7.3.2, gauge suction pressure):
+# atmospheric head of water at sea level, less a vapour-pressure and
+# suction-loss allowance
+ATMOSPHERIC_HEAD_M = 10.33
+NPSH_LOSS_ALLOWANCE_M = 0.5
+
+FAULT_DISPLAY = {
+    "misalignment": "MISALIGNMENT",
+    "unbalance": "UNBALANCE",
+    "looseness": "MECHANICAL LOOSENESS",
+    "bearing_defect": "BEARING DEFECT",
+    "no_significant_fault": "NO SIGNIFICANT FAULT"
+}
+
+
+def get_machine_group(motor_kw):
+    """
+    Machine group from motor power (ISO 20816-1 / ISO 10816-3)
+
+    Returns:
+    --------
+    tuple : (group number, display label)
+    """
+    if motor_kw <= 15:
+        return 1, "Group 1 (≤15 kW) - Small Pumps/Fans"
+    elif motor_kw <= 75:
+        return 2, "Group 2 (15-75 kW) - Small Product Pumps"
+    else:
+        return 3, "Group 3 (>75 kW) - BBM Transfer Pumps"
+
+
+def get_velocity_zone_limits(group_num, foundation_type):
+    """
+    Velocity zone limits by machine group and foundation type
+
+    Returns:
+    --------
+    tuple : (zone A limit, zone B limit, zone C limit) in mm/s
+    """
+    if group_num == 2:  # Group 2: 15-75 kW
+        if foundation_type == "Rigid (Concrete)":
+            return 1.8, 4.5, 7.1
+        return 2.8, 7.1, 11.2
+    else:  # Group 3: >75 kW
+        if foundation_type == "Rigid (Concrete)":
+            return 2.8, 7.1, 11.2
+        return 4.5, 11.2, 18.0
+
+
+def total_acceleration(band1, band2, band3):
+    """Total acceleration 0.5-16 kHz (g RMS) from the three bands"""
+    return math.sqrt(band1**2 + band2**2 + band3**2)
+
+
+def suction_head(suction_pressure, specific_gravity=1.0):
+    """Suction head (m) from gauge suction pressure (bar)"""
+    return suction_pressure * BAR_TO_METRES_HEAD / specific_gravity
+
+
+def npsh_available(suction_pressure, specific_gravity=1.0):
+    """
+    NPSHa (m) from gauge suction pressure (bar) - the one definition shared
+    by Layer 1 screening, route screening and the Level 3/5 engine checks
+    (scalars or NumPy arrays)
+    """
+    return (suction_head(suction_pressure, specific_gravity) + ATMOSPHERIC_HEAD_M / specific_gravity
+            - NPSH_LOSS_ALLOWANCE_M)
+
+
+def current_imbalance(currents):
+    """Current imbalance in % ((max - min) / min)"""
+    max_current = max(currents)
+    min_current = min(currents)
+    if min_current > 0:
+        return ((max_current - min_current) / min_current) * 100
+    return 0.0
+
+
+def screen_layer1(velocity_values, accel_values, suction_pressure, discharge_pressure,
+                  npshr, currents, actual_rpm, motor_kw, foundation_type):
+    """
+    Layer 1: Overall screening of velocity, acceleration, hydraulic and
+    electrical parameters
+
+    Parameters:
+    -----------
+    velocity_values : dict
+        Velocity RMS (mm/s) per point, keys in VELOCITY_POINTS
+    accel_values : dict
+        Total acceleration (g) per bearing, keys in BEARINGS
+    suction_pressure : float
+        Suction pressure
+    discharge_pressure : float
+        Discharge pressure
+    npshr : float
+        NPSHr from pump curve (m)
+    currents : tuple
+        (R, S, T) phase currents (A)
+    actual_rpm : float
+        Measured running speed
+    motor_kw : float
+        Motor power (kW) - selects the machine group
+    foundation_type : str
+        "Rigid (Concrete)" or "Flexible (Steel Structure)"
+
+    Returns:
+    --------
+    dict : Layer 1 result (values, thresholds, anomaly lists and flags)
+    """
+    group_num, _ = get_machine_group(motor_kw)
+    _, zone_b_limit, zone_c_limit = get_velocity_zone_limits(group_num, foundation_type)
+    imbalance = current_imbalance(currents)
+
+    layer1_result = {
+        'velocity_values': dict(velocity_values),
+        'accel_values': dict(accel_values),
+        'hydraulic': {
+            'suction': suction_pressure,
+            'suction_head': suction_head(suction_pressure),
+            'npsha': npsh_available(suction_pressure),
+            'discharge': discharge_pressure,
+            'npshr': npshr
+        },
+        'electrical': {
+            'imbalance': imbalance,
+            'rpm': actual_rpm
+        },
+        'thresholds': {
+            'zone_b': zone_b_limit,
+            'zone_c': zone_c_limit,
+            'accel_warning': 0.3,  # ISO 15243 Stage 1 threshold
+            'accel_danger': 1.0    # ISO 15243 Stage 2 threshold
+        }
+    }
+
+    # Determine severity per point and overall anomaly detection
+    velocity_anomalies = []
+    for point, value in layer1_result['velocity_values'].items():
+        if value > zone_c_limit:
+            velocity_anomalies.append((point, value, "DANGER"))
+        elif value > zone_b_limit:
+            velocity_anomalies.append((point, value, "WARNING"))
+
+    accel_anomalies = []
+    for bearing, value in layer1_result['accel_values'].items():
+        if value > 2.0:
+            accel_anomalies.append((bearing, value, "CRITICAL"))
+        elif value > 1.0:
+            accel_anomalies.append((bearing, value, "DANGER"))
+        elif value > 0.3:
+            accel_anomalies.append((bearing, value, "WARNING"))
+
+    # Hydraulic check: NPSHa (m) vs NPSHr (m) with 0.5m safety margin
+    hydraulic_anomaly = layer1_result['hydraulic']['npsha'] < (npshr + 0.5)
+
+    # Electrical check
+    electrical_anomaly = imbalance > 10.0
+
+    # Overall anomaly detection
+    layer1_anomaly = len(velocity_anomalies) > 0 or len(accel_anomalies) > 0 or hydraulic_anomaly or electrical_anomaly
+    layer1_result['anomaly_detected'] = layer1_anomaly
+    layer1_result['velocity_anomalies'] = velocity_anomalies
+    layer1_result['accel_anomalies'] = accel_anomalies
+    layer1_result['hydraulic_anomaly'] = hydraulic_anomaly
+    layer1_result['electrical_anomaly'] = electrical_anomaly
+
+    return layer1_result
+
+
+def _extract_1x_2x(peaks, fundamental_hz):
+    """1X and 2X amplitudes (±5% frequency window) and 2X/1X ratio"""
+    a1x = 0
+    a2x = 0
+    for p in peaks:
+        if abs(p['freq'] - fundamental_hz) / fundamental_hz <= 0.05:
+            a1x = p['amp']
+        if abs(p['freq'] - 2*fundamental_hz) / (2*fundamental_hz) <= 0.05:
+            a2x = p['amp']
+    return {
+        'a1x': a1x,
+        'a2x': a2x,
+        'r2x_1x': a2x / a1x if a1x > 0.1 else 0
+    }
+
+
+def extract_fft_features(fft_radial, fft_axial, actual_rpm):
+    """
+    1X/2X features per bearing location from the entered FFT peaks
+
+    Parameters:
+    -----------
+    fft_radial : dict
+        Bearing label (RADIAL_LOCATIONS key) -> list of {"freq", "amp"} peaks
+    fft_axial : dict
+        Bearing label (AXIAL_LOCATIONS key) -> list of {"freq", "amp"} peaks
+    actual_rpm : float
+        Measured running speed
+
+    Returns:
+    --------
+    dict : features[location]["radial"/"axial"] = {"a1x", "a2x", "r2x_1x"}
+    """
+    fundamental_hz = actual_rpm / 60.0
+
+    features = {
+        'motor_de': {'radial': {}, 'axial': {}},
+        'motor_nde': {'radial': {}},
+        'pump_de': {'radial': {}, 'axial': {}},
+        'pump_nde': {'radial': {}}
+    }
+
+    for loc_name, loc_key in RADIAL_LOCATIONS.items():
+        if loc_name in fft_radial:
+            features[loc_key]['radial'] = _extract_1x_2x(fft_radial[loc_name], fundamental_hz)
+
+    for loc_name, loc_key in AXIAL_LOCATIONS.items():
+        if loc_name in fft_axial:
+            features[loc_key]['axial'] = _extract_1x_2x(fft_axial[loc_name], fundamental_hz)
+
+    return features
+
+
+def analyze_layer2(fft_radial, fft_axial, accel_values, actual_rpm):
+    """
+    Layer 2: Fault identification and location from FFT features
+
+    Parameters:
+    -----------
+    fft_radial : dict
+        Radial peaks per bearing (see extract_fft_features)
+    fft_axial : dict
+        Axial peaks per DE bearing (see extract_fft_features)
+    accel_values : dict
+        Total acceleration (g) per bearing from Layer 1
+    actual_rpm : float
+        Measured running speed
+
+    Returns:
+    --------
+    dict : Primary fault, location, confidence, severity, fault scores
+           and the features used
+    """
+    fundamental_hz = actual_rpm / 60.0
+    features = extract_fft_features(fft_radial, fft_axial, actual_rpm)
+
+    # Check misalignment (axial 2X/1X ratio > 1.5)
+    mis_score = 0
+    mis_location = None
+    if 'axial' in features['motor_de'] and features['motor_de']['axial'].get('r2x_1x', 0) > 1.5:
+        mis_score += 2.0
+        mis_location = "motor"
+    if 'axial' in features['pump_de'] and features['pump_de']['axial'].get('r2x_1x', 0) > 1.5:
+        mis_score += 2.0
+        mis_location = "pump" if mis_score == 2.0 else "coupling"
+
+    # Calculate radial averages for unbalance detection
+    motor_radial_avg = 0
+    pump_radial_avg = 0
+    radial_count = 0
+
+    for loc in ['motor_de', 'motor_nde']:
+        if 'radial' in features[loc] and features[loc]['radial'].get('a1x', 0) > 0:
+            motor_radial_avg += features[loc]['radial']['a1x']
+            radial_count += 1
+
+    if radial_count > 0:
+        motor_radial_avg /= radial_count
+
+    radial_count = 0
+    for loc in ['pump_de', 'pump_nde']:
+        if 'radial' in features[loc] and features[loc]['radial'].get('a1x', 0) > 0:
+            pump_radial_avg += features[loc]['radial']['a1x']
+            radial_count += 1
+
+    if radial_count > 0:
+        pump_radial_avg /= radial_count
+
+    # Unbalance score
+    unb_score = 0
+    unb_location = None
+    if pump_radial_avg > 3.0 and pump_radial_avg > motor_radial_avg * 1.5:
+        unb_score += 3.0
+        unb_location = "pump"
+    elif motor_radial_avg > 3.0 and motor_radial_avg > pump_radial_avg * 1.5:
+        unb_score += 3.0
+        unb_location = "motor"
+
+    # Looseness score (harmonics detection)
+    loo_score = 0
+    harmonic_count = 0
+
+    for loc in ['motor_de', 'motor_nde', 'pump_de', 'pump_nde']:
+        if 'radial' in features[loc]:
+            if features[loc]['radial'].get('a1x', 0) > 0.5:
+                harmonic_count += 1
+
+    for loc in ['motor_de', 'pump_de']:
+        if 'axial' in features[loc]:
+            if features[loc]['axial'].get('a1x', 0) > 0.5:
+                harmonic_count += 1
+
+    if harmonic_count > 4:  # >40% of spectra show harmonics
+        loo_score = 3.0
+
+    # Bearing defect score
+    bearing_score = 0
+    bearing_location = None
+    max_accel = max(accel_values.values())
+    if max_accel > 2.0:
+        bearing_score = min(5.0, max_accel * 0.8)
+        bearing_location = max(accel_values, key=accel_values.get)
+
+    # Determine primary fault
+    fault_scores = {
+        'misalignment': mis_score,
+        'unbalance': unb_score,
+        'looseness': loo_score,
+        'bearing_defect': bearing_score
+    }
+    primary_fault = max(fault_scores, key=fault_scores.get)
+    primary_score = fault_scores[primary_fault]
+
+    # If no significant fault but acceleration high, prioritize bearing defect
+    if primary_score < 2.5 and bearing_score > 0:
+        primary_fault = 'bearing_defect'
+        primary_score = bearing_score
+
+    # Determine fault location
+    if primary_fault == 'misalignment':
+        fault_location = mis_location if mis_location else "coupling"
+    elif primary_fault == 'unbalance':
+        fault_location = unb_location if unb_location else "unknown"
+    elif primary_fault == 'bearing_defect':
+        fault_location = bearing_location if bearing_location else "unknown"
+    elif primary_fault == 'looseness':
+        fault_location = "structure"
+    else:
+        fault_location = None
+
+    return {
+        'primary_fault': primary_fault,
+        'fault_location': fault_location,
+        'confidence': min(95, 70 + primary_score * 5),
+        'severity': 'Unacceptable' if primary_score >= 4.0 else 'Unsatisfactory' if primary_score >= 3.0 else 'Satisfactory',
+        'fault_scores': fault_scores,
+        'features': features,
+        'fundamental_hz': fundamental_hz,
+        'motor_radial_avg': motor_radial_avg,
+        'pump_radial_avg': pump_radial_avg,
+        'harmonic_count': harmonic_count,
+        'bearing_location': bearing_location
+    }
+
+
+def analyze_layer3(layer2_result, coast_down_time, coast_down_vel, demod_values):
+    """
+    Layer 3: Mechanical vs electrical unbalance from the coast-down test
+
+    Only applicable when Layer 2 identified unbalance and at least three
+    coast-down points were recorded.
+
+    Parameters:
+    -----------
+    layer2_result : dict
+        Output of analyze_layer2
+    coast_down_time : list
+        Time points (s) after motor switch-off
+    coast_down_vel : list
+        Velocity (mm/s) at each time point
+    demod_values : dict
+        Demodulation (gE) with keys motor_de, motor_nde, pump_de, pump_nde
+
+    Returns:
+    --------
+    dict : Unbalance type, confidence, evidence, recommendation and
+           bearing-masking check (None if Layer 3 does not apply)
+    """
+    need_layer3 = (layer2_result['primary_fault'] == 'unbalance')
+    if not (need_layer3 and coast_down_time and len(coast_down_vel) >= 3):
+        return None
+
+    # Coast-down analysis
+    if coast_down_time[1] - coast_down_time[0] > 0:
+        initial_drop = (coast_down_vel[0] - coast_down_vel[1]) / (coast_down_time[1] - coast_down_time[0])
+    else:
+        initial_drop = 0
+
+    # Mechanical unbalance: gradual decrease
+    if initial_drop < 1.5 and coast_down_vel[-1] < coast_down_vel[0] * 0.2:
+        unbalance_type = 'mechanical'
+        confidence = 85
+        evidence = [
+            f"Velocity decrease gradual: {coast_down_vel[0]:.1f} → {coast_down_vel[-1]:.1f} mm/s over {coast_down_time[-1]} seconds",
+            "Pattern consistent with mechanical unbalance (inertia-driven decay)"
+        ]
+        recommendation = "Lakukan dynamic balancing pada rotor"
+
+    # Electrical unbalance: rapid drop
+    elif initial_drop > 2.5 and len(coast_down_vel) > 2 and coast_down_vel[2] < coast_down_vel[0] * 0.4:
+        unbalance_type = 'electrical'
+        confidence = 85
+        evidence = [
+            f"Velocity drop rapid: {coast_down_vel[0]:.1f} → {coast_down_vel[2]:.1f} mm/s dalam {coast_down_time[2]} detik",
+            "Indikasi gangguan pada rotor bar atau stator winding"
+        ]
+        recommendation = "Periksa rotor bar (broken bar) dan stator winding dengan MCSA"
+    else:
+        unbalance_type = 'ambiguous'
+        confidence = 70
+        evidence = [f"Pola penurunan tidak jelas: initial drop rate = {initial_drop:.2f} mm/s²"]
+        recommendation = "Lakukan MCSA untuk konfirmasi atau lakukan balancing sebagai langkah aman pertama"
+
+    # Check for bearing defect masking
+    fault_location = layer2_result['fault_location']
+    demod_check = None
+    if fault_location == "pump" and demod_values['pump_de'] > 2.0:
+        demod_check = {
+            'warning': 'High demodulation value detected at Pump DE',
+            'interpretation': 'Unbalance mungkin masking early-stage bearing defect',
+            'action': 'After balancing, re-measure vibration. If velocity remains high, suspect bearing defect.'
+        }
+    elif fault_location == "motor" and demod_values['motor_de'] > 2.0:
+        demod_check = {
+            'warning': 'High demodulation value detected at Motor DE',
+            'interpretation': 'Electrical unbalance mungkin terkait bearing defect',
+            'action': 'Periksa bearing Motor DE setelah investigasi electrical fault'
+        }
+
+    return {
+        'unbalance_type': unbalance_type,
+        'confidence': confidence,
+        'evidence': evidence,
+        'recommendation': recommendation,
+        'demod_check': demod_check
+    }
+
+
+def assess_screening_risk(layer2_result, layer3_result):
+    """
+    Risk level, MTBF band and action timeline from Layer 2/3 results
+
+    Returns:
+    --------
+    dict : risk_level, mtbf_days (text band) and timeline
+    """
+    if layer2_result['severity'] == 'Unacceptable' or (layer3_result and layer3_result.get('unbalance_type') == 'electrical'):
+        return {"risk_level": "CRITICAL", "mtbf_days": "< 7", "timeline": "< 4 hours"}
+    elif layer2_result['severity'] == 'Unsatisfactory':
+        return {"risk_level": "HIGH", "mtbf_days": "7-30", "timeline": "< 72 hours"}
+    else:
+        return {"risk_level": "MEDIUM", "mtbf_days": "30-90", "timeline": "< 30 days"}
+
+
+def assess_screening_compliance(layer1_result):
+    """
+    Compliance badges shown after a full 3-layer diagnosis
+
+    Returns:
+    --------
+    dict : iso_20816_1, api_610 and iso_15243 status strings
+    """
+    max_vel = max(layer1_result['velocity_values'].values())
+    max_acc = max(layer1_result['accel_values'].values())
+
+    iso_status = "COMPLIANT" if max_vel <= layer1_result['thresholds']['zone_b'] else "NON-COMPLIANT"
+    api_status = "COMPLIANT" if not layer1_result['hydraulic_anomaly'] else "WARNING"
+
+    if max_acc < 0.3:
+        iso15243_status = "COMPLIANT (Stage 0)"
+    elif max_acc < 1.0:
+        iso15243_status = "STAGE 1"
+    elif max_acc < 2.0:
+        iso15243_status = "STAGE 2"
+    else:
+        iso15243_status = "STAGE 3"
+
+    return {
+        "iso_20816_1": iso_status,
+        "api_610": api_status,
+        "iso_15243": iso15243_status
+    }
+
+
+def run_screening(measurement):
+    """
+    Run the full 3-layer screening headlessly (batch jobs, workers)
+
+    Parameters:
+    -----------
+    measurement : dict
+        motor_kw, foundation_type, npshr, velocity_values, accel_bands
+        ({bearing: (0.5-1.5 kHz, 1.5-5 kHz, 5-16 kHz)}), suction_pressure,
+        discharge_pressure, currents, actual_rpm and - for Layer 2/3 -
+        fft_radial, fft_axial, coast_down_time, coast_down_vel, demod
+
+    Returns:
+    --------
+    dict : layer1, layer2, layer3, risk and compliance results (Layer 2/3
+           entries are None when Layer 1 finds no anomaly or their inputs
+           are missing)
+    """
+    accel_values = {
+        bearing: total_acceleration(*bands)
+        for bearing, bands in measurement['accel_bands'].items()
+    }
+    layer1_result = screen_layer1(
+        measurement['velocity_values'],
+        accel_values,
+        measurement['suction_pressure'],
+        measurement['discharge_pressure'],
+        measurement['npshr'],
+        measurement['currents'],
+        measurement['actual_rpm'],
+        measurement['motor_kw'],
+        measurement['foundation_type']
+    )
+
+    result = {
+        'layer1': layer1_result,
+        'layer2': None,
+        'layer3': None,
+        'risk': None,
+        'compliance': None
+    }
+    if not layer1_result['anomaly_detected'] or 'fft_radial' not in measurement:
+        return result
+
+    layer2_result = analyze_layer2(
+        measurement['fft_radial'],
+        measurement.get('fft_axial', {}),
+        accel_values,
+        measurement['actual_rpm']
+    )
+    layer3_result = analyze_layer3(
+        layer2_result,
+        measurement.get('coast_down_time', []),
+        measurement.get('coast_down_vel', []),
+        measurement.get('demod', {'motor_de': 0, 'motor_nde': 0, 'pump_de': 0, 'pump_nde': 0})
+    )
+
+    result['layer2'] = layer2_result
+    result['layer3'] = layer3_result
+    result['risk'] = assess_screening_risk(layer2_result, layer3_result)
+    result['compliance'] = assess_screening_compliance(layer1_result)
+    return result
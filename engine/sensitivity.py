@@ -0,0 +1,146 @@
+"""
+What-If Sensitivity Sweeps - decision-boundary maps of the diagnostic engine
+ISO 13379-1:2012 Clause 6 (diagnostic rule review)
+A base measurement is repeated over a 1-D or 2-D grid of one or two input
+fields and the whole grid is diagnosed as one batch (engine.batch_engine),
+e.g. "how far can p_suc drop before CAVITATION is detected" or "at what
+peak2_amp (2X/1X ratio) does this become MISALIGNMENT".
+"""
+
+import numpy as np
+
+from .batch_engine import FAULT_SLOTS, diagnose_batch
+from .measurement import FIELD_NAMES, TEXT_NAMES, as_measurement, empty_batch, numeric_matrix
+
+# Categorical maps (decision boundaries) and numeric maps returned by sweep()
+CATEGORICAL_MAPS = ("report_type", "zone", "primary_fault", "risk_level") + tuple(
+    f"{fault.lower()}_detected" for fault in FAULT_SLOTS
+)
+NUMERIC_MAPS = ("posterior", "max_velocity", "mtbf_days")
+
+MAX_GRID_POINTS = 1_000_000
+
+
+def sweep(base, grids, reliability=None):
+    """
+    Diagnose a base measurement over a grid of one or two input fields
+
+    Parameters:
+    -----------
+    base : Measurement or dict
+        Operating point; every field not swept keeps its base value
+    grids : dict
+        One or two numeric fields -> 1-D array of values to try
+        (e.g. {"p_suc": np.linspace(-0.9, 1.0, 400)})
+    reliability : ReliabilityModel
+        Optional fitted Weibull model, as for PumpDiagnosticEngine
+
+    Returns:
+    --------
+    dict : axes (field names), values (grid arrays), base (base value per
+           axis, NaN if not measured), shape, and maps - CATEGORICAL_MAPS
+           and NUMERIC_MAPS as arrays of that shape (first axis = first
+           field)
+
+    Raises:
+    -------
+    ValueError : On unknown fields, more than two axes or an oversized grid
+    """
+    record = as_measurement(base)
+    axes = tuple(grids)
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("A sweep needs one or two fields")
+    unknown = [field for field in axes if field not in FIELD_NAMES]
+    if unknown:
+        raise ValueError(f"Cannot sweep non-numeric or unknown fields: {', '.join(unknown)}")
+    values = tuple(np.asarray(grids[field], dtype=float).ravel() for field in axes)
+    shape = tuple(len(axis_values) for axis_values in values)
+    n_points = int(np.prod(shape))
+    if n_points > MAX_GRID_POINTS:
+        raise ValueError(f"Grid of {n_points} points exceeds {MAX_GRID_POINTS}")
+
+    batch = empty_batch(n_points)
+    matrix = numeric_matrix(batch)
+    matrix[:] = np.frombuffer(bytes(record._values), dtype="<f8")
+    for name in TEXT_NAMES:
+        batch[name] = getattr(record, name) or ""
+    mesh = np.meshgrid(*values, indexing="ij")
+    for field, grid in zip(axes, mesh):
+        matrix[:, FIELD_NAMES.index(field)] = grid.ravel()
+
+    result = diagnose_batch(batch, reliability)
+    maps = {name: result[name].reshape(shape) for name in ("report_type", "zone", "primary_fault", "risk_level")
+            + NUMERIC_MAPS}
+    for slot, fault in enumerate(FAULT_SLOTS):
+        maps[f"{fault.lower()}_detected"] = result["detected"][:, slot].reshape(shape)
+    return {
+        "axes": axes,
+        "values": values,
+        "base": tuple(getattr(record, field) for field in axes),
+        "shape": shape,
+        "maps": maps
+    }
+
+
+def decision_boundaries(result, name):
+    """
+    Where a categorical map changes along the first swept field
+
+    Parameters:
+    -----------
+    result : dict
+        sweep() result
+    name : str
+        One of CATEGORICAL_MAPS
+
+    Returns:
+    --------
+    list : Dicts with between (first-field values either side), at
+           (midpoint), from, to, margin (at - base value of the first
+           field) and, for a 2-D sweep, fixed (second-field value);
+           ordered by second-field value, then first-field value
+    """
+    grid = result["maps"][name]
+    first = result["values"][0]
+    base = result["base"][0]
+    if grid.ndim == 1:
+        grid = grid[:, None]
+        fixed_values = None
+    else:
+        fixed_values = result["values"][1]
+
+    changes = grid[1:] != grid[:-1]
+    steps, columns = np.nonzero(changes)
+    order = np.lexsort((steps, columns))
+    boundaries = []
+    for step, column in zip(steps[order], columns[order]):
+        at = (first[step] + first[step + 1]) / 2
+        boundary = {
+            "between": (float(first[step]), float(first[step + 1])),
+            "at": float(at),
+            "from": grid[step, column].item(),
+            "to": grid[step + 1, column].item(),
+            "margin": float(at - base)
+        }
+        if fixed_values is not None:
+            boundary["fixed"] = float(fixed_values[column])
+        boundaries.append(boundary)
+    return boundaries
+
+
+def boundary_mask(result, name):
+    """
+    Boolean map of grid points next to a change of a categorical map
+    (either axis) - the decision boundary for plotting
+    """
+    grid = result["maps"][name]
+    mask = np.zeros(grid.shape, dtype=bool)
+    for axis in range(grid.ndim):
+        lead = [slice(None)] * grid.ndim
+        trail = [slice(None)] * grid.ndim
+        lead[axis] = slice(None, -1)
+        trail[axis] = slice(1, None)
+        changed = grid[tuple(lead)] != grid[tuple(trail)]
+        mask[tuple(lead)] |= changed
+        mask[tuple(trail)] |= changed
+    return mask
@@ -0,0 +1,249 @@
+"""
+Streaming Safety Gates - Online telemetry
+API 670 Annex G Table G.1 + OSHA 1910.147 applied to 1-10 Hz sensor streams
+"""
+
+import numpy as np
+
+from .safety_gates import SHUTDOWN_LIMITS
+
+
+# Online channels per pump (one column each in every update frame)
+CHANNELS = (
+    "temp_motor_de",
+    "temp_motor_nde",
+    "temp_pump_de",
+    "temp_pump_nde",
+    "vibration_velocity",
+    "p_dis",
+    "current_r",
+    "current_s",
+    "current_t"
+)
+
+_CH = {name: index for index, name in enumerate(CHANNELS)}
+
+# Same shutdown criteria as safety_gates_check (Level 1) - limits from SHUTDOWN_LIMITS
+SAFETY_GATE_RULES = (
+    {
+        "parameter": "Motor Bearing Temperature",
+        "component": "Motor",
+        "threshold": float(SHUTDOWN_LIMITS["bearing_temp_c"]),
+        "threshold_text": f"{SHUTDOWN_LIMITS['bearing_temp_c']:g}°C",
+        "unit": "°C",
+        "standard": "API 610 Table 8.4.3-1",
+        "action": "IMMEDIATE SHUTDOWN - LOTO required"
+    },
+    {
+        "parameter": "Pump Bearing Temperature",
+        "component": "Pump",
+        "threshold": float(SHUTDOWN_LIMITS["bearing_temp_c"]),
+        "threshold_text": f"{SHUTDOWN_LIMITS['bearing_temp_c']:g}°C",
+        "unit": "°C",
+        "standard": "API 610 Table 8.4.3-1",
+        "action": "IMMEDIATE SHUTDOWN - LOTO required"
+    },
+    {
+        "parameter": "Vibration Velocity",
+        "component": "Overall",
+        "threshold": float(SHUTDOWN_LIMITS["vibration_mm_s"]),
+        "threshold_text": f"{SHUTDOWN_LIMITS['vibration_mm_s']:g} mm/s",
+        "unit": "mm/s",
+        "standard": "ISO 10816-3:2001 Clause 5.4",
+        "action": "IMMEDIATE SHUTDOWN - bearing damage imminent"
+    },
+    {
+        "parameter": "Discharge Pressure Fluctuation",
+        "component": "Hydraulic",
+        "threshold": float(SHUTDOWN_LIMITS["p_dis_fluctuation_pct"]),
+        "threshold_text": f"{SHUTDOWN_LIMITS['p_dis_fluctuation_pct']:g}%",
+        "unit": "%",
+        "standard": "API 610 Clause 7.3.4",
+        "action": "IMMEDIATE SHUTDOWN - surge protection required"
+    },
+    {
+        "parameter": "Motor Load Factor",
+        "component": "Electrical",
+        "threshold": float(SHUTDOWN_LIMITS["load_factor_pct"]),
+        "threshold_text": f"{SHUTDOWN_LIMITS['load_factor_pct']:g}%",
+        "unit": "%",
+        "standard": "IEC 60034-1 Table 3",
+        "action": "IMMEDIATE SHUTDOWN - overload protection"
+    }
+)
+
+
+class StreamingSafetyEvaluator:
+    """Vectorized safety-gate evaluation over per-channel ring buffers"""
+
+    def __init__(self, asset_ids, flc=500.0, buffer_size=64, fluctuation_window=20,
+                 debounce_samples=3, clear_samples=10, hysteresis=0.05):
+        """
+        Parameters:
+        -----------
+        asset_ids : list
+            Asset identifiers, one row per pump in every update frame
+        flc : float or array
+            Full load current per asset (A)
+        buffer_size : int
+            Ring buffer depth per channel (samples)
+        fluctuation_window : int
+            Samples used for the discharge pressure fluctuation (peak-to-peak
+            over mean); must not exceed buffer_size
+        debounce_samples : int
+            Consecutive samples above threshold before a gate trips
+        clear_samples : int
+            Consecutive samples below the hysteresis band before it clears
+        hysteresis : float
+            Clear band as a fraction below the trip threshold (0.05 = 5%)
+        """
+        self.asset_ids = list(asset_ids)
+        n_assets = len(self.asset_ids)
+        n_rules = len(SAFETY_GATE_RULES)
+
+        self.buffer_size = buffer_size
+        self.fluctuation_window = min(fluctuation_window, buffer_size)
+        self.debounce_samples = debounce_samples
+        self.clear_samples = clear_samples
+
+        # Precompiled thresholds (n_rules,) broadcast against (n_assets, n_rules)
+        self.trip_limits = np.array([rule["threshold"] for rule in SAFETY_GATE_RULES])
+        self.clear_limits = self.trip_limits * (1.0 - hysteresis)
+        self.flc = np.broadcast_to(np.asarray(flc, dtype=float), (n_assets,)).copy()
+
+        self.buffers = np.full((buffer_size, n_assets, len(CHANNELS)), np.nan)
+        self.latest = np.full((n_assets, len(CHANNELS)), np.nan)
+        self.sample_count = 0
+
+        self.rule_values = np.zeros((n_assets, n_rules))
+        self.tripped = np.zeros((n_assets, n_rules), dtype=bool)
+        self._above = np.zeros((n_assets, n_rules), dtype=np.int32)
+        self._below = np.zeros((n_assets, n_rules), dtype=np.int32)
+
+    def _evaluate_rules(self):
+        """Compute the five gate values for every asset from current buffers"""
+        latest = self.latest
+        values = self.rule_values
+
+        values[:, 0] = np.fmax(latest[:, _CH["temp_motor_de"]], latest[:, _CH["temp_motor_nde"]])
+        values[:, 1] = np.fmax(latest[:, _CH["temp_pump_de"]], latest[:, _CH["temp_pump_nde"]])
+        values[:, 2] = latest[:, _CH["vibration_velocity"]]
+
+        # Pressure fluctuation = peak-to-peak / mean over the recent window
+        filled = min(self.sample_count, self.buffer_size)
+        if filled >= self.fluctuation_window:
+            rows = (self.sample_count - 1 - np.arange(self.fluctuation_window)) % self.buffer_size
+            window = self.buffers[rows, :, _CH["p_dis"]]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                p_mean = np.nanmean(window, axis=0)
+                values[:, 3] = np.where(p_mean > 0, (np.nanmax(window, axis=0) - np.nanmin(window, axis=0)) / p_mean * 100, 0.0)
+        else:
+            values[:, 3] = 0.0
+
+        current_avg = latest[:, _CH["current_r"]:_CH["current_t"] + 1].sum(axis=1) / 3
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values[:, 4] = np.where(self.flc > 0, current_avg / self.flc * 100, 0.0)
+
+        # Channels never sampled cannot trip a gate
+        np.nan_to_num(values, copy=False, nan=0.0)
+        return values
+
+    def update(self, frame, timestamp=None):
+        """
+        Ingest one sample per channel for every asset and evaluate gates
+
+        Parameters:
+        -----------
+        frame : array (n_assets, n_channels)
+            New samples in CHANNELS order; NaN keeps the previous value
+        timestamp : float
+            Sample time, copied into emitted transitions
+
+        Returns:
+        --------
+        list : Gate transitions (TRIPPED / CLEARED) in safety_gates_check
+               trigger format, plus asset_id, state and timestamp
+        """
+        frame = np.asarray(frame, dtype=float)
+        self.buffers[self.sample_count % self.buffer_size] = frame
+        self.sample_count += 1
+        np.copyto(self.latest, frame, where=~np.isnan(frame))
+
+        values = self._evaluate_rules()
+        above = values > self.trip_limits
+        below = values < self.clear_limits
+
+        self._above = np.where(above, self._above + 1, 0)
+        self._below = np.where(below, self._below + 1, 0)
+
+        trips = ~self.tripped & (self._above >= self.debounce_samples)
+        clears = self.tripped & (self._below >= self.clear_samples)
+        if not (trips.any() or clears.any()):
+            return []
+
+        self.tripped |= trips
+        self.tripped &= ~clears
+        return self._transitions(trips, "TRIPPED", timestamp) + self._transitions(clears, "CLEARED", timestamp)
+
+    def update_block(self, frames, timestamps=None):
+        """
+        Ingest a block of frames (n_samples, n_assets, n_channels) in order
+        """
+        transitions = []
+        for index, frame in enumerate(frames):
+            timestamp = timestamps[index] if timestamps is not None else None
+            transitions.extend(self.update(frame, timestamp))
+        return transitions
+
+    def _transitions(self, mask, state, timestamp):
+        """Build trigger dicts for the (asset, rule) pairs set in mask"""
+        events = []
+        for asset_index, rule_index in zip(*np.nonzero(mask)):
+            rule = SAFETY_GATE_RULES[rule_index]
+            events.append({
+                "asset_id": self.asset_ids[asset_index],
+                "parameter": rule["parameter"],
+                "component": rule["component"],
+                "value": float(self.rule_values[asset_index, rule_index]),
+                "threshold": rule["threshold_text"],
+                "unit": rule["unit"],
+                "standard": rule["standard"],
+                "action": rule["action"],
+                "severity": "CRITICAL" if state == "TRIPPED" else "INFO",
+                "state": state,
+                "timestamp": timestamp
+            })
+        return events
+
+    def shutdown_required(self):
+        """
+        Boolean array - True for assets with at least one tripped gate
+        """
+        return self.tripped.any(axis=1)
+
+    def status(self, asset_id):
+        """
+        Current gate status of one asset in safety_gates_check format
+        """
+        asset_index = self.asset_ids.index(asset_id)
+        triggers = [
+            {
+                "parameter": rule["parameter"],
+                "component": rule["component"],
+                "value": float(self.rule_values[asset_index, rule_index]),
+                "threshold": rule["threshold_text"],
+                "unit": rule["unit"],
+                "standard": rule["standard"],
+                "action": rule["action"],
+                "severity": "CRITICAL"
+            }
+            for rule_index, rule in enumerate(SAFETY_GATE_RULES)
+            if self.tripped[asset_index, rule_index]
+        ]
+        return {
+            "shutdown_required": len(triggers) > 0,
+            "triggers": triggers,
+            "trigger_count": len(triggers),
+            "standard": "API 670 Annex G Table G.1 + OSHA 1910.147",
+            "safety_status": "CRITICAL" if len(triggers) > 0 else "SAFE"
+        }
@@ -0,0 +1,336 @@
+"""
+Trend Rollups - precomputed daily/weekly/monthly fleet aggregates
+Maintained inside the HistoryStore write transaction: only the buckets
+touched by new records are recomputed, from the indexed raw rows
+"""
+
+from collections import Counter
+
+import numpy as np
+
+
+PERIODS = ("day", "week", "month")
+SCOPES = {"asset": "asset_id", "location": "location"}
+COUNT_CATEGORIES = ("zone", "primary_fault", "risk_level")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_stats (
+    scope TEXT NOT NULL,
+    scope_key TEXT NOT NULL,
+    period TEXT NOT NULL,
+    parameter TEXT NOT NULL,
+    bucket_start REAL NOT NULL,
+    n INTEGER NOT NULL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    p95 REAL,
+    PRIMARY KEY (scope, scope_key, period, parameter, bucket_start)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rollup_counts (
+    scope TEXT NOT NULL,
+    scope_key TEXT NOT NULL,
+    period TEXT NOT NULL,
+    category TEXT NOT NULL,
+    bucket_start REAL NOT NULL,
+    value TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (scope, scope_key, period, category, bucket_start, value)
+) WITHOUT ROWID;
+"""
+
+# SQLite host-parameter budget per IN (...) list
+_KEY_CHUNK = 500
+
+
+def bucket_bounds(timestamps, period, utc_offset_hours=0.0):
+    """
+    Start and end (POSIX seconds) of the day/week/month bucket of each timestamp
+
+    Weeks start on Monday; boundaries are local midnight at utc_offset_hours.
+
+    Returns:
+    --------
+    tuple : (bucket_start, bucket_end) float64 arrays
+    """
+    offset = utc_offset_hours * 3600.0
+    local = (np.asarray(timestamps, dtype=float) + offset).astype("int64").astype("datetime64[s]")
+    days = local.astype("datetime64[D]")
+    if period == "day":
+        start, end = days, days + np.timedelta64(1, "D")
+    elif period == "week":
+        # 1970-01-01 was a Thursday -> Monday is day index 4 (mod 7)
+        start = days - ((days.astype("int64") + 3) % 7).astype("timedelta64[D]")
+        end = start + np.timedelta64(7, "D")
+    elif period == "month":
+        months = local.astype("datetime64[M]")
+        start, end = months.astype("datetime64[D]"), (months + np.timedelta64(1, "M")).astype("datetime64[D]")
+    else:
+        raise ValueError(f"Unknown rollup period: {period}")
+    to_seconds = lambda value: value.astype("datetime64[s]").astype("int64").astype(float) - offset
+    return to_seconds(start), to_seconds(end)
+
+
+def _grouped_stats(group, values):
+    """
+    n/min/max/mean/p95 of values per group index (NaN values ignored)
+
+    p95 uses linear interpolation, matching np.percentile
+    """
+    measured = ~np.isnan(values)
+    group, values = group[measured], values[measured]
+    order = np.lexsort((values, group))
+    group, values = group[order], values[order]
+    groups, first, counts = np.unique(group, return_index=True, return_counts=True)
+    if groups.size == 0:
+        return groups, counts, values[:0], values[:0], values[:0], values[:0]
+
+    last = first + counts - 1
+    means = np.add.reduceat(values, first) / counts
+    position = 0.95 * (counts - 1)
+    lower = np.floor(position).astype(int)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    p95 = values[first + lower] + (values[first + upper] - values[first + lower]) * fraction
+    return groups, counts, values[first], values[last], means, p95
+
+
+class TrendRollups:
+    """Daily/weekly/monthly aggregates per asset and per location"""
+
+    def __init__(self, conn, parameters, utc_offset_hours=0.0):
+        """
+        Parameters:
+        -----------
+        conn : sqlite3.Connection
+            HistoryStore connection (rollup tables live in the same file)
+        parameters : tuple
+            Trended measurement columns to aggregate
+        utc_offset_hours : float
+            Local time of the terminal for bucket boundaries (WIB = 7.0)
+        """
+        self.conn = conn
+        self.parameters = tuple(parameters)
+        self.utc_offset_hours = utc_offset_hours
+        self.conn.executescript(_SCHEMA)
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance (called inside the insert transaction)
+    # ------------------------------------------------------------------
+    def _affected(self, keys, timestamps):
+        """(period, key) -> set of bucket starts touched, and fetch range"""
+        timestamps = np.asarray(timestamps, dtype=float)
+        keys = np.asarray(keys, dtype=object)
+        affected = {}
+        range_start, range_end = np.inf, -np.inf
+        for period in PERIODS:
+            start, end = bucket_bounds(timestamps, period, self.utc_offset_hours)
+            range_start = min(range_start, start.min())
+            range_end = max(range_end, end.max())
+            affected[period] = set(zip(keys.tolist(), start.tolist()))
+        return affected, range_start, range_end
+
+    def _fetch(self, table, columns, scope_column, keys, range_start, range_end):
+        rows = []
+        keys = sorted(set(keys))
+        for chunk in range(0, len(keys), _KEY_CHUNK):
+            batch = keys[chunk:chunk + _KEY_CHUNK]
+            rows += self.conn.execute(
+                f"SELECT {scope_column}, timestamp, {', '.join(columns)} FROM {table} "
+                f"WHERE {scope_column} IN ({', '.join('?' * len(batch))}) "
+                f"AND timestamp >= ? AND timestamp < ?",
+                batch + [range_start, range_end]
+            ).fetchall()
+        return rows
+
+    def update_measurements(self, asset_ids, locations, timestamps):
+        """
+        Recompute measurement stats for the buckets touched by new rows
+        """
+        if not len(timestamps):
+            return
+        for scope, keys in (("asset", asset_ids), ("location", locations)):
+            affected, range_start, range_end = self._affected(keys, timestamps)
+            rows = self._fetch("measurements", self.parameters, SCOPES[scope], keys, range_start, range_end)
+            self._write_stats(scope, affected, rows)
+
+    def _write_stats(self, scope, affected, rows):
+        if not rows:
+            return
+        row_keys = np.array([row[0] for row in rows], dtype=object)
+        table = np.array([row[1:] for row in rows], dtype=float)
+        timestamps = table[:, 0]
+
+        upserts = []
+        for period in PERIODS:
+            bucket_start, _ = bucket_bounds(timestamps, period, self.utc_offset_hours)
+            wanted = np.array([(key, start) in affected[period]
+                               for key, start in zip(row_keys.tolist(), bucket_start.tolist())], dtype=bool)
+            if not wanted.any():
+                continue
+            key_values, key_index = np.unique(row_keys[wanted].astype(str), return_inverse=True)
+            start_values, start_index = np.unique(bucket_start[wanted], return_inverse=True)
+            group = key_index.ravel() * len(start_values) + start_index.ravel()
+            for position, parameter in enumerate(self.parameters, 1):
+                groups, counts, minima, maxima, means, p95 = _grouped_stats(group, table[wanted, position])
+                keys = key_values[groups // len(start_values)].tolist()
+                starts = start_values[groups % len(start_values)].tolist()
+                upserts += zip([scope] * len(groups), keys, [period] * len(groups), [parameter] * len(groups),
+                               starts, counts.tolist(), minima.tolist(), maxima.tolist(), means.tolist(),
+                               p95.tolist())
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO rollup_stats (scope, scope_key, period, parameter, bucket_start, "
+            "n, min, max, mean, p95) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            upserts
+        )
+
+    def update_diagnoses(self, asset_ids, locations, timestamps):
+        """
+        Recompute zone/fault/risk counts for the buckets touched by new rows
+        """
+        if not len(timestamps):
+            return
+        for scope, keys in (("asset", asset_ids), ("location", locations)):
+            affected, range_start, range_end = self._affected(keys, timestamps)
+            rows = self._fetch("diagnoses", COUNT_CATEGORIES, SCOPES[scope], keys, range_start, range_end)
+            self._write_counts(scope, affected, rows)
+
+    def _write_counts(self, scope, affected, rows):
+        if not rows:
+            return
+        timestamps = np.array([row[1] for row in rows], dtype=float)
+        deletes, inserts = [], []
+        for period in PERIODS:
+            bucket_start, _ = bucket_bounds(timestamps, period, self.utc_offset_hours)
+            counts = Counter()
+            for row, start in zip(rows, bucket_start.tolist()):
+                if (row[0], start) not in affected[period]:
+                    continue
+                for category, value in zip(COUNT_CATEGORIES, row[2:]):
+                    if value is not None:
+                        counts[(row[0], start, category, str(value))] += 1
+            deletes += [(scope, key, period, start) for key, start in affected[period]]
+            inserts += [(scope, key, period, category, start, value, n)
+                        for (key, start, category, value), n in counts.items()]
+
+        self.conn.executemany(
+            "DELETE FROM rollup_counts WHERE scope = ? AND scope_key = ? AND period = ? AND bucket_start = ?",
+            deletes
+        )
+        self.conn.executemany(
+            "INSERT INTO rollup_counts (scope, scope_key, period, category, bucket_start, value, n) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            inserts
+        )
+
+    def rebuild(self):
+        """Recompute every rollup from the raw history (e.g. after an offset change)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM rollup_stats")
+            self.conn.execute("DELETE FROM rollup_counts")
+            for table, update in (("measurements", self.update_measurements),
+                                  ("diagnoses", self.update_diagnoses)):
+                rows = self.conn.execute(f"SELECT asset_id, location, timestamp FROM {table}").fetchall()
+                if rows:
+                    asset_ids, locations, timestamps = zip(*rows)
+                    update(list(asset_ids), list(locations), list(timestamps))
+
+    # ------------------------------------------------------------------
+    # Dashboard reads
+    # ------------------------------------------------------------------
+    def stats(self, scope, scope_key, parameter, period="week", start=None, end=None):
+        """
+        Aggregates of one parameter for one asset or location, oldest first
+
+        Parameters:
+        -----------
+        scope : str
+            "asset" or "location"
+        scope_key : str
+            Asset ID or location name
+        parameter : str
+            Trended parameter (e.g. "velocity_rms")
+        period : str
+            "day", "week" or "month"
+        start, end : float
+            Inclusive POSIX range on bucket_start
+
+        Returns:
+        --------
+        dict : bucket_start, n, min, max, mean, p95 -> ndarrays
+        """
+        sql = ("SELECT bucket_start, n, min, max, mean, p95 FROM rollup_stats "
+               "WHERE scope = ? AND scope_key = ? AND period = ? AND parameter = ?")
+        params = [scope, scope_key, period, parameter]
+        if start is not None:
+            sql += " AND bucket_start >= ?"
+            params.append(float(start))
+        if end is not None:
+            sql += " AND bucket_start <= ?"
+            params.append(float(end))
+        rows = self.conn.execute(sql + " ORDER BY bucket_start", params).fetchall()
+        table = np.array(rows, dtype=float).reshape(len(rows), 6)
+        return {
+            "bucket_start": table[:, 0],
+            "n": table[:, 1].astype(int),
+            "min": table[:, 2],
+            "max": table[:, 3],
+            "mean": table[:, 4],
+            "p95": table[:, 5]
+        }
+
+    def location_asset_stats(self, location, parameter, period="week", statistic="max", start=None, end=None):
+        """
+        Per-pump aggregates for every asset at a location (dashboard grid)
+
+        Returns:
+        --------
+        tuple : (asset_ids list, bucket_starts ndarray, values ndarray of
+                 shape (n_assets, n_buckets), NaN where a pump has no data)
+        """
+        if statistic not in ("n", "min", "max", "mean", "p95"):
+            raise ValueError(f"Unknown rollup statistic: {statistic}")
+        sql = (f"SELECT scope_key, bucket_start, {statistic} FROM rollup_stats "
+               "WHERE scope = 'asset' AND period = ? AND parameter = ? "
+               "AND scope_key IN (SELECT DISTINCT asset_id FROM measurements WHERE location = ?)")
+        params = [period, parameter, location]
+        if start is not None:
+            sql += " AND bucket_start >= ?"
+            params.append(float(start))
+        if end is not None:
+            sql += " AND bucket_start <= ?"
+            params.append(float(end))
+        rows = self.conn.execute(sql, params).fetchall()
+        if not rows:
+            return [], np.zeros(0), np.zeros((0, 0))
+
+        keys, starts, values = zip(*rows)
+        asset_ids, asset_index = np.unique(np.array(keys, dtype=object), return_inverse=True)
+        buckets, bucket_index = np.unique(np.array(starts, dtype=float), return_inverse=True)
+        grid = np.full((len(asset_ids), len(buckets)), np.nan)
+        grid[asset_index, bucket_index] = np.array(values, dtype=float)
+        return list(asset_ids), buckets, grid
+
+    def counts(self, scope, scope_key, category, period="week", start=None, end=None):
+        """
+        Zone / fault / risk-level counts per bucket
+
+        Returns:
+        --------
+        dict : bucket_start -> {value: count}, oldest bucket first
+        """
+        sql = ("SELECT bucket_start, value, n FROM rollup_counts "
+               "WHERE scope = ? AND scope_key = ? AND period = ? AND category = ?")
+        params = [scope, scope_key, period, category]
+        if start is not None:
+            sql += " AND bucket_start >= ?"
+            params.append(float(start))
+        if end is not None:
+            sql += " AND bucket_start <= ?"
+            params.append(float(end))
+        result = {}
+        for bucket_start, value, n in self.conn.execute(sql + " ORDER BY bucket_start", params):
+            result.setdefault(bucket_start, {})[value] = n
+        return result
@@ -0,0 +1,266 @@
+"""
+Diagnosis Report Archive - ISO 45001 Clause 7.5.3 record retention
+Append-only length-prefixed records with a fixed-width sidecar index
+"""
+
+import json
+import mmap
+import os
+import struct
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from .report_generator import build_json_report
+
+
+DATA_MAGIC = b"PDAR\x01\x00\x00\x00"
+INDEX_MAGIC = b"PDAI\x02\x00\x00\x00"    # v2: 64-byte report_id
+
+# Record header: payload length, flags (bit 0 = zlib), CRC32 of payload
+_RECORD_HEADER = struct.Struct("<IBI")
+FLAG_ZLIB = 1
+
+# One fixed-width index entry per record - read directly with np.memmap;
+# IDs that do not fit their field are rejected, never truncated. report_id
+# is "DIAG-<YYYYMMDD>-<asset_id>-<counter>": 15 bytes + asset_id (S32) +
+# a counter of up to 17 digits
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("length", "<u4"),
+    ("timestamp", "<f8"),
+    ("asset_id", "S32"),
+    ("report_id", "S64"),
+    ("report_type", "S24")
+])
+
+
+def _index_field(field, value):
+    """UTF-8 bytes of an index string field (ValueError if wider than the field)"""
+    encoded = str(value).encode("utf-8")
+    width = INDEX_DTYPE[field].itemsize
+    if len(encoded) > width:
+        raise ValueError(f"{field} {value!r} is {len(encoded)} bytes; the archive index holds at most {width}")
+    return encoded
+
+
+class ReportArchive:
+    """Append-only diagnosis archive with memory-mapped random access"""
+
+    def __init__(self, path, compress=True):
+        """
+        Parameters:
+        -----------
+        path : str
+            Archive base path; creates <path>.pda (records) and <path>.pdi
+            (index) if they do not exist
+        compress : bool
+            zlib-compress record payloads (level 1)
+        """
+        self.data_path = path + ".pda"
+        self.index_path = path + ".pdi"
+        self.compress = compress
+
+        for file_path, magic in ((self.data_path, DATA_MAGIC), (self.index_path, INDEX_MAGIC)):
+            if not os.path.exists(file_path):
+                with open(file_path, "wb") as fh:
+                    fh.write(magic)
+            else:
+                with open(file_path, "rb") as fh:
+                    if fh.read(len(magic)) != magic:
+                        raise ValueError(f"{file_path} is not a diagnosis archive file")
+
+        self._data_fh = open(self.data_path, "ab")
+        self._index_fh = open(self.index_path, "ab")
+        self._count = (os.path.getsize(self.index_path) - len(INDEX_MAGIC)) // INDEX_DTYPE.itemsize
+        self._data_map = None
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Flush and release file handles and memory maps"""
+        self._release_maps()
+        for fh in (self._data_fh, self._index_fh):
+            if fh and not fh.closed:
+                fh.close()
+
+    def _release_maps(self):
+        if self._data_map is not None:
+            self._data_map.close()
+            self._data_map = None
+        self._index = None
+
+    def append(self, diagnosis_result, asset_info, timestamp=None):
+        """
+        Append one diagnosis (stored as the compact JSON report)
+
+        Parameters:
+        -----------
+        diagnosis_result : dict
+            Complete diagnosis result from engine
+        asset_info : dict
+            Asset information
+        timestamp : float
+            Diagnosis time (POSIX seconds); defaults to now
+
+        Returns:
+        --------
+        str : Report ID of the archived record
+
+        Raises:
+        -------
+        ValueError : asset_id longer than 32 bytes (UTF-8) - nothing is
+                     written
+        """
+        report_id = self._write_record(diagnosis_result, asset_info, timestamp)
+        self._flush()
+        return report_id
+
+    def _write_record(self, diagnosis_result, asset_info, timestamp):
+        timestamp = datetime.now().timestamp() if timestamp is None else float(timestamp)
+        report = build_json_report(diagnosis_result, asset_info)
+        report_id = f"DIAG-{datetime.fromtimestamp(timestamp).strftime('%Y%m%d')}-{asset_info.get('asset_id', 'XXX')}-{self._count:06d}"
+        report["report_metadata"]["report_id"] = report_id
+        report["report_metadata"]["archived_timestamp"] = timestamp
+
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        entry["timestamp"] = timestamp
+        entry["asset_id"] = _index_field("asset_id", asset_info.get("asset_id", "XXX"))
+        entry["report_id"] = _index_field("report_id", report_id)
+        entry["report_type"] = _index_field("report_type", diagnosis_result.get("report_type", ""))
+
+        payload = json.dumps(report, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+            flags |= FLAG_ZLIB
+
+        # Data first, then index - a crash leaves unindexed bytes, never a dangling entry
+        offset = self._data_fh.tell()
+        self._data_fh.write(_RECORD_HEADER.pack(len(payload), flags, zlib.crc32(payload)))
+        self._data_fh.write(payload)
+
+        entry["offset"] = offset
+        entry["length"] = len(payload)
+        self._index_fh.write(entry.tobytes())
+        self._count += 1
+        return report_id
+
+    def _flush(self):
+        self._data_fh.flush()
+        self._index_fh.flush()
+        self._release_maps()
+
+    def extend(self, report_pairs, timestamps=None):
+        """
+        Append many (diagnosis_result, asset_info) pairs
+
+        Returns:
+        --------
+        list : Report IDs in input order
+
+        Raises:
+        -------
+        ValueError : as append(); the pairs before the offending one stay
+                     archived
+        """
+        report_ids = []
+        try:
+            for position, (diagnosis_result, asset_info) in enumerate(report_pairs):
+                timestamp = timestamps[position] if timestamps is not None else None
+                report_ids.append(self._write_record(diagnosis_result, asset_info, timestamp))
+        finally:
+            self._flush()
+        return report_ids
+
+    @property
+    def index(self):
+        """Memory-mapped structured index (one entry per record)"""
+        if self._index is None:
+            size = os.path.getsize(self.index_path) - len(INDEX_MAGIC)
+            count = size // INDEX_DTYPE.itemsize
+            if count == 0:
+                self._index = np.zeros(0, dtype=INDEX_DTYPE)
+            else:
+                self._index = np.memmap(self.index_path, dtype=INDEX_DTYPE, mode="r",
+                                        offset=len(INDEX_MAGIC), shape=(count,))
+        return self._index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _map(self):
+        if self._data_map is None:
+            with open(self.data_path, "rb") as fh:
+                self._data_map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data_map
+
+    def read_raw(self, position):
+        """
+        Payload bytes of one record (decompressed JSON), without parsing it
+        """
+        entry = self.index[position]
+        data = self._map()
+        start = int(entry["offset"])
+        length, flags, crc = _RECORD_HEADER.unpack_from(data, start)
+        payload = data[start + _RECORD_HEADER.size:start + _RECORD_HEADER.size + length]
+        if zlib.crc32(payload) != crc:
+            raise ValueError(f"Archive record {position} failed CRC check")
+        return zlib.decompress(payload) if flags & FLAG_ZLIB else payload
+
+    def get(self, position):
+        """
+        Parsed JSON report for one record (only this record is decoded)
+        """
+        return json.loads(self.read_raw(position))
+
+    def find(self, asset_id=None, start=None, end=None, report_type=None):
+        """
+        Record positions matching the filters, using only the index
+
+        Parameters:
+        -----------
+        asset_id : str
+            Exact asset ID
+        start, end : float
+            Inclusive POSIX timestamp range
+        report_type : str
+            e.g. "EMERGENCY_SHUTDOWN"
+
+        Returns:
+        --------
+        ndarray : Matching record positions in archive order
+        """
+        index = self.index
+        mask = np.ones(len(index), dtype=bool)
+        if asset_id is not None:
+            mask &= index["asset_id"] == asset_id.encode("utf-8")
+        if start is not None:
+            mask &= index["timestamp"] >= start
+        if end is not None:
+            mask &= index["timestamp"] <= end
+        if report_type is not None:
+            mask &= index["report_type"] == report_type.encode("utf-8")
+        return np.nonzero(mask)[0]
+
+    def get_by_report_id(self, report_id):
+        """
+        Latest record with this report ID, or None
+        """
+        matches = np.nonzero(self.index["report_id"] == report_id.encode("utf-8"))[0]
+        return self.get(int(matches[-1])) if matches.size else None
+
+    def iter_reports(self, positions=None):
+        """
+        Yield parsed reports for the given positions (default: all)
+        """
+        if positions is None:
+            positions = range(len(self.index))
+        for position in positions:
+            yield self.get(int(position))
@@ -0,0 +1,372 @@
+"""
+PDF Compliance Report Renderer - AIM-004 Format
+Batch rendering with cached templates and a process pool (reportlab)
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+
+@lru_cache(maxsize=1)
+def _pdf_templates():
+    """
+    Build paragraph styles, table styles and page decorations once per process
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import mm
+    from reportlab.platypus import TableStyle
+
+    base = getSampleStyleSheet()
+    styles = {
+        "title": ParagraphStyle("AimTitle", parent=base["Title"], fontSize=15, textColor=colors.HexColor("#FF6B35"), spaceAfter=4),
+        "section": ParagraphStyle("AimSection", parent=base["Heading2"], fontSize=11.5, textColor=colors.HexColor("#1a365d"), spaceBefore=10, spaceAfter=4),
+        "body": ParagraphStyle("AimBody", parent=base["BodyText"], fontSize=9, leading=11.5),
+        "cell": ParagraphStyle("AimCell", parent=base["BodyText"], fontSize=8.5, leading=10.5)
+    }
+
+    grid = colors.HexColor("#dee2e6")
+    key_value = TableStyle([
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8.5),
+        ("BACKGROUND", (0, 0), (0, -1), colors.HexColor("#f8f9fa")),
+        ("GRID", (0, 0), (-1, -1), 0.4, grid),
+        ("VALIGN", (0, 0), (-1, -1), "TOP")
+    ])
+    header_row = TableStyle([
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8.5),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1a365d")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("GRID", (0, 0), (-1, -1), 0.4, grid),
+        ("VALIGN", (0, 0), (-1, -1), "TOP")
+    ])
+    status_colors = {
+        "COMPLIANT": colors.HexColor("#d4edda"),
+        "WARNING": colors.HexColor("#fff3cd"),
+        "NON-COMPLIANT": colors.HexColor("#f8d7da")
+    }
+
+    def draw_page(canvas, doc):
+        """Header and footer shared by every page"""
+        width, height = A4
+        canvas.saveState()
+        canvas.setFont("Helvetica-Bold", 8)
+        canvas.setFillColor(colors.HexColor("#1a365d"))
+        canvas.drawString(15 * mm, height - 10 * mm, "PUMP DIAGNOSTIC REPORT - PERTAMINA PATRA NIAGA")
+        canvas.drawRightString(width - 15 * mm, height - 10 * mm, "AIM-004")
+        canvas.setStrokeColor(colors.HexColor("#FF6B35"))
+        canvas.line(15 * mm, height - 12 * mm, width - 15 * mm, height - 12 * mm)
+        canvas.setFont("Helvetica", 7.5)
+        canvas.setFillColor(colors.HexColor("#6c757d"))
+        canvas.drawString(15 * mm, 9 * mm, "ISO 10816-3 | API 610 Ed.11 | IEC 60034-1 | ISO 15243 | ISO 45001")
+        canvas.drawRightString(width - 15 * mm, 9 * mm, f"Page {doc.page}")
+        canvas.restoreState()
+
+    return {
+        "styles": styles,
+        "key_value": key_value,
+        "header_row": header_row,
+        "status_colors": status_colors,
+        "draw_page": draw_page,
+        "page_size": A4,
+        "margin": 15 * mm,
+        "content_width": A4[0] - 30 * mm
+    }
+
+
+def _latin1(text):
+    """Core PDF fonts are Latin-1 only - drop emoji and other symbols"""
+    return str(text).encode("latin-1", "ignore").decode("latin-1").strip()
+
+
+def _markup(text):
+    """Free text for a Paragraph - Latin-1 with <, > and & escaped"""
+    return escape(_latin1(text))
+
+
+def _key_value_table(rows, templates):
+    from reportlab.platypus import Paragraph, Table
+
+    cell = templates["styles"]["cell"]
+    data = [[_latin1(key), Paragraph(_markup(value), cell)] for key, value in rows]
+    width = templates["content_width"]
+    table = Table(data, colWidths=[0.3 * width, 0.7 * width])
+    table.setStyle(templates["key_value"])
+    return table
+
+
+def build_report_story(diagnosis_result, asset_info):
+    """
+    Build the reportlab flowables for one diagnosis (AIM-004 sections)
+
+    Parameters:
+    -----------
+    diagnosis_result : dict
+        Complete diagnosis result from engine
+    asset_info : dict
+        Asset information
+
+    Returns:
+    --------
+    list : Flowables ready for a document template
+    """
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+    templates = _pdf_templates()
+    styles = templates["styles"]
+    now = datetime.now()
+    asset_id = asset_info.get("asset_id", "UNKNOWN")
+
+    story = [
+        Paragraph("Pump Diagnostic Report", styles["title"]),
+        _key_value_table([
+            ("Asset ID", asset_id),
+            ("Location", asset_info.get("location", "UNKNOWN")),
+            ("Pump Type", asset_info.get("pump_type", "UNKNOWN")),
+            ("Date", now.strftime("%d %b %Y")),
+            ("Report ID", f"DIAG-{now.strftime('%Y%m%d')}-{asset_info.get('asset_id', 'XXX')}")
+        ], templates),
+        Paragraph("Executive Summary", styles["section"])
+    ]
+
+    summary = [("Diagnosis", diagnosis_result["summary"]), ("Report Type", diagnosis_result.get("report_type", ""))]
+    if "audit_trail" in diagnosis_result:
+        summary.append(("Confidence", f"{diagnosis_result['audit_trail']['confidence_score']:.0f}%"))
+    if "level_6_risk" in diagnosis_result:
+        summary.append(("Risk Level", diagnosis_result["level_6_risk"]["risk_level"]))
+        summary.append(("Recommended Timeline", diagnosis_result["level_6_risk"]["action_timeline"]))
+    story.append(_key_value_table(summary, templates))
+
+    if "level_1_safety" in diagnosis_result and diagnosis_result["level_1_safety"]["triggers"]:
+        story.append(Paragraph("Safety Gates (API 670 Annex G)", styles["section"]))
+        story.append(_key_value_table([
+            (trigger["parameter"], f"{trigger['value']:.1f} {trigger['unit']} > {trigger['threshold']} - {trigger['action']} ({trigger['standard']})")
+            for trigger in diagnosis_result["level_1_safety"]["triggers"]
+        ], templates))
+
+    if "level_2_severity" in diagnosis_result:
+        zone = diagnosis_result["level_2_severity"]
+        story.append(Paragraph("Vibration Severity (ISO 10816-3:2001)", styles["section"]))
+        story.append(_key_value_table([
+            ("Zone Classification", zone["zone"]),
+            ("Maximum Velocity", f"{zone['velocity_rms']:.2f} mm/s"),
+            ("Zone B / C / D Limits", f"{zone['limit_b']:.1f} / {zone['limit_c']:.1f} / {zone['limit_d']:.1f} mm/s"),
+            ("Foundation Type", zone["foundation_type"]),
+            ("Status", zone["remark"]),
+            ("Action", zone["action"]),
+            ("Standard", zone["standard"])
+        ], templates))
+
+    if "level_5_bayesian" in diagnosis_result:
+        bayesian = diagnosis_result["level_5_bayesian"]
+        rows = [
+            ("Fault Type", bayesian["primary_fault"]),
+            ("Confidence", f"{bayesian['primary_confidence']:.0f}%"),
+            ("Evidence", bayesian["evidence_summary"])
+        ]
+        for fault in bayesian["secondary_faults"][:2]:
+            rows.append(("Secondary Fault", f"{fault['fault_type']} ({fault['posterior_probability']:.0f}% confidence)"))
+        story.append(Paragraph("Primary Diagnosis (Bayesian Fusion)", styles["section"]))
+        story.append(_key_value_table(rows, templates))
+
+    if "bearing_condition" in diagnosis_result:
+        bearing = diagnosis_result["bearing_condition"]
+        story.append(Paragraph("Bearing Condition (ISO 15243:2017)", styles["section"]))
+        story.append(_key_value_table([
+            ("Stage", bearing["stage"]),
+            ("Condition", bearing["condition"]),
+            ("HF 5-16 kHz", f"{bearing['hf_value']:.2f} g"),
+            ("Temperature Rise", f"{bearing['temp_rise']:.0f} °C"),
+            ("Recommendation", bearing["recommendation"])
+        ], templates))
+
+    recommendations = diagnosis_result.get("recommendations", [])
+    if recommendations:
+        cell = styles["cell"]
+        width = templates["content_width"]
+        data = [["Priority", "Timeline", "Action / Details", "Standard"]]
+        for rec in recommendations:
+            data.append([
+                _latin1(rec["priority"]),
+                _latin1(rec["timeline"]),
+                Paragraph(f"<b>{_markup(rec['action'])}</b><br/>{_markup(rec['details'])}", cell),
+                Paragraph(_markup(rec["standard"]), cell)
+            ])
+        table = Table(data, colWidths=[0.13 * width, 0.13 * width, 0.5 * width, 0.24 * width], repeatRows=1)
+        table.setStyle(templates["header_row"])
+        story.append(Paragraph("Recommended Actions (ISO 45001 Risk-Based)", styles["section"]))
+        story.append(table)
+
+    compliance = diagnosis_result.get("compliance", {})
+    if "overall_status" in compliance:
+        data = [["Standard", "Status"]]
+        for label, key in (("ISO 10816-3", "iso_10816_3"), ("IEC 60034-1", "iec_60034_1"),
+                           ("API 610", "api_610"), ("ISO 15243", "iso_15243"), ("Overall", "overall_status")):
+            data.append([label, compliance[key]])
+        table = Table(data, colWidths=[0.3 * templates["content_width"], 0.3 * templates["content_width"]], hAlign="LEFT")
+        status_style = [
+            ("BACKGROUND", (1, row), (1, row), templates["status_colors"].get(data[row][1]))
+            for row in range(1, len(data))
+            if data[row][1] in templates["status_colors"]
+        ]
+        table.setStyle(templates["header_row"])
+        table.setStyle(TableStyle(status_style))
+        story.append(Paragraph("Compliance Status (AIM-004 Format)", styles["section"]))
+        story.append(table)
+    elif compliance:
+        story.append(Paragraph("Compliance Status (AIM-004 Format)", styles["section"]))
+        story.append(_key_value_table([
+            ("Status", compliance.get("status", "")),
+            ("Reason", compliance.get("reason", "")),
+            ("Required Action", compliance.get("required_action", ""))
+        ], templates))
+
+    story.append(Spacer(1, 6))
+    return story
+
+
+def _document(output):
+    from reportlab.platypus import SimpleDocTemplate
+
+    templates = _pdf_templates()
+    margin = templates["margin"]
+    return SimpleDocTemplate(
+        output,
+        pagesize=templates["page_size"],
+        leftMargin=margin,
+        rightMargin=margin,
+        topMargin=margin + 4,
+        bottomMargin=margin,
+        title="Pump Diagnostic Report",
+        author="Pertamina Patra Niaga - Asset Integrity Management"
+    )
+
+
+def render_pdf_report(diagnosis_result, asset_info, output):
+    """
+    Render one diagnosis as a PDF
+
+    Parameters:
+    -----------
+    diagnosis_result : dict
+        Complete diagnosis result from engine
+    asset_info : dict
+        Asset information
+    output : str or file object
+        Output filename or binary file handle (e.g. io.BytesIO)
+    """
+    templates = _pdf_templates()
+    _document(output).build(
+        build_report_story(diagnosis_result, asset_info),
+        onFirstPage=templates["draw_page"],
+        onLaterPages=templates["draw_page"]
+    )
+
+
+def render_merged_fleet_pdf(report_pairs, output):
+    """
+    Render a fleet run as one PDF with a page break between assets
+
+    Parameters:
+    -----------
+    report_pairs : iterable
+        (diagnosis_result, asset_info) pairs
+    output : str or file object
+        Output filename or binary file handle
+
+    Returns:
+    --------
+    int : Number of reports rendered
+    """
+    from reportlab.platypus import PageBreak
+
+    templates = _pdf_templates()
+    story = []
+    count = 0
+    for diagnosis_result, asset_info in report_pairs:
+        if count:
+            story.append(PageBreak())
+        story.extend(build_report_story(diagnosis_result, asset_info))
+        count += 1
+
+    _document(output).build(story, onFirstPage=templates["draw_page"], onLaterPages=templates["draw_page"])
+    return count
+
+
+_UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def fleet_pdf_filename(asset_id, date, position):
+    """
+    File name of one fleet report: the asset ID reduced to [A-Za-z0-9_.-]
+    (no path separators) plus its input position, so several reports of
+    one asset in a run never share a file
+    """
+    safe_id = _UNSAFE_FILENAME_CHARS.sub("_", str(asset_id))
+    return f"pump_diagnostic_{safe_id}_{date}_{position:05d}.pdf"
+
+
+def _render_chunk(args):
+    """Process-pool worker: render a chunk of reports to per-asset files"""
+    chunk, first_position, date, output_dir = args
+    paths = []
+    for position, (diagnosis_result, asset_info) in enumerate(chunk, first_position):
+        filename = fleet_pdf_filename(asset_info.get("asset_id", "XXX"), date, position)
+        path = os.path.join(output_dir, filename)
+        render_pdf_report(diagnosis_result, asset_info, path)
+        paths.append(path)
+    return paths
+
+
+def render_fleet_pdfs(report_pairs, output_dir, processes=None, chunk_size=25):
+    """
+    Render per-asset PDFs for a fleet in a process pool
+
+    Each worker builds the templates once and reuses them for every report
+    in its chunks.
+
+    Parameters:
+    -----------
+    report_pairs : iterable
+        (diagnosis_result, asset_info) pairs
+    output_dir : str
+        Directory for the PDF files (created if missing)
+    processes : int
+        Worker processes (defaults to CPU count; 1 renders in-process)
+    chunk_size : int
+        Reports sent to a worker per task
+
+    Returns:
+    --------
+    list : Paths of the rendered PDF files, in input order (one file per
+           pair, see fleet_pdf_filename)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    date = datetime.now().strftime("%Y%m%d")
+
+    chunks = []
+    chunk = []
+    position = 0
+    for pair in report_pairs:
+        chunk.append(pair)
+        if len(chunk) >= chunk_size:
+            chunks.append((chunk, position, date, output_dir))
+            position += len(chunk)
+            chunk = []
+    if chunk:
+        chunks.append((chunk, position, date, output_dir))
+
+    if processes == 1:
+        return [path for args in chunks for path in _render_chunk(args)]
+
+    paths = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for chunk_paths in executor.map(_render_chunk, chunks):
+            paths.extend(chunk_paths)
+    return paths
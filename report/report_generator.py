@@ -6,9 +6,9 @@ import json
 from datetime import datetime
 
 
-def generate_text_report(diagnosis_result, asset_info):
+def iter_text_report_lines(diagnosis_result, asset_info):
     """
-    Generate comprehensive text report
+    Yield the lines of the text report one at a time
     
     Parameters:
     -----------
@@ -17,119 +17,140 @@ def generate_text_report(diagnosis_result, asset_info):
     asset_info : dict
         Asset information
     
-    Returns:
-    --------
-    str : Formatted text report
+    Yields:
+    -------
+    str : One report line (without newline)
     """
-    report_lines = []
+    now = datetime.now()
     
     # Header
-    report_lines.append("=" * 80)
-    report_lines.append("🛢️  PUMP DIAGNOSTIC REPORT - PERTAMINA PATRA NIAGA")
-    report_lines.append("=" * 80)
-    report_lines.append(f"Asset ID: {asset_info.get('asset_id', 'UNKNOWN')}")
-    report_lines.append(f"Location: {asset_info.get('location', 'UNKNOWN')}")
-    report_lines.append(f"Pump Type: {asset_info.get('pump_type', 'UNKNOWN')}")
-    report_lines.append(f"Date: {datetime.now().strftime('%d %b %Y')}")
-    report_lines.append(f"Report ID: DIAG-{datetime.now().strftime('%Y%m%d')}-{asset_info.get('asset_id', 'XXX')}")
-    report_lines.append("=" * 80)
-    report_lines.append("")
+    yield "=" * 80
+    yield "🛢️  PUMP DIAGNOSTIC REPORT - PERTAMINA PATRA NIAGA"
+    yield "=" * 80
+    yield f"Asset ID: {asset_info.get('asset_id', 'UNKNOWN')}"
+    yield f"Location: {asset_info.get('location', 'UNKNOWN')}"
+    yield f"Pump Type: {asset_info.get('pump_type', 'UNKNOWN')}"
+    yield f"Date: {now.strftime('%d %b %Y')}"
+    yield f"Report ID: DIAG-{now.strftime('%Y%m%d')}-{asset_info.get('asset_id', 'XXX')}"
+    yield "=" * 80
+    yield ""
     
     # Executive Summary
-    report_lines.append("EXECUTIVE SUMMARY")
-    report_lines.append("-" * 80)
-    report_lines.append(f"Diagnosis: {diagnosis_result['summary']}")
-    report_lines.append(f"Confidence: {diagnosis_result['audit_trail']['confidence_score']:.0f}%")
-    report_lines.append(f"Risk Level: {diagnosis_result['level_6_risk']['risk_level']}")
-    report_lines.append(f"Recommended Timeline: {diagnosis_result['level_6_risk']['action_timeline']}")
-    report_lines.append("")
+    yield "EXECUTIVE SUMMARY"
+    yield "-" * 80
+    yield f"Diagnosis: {diagnosis_result['summary']}"
+    if "audit_trail" in diagnosis_result:
+        yield f"Confidence: {diagnosis_result['audit_trail']['confidence_score']:.0f}%"
+    if "level_6_risk" in diagnosis_result:
+        yield f"Risk Level: {diagnosis_result['level_6_risk']['risk_level']}"
+        yield f"Recommended Timeline: {diagnosis_result['level_6_risk']['action_timeline']}"
+    else:
+        yield f"Recommended Timeline: {diagnosis_result['recommendations'][0]['timeline']}"
+    yield ""
     
     # Level 2: Severity Classification
     if "level_2_severity" in diagnosis_result:
         zone_result = diagnosis_result["level_2_severity"]
-        report_lines.append("VIBRATION SEVERITY (ISO 10816-3:2001)")
-        report_lines.append("-" * 80)
-        report_lines.append(f"Zone Classification: {zone_result['zone']}")
-        report_lines.append(f"Maximum Velocity: {zone_result['max_velocity']:.2f} mm/s")
-        report_lines.append(f"Direction: {diagnosis_result['averages']['max_direction']}")
-        report_lines.append(f"Zone B Limit: {zone_result['limit_b']:.1f} mm/s")
-        report_lines.append(f"Zone C Limit: {zone_result['limit_c']:.1f} mm/s")
-        report_lines.append(f"Foundation Type: {zone_result['foundation_type']}")
-        report_lines.append(f"Status: {zone_result['remark']}")
-        report_lines.append(f"Action: {zone_result['action']}")
-        report_lines.append(f"Standard: {zone_result['standard']}")
-        report_lines.append("")
+        yield "VIBRATION SEVERITY (ISO 10816-3:2001)"
+        yield "-" * 80
+        yield f"Zone Classification: {zone_result['zone']}"
+        yield f"Maximum Velocity: {zone_result['velocity_rms']:.2f} mm/s"
+        if "averages" in diagnosis_result:
+            yield f"Direction: {diagnosis_result['averages']['max_direction']}"
+        yield f"Zone B Limit: {zone_result['limit_b']:.1f} mm/s"
+        yield f"Zone C Limit: {zone_result['limit_c']:.1f} mm/s"
+        yield f"Foundation Type: {zone_result['foundation_type']}"
+        yield f"Status: {zone_result['remark']}"
+        yield f"Action: {zone_result['action']}"
+        yield f"Standard: {zone_result['standard']}"
+        yield ""
     
     # Level 5: Primary Diagnosis
     if "level_5_bayesian" in diagnosis_result:
         bayesian = diagnosis_result["level_5_bayesian"]
-        report_lines.append("PRIMARY DIAGNOSIS (Bayesian Fusion)")
-        report_lines.append("-" * 80)
-        report_lines.append(f"Fault Type: {bayesian['primary_fault']}")
-        report_lines.append(f"Confidence: {bayesian['primary_confidence']:.0f}%")
-        report_lines.append(f"Evidence: {bayesian['evidence_summary']}")
-        report_lines.append("")
+        yield "PRIMARY DIAGNOSIS (Bayesian Fusion)"
+        yield "-" * 80
+        yield f"Fault Type: {bayesian['primary_fault']}"
+        yield f"Confidence: {bayesian['primary_confidence']:.0f}%"
+        yield f"Evidence: {bayesian['evidence_summary']}"
+        yield ""
         
         if bayesian["secondary_faults"]:
-            report_lines.append("Secondary Faults:")
+            yield "Secondary Faults:"
             for fault in bayesian["secondary_faults"][:2]:  # Top 2
-                report_lines.append(f"  • {fault['fault_type']} ({fault['posterior_probability']:.0f}% confidence)")
-            report_lines.append("")
+                yield f"  • {fault['fault_type']} ({fault['posterior_probability']:.0f}% confidence)"
+            yield ""
     
     # Bearing Condition
     if "bearing_condition" in diagnosis_result:
         bearing = diagnosis_result["bearing_condition"]
-        report_lines.append("BEARING CONDITION (ISO 15243:2017)")
-        report_lines.append("-" * 80)
-        report_lines.append(f"Stage: {bearing['stage']}")
-        report_lines.append(f"Condition: {bearing['condition']}")
-        report_lines.append(f"HF 5-16 kHz: {bearing['hf_value']:.2f} g")
-        report_lines.append(f"Temperature Rise: {bearing['temp_rise']:.0f}°C")
-        report_lines.append(f"Recommendation: {bearing['recommendation']}")
-        report_lines.append("")
+        yield "BEARING CONDITION (ISO 15243:2017)"
+        yield "-" * 80
+        yield f"Stage: {bearing['stage']}"
+        yield f"Condition: {bearing['condition']}"
+        yield f"HF 5-16 kHz: {bearing['hf_value']:.2f} g"
+        yield f"Temperature Rise: {bearing['temp_rise']:.0f}°C"
+        yield f"Recommendation: {bearing['recommendation']}"
+        yield ""
     
     # Level 6: Action Plan
     if "level_6_risk" in diagnosis_result:
         risk = diagnosis_result["level_6_risk"]
-        report_lines.append("RECOMMENDED ACTIONS (ISO 45001 Risk-Based)")
-        report_lines.append("-" * 80)
-        report_lines.append(f"Risk Level: {risk['risk_level']}")
-        report_lines.append(f"Severity: {risk['severity_level']} - {risk['severity_description']}")
-        report_lines.append(f"Probability: {risk['probability_level']} - {risk['probability_description']}")
-        report_lines.append(f"MTBF Estimation: {risk['mtbf_days']} days")
-        report_lines.append("")
+        yield "RECOMMENDED ACTIONS (ISO 45001 Risk-Based)"
+        yield "-" * 80
+        yield f"Risk Level: {risk['risk_level']}"
+        yield f"Severity: {risk['severity_level']} - {risk['severity_description']}"
+        yield f"Probability: {risk['probability_level']} - {risk['probability_description']}"
+        yield f"MTBF Estimation: {risk['mtbf_days']} days"
+        yield ""
         
-        report_lines.append("Action Items:")
+        yield "Action Items:"
         for i, rec in enumerate(risk["recommendations"], 1):
-            report_lines.append(f"{i}. [{rec['priority']}] {rec['timeline']}")
-            report_lines.append(f"   Action: {rec['action']}")
-            report_lines.append(f"   Details: {rec['details']}")
-            report_lines.append(f"   Standard: {rec['standard']}")
-            report_lines.append("")
+            yield f"{i}. [{rec['priority']}] {rec['timeline']}"
+            yield f"   Action: {rec['action']}"
+            yield f"   Details: {rec['details']}"
+            yield f"   Standard: {rec['standard']}"
+            yield ""
     
     # Compliance Status
-    if "compliance" in diagnosis_result:
+    if "compliance" in diagnosis_result and "overall_status" in diagnosis_result["compliance"]:
         comp = diagnosis_result["compliance"]
-        report_lines.append("COMPLIANCE STATUS (AIM-004 Format)")
-        report_lines.append("-" * 80)
-        report_lines.append(f"ISO 10816-3: {comp['iso_10816_3']}")
-        report_lines.append(f"IEC 60034-1: {comp['iec_60034_1']}")
-        report_lines.append(f"API 610: {comp['api_610']}")
-        report_lines.append(f"ISO 15243: {comp['iso_15243']}")
-        report_lines.append(f"Overall Status: {comp['overall_status']}")
-        report_lines.append("")
+        yield "COMPLIANCE STATUS (AIM-004 Format)"
+        yield "-" * 80
+        yield f"ISO 10816-3: {comp['iso_10816_3']}"
+        yield f"IEC 60034-1: {comp['iec_60034_1']}"
+        yield f"API 610: {comp['api_610']}"
+        yield f"ISO 15243: {comp['iso_15243']}"
+        yield f"Overall Status: {comp['overall_status']}"
+        yield ""
     
     # Footer
-    report_lines.append("=" * 80)
-    report_lines.append("END OF REPORT")
-    report_lines.append("=" * 80)
+    yield "=" * 80
+    yield "END OF REPORT"
+    yield "=" * 80
+
+
+def generate_text_report(diagnosis_result, asset_info):
+    """
+    Generate comprehensive text report
+    
+    Parameters:
+    -----------
+    diagnosis_result : dict
+        Complete diagnosis result from engine
+    asset_info : dict
+        Asset information
     
-    return "\n".join(report_lines)
+    Returns:
+    --------
+    str : Formatted text report
+    """
+    return "\n".join(iter_text_report_lines(diagnosis_result, asset_info))
 
 
-def generate_json_report(diagnosis_result, asset_info):
+def build_json_report(diagnosis_result, asset_info):
     """
-    Generate JSON format report
+    Build the JSON report structure (not yet serialized)
     
     Parameters:
     -----------
@@ -140,14 +161,15 @@ def generate_json_report(diagnosis_result, asset_info):
     
     Returns:
     --------
-    str : JSON formatted report
+    dict : Report with metadata, diagnosis and audit trail
     """
-    report = {
+    now = datetime.now()
+    return {
         "report_metadata": {
             "report_type": "Pump Diagnostic Report",
-            "generated_date": datetime.now().isoformat(),
+            "generated_date": now.isoformat(),
             "asset_info": asset_info,
-            "report_id": f"DIAG-{datetime.now().strftime('%Y%m%d')}-{asset_info.get('asset_id', 'XXX')}"
+            "report_id": f"DIAG-{now.strftime('%Y%m%d')}-{asset_info.get('asset_id', 'XXX')}"
         },
         "diagnosis_result": diagnosis_result,
         "audit_trail": {
@@ -156,7 +178,29 @@ def generate_json_report(diagnosis_result, asset_info):
             "analysis_engine": "6-Level Hierarchical Diagnostic Engine"
         }
     }
+
+
+def generate_json_report(diagnosis_result, asset_info, compact=False):
+    """
+    Generate JSON format report
+    
+    Parameters:
+    -----------
+    diagnosis_result : dict
+        Complete diagnosis result
+    asset_info : dict
+        Asset information
+    compact : bool
+        Single-line JSON without indentation (for machine consumers)
+    
+    Returns:
+    --------
+    str : JSON formatted report
+    """
+    report = build_json_report(diagnosis_result, asset_info)
     
+    if compact:
+        return json.dumps(report, separators=(",", ":"), ensure_ascii=False)
     return json.dumps(report, indent=2)
 
 
@@ -0,0 +1,297 @@
+"""
+Spectrum & Trend Plots - multi-resolution, zoom-window serving (plotly)
+Full spectra are decimated once into a min/max pyramid; each view sends
+only the points the current frequency window needs
+"""
+
+import math
+from collections import OrderedDict
+
+import numpy as np
+
+from engine.asset_registry import bearing_defect_frequencies  # re-exported for cursor callers
+
+
+DEFAULT_MAX_POINTS = 2000
+PYRAMID_MIN_BUCKETS = 128
+LINE_FREQUENCY = 50.0   # Hz - PLN grid
+
+CURSOR_COLORS = {
+    "1X": "#dc3545",
+    "2X": "#fd7e14",
+    "3X": "#ffc107",
+    "2LF": "#6f42c1",
+    "BPFO": "#198754",
+    "BPFI": "#0d6efd",
+    "BSF": "#20c997",
+    "FTF": "#6c757d"
+}
+
+
+def minmax_decimate(x, y, n_buckets):
+    """
+    Keep the min and max sample of each of n_buckets equal-count buckets
+
+    Peaks survive decimation (unlike averaging), which is what spectra need.
+
+    Returns:
+    --------
+    tuple : (x, y) with at most 2 * n_buckets points, in x order
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= 2 * n_buckets:
+        return x, y
+    edges = np.linspace(0, len(x), n_buckets + 1).astype(int)
+    starts = edges[:-1]
+    lengths = np.diff(edges)
+    bucket = np.repeat(np.arange(n_buckets), lengths)
+    # argmin/argmax per bucket via one lexsort over (value, bucket)
+    order = np.lexsort((y, bucket))
+    imin = order[starts]
+    imax = order[starts + lengths - 1]
+    keep = np.unique(np.concatenate([imin, imax]))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013)
+
+    Preserves the visual shape of trend lines with n_out points.
+
+    Returns:
+    --------
+    tuple : (x, y) with n_out points (or the input if already shorter)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x = x[end:next_end].mean() if next_end > end else x[-1]
+        next_y = y[end:next_end].mean() if next_end > end else y[-1]
+        area = np.abs((x[previous] - next_x) * (y[start:end] - y[previous])
+                      - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
+
+
+class SpectrumPyramid:
+    """Min/max decimation pyramid of one spectrum for zoom-window serving"""
+
+    def __init__(self, freqs, amps):
+        """
+        Parameters:
+        -----------
+        freqs : array
+            Bin frequencies (Hz), ascending
+        amps : array
+            Bin amplitudes (mm/s or g)
+        """
+        freqs = np.asarray(freqs, dtype=float)
+        amps = np.asarray(amps, dtype=float)
+        self.freqs = freqs
+        self.amps = amps
+
+        # Level k: buckets of 2**k bins, each keeping its (min, max) sample index
+        index = np.arange(len(freqs))
+        self.levels = [(index, index)]
+        imin, imax = index, index
+        while len(imin) > PYRAMID_MIN_BUCKETS:
+            if len(imin) % 2:
+                imin, imax = np.append(imin, imin[-1]), np.append(imax, imax[-1])
+            a_min, b_min = imin[0::2], imin[1::2]
+            a_max, b_max = imax[0::2], imax[1::2]
+            imin = np.where(amps[a_min] <= amps[b_min], a_min, b_min)
+            imax = np.where(amps[a_max] >= amps[b_max], a_max, b_max)
+            self.levels.append((imin, imax))
+
+    def window(self, f_min=None, f_max=None, max_points=DEFAULT_MAX_POINTS):
+        """
+        Points to draw for a frequency window
+
+        Uses the finest pyramid level that fits max_points inside the window.
+
+        Returns:
+        --------
+        tuple : (freqs, amps) ndarrays in frequency order
+        """
+        f_min = self.freqs[0] if f_min is None else f_min
+        f_max = self.freqs[-1] if f_max is None else f_max
+        lo = int(np.searchsorted(self.freqs, f_min, side="left"))
+        hi = int(np.searchsorted(self.freqs, f_max, side="right"))
+        if hi - lo <= max_points:
+            return self.freqs[lo:hi], self.amps[lo:hi]
+
+        level = min(len(self.levels) - 1, max(1, math.ceil(math.log2(2 * (hi - lo) / max_points))))
+        imin, imax = self.levels[level]
+        size = 2 ** level
+        b_lo, b_hi = lo // size, min(len(imin), -(-hi // size))
+        keep = np.unique(np.concatenate([imin[b_lo:b_hi], imax[b_lo:b_hi]]))
+        keep = keep[(keep >= lo) & (keep < hi)]
+        return self.freqs[keep], self.amps[keep]
+
+
+def harmonic_cursors(rpm, line_frequency=LINE_FREQUENCY, bearing_frequencies=None, n_harmonics=3):
+    """
+    Cursor positions for 1X..nX running speed, 2LF and bearing frequencies
+
+    Returns:
+    --------
+    list : (label, frequency Hz) pairs
+    """
+    fr = rpm / 60.0
+    cursors = [(f"{order}X", order * fr) for order in range(1, n_harmonics + 1)]
+    cursors.append(("2LF", 2.0 * line_frequency))
+    for label, frequency in (bearing_frequencies or {}).items():
+        cursors.append((label, frequency))
+    return cursors
+
+
+def cursor_shapes(cursors):
+    """
+    Plotly layout shapes/annotations for cursors (data-independent, so they
+    stay valid across zoom windows and are built once per speed)
+    """
+    shapes, annotations = [], []
+    for label, frequency in cursors:
+        color = CURSOR_COLORS.get(label, "#6c757d")
+        shapes.append({
+            "type": "line", "xref": "x", "yref": "paper",
+            "x0": frequency, "x1": frequency, "y0": 0, "y1": 1,
+            "line": {"color": color, "width": 1, "dash": "dot"}
+        })
+        annotations.append({
+            "x": frequency, "y": 1, "xref": "x", "yref": "paper",
+            "text": label, "showarrow": False, "yanchor": "bottom",
+            "font": {"size": 10, "color": color}
+        })
+    return shapes, annotations
+
+
+class SpectrumFigureCache:
+    """LRU cache of pyramids and plotly figures per (asset, measurement)"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, key, freqs, amps):
+        entry = self._entries.get(key)
+        if entry is None:
+            if freqs is None:
+                raise KeyError(f"Spectrum {key} not cached and no data given")
+            entry = {"pyramid": SpectrumPyramid(freqs, amps), "figure": None, "cursor_key": None}
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return entry
+
+    def figure(self, asset_id, measurement_id, freqs=None, amps=None, window=None,
+               cursors=None, max_points=DEFAULT_MAX_POINTS, title=None, units="mm/s"):
+        """
+        Plotly figure of one spectrum for a zoom window
+
+        The pyramid and figure are built on first use; later calls only swap
+        the trace data for the requested window (and the cursor overlay if
+        the cursor set changed).
+
+        Parameters:
+        -----------
+        asset_id, measurement_id : str
+            Cache key
+        freqs, amps : array
+            Spectrum data, needed only on first use
+        window : tuple
+            (f_min, f_max) in Hz; None for the full span
+        cursors : list
+            (label, frequency) pairs from harmonic_cursors()
+        max_points : int
+            Points sent to the browser
+
+        Returns:
+        --------
+        plotly.graph_objects.Figure
+        """
+        entry = self._entry((asset_id, measurement_id), freqs, amps)
+        f_min, f_max = window if window else (None, None)
+        x, y = entry["pyramid"].window(f_min, f_max, max_points)
+
+        figure = entry["figure"]
+        if figure is None:
+            import plotly.graph_objects as go
+
+            figure = go.Figure(go.Scattergl(x=x, y=y, mode="lines", line={"width": 1, "color": "#1a365d"},
+                                            name="Spectrum"))
+            figure.update_layout(
+                title=title or f"{asset_id} - {measurement_id}",
+                xaxis_title="Frequency (Hz)",
+                yaxis_title=f"Amplitude ({units})",
+                margin={"l": 50, "r": 20, "t": 50, "b": 40},
+                template="plotly_white"
+            )
+            entry["figure"] = figure
+        else:
+            figure.data[0].x = x
+            figure.data[0].y = y
+
+        cursor_key = tuple(cursors) if cursors else None
+        if cursor_key != entry["cursor_key"]:
+            shapes, annotations = cursor_shapes(cursors or [])
+            figure.layout.shapes = shapes
+            figure.layout.annotations = annotations
+            entry["cursor_key"] = cursor_key
+        if window:
+            figure.update_xaxes(range=list(window))
+        else:
+            figure.update_xaxes(autorange=True)
+        return figure
+
+
+def trend_figure(timestamps, values, limits=None, max_points=DEFAULT_MAX_POINTS, title="", units="mm/s"):
+    """
+    Plotly trend line (LTTB-downsampled) with horizontal alarm limits
+
+    Parameters:
+    -----------
+    timestamps : array
+        POSIX seconds
+    values : array
+        Trended parameter (NaN = not measured, dropped)
+    limits : dict
+        Limit label -> value, e.g. {"Zone C": 7.1, "Zone D": 11.2}
+
+    Returns:
+    --------
+    plotly.graph_objects.Figure
+    """
+    import plotly.graph_objects as go
+
+    timestamps = np.asarray(timestamps, dtype=float)
+    values = np.asarray(values, dtype=float)
+    measured = ~np.isnan(values)
+    x, y = lttb(timestamps[measured], values[measured], max_points)
+
+    figure = go.Figure(go.Scattergl(x=x.astype("datetime64[s]"), y=y, mode="lines+markers",
+                                    marker={"size": 4}, line={"width": 1.5, "color": "#1a365d"}, name=title or "Trend"))
+    for label, value in (limits or {}).items():
+        figure.add_hline(y=value, line_dash="dash", line_color="#dc3545", annotation_text=label)
+    figure.update_layout(title=title, yaxis_title=units, template="plotly_white",
+                         margin={"l": 50, "r": 20, "t": 50, "b": 40})
+    return figure
@@ -0,0 +1,122 @@
+"""
+Streaming Fleet Report Writer - AIM-004 Format
+Writes terminal-wide report runs incrementally with constant memory
+"""
+
+import json
+
+from .report_generator import iter_text_report_lines, build_json_report
+
+
+_COMPACT = {"separators": (",", ":"), "ensure_ascii": False}
+
+
+def write_text_reports(report_pairs, fh):
+    """
+    Write text reports for a fleet, one report after another
+
+    Parameters:
+    -----------
+    report_pairs : iterable
+        (diagnosis_result, asset_info) pairs - may be a generator
+    fh : file object
+        Text file handle opened for writing
+
+    Returns:
+    --------
+    int : Number of reports written
+    """
+    count = 0
+    for diagnosis_result, asset_info in report_pairs:
+        if count:
+            fh.write("\n")
+        for line in iter_text_report_lines(diagnosis_result, asset_info):
+            fh.write(line)
+            fh.write("\n")
+        count += 1
+    return count
+
+
+def write_jsonl_reports(report_pairs, fh):
+    """
+    Write one compact JSON report per line (JSON Lines)
+
+    Parameters:
+    -----------
+    report_pairs : iterable
+        (diagnosis_result, asset_info) pairs - may be a generator
+    fh : file object
+        Text file handle opened for writing
+
+    Returns:
+    --------
+    int : Number of reports written
+    """
+    count = 0
+    for diagnosis_result, asset_info in report_pairs:
+        fh.write(json.dumps(build_json_report(diagnosis_result, asset_info), **_COMPACT))
+        fh.write("\n")
+        count += 1
+    return count
+
+
+def write_consolidated_json(report_pairs, fh, fleet_info=None):
+    """
+    Write a single JSON document {"fleet_info": ..., "reports": [...]}
+    without holding the report list in memory
+
+    Parameters:
+    -----------
+    report_pairs : iterable
+        (diagnosis_result, asset_info) pairs - may be a generator
+    fh : file object
+        Text file handle opened for writing
+    fleet_info : dict
+        Optional run metadata (terminal, route, inspector)
+
+    Returns:
+    --------
+    int : Number of reports written
+    """
+    fh.write('{"fleet_info":')
+    fh.write(json.dumps(fleet_info or {}, **_COMPACT))
+    fh.write(',"reports":[')
+
+    count = 0
+    for diagnosis_result, asset_info in report_pairs:
+        if count:
+            fh.write(",")
+        fh.write(json.dumps(build_json_report(diagnosis_result, asset_info), **_COMPACT))
+        count += 1
+
+    fh.write(f'],"report_count":{count}}}')
+    return count
+
+
+_WRITERS = {
+    "text": write_text_reports,
+    "jsonl": write_jsonl_reports,
+    "json": write_consolidated_json
+}
+
+
+def write_fleet_reports(report_pairs, filename, fmt="jsonl"):
+    """
+    Stream a fleet run to a file
+
+    Parameters:
+    -----------
+    report_pairs : iterable
+        (diagnosis_result, asset_info) pairs - may be a generator
+    filename : str
+        Output filename
+    fmt : str
+        "text", "jsonl" or "json" (consolidated document)
+
+    Returns:
+    --------
+    int : Number of reports written
+    """
+    writer = _WRITERS[fmt]
+    with open(filename, "w", encoding="utf-8") as fh:
+        return writer(report_pairs, fh)
@@ -0,0 +1,57 @@
+"""
+Asset constants in PumpDiagnosticEngine (engine.asset_registry)
+"""
+
+from engine.asset_registry import AssetRegistry
+from engine.diagnostic_engine import PumpDiagnosticEngine
+from engine.measurement import Measurement
+
+
+ASSET = {"asset_id": "P-101", "motor_kw": 90, "motor_rpm": 2970, "foundation_type": "Rigid (Concrete)",
+         "flc": 160, "npshr": 4.0, "bep_flow": 100}
+
+# Misalignment at 2X of 2970 rpm, no safety gate tripped
+READING = {
+    "pump_v_de": 4.0, "pump_v_nde": 3.6, "pump_a_de": 3.8, "pump_a_nde": 3.2,
+    "peak1_freq": 49.5, "peak1_amp": 2.0, "peak2_freq": 99.0, "peak2_amp": 1.8,
+    "peak3_freq": 148.5, "peak3_amp": 0.4,
+    "temp_pump_de": 60, "temp_pump_nde": 58, "temp_motor_de": 62
+}
+
+
+def diagnose(reading, asset_id="P-101"):
+    engine = PumpDiagnosticEngine(registry=AssetRegistry([ASSET]))
+    return engine, engine.run_diagnosis(dict(reading), asset_id=asset_id)
+
+
+def test_report_carries_the_cached_constants():
+    engine, report = diagnose(READING)
+    constants = engine.registry.constants("P-101")
+    assert report["asset_constants"] is constants
+    assert report["level_2_severity"]["limit_b"] == constants["iso_10816_3"]["limits"][0]
+    assert any("MISALIGNMENT" in fault["type"] for fault in engine.results["level_3_fft"]["faults"])
+
+
+def test_constants_match_per_call_derivation():
+    _, with_registry = diagnose(READING)
+    engine = PumpDiagnosticEngine()
+    without = engine.run_diagnosis({**READING, "motor_kw": 90, "motor_rpm": 2970,
+                                    "foundation_type": "Rigid (Concrete)", "flc": 160,
+                                    "npshr": 4.0, "bep_flow": 100})
+    del with_registry["asset_constants"]
+    assert with_registry == without
+
+
+def test_reading_at_another_speed_uses_its_own_orders():
+    # VFD at 1485 rpm: 2X is 49.5 Hz, so the peak at 99 Hz is not misalignment
+    engine, _ = diagnose({**READING, "motor_rpm": 1485})
+    assert not any("MISALIGNMENT" in fault["type"] for fault in engine.results["level_3_fft"]["faults"])
+
+
+def test_results_are_reset_between_runs():
+    engine = PumpDiagnosticEngine(registry=AssetRegistry([ASSET]))
+    engine.run_diagnosis(Measurement.from_dict(READING), asset_id="P-101")
+    report = engine.run_diagnosis(Measurement.from_dict({**READING, "peak2_amp": 0.1}))
+    assert "asset_constants" not in report
+    assert "asset_constants" not in engine.results
+    assert "level_5_bayesian" not in engine.results
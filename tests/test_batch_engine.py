@@ -0,0 +1,135 @@
+"""
+Parity of engine.batch_engine.diagnose_batch with PumpDiagnosticEngine.run_diagnosis
+on seeded random measurements (run with: python -m pytest -q tests)
+"""
+
+import numpy as np
+
+from engine.batch_engine import FAULT_SLOTS, diagnose_batch
+from engine.diagnostic_engine import PumpDiagnosticEngine
+from engine.iso_10816_3_classifier import calculate_direction_averages
+from engine.measurement import Measurement, to_batch
+from engine.reliability import ReliabilityModel
+
+
+N_RECORDS = 3000
+
+
+def random_record(rng):
+    """Engine input spread around every Level 1-6 decision boundary, some inputs missing"""
+    rpm = rng.choice([985, 1480, 1500, 2960])
+    fundamental = rpm / 60
+    data = {}
+    for component in ("motor", "pump"):
+        for direction in "hva":
+            for end in ("de", "nde"):
+                if rng.random() < 0.9:
+                    data[f"{component}_{direction}_{end}"] = rng.uniform(0.3, 9)
+    if rng.random() < 0.3:
+        data["vibration_max_avr"] = rng.uniform(1, 13)
+    if rng.random() < 0.9:
+        data["motor_rpm"] = rpm
+    data["motor_kw"] = rng.choice([11, 55, 90, 315])
+    foundation = rng.choice(["Rigid (Concrete)", "Flexible (Steel Structure)", ""])
+    if foundation:
+        data["foundation_type"] = foundation
+    data["pump_type"] = rng.choice(["OH2", "BB1"])
+    data["location"] = rng.choice(["TBBM-A", "TBBM-B"])
+    data["peak1_freq"] = fundamental * rng.choice([1, 1.02, 0.5])
+    data["peak1_amp"] = rng.uniform(0.5, 6)
+    data["peak2_freq"] = 2 * fundamental * rng.choice([1, 1.05, 1.3])
+    data["peak2_amp"] = rng.uniform(0, 6)
+    data["peak3_freq"] = rng.choice([100, 3 * fundamental, 3.58 * fundamental, 60])
+    data["peak3_amp"] = rng.uniform(0, 4)
+    for phase in "rst":
+        data[f"voltage_{phase}"] = rng.normal(400, 6)
+        data[f"current_{phase}"] = rng.uniform(100, 200)
+    data["flc"] = rng.choice([180, 250])
+    data["hf_pump_de"] = rng.uniform(0, 2)
+    data["temp_pump_de"] = rng.uniform(40, 110)
+    data["temp_pump_nde"] = rng.uniform(40, 90)
+    data["temp_motor_de"] = rng.uniform(40, 100)
+    if rng.random() < 0.5:
+        data["phase_instability"] = rng.uniform(0, 40)
+    data["displacement_peak"] = rng.uniform(0, 80)
+    data["p_suc"] = rng.uniform(-0.9, 1)
+    data["actual_flow"] = rng.uniform(40, 160)
+    data["bep_flow"] = 100
+    data["npshr"] = rng.uniform(2, 12)
+    data["p_dis_fluctuation"] = rng.uniform(0, 17)
+    if rng.random() < 0.1:
+        data["rul_days"] = rng.uniform(0, 50)
+    for key in list(data):
+        if key != "motor_kw" and rng.random() < 0.05:
+            del data[key]
+    return data
+
+
+def scalar_decisions(records, reliability=None):
+    """diagnose_batch fields rebuilt from run_diagnosis reports"""
+    fields = {name: [] for name in ("report_type", "zone", "max_velocity", "primary_fault", "posterior",
+                                    "risk_level", "mtbf_days", "detected", "validated")}
+    for data in records:
+        engine = PumpDiagnosticEngine(reliability=reliability)
+        result = engine.run_diagnosis(Measurement.from_dict(data))
+        shutdown = result["report_type"] == "EMERGENCY_SHUTDOWN"
+        bayesian = result.get("level_5_bayesian", {})
+        risk = result.get("level_6_risk", {})
+        # Routine reports omit Levels 3-4; the engine keeps them in results
+        detected = [fault["type"] for fault in engine.results.get("level_3_fft", {}).get("faults", [])]
+        validated = [fault["type"] for fault in engine.results.get("level_4_validation", {}).get("faults", [])
+                     if fault["is_validated"]]
+        fields["report_type"].append(result["report_type"])
+        fields["zone"].append(result.get("level_2_severity", {}).get("zone"))
+        fields["max_velocity"].append(calculate_direction_averages(data)["max_velocity"])
+        fields["primary_fault"].append("" if shutdown else bayesian.get("primary_fault", "NO_FAULT_DETECTED"))
+        fields["posterior"].append(bayesian.get("primary_confidence", 0.0))
+        fields["risk_level"].append("CRITICAL" if shutdown else risk.get("risk_level", "NONE"))
+        fields["mtbf_days"].append(risk.get("mtbf_days", -1))
+        fields["detected"].append([any(slot in name for name in detected) for slot in FAULT_SLOTS])
+        fields["validated"].append([any(slot in name for name in validated) for slot in FAULT_SLOTS])
+    return fields
+
+
+def assert_parity(records, reliability=None):
+    expected = scalar_decisions(records, reliability)
+    result = diagnose_batch(to_batch(records), reliability)
+    # The scalar engine stops at Level 1 on shutdown - no zone to compare
+    classified = np.array([zone is not None for zone in expected["zone"]])
+    for name, values in expected.items():
+        got = result[name]
+        if name == "zone":
+            got, values = got[classified], np.array(values, dtype=object)[classified].astype(str)
+        mismatched = np.flatnonzero(np.asarray(got) != np.asarray(values).reshape(np.shape(got)))
+        assert not len(mismatched), f"{name} differs on rows {mismatched[:10].tolist()}"
+
+
+def test_default_engine_parity():
+    rng = np.random.default_rng(3)
+    records = [random_record(rng) for _ in range(N_RECORDS)]
+    assert_parity(records)
+
+
+def test_reliability_model_parity():
+    rng = np.random.default_rng(11)
+    n_history = 400
+    reliability = ReliabilityModel(min_failures=3)
+    reliability.fit(
+        rng.choice(["BEARING_DEFECT", "MISALIGNMENT", "MECHANICAL_UNBALANCE"], n_history),
+        rng.choice(["OH2", "BB1", None], n_history),
+        rng.choice(["TBBM-A", "TBBM-B", None], n_history),
+        rng.weibull(1.5, n_history) * 60,
+        rng.random(n_history) < 0.7
+    )
+    records = [random_record(rng) for _ in range(N_RECORDS // 2)]
+    assert_parity(records, reliability)
+
+
+def test_decisions_are_covered():
+    # Guard against a generator that no longer reaches the interesting branches
+    rng = np.random.default_rng(3)
+    result = diagnose_batch(to_batch([random_record(rng) for _ in range(N_RECORDS)]))
+    assert set(result["report_type"]) == {"EMERGENCY_SHUTDOWN", "ROUTINE_MONITORING", "COMPREHENSIVE_DIAGNOSIS"}
+    assert {"BEARING_DEFECT", "ANGULAR_MISALIGNMENT", "PARALLEL_MISALIGNMENT",
+            "ELECTRICAL_UNBALANCE", "MECHANICAL_UNBALANCE"} <= set(result["primary_fault"])
+    assert set(result["risk_level"]) >= {"LOW", "MEDIUM", "HIGH", "CRITICAL"}
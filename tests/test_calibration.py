@@ -0,0 +1,21 @@
+"""
+ROC summaries of engine.calibration.calibrate
+"""
+
+import numpy as np
+
+from engine.batch_engine import FAULT_SLOTS
+from engine.calibration import calibrate
+
+from test_batch_engine import random_record
+
+
+def test_auc_is_undefined_for_faults_absent_from_the_labels():
+    rng = np.random.default_rng(5)
+    records = [random_record(rng) for _ in range(300)]
+    labels = ["BEARING_DEFECT" if record.get("hf_pump_de", 0) > 0.7 else "" for record in records]
+    result = calibrate(records, labels, {"hf_g": [0.5, 0.7, 0.9]}, processes=1)
+    assert 0.0 <= result["roc"]["BEARING_DEFECT"]["auc"] <= 1.0
+    for fault in FAULT_SLOTS:
+        if fault != "BEARING_DEFECT":
+            assert result["roc"][fault]["auc"] is None
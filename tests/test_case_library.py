@@ -0,0 +1,49 @@
+"""
+Filtered nearest-neighbour queries of engine.case_library.CaseIndex
+"""
+
+import numpy as np
+
+from engine.case_library import CaseIndex, peak_orders
+
+
+def random_index(n_cases=20000, confirmed_fraction=0.01, seed=0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(n_cases):
+        fundamental = rng.uniform(1450, 3000) / 60
+        records.append({
+            "motor_rpm": fundamental * 60,
+            "peak1_freq": fundamental * rng.choice([1, 2, 3]), "peak1_amp": rng.uniform(1, 5),
+            "peak2_freq": fundamental * rng.integers(1, 10), "peak2_amp": rng.uniform(0, 3),
+            "peak3_freq": fundamental * rng.uniform(0.3, 11), "peak3_amp": rng.uniform(0, 2)
+        })
+    vectors = peak_orders(records)
+    index = CaseIndex()
+    index.add(vectors, [
+        {"asset_id": f"P-{case % 50}", "timestamp": case, "primary_fault": "BEARING_DEFECT",
+         "root_cause": "spalled outer race" if rng.random() < confirmed_fraction else ""}
+        for case in range(n_cases)
+    ])
+    return index, vectors, rng
+
+
+def test_sparse_confirmed_cases_still_return_k():
+    index, vectors, rng = random_index()
+    overlap = 0
+    for row in rng.integers(len(index), size=30):
+        approximate = index.query(vectors[row], k=5, confirmed_only=True)
+        exact = index.query(vectors[row], k=5, confirmed_only=True, exact=True)
+        assert len(approximate) == 5
+        assert all(case["root_cause"] for case in approximate)
+        overlap += len({case["case_id"] for case in approximate} & {case["case_id"] for case in exact})
+    assert overlap / 150 >= 0.9
+
+
+def test_exclude_asset():
+    index, vectors, _ = random_index(2000, confirmed_fraction=0.5)
+    found = index.query(vectors[7], k=10, confirmed_only=True, exclude_asset="P-7")
+    assert len(found) == 10
+    assert all(case["asset_id"] != "P-7" and case["root_cause"] for case in found)
+    index.add(vectors[:1], [{"asset_id": "P-new", "timestamp": 1.0}])
+    assert all(case["asset_id"] != "P-new" for case in index.query(vectors[0], k=5, exclude_asset="P-new"))
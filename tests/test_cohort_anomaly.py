@@ -0,0 +1,27 @@
+"""
+Chi-square threshold of the cohort anomaly detector (engine.cohort_anomaly)
+"""
+
+import pytest
+
+from engine.cohort_anomaly import chi2_quantile, normal_quantile
+
+
+@pytest.mark.parametrize("probability, z", [
+    (0.5, 0.0), (0.9, 1.2815516), (0.99, 2.3263479), (0.997, 2.7477814), (0.01, -2.3263479)
+])
+def test_normal_quantile(probability, z):
+    assert normal_quantile(probability) == pytest.approx(z, abs=1e-6)
+
+
+def test_chi2_quantile_follows_any_probability():
+    # Wilson-Hilferty against the exact chi2(8) quantiles 13.362 (0.9) and 20.090 (0.99)
+    assert chi2_quantile(0.9, 8) == pytest.approx(13.362, rel=2e-3)
+    assert chi2_quantile(0.99, 8) == pytest.approx(20.090, rel=2e-3)
+    assert chi2_quantile(0.997, 8) < chi2_quantile(0.999, 8)
+
+
+@pytest.mark.parametrize("probability", [0.0, 1.0, 99.9])
+def test_unsupported_probability_raises(probability):
+    with pytest.raises(ValueError):
+        chi2_quantile(probability, 8)
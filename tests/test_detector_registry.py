@@ -0,0 +1,47 @@
+"""
+Level 3 detector scheduling (engine.detector_registry)
+"""
+
+from engine import fft_analyzer
+from engine.detector_registry import DETECTOR_REGISTRY, run_detectors
+
+
+# Bearing, cavitation, electrical unbalance and misalignment all fire on this
+# reading; bearing HF is at ISO 15243 Stage 3
+ALL_FAULTS = {
+    "motor_rpm": 2970,
+    "peak1_freq": 49.5, "peak1_amp": 2.0,
+    "peak2_freq": 99.0, "peak2_amp": 1.8,
+    "peak3_freq": 100.0, "peak3_amp": 1.5,
+    "voltage_r": 412, "voltage_s": 398, "voltage_t": 390,
+    "hf_pump_de": 1.8, "temp_pump_de": 90, "temp_pump_nde": 60,
+    "p_suc": -0.9, "actual_flow": 40, "bep_flow": 100, "npshr": 12.0
+}
+
+
+def test_fft_analyzer_registers_the_built_in_detectors():
+    assert set(fft_analyzer.DETECTOR_CONFIDENCE) <= set(DETECTOR_REGISTRY)
+    assert DETECTOR_REGISTRY["BEARING_DEFECT"]["detect"] is fft_analyzer.detect_bearing_defect
+
+
+def test_without_early_exit_every_scheduled_detector_runs():
+    detection = run_detectors(ALL_FAULTS)
+    assert set(detection["executed"]) == set(DETECTOR_REGISTRY)
+    assert not detection["skipped"]
+
+
+def test_stage_3_bearing_defect_ends_detection_early():
+    detection = run_detectors(ALL_FAULTS, early_exit=True)
+    bearing = [fault for fault in detection["faults"] if fault["type"] == "BEARING_DEFECT"]
+    assert bearing and bearing[0]["severity"] == "CRITICAL"
+    assert detection["executed"][-1] == "BEARING_DEFECT"
+    skipped = {entry["detector"] for entry in detection["skipped"] if entry["reason"] == "early exit"}
+    assert skipped == set(DETECTOR_REGISTRY) - set(detection["executed"])
+    assert skipped
+
+
+def test_stage_2_bearing_defect_does_not_exit():
+    detection = run_detectors({**ALL_FAULTS, "hf_pump_de": 1.0}, early_exit=True)
+    bearing = [fault for fault in detection["faults"] if fault["type"] == "BEARING_DEFECT"]
+    assert bearing and bearing[0]["severity"] == "WARNING"
+    assert set(detection["executed"]) == set(DETECTOR_REGISTRY)
@@ -0,0 +1,20 @@
+"""
+Trend features of engine.history_store
+"""
+
+from engine.diagnostic_engine import PumpDiagnosticEngine
+from engine.history_store import extract_trend_features
+
+
+RAW = {"pump_v_de": 4.0, "pump_v_nde": 2.0, "motor_h_de": 3.5, "motor_h_nde": None}
+
+
+def test_velocity_rms_is_the_engine_direction_average_before_and_after_diagnosis():
+    raw = extract_trend_features(dict(RAW))["velocity_rms"]
+    diagnosed = {key: value for key, value in RAW.items() if value is not None}
+    PumpDiagnosticEngine().run_diagnosis(diagnosed)
+    assert raw == diagnosed["vibration_max_avr"] == extract_trend_features(diagnosed)["velocity_rms"] == 3.0
+
+
+def test_velocity_rms_not_measured():
+    assert extract_trend_features({"p_suc": 0.5})["velocity_rms"] is None
@@ -0,0 +1,21 @@
+"""
+Text fields of engine.measurement batches
+"""
+
+import pytest
+
+from engine.measurement import TEXT_FIELDS, from_batch, to_batch
+
+
+@pytest.mark.parametrize("name, width", TEXT_FIELDS)
+def test_text_up_to_the_width_round_trips(name, width):
+    value = "T" * (width - 1) + "é"
+    batch = to_batch([{name: value}, {name: "T" * (width - 1) + "è"}])
+    assert batch[name][0] != batch[name][1]
+    assert from_batch(batch)[0][name] == value
+
+
+@pytest.mark.parametrize("name, width", TEXT_FIELDS)
+def test_longer_text_is_rejected(name, width):
+    with pytest.raises(ValueError, match=name):
+        to_batch([{"motor_kw": 90}, {name: "TBBM-" + "x" * width}])
@@ -0,0 +1,45 @@
+"""
+Free text in report.pdf_renderer paragraphs and fleet file names
+"""
+
+import io
+import os
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from engine.diagnostic_engine import PumpDiagnosticEngine
+from report.pdf_renderer import build_report_story, render_fleet_pdfs, render_pdf_report
+
+
+ROUTINE = PumpDiagnosticEngine().run_diagnosis({"pump_v_de": 1.0, "pump_v_nde": 1.0})
+
+
+def test_markup_characters_in_free_text_render_literally():
+    asset_info = {"asset_id": "P-101 <b>", "location": "Tank farm A&B </para>", "pump_type": "OH2 <font"}
+    result = {**ROUTINE, "recommendations": [{
+        "priority": "HIGH", "timeline": "<24 hours", "action": "Correct voltage imbalance to <2%",
+        "details": "Check R&S phases <br/>", "standard": "IEC 60034-1 <6.3>"
+    }]}
+    output = io.BytesIO()
+    render_pdf_report(result, asset_info, output)
+    assert output.getvalue().startswith(b"%PDF")
+
+    cells = [cell.getPlainText() for flowable in build_report_story(result, asset_info)
+             for row in getattr(flowable, "_cellvalues", ()) for cell in row if hasattr(cell, "getPlainText")]
+    assert "P-101 <b>" in cells
+    assert "Tank farm A&B </para>" in cells
+    assert "IEC 60034-1 <6.3>" in cells
+    assert "Correct voltage imbalance to <2%Check R&S phases <br/>" in cells
+
+
+def test_fleet_files_are_unique_and_stay_in_the_output_dir(tmp_path):
+    pairs = [(ROUTINE, {"asset_id": "P-101"}), (ROUTINE, {"asset_id": "P-101"}),
+             (ROUTINE, {"asset_id": "../../etc/P 102"})]
+    paths = render_fleet_pdfs(pairs, str(tmp_path), processes=1, chunk_size=2)
+    assert len(set(paths)) == 3
+    for path in paths:
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.path.isfile(path)
+    assert os.path.basename(paths[2]).startswith("pump_diagnostic_.._.._etc_P_102_")
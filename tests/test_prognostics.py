@@ -0,0 +1,32 @@
+"""
+Confidence bounds of engine.prognostics.estimate_time_to_threshold
+"""
+
+import numpy as np
+import pytest
+
+from engine.prognostics import estimate_time_to_threshold, fit_degradation_trends
+
+
+def noisy_trend():
+    rng = np.random.default_rng(2)
+    t_days = np.tile(np.arange(0.0, 120.0, 10.0), 2)
+    asset_index = np.repeat([0, 1], 12)
+    values = 2.0 + np.where(asset_index == 0, 0.03, 0.02) * t_days + rng.normal(0, 0.2, t_days.size)
+    return fit_degradation_trends(asset_index, t_days, values)
+
+
+def test_interval_follows_the_requested_confidence():
+    trend = noisy_trend()
+    widths = []
+    for confidence in (0.8, 0.9, 0.95, 0.975, 0.99):
+        result = estimate_time_to_threshold(trend, 11.2, confidence)
+        assert result["confidence"] == confidence
+        widths.append(result["days_upper"] - result["days_lower"])
+    assert np.all(np.diff(widths, axis=0) > 0)
+
+
+@pytest.mark.parametrize("confidence", [95, 0.0, 1.0])
+def test_confidence_outside_unit_interval_raises(confidence):
+    with pytest.raises(ValueError):
+        estimate_time_to_threshold(noisy_trend(), 11.2, confidence)
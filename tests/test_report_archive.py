@@ -0,0 +1,34 @@
+"""
+Index fields of report.archive.ReportArchive
+"""
+
+import pytest
+
+from engine.diagnostic_engine import PumpDiagnosticEngine
+from report.archive import ReportArchive
+
+
+ROUTINE = PumpDiagnosticEngine().run_diagnosis({"pump_v_de": 1.0, "pump_v_nde": 1.0})
+
+
+@pytest.mark.parametrize("asset_id", ["P-" + "7" * 30, "ポンプ-" + "7" * 22])
+def test_find_matches_ids_up_to_the_field_width(tmp_path, asset_id):
+    # Both 32 bytes, the asset_id field width - the report ID must fit too
+    with ReportArchive(str(tmp_path / "archive")) as archive:
+        archive.append(ROUTINE, {"asset_id": asset_id}, timestamp=0.0)
+        archive.append(ROUTINE, {"asset_id": "P-7"}, timestamp=0.0)
+        assert archive.find(asset_id=asset_id).tolist() == [0]
+        assert archive.find(asset_id="P-7").tolist() == [1]
+        report_id = archive.get(0)["report_metadata"]["report_id"]
+        assert archive.get_by_report_id(report_id)["report_metadata"]["report_id"] == report_id
+
+
+@pytest.mark.parametrize("asset_id", ["P-" + "7" * 31, "ポンプ" * 4])   # 33 and 36 bytes
+def test_ids_that_do_not_fit_are_rejected(tmp_path, asset_id):
+    with ReportArchive(str(tmp_path / "archive")) as archive:
+        with pytest.raises(ValueError):
+            archive.append(ROUTINE, {"asset_id": asset_id}, timestamp=0.0)
+        with pytest.raises(ValueError):
+            archive.extend([(ROUTINE, {"asset_id": "P-1"}), (ROUTINE, {"asset_id": asset_id})], [0.0, 0.0])
+        assert len(archive) == 1
+        assert archive.get(0)["report_metadata"]["report_id"].endswith("-P-1-000000")